@@ -0,0 +1,85 @@
+"""
+Disk used by CV artifacts (core/artifacts.py) under sustained load.
+
+Simulates --jobs generations against a scratch artifact directory: a share
+(--upload-share) go through complete_cv_flow/update_cv and are uploaded, the
+rest through /convert-to-latex and /convert-tex-to-pdf and stay to be
+served. Each writes its .tex, the pdflatex by-products (.aux/.log/.out of
+typical sizes) and a PDF from the direct backend. Reports the directory
+size along the way against what the old flat directory would hold, then
+ages everything past the TTL and sweeps.
+
+    python -m benchmarks.bench_artifacts [--jobs 2000] [--max-mb 4] [--upload-share 0.5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cv
+from core.artifacts import ArtifactStore, _usage
+from utils.json_to_latex import HARVARD, json_to_latex
+from utils.latex_pdf import latex_to_pdf
+
+# Typical sizes of pdflatex's by-products for a one-page CV
+INTERMEDIATES = {".aux": 1_200, ".log": 24_000, ".out": 400}
+
+
+def generate(store: ArtifactStore, filename: str, source: str, pdf: bytes, keep: bool) -> int:
+    """One generation; bytes the old flat layout would have kept"""
+    tex_path = store.create(filename)
+    stem = os.path.splitext(tex_path)[0]
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(source)
+    for extension, size in INTERMEDIATES.items():
+        with open(stem + extension, "wb") as f:
+            f.write(b"%" * size)
+    with open(stem + ".pdf", "wb") as f:
+        f.write(pdf)
+    written = _usage(os.path.dirname(tex_path))[0]
+    store.release(tex_path, keep=keep)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--max-mb", type=float, default=4)
+    parser.add_argument("--upload-share", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    sources = [json_to_latex(make_cv(seed), HARVARD) for seed in range(20)]
+    pdfs = [latex_to_pdf(source) for source in sources]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = ArtifactStore(root, ttl_seconds=3600, max_bytes=int(args.max_mb * 1024 * 1024))
+        flat = peak = 0
+        started = time.perf_counter()
+        for i in range(args.jobs):
+            case = i % len(sources)
+            keep = rng.random() >= args.upload_share
+            flat += generate(store, f"cv_{i:06d}.tex", sources[case], pdfs[case], keep)
+            if (i + 1) % max(1, args.jobs // 5) == 0:
+                size = _usage(root)[0]
+                peak = max(peak, size)
+                print(f"after {i + 1:6d} jobs: {size / 1e6:7.2f} MB in {len(os.listdir(root))} jobs "
+                      f"(flat directory, never cleaned: {flat / 1e6:8.2f} MB)")
+        elapsed = time.perf_counter() - started
+        print(f"peak {peak / 1e6:.2f} MB against a cap of {store.max_bytes / 1e6:.2f} MB; "
+              f"{elapsed / args.jobs * 1e3:.2f} ms per job including the writes")
+
+        expired = time.time() - 2 * store.ttl_seconds
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                os.utime(os.path.join(directory, filename), (expired, expired))
+            os.utime(directory, (expired, expired))
+        sweep_started = time.perf_counter()
+        result = store.collect()
+        print(f"TTL sweep: removed {result['removed_ttl']} expired jobs in "
+              f"{(time.perf_counter() - sweep_started) * 1e3:.1f} ms, {result['bytes']} bytes left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Batch CV ingestion (services/batch_ingestion_service.py) against the replay
+model backend, offline.
+
+* parse: N PDFs parsed inline on the event loop vs on the worker processes
+  of core/pdf_pool.py, with the longest event-loop stall seen meanwhile
+* pipeline: a ZIP of N CVs through POST /cv-batches until the job completes,
+  for several extraction concurrencies, compared with one /analyze-cv-weaknesses
+  request per CV sent one after the other
+
+    python -m benchmarks.bench_batch_ingestion [--files 100] [--latency constant:800]
+        [--workers 4] [--concurrency 1,4,8] [--rate 1000]
+
+--rate sets GEMINI_RATE_PER_SECOND (the governor's token bucket); keep it
+high to measure ingestion alone, or at the deployment's value to see the
+quota become the limit.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+from benchmarks.load_llm_endpoints import cv_pdf, setup_user
+
+
+async def loop_stall(stop: asyncio.Event, samples: list) -> None:
+    """Longest gap between 5 ms ticks of the event loop"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - started - 0.005)
+
+
+async def bench_parse(paths: list, workers: int) -> None:
+    from core.pdf_pool import PDFParsePool
+    from utils.pdf_text import parse_cv_pdf_file
+
+    for mode in ("inline", "pool"):
+        stop, samples = asyncio.Event(), []
+        ticker = asyncio.create_task(loop_stall(stop, samples))
+        started = time.perf_counter()
+        if mode == "inline":
+            for path in paths:
+                parse_cv_pdf_file(path)
+                await asyncio.sleep(0)
+            label = "inline on the event loop"
+        else:
+            pool = PDFParsePool(workers)
+            await pool.parse(paths[0])  # start the workers outside the measurement
+            started = time.perf_counter()
+            await asyncio.gather(*(pool.parse(path) for path in paths))
+            pool.shutdown()
+            label = f"process pool, {workers} workers"
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+        print(f"parse {len(paths)} PDFs {label}: {len(paths) / elapsed:.0f} PDFs/s, "
+              f"longest loop stall {max(samples, default=0) * 1000:.0f} ms")
+
+
+async def bench_pipeline(args, pdfs: list) -> None:
+    import httpx
+    from core.database import AsyncSessionLocal, engine
+    from main import app, on_startup
+    from services import batch_ingestion_service
+
+    engine.echo = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        await on_startup()
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        for i, pdf in enumerate(pdfs):
+            z.writestr(f"cvs/cv{i}.pdf", pdf)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        headers = await setup_user(client, AsyncSessionLocal)
+
+        sequential = pdfs[:max(1, min(len(pdfs), 10))]
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, pdf in enumerate(sequential):
+                files = {"file": (f"cv{i}.pdf", pdf, "application/pdf")}
+                await client.post("/analyze-cv-weaknesses", files=files, headers=headers)
+        per_cv = (time.perf_counter() - started) / len(sequential)
+        print(f"one /analyze-cv-weaknesses per CV, sequential: {1 / per_cv:.2f} CVs/s "
+              f"(~{per_cv * len(pdfs):.0f} s for {len(pdfs)} CVs, extraction + analysis)")
+
+        for concurrency in args.concurrency:
+            batch_ingestion_service.BATCH_INGEST_LLM_CONCURRENCY = concurrency
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = await client.post(
+                    "/cv-batches", headers=headers,
+                    files=[("files", ("batch.zip", archive.getvalue(), "application/zip"))])
+                accepted = time.perf_counter() - started
+                job_id = response.json()["job_id"]
+                while True:
+                    await asyncio.sleep(0.05)
+                    job = (await client.get(f"/cv-batches/{job_id}", headers=headers)).json()
+                    if job["status"] in ("completed", "failed"):
+                        break
+            elapsed = time.perf_counter() - started
+            print(f"/cv-batches, {concurrency} extraction slots: accepted in {accepted * 1000:.0f} ms, "
+                  f"{job['stored']}/{job['total_files']} stored in {elapsed:.1f} s "
+                  f"({job['stored'] / elapsed:.1f} CVs/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--latency", default="constant:800", help="replay latency distribution (ms)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", default="1,4,8", help="extraction slots to compare")
+    parser.add_argument("--rate", default="1000", help="GEMINI_RATE_PER_SECOND")
+    args = parser.parse_args()
+    args.concurrency = [int(value) for value in args.concurrency.split(",")]
+
+    # The app reads these at import time
+    database = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["LLM_BACKEND"] = "replay"
+    os.environ["LLM_REPLAY_LATENCY"] = args.latency
+    os.environ["GEMINI_RATE_PER_SECOND"] = args.rate
+    os.environ["GEMINI_BURST"] = args.rate
+    os.environ.pop("LLM_RECORD_PATH", None)
+
+    pdfs = [cv_pdf(seed) for seed in range(args.files)]
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for i, pdf in enumerate(pdfs):
+            paths.append(os.path.join(workdir, f"{i}.pdf"))
+            with open(paths[-1], "wb") as f:
+                f.write(pdf)
+        asyncio.run(bench_parse(paths, args.workers))
+
+    try:
+        asyncio.run(bench_pipeline(args, pdfs))
+    finally:
+        os.unlink(database)
+    print(f"{args.files} CVs, replay latency {args.latency}, {os.cpu_count()} CPUs")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
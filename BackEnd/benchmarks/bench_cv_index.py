@@ -0,0 +1,133 @@
+"""
+Scale and quality of the CV similarity index (core/cv_index.py).
+
+* embed: utils/cv_embedding.embed_cv throughput on synthetic CVs
+* quality: for job descriptions naming three skills, the share of the top 10
+  CVs listing all three in their skills section (precision@10), against a
+  random ranking
+* scale: an index of N vectors (default 100k, synthesized from skill/word
+  features so building them stays fast): build time, memory, search latency
+  and incremental upsert/remove cost, with NumPy and in pure Python
+
+    python -m benchmarks.bench_cv_index [rows] [--no-numpy]
+
+Pure-Python search is timed on a few queries only; it is the fallback for
+deployments without NumPy, not meant for 100k CVs.
+"""
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from benchmarks.synthetic import SKILLS, VERBS, OBJECTS, make_cv
+from core import cv_index as cv_index_module
+from core.cv_index import CVVectorIndex
+from utils.cv_embedding import embed_cv, embed_text, hash_features, text_features
+
+QUALITY_CVS = 2000
+QUALITY_QUERIES = 200
+SCALE_QUERIES = 50
+VOCABULARY = sorted({word.lower() for phrase in VERBS + OBJECTS for word in phrase.split()} | {
+    "dashboards", "latency", "payments", "analytics", "scalable", "microservices", "testing", "mentoring",
+    "migration", "pipeline", "realtime", "search", "recommendation", "frontend", "checkout", "billing",
+})
+
+
+def job_description(skills: list) -> str:
+    return (f"We are hiring an engineer to build our billing platform. You will work with "
+            f"{', '.join(skills[:-1])} and {skills[-1]} every day.")
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def quality(use_numpy: bool) -> None:
+    rng = random.Random(3)
+    cvs = [make_cv(seed) for seed in range(QUALITY_CVS)]
+
+    started = time.perf_counter()
+    vectors = [embed_cv(cv) for cv in cvs]
+    rate = len(cvs) / (time.perf_counter() - started)
+    print(f"embed_cv: {rate:.0f} CVs/s, {len(vectors[0])} float32 dims ({4 * len(vectors[0])} bytes/CV)")
+
+    index = CVVectorIndex(use_numpy=use_numpy)
+    owner = uuid.uuid4()
+    for cv_id, vector in enumerate(vectors):
+        index.upsert(cv_id, owner, vector)
+    listed = [set(cv["cv_template"]["sections"]["skills"]["categories"][0]["items"]) for cv in cvs]
+
+    hits, baseline = [], []
+    for _ in range(QUALITY_QUERIES):
+        skills = rng.sample(SKILLS, 3)
+        relevant = {cv_id for cv_id, has in enumerate(listed) if has.issuperset(skills)}
+        top = index.search(embed_text(job_description(skills)), 10)
+        hits.append(sum(1 for cv_id, _ in top if cv_id in relevant) / 10)
+        baseline.append(len(relevant) / len(cvs))
+    print(f"precision@10 over {QUALITY_QUERIES} three-skill JDs: {statistics.mean(hits):.2f} "
+          f"(random ranking {statistics.mean(baseline):.2f})")
+
+
+def synthetic_vector(rng: random.Random):
+    """A CV-like vector from random skills and words, without the full pipeline"""
+    features = text_features(" ".join(rng.sample(VOCABULARY, 25)))
+    for skill in rng.sample(SKILLS, 8):
+        features["skill:" + skill] += 3.0
+        features[skill.lower()] += 1.5
+    return hash_features(features)
+
+
+def scale(rows: int, use_numpy: bool) -> None:
+    rng = random.Random(11)
+    started = time.perf_counter()
+    vectors = [synthetic_vector(rng) for _ in range(min(rows, 20000))]
+    print(f"synthesized {len(vectors)} distinct vectors in {time.perf_counter() - started:.1f}s")
+
+    index = CVVectorIndex(use_numpy=use_numpy)
+    owners = [uuid.uuid4() for _ in range(rows // 3 + 1)]
+    started = time.perf_counter()
+    for cv_id in range(rows):
+        index.upsert(cv_id, owners[cv_id // 3], vectors[cv_id % len(vectors)])
+    build = time.perf_counter() - started
+    mode = "numpy" if index.use_numpy else "pure python"
+    print(f"[{mode}] built {len(index)} rows in {build:.1f}s ({len(index) / build:.0f} upserts/s), "
+          f"matrix {index.nbytes / 2 ** 20:.0f} MB")
+
+    queries = [embed_text(job_description(rng.sample(SKILLS, 3))) for _ in range(SCALE_QUERIES)]
+    if not index.use_numpy:
+        queries = queries[:3]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, 10)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"[{mode}] top-10 search over {len(index)} CVs: p50 {percentile(latencies, 0.5):.1f} ms, "
+          f"p95 {percentile(latencies, 0.95):.1f} ms ({len(queries)} queries)")
+
+    started = time.perf_counter()
+    index.search(queries[0], 10, user_id=owners[0])
+    owner_ms = (time.perf_counter() - started) * 1000
+
+    changes = 1000
+    started = time.perf_counter()
+    for i in range(changes):
+        index.upsert(rng.randrange(rows), owners[0], vectors[i % len(vectors)])
+        index.remove(rng.randrange(rows))
+    churn_us = (time.perf_counter() - started) / (2 * changes) * 1e6
+    print(f"[{mode}] one user's CVs: {owner_ms:.2f} ms; incremental upsert/remove: {churn_us:.0f} us each")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 100_000
+    use_numpy = "--no-numpy" not in sys.argv
+    if use_numpy and not cv_index_module.HAS_NUMPY:
+        print("numpy is not installed; using the pure-Python index")
+    quality(use_numpy)
+    scale(rows, use_numpy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Throughput and parity of the section-completeness rules (utils/cv_rules.py)
+against the inline checks /analyze-cv-weaknesses ran before they were
+extracted. Every case must give the same section_analysis, missing sections
+and suggestions as the reference; exits 1 otherwise.
+
+    python -m benchmarks.bench_cv_rules [cvs]
+"""
+import copy
+import json
+import random
+import sys
+import time
+
+from benchmarks.synthetic import make_cv
+from utils.cv_rules import evaluate_cv_completeness
+from utils.cv_structure import CV_STRUCTURE
+
+
+def inline_checks(extracted_cv_data: dict) -> dict:
+    """The checks as they were written inline in the route"""
+    sections = extracted_cv_data.get("cv_template", {}).get("sections", {})
+    section_analysis = {}
+    missing_sections = []
+    improvement_suggestions = []
+
+    header = sections.get("header", {})
+    contact_info = header.get("contact_info", {})
+    header_analysis = {"is_complete": True, "missing_fields": []}
+    if not header.get("name") or header.get("name") == "Firstname Lastname":
+        header_analysis["is_complete"] = False
+        header_analysis["missing_fields"].append("name")
+    for field in ["email", "phone", "location"]:
+        field_data = contact_info.get(field, {})
+        if not field_data or not field_data.get("value"):
+            header_analysis["is_complete"] = False
+            header_analysis["missing_fields"].append(f"contact_info.{field}")
+    if not header_analysis["is_complete"]:
+        missing_sections.append("Contact Information")
+        improvement_suggestions.append("Complete your contact information for better reachability")
+    section_analysis["header"] = header_analysis
+
+    education_items = sections.get("education", {}).get("items", [])
+    education_analysis = {"is_complete": bool(education_items), "item_count": len(education_items), "missing_fields": []}
+    if not education_items:
+        missing_sections.append("Education")
+        improvement_suggestions.append("Add your educational background")
+    else:
+        incomplete_items = 0
+        for item in education_items:
+            if not item.get("institution") or not item.get("degree"):
+                incomplete_items += 1
+        if incomplete_items > 0:
+            education_analysis["missing_fields"].append(f"{incomplete_items} education entries are incomplete")
+            improvement_suggestions.append("Complete all education entries with institution, degree, and dates")
+    section_analysis["education"] = education_analysis
+
+    experience_items = sections.get("experience", {}).get("items", [])
+    experience_analysis = {"is_complete": bool(experience_items), "item_count": len(experience_items),
+                           "missing_fields": [], "items_without_achievements": 0}
+    if not experience_items:
+        missing_sections.append("Work Experience")
+        improvement_suggestions.append("Add your work experience to showcase your professional background")
+    else:
+        items_without_achievements = 0
+        items_without_quantifiables = 0
+        for item in experience_items:
+            achievements = item.get("achievements", [])
+            if not achievements:
+                items_without_achievements += 1
+                continue
+            has_quantifiable = False
+            for achievement in achievements:
+                if any(char.isdigit() for char in achievement):
+                    has_quantifiable = True
+                    break
+            if not has_quantifiable:
+                items_without_quantifiables += 1
+        experience_analysis["items_without_achievements"] = items_without_achievements
+        experience_analysis["items_without_quantifiables"] = items_without_quantifiables
+        if items_without_achievements > 0:
+            experience_analysis["missing_fields"].append(f"{items_without_achievements} jobs lack achievements")
+            improvement_suggestions.append("Add achievements for all work experiences")
+        if items_without_quantifiables > 0:
+            improvement_suggestions.append("Add quantifiable metrics to your achievements (e.g., 'Increased sales by 20%')")
+    section_analysis["experience"] = experience_analysis
+
+    skill_categories = sections.get("skills", {}).get("categories", [])
+    skills_analysis = {"is_complete": bool(skill_categories), "category_count": len(skill_categories),
+                       "total_skills": sum(len(category.get("items", [])) for category in skill_categories),
+                       "missing_categories": []}
+    if not skill_categories:
+        missing_sections.append("Skills")
+        improvement_suggestions.append("Add your technical and soft skills")
+    else:
+        category_names = [category.get("name", "").lower() for category in skill_categories]
+        for category in ["technical", "language", "soft skills", "tools"]:
+            if not any(category in name for name in category_names):
+                skills_analysis["missing_categories"].append(category)
+        if skills_analysis["missing_categories"]:
+            improvement_suggestions.append("Consider adding more skill categories: " + ", ".join(skills_analysis["missing_categories"]))
+        if skills_analysis["total_skills"] < 5:
+            improvement_suggestions.append("Add more specific skills to make your profile more attractive")
+    section_analysis["skills"] = skills_analysis
+
+    project_items = sections.get("projects", {}).get("items", [])
+    projects_analysis = {"is_complete": bool(project_items), "item_count": len(project_items),
+                         "items_without_contributions": 0}
+    if not project_items and not experience_items:
+        missing_sections.append("Projects")
+        improvement_suggestions.append("Add projects to showcase your practical skills")
+    elif project_items:
+        items_without_contributions = 0
+        for item in project_items:
+            if not item.get("key_contributions", []):
+                items_without_contributions += 1
+        projects_analysis["items_without_contributions"] = items_without_contributions
+        if items_without_contributions > 0:
+            improvement_suggestions.append("Add specific contributions for each project")
+    section_analysis["projects"] = projects_analysis
+
+    language_fields = []
+    for category in skill_categories:
+        if isinstance(category, dict) and category.get("name", "").lower() == "languages":
+            for i, item in enumerate(category.get("items", [])):
+                if isinstance(item, str):
+                    if "(" in item and ")" in item:
+                        parts = item.split("(")
+                        language_name = parts[0].strip()
+                        proficiency = parts[1].replace(")", "").strip()
+                    else:
+                        language_name = item.strip()
+                        proficiency = "Intermediate"
+                elif isinstance(item, dict):
+                    language_name = item.get("language", "") or item.get("name", "")
+                    proficiency = item.get("proficiency", "Intermediate")
+                else:
+                    continue
+                language_fields.append({"id": f"language_{i}", "language": language_name, "proficiency": proficiency})
+            break
+    section_analysis["languages"] = {"is_complete": bool(language_fields), "item_count": len(language_fields)}
+
+    return {"section_analysis": section_analysis, "missing_sections": missing_sections,
+            "improvement_suggestions": improvement_suggestions}
+
+
+def build_cases(count: int) -> list:
+    """Synthetic CVs with random sections emptied, fields dropped and numbers stripped"""
+    rng = random.Random(7)
+    cases = [json.loads(CV_STRUCTURE), {}, {"cv_template": {"sections": {}}}]
+    for seed in range(count - len(cases)):
+        cv = make_cv(seed, experience_items=rng.randint(0, 5), project_items=rng.randint(0, 4),
+                     achievements=rng.randint(0, 5))
+        sections = cv["cv_template"]["sections"]
+        header = sections["header"]
+        header["contact_info"] = {
+            field: {"value": f"{field} {seed}"} for field in ("email", "phone", "location") if rng.random() < 0.8
+        }
+        if rng.random() < 0.1:
+            header["name"] = rng.choice(["", "Firstname Lastname"])
+        if rng.random() < 0.15:
+            sections["education"]["items"] = []
+        for item in sections["education"]["items"]:
+            if rng.random() < 0.2:
+                item.pop(rng.choice(["institution", "degree"]), None)
+        for job in sections["experience"]["items"]:
+            if rng.random() < 0.3:
+                job["achievements"] = [a.translate(str.maketrans("", "", "0123456789")) for a in job["achievements"]]
+        for project in sections["projects"]["items"]:
+            if rng.random() < 0.2:
+                project["key_contributions"] = []
+        categories = sections["skills"]["categories"]
+        if rng.random() < 0.2:
+            categories[0]["items"] = categories[0]["items"][:3]
+        if rng.random() < 0.3:
+            categories.append({"name": "Soft Skills", "items": ["Mentoring"]})
+        if rng.random() < 0.3:
+            categories[1]["items"].append({"language": "French", "proficiency": "Basic"})
+        if rng.random() < 0.1:
+            sections["skills"]["categories"] = []
+        cases.append(cv)
+    return cases
+
+
+def throughput(func, cases: list) -> float:
+    start = time.perf_counter()
+    for cv in cases:
+        func(cv)
+    return len(cases) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = build_cases(count)
+
+    mismatches = 0
+    for index, cv in enumerate(cases):
+        expected = inline_checks(copy.deepcopy(cv))
+        actual = evaluate_cv_completeness(cv)
+        actual.pop("score")
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"case {index} differs:\n  inline {expected}\n  rules  {actual}")
+    print(f"parity: {len(cases) - mismatches}/{len(cases)} cases identical")
+
+    inline_rate = throughput(inline_checks, cases)
+    rules_rate = throughput(evaluate_cv_completeness, cases)
+    scores = sorted(evaluate_cv_completeness(cv)["score"] for cv in cases)
+    print(f"inline checks  {inline_rate:>9.0f} CVs/s")
+    print(f"cv_rules       {rules_rate:>9.0f} CVs/s (with score)")
+    print(f"score p10/p50/p90: {scores[len(scores) // 10]}/{scores[len(scores) // 2]}/{scores[len(scores) * 9 // 10]}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Token spend and wall-clock time of one job description analysis, merged
+(one Gemini call) versus staged (three sequential calls).
+
+Gemini is replaced by a stub that returns canned, schema-valid replies and
+sleeps for a modelled latency: a fixed per-call overhead, a prefill cost per
+input token and a decode cost per output token. Prompts are the real ones
+built by GeminiService, so the token numbers reflect the actual prompts.
+
+    python -m benchmarks.bench_jd_analysis [analyses]
+"""
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+
+import services.gemini_service as gemini_module
+from benchmarks.synthetic import make_cv
+from core.llm_governor import LLMGovernor
+from services.llm_backends import LLMReply
+from utils.prompt_serializer import estimate_tokens
+
+# Latency model for the stub, roughly gemini-2.0-flash over the public API
+CALL_OVERHEAD_MS = 350
+PREFILL_MS_PER_TOKEN = 0.02
+DECODE_MS_PER_TOKEN = 4
+
+JOB_DESCRIPTION = (
+    "Senior Mobile Engineer. 5+ years building iOS and Android apps with Flutter or Swift/Kotlin. "
+    "Experience with Firebase, CI/CD, REST and GraphQL APIs, unit testing and Docker. "
+    "Team lead experience is a plus. Bachelor's degree in Computer Science or equivalent."
+)
+
+EXPERIENCE = {
+    "candidate_total_experience": {"years": 4, "months": 0, "level": "Mid-level"},
+    "job_requirements": {"minimum_years": 5, "preferred_years": 7, "seniority_level": "Senior",
+                         "specific_requirements": ["5+ years mobile development"],
+                         "special_requirements": ["Team lead experience"]},
+    "experience_analysis": {"meets_minimum": False, "experience_gap_years": 1, "level_match": "Gap",
+                            "strengths": ["Cross-platform delivery"], "gaps": ["No team lead role"],
+                            "recommendations": ["Highlight mentoring work"]},
+    "notable_requirements": ["Team lead experience"],
+}
+GAPS = {
+    "missing_requirements": ["Swift", "Unit Testing"],
+    "weaknesses": [{"category": "Skills", "description": "No native iOS work shown"}],
+    "recommended_courses": [
+        {"title": "Swift Fundamentals", "platform": "Apple Developer", "url": "https://developer.apple.com/swift/",
+         "reason": "Native iOS language required by the role", "skill_addressed": "Swift",
+         "estimated_time": "4 weeks", "level": "Beginner", "is_free": True},
+        {"title": "Flutter Testing", "platform": "YouTube", "reason": "Role asks for unit testing",
+         "skill_addressed": "Unit Testing", "estimated_time": "6 hours", "level": "Intermediate", "is_free": True},
+    ],
+}
+COMPARISON = {"matches": ["Flutter", "Firebase", "Docker", "GraphQL"], "missing": ["Swift", "Unit Testing"]}
+
+REPLIES = {
+    "SkillComparison": COMPARISON,
+    "ExperienceAnalysis": EXPERIENCE,
+    "JobGapAnalysis": GAPS,
+    "JobDescriptionAnalysis": {**COMPARISON, "experience": EXPERIENCE, **GAPS},
+}
+
+
+class StubBackend:
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def generate_json(self, model, prompt, schema):
+        text = json.dumps(REPLIES[schema.__name__])
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+        await asyncio.sleep((CALL_OVERHEAD_MS + input_tokens * PREFILL_MS_PER_TOKEN
+                             + output_tokens * DECODE_MS_PER_TOKEN) / 1000)
+        return LLMReply(text=text, parsed=schema.model_validate_json(text), prompt_tokens=input_tokens)
+
+
+async def run(mode: str, analyses: int) -> dict:
+    gemini_module.JD_ANALYSIS_MODE = mode
+    # Measure the calls themselves, not the production rate limit
+    gemini_module.llm_governor = LLMGovernor(rate=1000, burst=1000)
+    backend = StubBackend()
+    service = gemini_module.GeminiService(backend=backend)
+
+    durations = []
+    for seed in range(analyses):
+        cv = make_cv(seed)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await service.analyze_cv_against_job_description(cv, JOB_DESCRIPTION)
+        durations.append((time.perf_counter() - start) * 1000)
+        assert "error" not in result and result["overall_grade"]["score"] > 0, result
+
+    return {
+        "calls": backend.calls / analyses,
+        "input_tokens": backend.input_tokens / analyses,
+        "output_tokens": backend.output_tokens / analyses,
+        "wall_ms": statistics.mean(durations),
+    }
+
+
+def main():
+    analyses = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {mode: asyncio.run(run(mode, analyses)) for mode in ("staged", "merged")}
+
+    print(f"per analysis, mean of {analyses}:")
+    print(f"  {'mode':<8}{'calls':>7}{'input tok':>11}{'output tok':>12}{'wall ms':>10}")
+    for mode, r in results.items():
+        print(f"  {mode:<8}{r['calls']:>7.0f}{r['input_tokens']:>11.0f}{r['output_tokens']:>12.0f}{r['wall_ms']:>10.0f}")
+    staged, merged = results["staged"], results["merged"]
+    print(f"merged saves {1 - merged['input_tokens'] / staged['input_tokens']:.0%} input tokens "
+          f"and {1 - merged['wall_ms'] / staged['wall_ms']:.0%} wall-clock time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Table size and read latency of plain JSON columns versus the CompressedJSON
+codec, measured on throwaway SQLite databases.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.bench_json_storage [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import Column, Integer, JSON, MetaData, Table, create_engine, insert, select
+
+from benchmarks.synthetic import make_cv
+from models.types import CompressedJSON
+
+
+def run(rows: int, column_type) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    cvs = Table("cvs", metadata, Column("id", Integer, primary_key=True), Column("cv_structure", column_type))
+    metadata.create_all(engine)
+
+    payloads = [make_cv(seed=i) for i in range(rows)]
+    with engine.begin() as conn:
+        conn.execute(insert(cvs), [{"id": i + 1, "cv_structure": p} for i, p in enumerate(payloads)])
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        loaded = conn.execute(select(cvs.c.cv_structure)).scalars().all()
+    elapsed = time.perf_counter() - start
+
+    assert loaded == payloads
+    engine.dispose()
+    os.remove(path)
+    return {"size_bytes": size, "read_ms": elapsed * 1000}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    before = run(rows, JSON)
+    after = run(rows, CompressedJSON)
+
+    print(f"rows: {rows}")
+    print(f"{'storage':<16}{'table size':>14}{'read all (ms)':>16}{'per row (us)':>14}")
+    for label, result in (("JSON", before), ("CompressedJSON", after)):
+        print(f"{label:<16}{result['size_bytes']:>14,}{result['read_ms']:>16.1f}"
+              f"{result['read_ms'] * 1000 / rows:>14.1f}")
+    print(f"size ratio: {after['size_bytes'] / before['size_bytes']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
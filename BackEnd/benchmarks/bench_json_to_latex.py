@@ -0,0 +1,471 @@
+"""
+Throughput and parity of the LaTeX generator (utils/json_to_latex.py)
+against the string-concatenating version it replaced, kept below as the
+reference (minus its debug prints). Random CVs, with LaTeX special
+characters and odd value types mixed in, must render identically; exits 1
+otherwise. Golden files: benchmarks/check_latex_golden.py.
+
+    python -m benchmarks.bench_json_to_latex [cvs]
+"""
+import random
+import sys
+import time
+
+from benchmarks.synthetic import make_cv
+from utils.json_to_latex import generate_latex_list, json_to_latex
+
+SPECIALS = "\\&%$#_{}~^"
+
+
+# --- Reference: the generator before it was restructured ---
+
+def legacy_escape_latex(text):
+    """Escapes special LaTeX characters in a string."""
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.replace('\\', r'\textbackslash{}')
+    text = text.replace('&', r'\&')
+    text = text.replace('%', r'\%')
+    text = text.replace('$', r'\$')
+    text = text.replace('#', r'\#')
+    text = text.replace('_', r'\_')
+    text = text.replace('{', r'\{')
+    text = text.replace('}', r'\}')
+    text = text.replace('~', r'\textasciitilde{}')
+    text = text.replace('^', r'\textasciicircum{}')
+    return text
+
+def legacy_format_dates(dates_obj):
+    """Formats the start and end dates."""
+    if not isinstance(dates_obj, dict):
+        return ""
+    start = dates_obj.get("start", "")
+    end = dates_obj.get("end", "")
+    is_current = dates_obj.get("is_current", False)
+
+    if is_current or (isinstance(end, str) and end.lower() == 'present'):
+        end = "Present"
+
+    start_esc = legacy_escape_latex(start) if start else ""
+    end_esc = legacy_escape_latex(end) if end else ""
+
+    if start_esc and end_esc:
+        return f"{start_esc} -- {end_esc}"
+    elif start_esc:
+        return start_esc
+    elif end_esc:
+        return end_esc
+    else:
+        return ""
+
+def legacy_generate_latex_list(items):
+    """Generates a LaTeX itemize list for achievements/contributions with proper spacing."""
+    if not isinstance(items, list):
+        return ""
+    if not items:
+        return ""
+        
+    # Harvard-style compact formatting
+    latex = "\\begin{itemize}[noitemsep, topsep=0pt, partopsep=0pt, parsep=0pt]\n"
+    for item in items:
+        latex += f"    \\item {legacy_escape_latex(item)}\n"
+    latex += "\\end{itemize}\n"
+    return latex
+
+def legacy_json_to_latex(json_data):
+    """Converts CV JSON data to a LaTeX string using the Harvard template."""
+
+    if not isinstance(json_data, dict):
+         raise TypeError("Input data must be a dictionary.")
+
+    # Use .get chaining safely
+    cv_data = json_data.get("cv_template", {})
+    if not isinstance(cv_data, dict): cv_data = {}
+
+    metadata = cv_data.get("metadata", {})
+    if not isinstance(metadata, dict): metadata = {}
+
+    sections = cv_data.get("sections", {})
+    if not isinstance(sections, dict): sections = {}
+
+    # Default section order if not specified
+    default_order = ["header", "education", "experience", "projects",
+                     "skills", "interests", "certifications"]
+                      
+    section_order = metadata.get("section_order", default_order)
+    
+    # Make sure section_order is valid
+    if not isinstance(section_order, list) or not section_order: 
+        section_order = default_order
+
+    # --- LaTeX Preamble for Harvard Style CV ---
+    latex_string = r"""
+\documentclass[11pt]{article}
+
+% Harvard Style CV Template - Compatible with basic LaTeX installations
+\setlength{\parindent}{0pt}
+\usepackage{hyperref}
+\usepackage{enumitem}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[left=1.06cm,top=1.7cm,right=1.06cm,bottom=0.49cm]{geometry}
+
+% Basic hyperref settings
+\hypersetup{
+    colorlinks=true,
+    linkcolor=blue,
+    filecolor=blue,
+    urlcolor=blue,
+    pdftitle={Harvard Style CV},
+}
+
+% Custom section formatting to match Harvard style
+\makeatletter
+\renewcommand{\section}[1]{%
+  \vspace{12pt}%
+  \begin{center}%
+    \textbf{#1}%
+  \end{center}%
+  \vspace{0.5pt}%
+}
+\makeatother
+
+\begin{document}
+"""
+
+    # --- Process Sections Based on Order ---
+    processed_sections = []
+    for section_key in section_order:
+        section_content = sections.get(section_key)
+        if not isinstance(section_content, dict):
+            continue
+
+        section_latex = ""
+
+        # --- Header Section ---
+        if section_key == "header":
+            name = legacy_escape_latex(section_content.get("name", "Firstname Lastname"))
+            title = legacy_escape_latex(section_content.get("title", ""))
+            contact_info = section_content.get("contact_info", {})
+            if not isinstance(contact_info, dict): contact_info = {}
+
+            email_info = contact_info.get("email", {})
+            if not isinstance(email_info, dict): email_info = {}
+            phone_info = contact_info.get("phone", {})
+            if not isinstance(phone_info, dict): phone_info = {}
+            location_info = contact_info.get("location", {})
+            if not isinstance(location_info, dict): location_info = {}
+
+            email_val = legacy_escape_latex(email_info.get("value", ""))
+            email_link_target = email_info.get("value", "")
+            email_link = legacy_escape_latex(email_info.get("link", f"mailto:{email_link_target}" if isinstance(email_link_target, str) else ""))
+
+            phone_val = legacy_escape_latex(phone_info.get("value", ""))
+            phone_link_target = phone_info.get("value", "")
+            phone_link = legacy_escape_latex(phone_info.get("link", f"tel:{phone_link_target}" if isinstance(phone_link_target, str) else ""))
+
+            location_val = legacy_escape_latex(location_info.get("value", ""))
+
+            contact_parts = []
+            if location_val:
+                contact_parts.append(location_val)
+            if email_val and email_link:
+                 contact_parts.append(f"\\href{{{email_link}}}{{{email_val}}}")
+            if phone_val and phone_link:
+                 contact_parts.append(f"\\href{{{phone_link}}}{{{phone_val}}}")
+
+            # Harvard-style header with centered name and horizontal rule
+            section_latex += "\\begin{center}\n"
+            section_latex += f"    \\textbf{{{name}}}\\\\ \n"
+            section_latex += "    \\hrulefill\n"
+            section_latex += "\\end{center}\n\n"
+            section_latex += "\\begin{center}\n"
+            section_latex += "    " + " \\textbullet\\ ".join(contact_parts) + "\n"
+            section_latex += "\\end{center}\n\n"
+            section_latex += "\\vspace{0.5pt}\n\n"
+            processed_sections.append(section_latex)
+            continue
+
+        # --- General Section Title with Harvard Style ---
+        section_title = legacy_escape_latex(section_content.get("section_title", section_key.capitalize()))
+        section_latex += f"\\section{{{section_title}}}\n"
+
+        # --- Summary Section ---
+        if section_key == "summary":
+            content = legacy_escape_latex(section_content.get("content", ""))
+            if content:
+                section_latex += f"{content}\n\n"
+
+        # --- Education Section ---
+        elif section_key == "education":
+            items = section_content.get("items", [])
+            if not isinstance(items, list): items = []
+            for i, item in enumerate(items):
+                 if not isinstance(item, dict): continue
+                 institution = legacy_escape_latex(item.get("institution", ""))
+                 start_date = legacy_escape_latex(item.get("start_date", ""))
+                 graduation_date = legacy_escape_latex(item.get("graduation_date", ""))
+                 gpa = legacy_escape_latex(item.get("gpa", ""))
+
+                 # Format date range
+                 dates_str = ""
+                 if start_date and graduation_date:
+                     dates_str = f"{start_date} -- {graduation_date}"
+                 elif graduation_date:
+                     dates_str = graduation_date
+                 elif start_date:
+                     dates_str = start_date
+
+                 # Harvard-style education entry - simplified format
+                 section_latex += f"\\textbf{{{institution}}} \\hfill {dates_str}\n"
+
+                 # Add GPA if available
+                 if gpa:
+                     section_latex += f"GPA: {gpa}\n"
+
+                 section_latex += "\n"
+
+                 # Add proper spacing between education entries
+                 if i < len(items) - 1:
+                     section_latex += "\\vspace{12pt}\n"
+        # --- Experience Section with Enhanced Formatting ---
+        elif section_key == "experience":
+            items = section_content.get("items", [])
+            if not isinstance(items, list): items = []
+            for i, item in enumerate(items):
+                 if not isinstance(item, dict): continue
+                 company = legacy_escape_latex(item.get("company", ""))
+                 location = legacy_escape_latex(item.get("location", ""))
+                 title = legacy_escape_latex(item.get("title", ""))
+                 dates_str = legacy_format_dates(item.get("dates", {}))
+                 achievements = item.get("achievements", [])
+                 technologies = item.get("technologies", [])
+                 if not isinstance(technologies, list): technologies = []
+
+                 # Harvard-style job entry
+                 section_latex += f"\\textbf{{{company}}} \\hfill {location}\n\n"
+                 section_latex += f"\\textbf{{{title}}} \\hfill {dates_str}\n"
+                   # Properly formatted achievements list
+                 if achievements:
+                     # Handle both string and list formats
+                     if isinstance(achievements, str):
+                         # If it's a string, treat it as a single achievement
+                         achievements_list = [achievements]
+                     elif isinstance(achievements, list):
+                         # If it's already a list, use it as is
+                         achievements_list = achievements
+                     else:
+                         # Fallback for other types
+                         achievements_list = [str(achievements)]
+                     
+                     achievements_latex = legacy_generate_latex_list(achievements_list)
+                     section_latex += achievements_latex
+
+                 # Add technologies if present
+                 if technologies:
+                      section_latex += f"\\textit{{Technologies:}} {legacy_escape_latex(', '.join(filter(None, map(str, technologies))))}\n"
+                 
+                 # Add clear spacing between job entries
+                 if i < len(items) - 1:
+                     section_latex += "\\vspace{12pt}\n"  # Harvard-style spacing between experience items
+
+        # --- Projects Section with Enhanced Formatting ---
+        elif section_key == "projects":
+            items = section_content.get("items", [])
+            if not isinstance(items, list): items = []
+            for i, item in enumerate(items):
+                 if not isinstance(item, dict): continue
+                 title = legacy_escape_latex(item.get("title", ""))
+                 description = legacy_escape_latex(item.get("description", ""))
+                 
+                 # Format dates properly
+                 start_date = item.get("start_date", "")
+                 end_date = item.get("end_date", "")
+                 
+                 # Use direct date fields if available, otherwise use dates object
+                 if start_date or end_date:
+                     if start_date and end_date:
+                         dates_str = f"{legacy_escape_latex(start_date)} -- {legacy_escape_latex(end_date)}"
+                     elif start_date:
+                         dates_str = legacy_escape_latex(start_date)
+                     else:
+                         dates_str = legacy_escape_latex(end_date)
+                 else:
+                     dates_str = legacy_format_dates(item.get("dates", {}))
+                     
+                 # Handle both key_contributions and contributions fields
+                 contributions = []
+                 if "key_contributions" in item:
+                     contributions = item.get("key_contributions", [])
+                 elif "contributions" in item:
+                     contributions = item.get("contributions", [])
+                     
+                 technologies = item.get("technologies", [])
+                 if not isinstance(technologies, list): technologies = []
+
+                 # Harvard-style project entry
+                 section_latex += f"\\textbf{{{title}}} \\hfill {dates_str}\n\n"
+                 
+                 if description:
+                     section_latex += f"{description}\n\n"  # Add extra newline for spacing
+                     
+                 # Add contributions as bullet points
+                 if contributions:
+                     section_latex += legacy_generate_latex_list(contributions)
+                 
+                 # Add technologies if present
+                 if technologies:
+                      section_latex += f"\\textit{{Technologies:}} {legacy_escape_latex(', '.join(filter(None, map(str, technologies))))}\n\n"  # Add extra newline here
+                 
+                 # Add clear spacing between project entries
+                 if i < len(items) - 1:
+                     section_latex += "\\vspace{12pt}\n"  # Harvard-style spacing between project items
+
+        # --- Skills Section with Harvard Formatting (includes languages) ---
+        elif section_key == "skills":
+            categories = section_content.get("categories", [])
+            if not isinstance(categories, list): categories = []
+
+            for i, category in enumerate(categories):
+                if not isinstance(category, dict): continue
+                cat_name = legacy_escape_latex(category.get("name", "Skills"))
+                items = category.get("items", [])
+                if not isinstance(items, list): items = []
+                if items:
+                    escaped_items = [legacy_escape_latex(skill) for skill in items if isinstance(skill, str)]
+                    if escaped_items:
+                        section_latex += f"\\textbf{{{cat_name}:}} {', '.join(escaped_items)}\n\n"
+
+        # --- Interests Section ---
+        elif section_key == "interests":
+            items = section_content.get("items", [])
+            if not isinstance(items, list): items = []
+            if items:
+                interests_str = ", ".join([legacy_escape_latex(interest) for interest in items if interest])
+                if interests_str:
+                    section_latex += f"{interests_str}\n\n"
+
+        # --- Certifications Section ---
+        elif section_key == "certifications":
+            items = section_content.get("items", [])
+            if not isinstance(items, list): items = []
+            for item in items:
+                if not isinstance(item, dict): continue
+                title = legacy_escape_latex(item.get("title", ""))
+                institution = legacy_escape_latex(item.get("institution", ""))
+                date = legacy_escape_latex(item.get("date", ""))
+
+                if title:
+                    cert_line = f"\\textbf{{{title}}}"
+                    if institution:
+                        cert_line += f", {institution}"
+                    if date:
+                        cert_line += f" \\hfill {date}"
+                    section_latex += cert_line + "\n\n"
+
+
+
+        # Only add sections that have content (skip empty sections)
+        if section_latex.strip() and section_key != "header":
+            # Check if section has actual content beyond just the title
+            content_lines = [line.strip() for line in section_latex.split('\n') if line.strip()]
+            # If we have more than just the section title, add it
+            if len(content_lines) > 1 or (len(content_lines) == 1 and not content_lines[0].startswith('\\section{')):
+                processed_sections.append(section_latex)
+
+    # --- Join processed sections ---
+    latex_string += "\n".join(processed_sections)
+
+    # --- LaTeX Ending ---
+    latex_string += r"""
+\end{document}
+"""
+
+    return latex_string
+
+
+# --- Benchmark ---
+
+def noisy(value, rng: random.Random):
+    """Sprinkle LaTeX special characters into the strings of a CV, and now and then swap a type"""
+    if isinstance(value, dict):
+        return {key: noisy(item, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [noisy(item, rng) for item in value]
+    if isinstance(value, str):
+        roll = rng.random()
+        if roll < 0.02:
+            return rng.choice([None, 42, 3.5, "", ["nested"], {"odd": "dict"}])
+        if roll < 0.5:
+            chars = list(value)
+            for _ in range(rng.randint(1, 3)):
+                chars.insert(rng.randint(0, len(chars)), rng.choice(SPECIALS))
+            return "".join(chars)
+    return value
+
+
+def random_cv(seed: int) -> dict:
+    rng = random.Random(seed)
+    cv = make_cv(seed, experience_items=rng.randint(0, 6), project_items=rng.randint(0, 5),
+                 achievements=rng.randint(0, 8))
+    cv = noisy(cv, rng)
+    order = cv["cv_template"]["metadata"]["section_order"]
+    if rng.random() < 0.3:
+        rng.shuffle(order)
+    if rng.random() < 0.2:
+        order.append(rng.choice(["summary", "languages", "skills"]))
+    if rng.random() < 0.2:
+        cv["cv_template"]["sections"]["summary"] = {"content": noisy("Engineer & mentor, 100% remote", rng)}
+    return cv
+
+
+def outcome(func, cv):
+    """Rendered text, or the type of the exception raised (which must match too)"""
+    try:
+        return func(cv)
+    except Exception as e:
+        return type(e)
+
+
+def timed(func, cvs: list, rounds: int) -> float:
+    """Best per-CV time over `rounds` passes, in microseconds"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for cv in cvs:
+            func(cv)
+        best = min(best, time.perf_counter() - started)
+    return best / len(cvs) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    mismatches = 0
+    for seed in range(count):
+        cv = random_cv(seed)
+        if outcome(json_to_latex, cv) != outcome(legacy_json_to_latex, cv):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"MISMATCH for random CV {seed}")
+    print(f"parity: {count - mismatches}/{count} random CVs render identically")
+
+    large = [make_cv(seed, experience_items=12, project_items=8, achievements=10) for seed in range(50)]
+    special = [cv for cv in map(random_cv, range(300)) if isinstance(outcome(json_to_latex, cv), str)][:200]
+    size = sum(len(json_to_latex(cv)) for cv in large) // len(large)
+    for label, cvs in ((f"large CVs (~{size // 1000} KB of LaTeX)", large), ("noisy random CVs", special)):
+        before = timed(legacy_json_to_latex, cvs, 5)
+        after = timed(json_to_latex, cvs, 5)
+        print(f"json_to_latex, {label}: {before:.0f} -> {after:.0f} us per CV ({before / after:.1f}x)")
+
+    lists = [item["achievements"] for cv in large for item in cv["cv_template"]["sections"]["experience"]["items"]]
+    lists += [noisy(items, random.Random(i)) for i, items in enumerate(lists[:300])]
+    before = timed(legacy_generate_latex_list, lists, 5)
+    after = timed(generate_latex_list, lists, 5)
+    print(f"generate_latex_list over {len(lists)} lists: {before:.1f} -> {after:.1f} us per list "
+          f"({before / after:.1f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Re-rendering a CV after a one-field edit with the LaTeX fragment cache
+(core/latex_cache.py) against a full render, for CVs with more and more
+entries. Also checks that cached renders, cold and warm and after random
+edits, match uncached ones byte for byte; exits 1 otherwise.
+
+    python -m benchmarks.bench_latex_fragments [cvs]
+"""
+import copy
+import random
+import sys
+import time
+
+from benchmarks.bench_json_to_latex import outcome, random_cv
+from benchmarks.synthetic import make_cv
+from core.latex_cache import LatexFragmentCache
+from utils.json_to_latex import json_to_latex
+from utils.latex_templates import list_templates
+
+
+def random_edit(cv: dict, rng: random.Random) -> dict:
+    """A copy of cv with one field changed, the way /cv/{cv_id}/update edits it"""
+    cv = copy.deepcopy(cv)
+    sections = cv["cv_template"]["sections"]
+    key = rng.choice(sorted(k for k, v in sections.items() if isinstance(v, dict)))
+    section = sections[key]
+    items = section.get("items")
+    if isinstance(items, list) and items and isinstance(items[0], dict):
+        item = rng.choice(items)
+        field = rng.choice(sorted(item))
+        item[field] = f"edited {rng.random()} & 50%"
+    elif isinstance(items, list) and items:
+        items[rng.randrange(len(items))] = f"edited {rng.random()}"
+    else:
+        section["section_title"] = f"Edited_{rng.random()}"
+    return cv
+
+
+def check_parity(count: int) -> int:
+    mismatches = 0
+    for template in list_templates():
+        cache = LatexFragmentCache()
+        for seed in range(count):
+            rng = random.Random(seed)
+            cv = random_cv(seed)
+            versions = [cv, cv]
+            if isinstance(outcome(json_to_latex, cv), str):
+                versions += [random_edit(cv, rng) for _ in range(3)]
+            for version in versions:
+                cached = outcome(lambda data: json_to_latex(data, template, fragment_cache=cache), version)
+                if cached != outcome(lambda data: json_to_latex(data, template), version):
+                    mismatches += 1
+                    if mismatches <= 3:
+                        print(f"MISMATCH for random CV {seed} [{template.name}]")
+    print(f"parity: cached renders of {count} random CVs and their edits, {len(list_templates())} templates, "
+          f"{mismatches} mismatches")
+    return mismatches
+
+
+def bench_edits() -> None:
+    for entries in (10, 30, 100):
+        cv = make_cv(entries, experience_items=entries, project_items=entries // 2, achievements=8)
+        rng = random.Random(entries)
+        edits = [random_edit(cv, rng) for _ in range(200)]
+        size = len(json_to_latex(cv)) // 1000
+
+        started = time.perf_counter()
+        for edited in edits:
+            json_to_latex(edited)
+        full = (time.perf_counter() - started) / len(edits)
+
+        cache = LatexFragmentCache()
+        elapsed = 0.0
+        for edited in edits:
+            json_to_latex(cv, fragment_cache=cache)  # the render before the edit
+            started = time.perf_counter()
+            json_to_latex(edited, fragment_cache=cache)
+            elapsed += time.perf_counter() - started
+        cached = elapsed / len(edits)
+        print(f"{entries} experience + {entries // 2} project entries (~{size} KB of LaTeX), one-field edit: "
+              f"full render {full * 1e6:.0f} us, cached {cached * 1e6:.0f} us ({full / cached:.1f}x)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    mismatches = check_parity(count)
+    bench_edits()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Rendering throughput of each registered LaTeX template
+(utils/latex_templates.py), whether registering more templates changes the
+cost of picking and rendering one, and, when pdflatex is installed, compile
+time with and without the template's precompiled format
+(core/latex_formats.py).
+
+    python -m benchmarks.bench_latex_templates [--cvs 200] [--extra-templates 200] [--compiles 5]
+"""
+import argparse
+import dataclasses
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cv
+from services.latex_service import select_template
+from utils.json_to_latex import json_to_latex
+from utils.latex_templates import TEMPLATES, list_templates, register_template
+
+
+def best_of(rounds: int, func) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def render_all(name: str, cvs: list) -> None:
+    for cv in cvs:
+        json_to_latex(cv, select_template(name, custom_templates=True))
+
+
+def bench_rendering(args) -> None:
+    suites = {
+        "typical": [make_cv(seed) for seed in range(args.cvs)],
+        "large": [make_cv(seed, experience_items=12, project_items=8, achievements=10) for seed in range(args.cvs)],
+    }
+    render_all(list_templates()[0].name, suites["typical"])  # warm up
+    for template in list_templates():
+        for label, cvs in suites.items():
+            elapsed = best_of(5, lambda: render_all(template.name, cvs))
+            print(f"{template.name:>8}, {label} CVs: {len(cvs) / elapsed:,.0f} CVs/s "
+                  f"({elapsed / len(cvs) * 1e6:.0f} us per CV)")
+
+    cvs = suites["typical"]
+    name = list_templates()[-1].name
+    before = best_of(5, lambda: render_all(name, cvs))
+    originals = dict(TEMPLATES)
+    for i in range(args.extra_templates):
+        register_template(dataclasses.replace(originals["harvard"], name=f"extra{i}"))
+    after = best_of(5, lambda: render_all(name, cvs))
+    TEMPLATES.clear()
+    TEMPLATES.update(originals)
+    print(f"select + render with {len(originals)} vs {len(originals) + args.extra_templates} registered templates: "
+          f"{before / len(cvs) * 1e6:.0f} vs {after / len(cvs) * 1e6:.0f} us per CV")
+
+
+def bench_compile(args) -> None:
+    if shutil.which("pdflatex") is None:
+        print("pdflatex not installed: format compiles not measured")
+        return
+    from core.latex_formats import LatexFormatCache
+
+    with tempfile.TemporaryDirectory() as workdir:
+        formats = LatexFormatCache(os.path.join(workdir, "formats"), enabled=True)
+        cv = make_cv(1)
+        for template in list_templates():
+            started = time.perf_counter()
+            if formats.get(template) is None:
+                print(f"{template.name:>8}: format could not be built")
+                continue
+            build = time.perf_counter() - started
+
+            tex_path = os.path.join(workdir, f"{template.name}.tex")
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(json_to_latex(cv, template))
+            plain = best_of(args.compiles, lambda: subprocess.run(
+                ["pdflatex", "-interaction=nonstopmode", f"-output-directory={workdir}", tex_path],
+                check=False, capture_output=True))
+            with_format = best_of(args.compiles, lambda: formats.compile(tex_path))
+            print(f"{template.name:>8}: format built in {build:.1f} s; compile {plain * 1000:.0f} ms plain, "
+                  f"{with_format * 1000:.0f} ms with the format ({plain / with_format:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cvs", type=int, default=200)
+    parser.add_argument("--extra-templates", type=int, default=200)
+    parser.add_argument("--compiles", type=int, default=5)
+    args = parser.parse_args()
+    bench_rendering(args)
+    bench_compile(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Behaviour of the LLM governor (core/llm_governor.py) against a simulated
+Gemini backend, in three scenarios:
+
+  contention  free and paid traffic together exceed the model's rate limit;
+              reports served calls and mean wait per lane
+  outage      the backend returns 503 for every call; reports how many
+              requests reach the backend and how fast callers get their 503
+  recovery    the backend comes back; the breaker probes and closes
+
+    python -m benchmarks.bench_llm_governor
+"""
+import asyncio
+import statistics
+import time
+
+from core.llm_governor import LANE_PRIORITY, LANE_STANDARD, LLMGovernor, LLMUnavailable
+
+MODEL = "gemini-2.0-flash"
+BACKEND_LATENCY = 0.05
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"{code} from backend")
+        self.code = code
+
+
+class Backend:
+    def __init__(self):
+        self.healthy = True
+        self.requests = 0
+
+    async def generate(self):
+        self.requests += 1
+        await asyncio.sleep(BACKEND_LATENCY)
+        if not self.healthy:
+            raise FakeAPIError(503)
+        return "ok"
+
+
+async def timed_call(governor: LLMGovernor, backend: Backend, lane: str) -> tuple:
+    start = time.perf_counter()
+    try:
+        await governor.call(MODEL, backend.generate, lane=lane)
+        outcome = "ok"
+    except LLMUnavailable as error:
+        outcome = f"503 ({error.reason}, Retry-After {error.headers['Retry-After']}s)"
+    return lane, outcome, time.perf_counter() - start
+
+
+async def contention():
+    governor = LLMGovernor(rate=10, burst=10, max_wait=2)
+    backend = Backend()
+    lanes = [LANE_PRIORITY if i % 4 == 0 else LANE_STANDARD for i in range(80)]
+    results = await asyncio.gather(*(timed_call(governor, backend, lane) for lane in lanes))
+
+    print("contention: 80 simultaneous calls (1 in 4 paid), limit 10/s, max wait 2s")
+    for lane in (LANE_PRIORITY, LANE_STANDARD):
+        mine = [r for r in results if r[0] == lane]
+        served = [r for r in mine if r[1] == "ok"]
+        wait = statistics.mean(r[2] for r in served) if served else 0
+        print(f"  {lane:<9} served {len(served):>2}/{len(mine):<2}  mean latency {wait * 1000:>5.0f} ms")
+
+
+async def outage_and_recovery():
+    governor = LLMGovernor(rate=100, burst=100, max_retries=3, retry_base=0.05, retry_max=0.2)
+    backend = Backend()
+    backend.healthy = False
+
+    results = []
+    for _ in range(40):
+        results.append(await timed_call(governor, backend, LANE_STANDARD))
+    failing = [r for r in results if r[1].startswith("503 (retries")]
+    shed = [r for r in results if "circuit_open" in r[1]]
+    print("outage: 40 sequential calls while the backend returns 503")
+    print(f"  backend requests {backend.requests} (no governor: 40, naive 3 retries: 160)")
+    print(f"  failed after retries {len(failing)}, shed by open breaker {len(shed)}")
+    if shed:
+        print(f"  time to 503 when shed: {statistics.mean(r[2] for r in shed) * 1000:.2f} ms; {shed[0][1]}")
+
+    backend.healthy = True
+    breaker = governor._breaker(MODEL)
+    breaker.opened_at -= breaker.cooldown
+    lane, outcome, _ = await timed_call(governor, backend, LANE_STANDARD)
+    print(f"recovery: after the cooldown the probe returns {outcome}; breaker {breaker.state}")
+
+
+def main():
+    asyncio.run(contention())
+    asyncio.run(outage_and_recovery())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Requests/second of a trivial route behind the upload-size and auth-debug
+middleware, comparing BaseHTTPMiddleware wrappers with the raw ASGI classes.
+Requests are driven straight through the ASGI interface so only the
+framework and middleware cost is measured.
+
+    python -m benchmarks.bench_middleware [requests]
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from middleware.auth_debug_middleware import AuthDebugMiddleware
+from middleware.upload_middleware import UploadSizeMiddleware
+
+
+class PassThroughHTTPMiddleware(BaseHTTPMiddleware):
+    """Same call path the previous BaseHTTPMiddleware versions took, minus the printing"""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def build_app(raw_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if raw_asgi:
+        app.add_middleware(UploadSizeMiddleware)
+        app.add_middleware(AuthDebugMiddleware, debug_enabled=False)
+    else:
+        app.add_middleware(PassThroughHTTPMiddleware)
+        app.add_middleware(PassThroughHTTPMiddleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for label, raw_asgi in (("BaseHTTPMiddleware", False), ("raw ASGI", True)):
+        rate = asyncio.run(drive(build_app(raw_asgi), requests))
+        print(f"{label:<20}{rate:>10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Latency of unrelated work on the event loop during a burst of logins, with
+password verification inline (as fastapi-users does it) versus on the
+password pool.
+
+    python -m benchmarks.bench_password_pool [logins]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from fastapi_users.password import PasswordHelper
+
+from core.password_pool import PasswordPool
+
+helper = PasswordHelper()
+HASHED = helper.hash("correct horse battery staple")
+
+
+async def inline_login():
+    helper.verify_and_update("correct horse battery staple", HASHED)
+
+
+def pooled_login(pool: PasswordPool):
+    async def login():
+        await pool.verify_and_update("correct horse battery staple", HASHED)
+    return login
+
+
+async def ticker(samples: list, stop: asyncio.Event):
+    """Stands in for cheap requests: each tick should take ~1 ms"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        samples.append((time.perf_counter() - start) * 1000)
+
+
+async def run(login, logins: int) -> dict:
+    samples, stop = [], asyncio.Event()
+    tick_task = asyncio.create_task(ticker(samples, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick_task
+
+    samples.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "tick_p50_ms": statistics.median(samples) if samples else float("nan"),
+        "tick_p99_ms": samples[int(len(samples) * 0.99) - 1] if samples else float("nan"),
+        "tick_max_ms": samples[-1] if samples else float("nan"),
+    }
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pool = PasswordPool(helper=helper)
+    print(f"{logins} concurrent logins, pool workers: {pool.workers}")
+    print(f"{'mode':<10}{'logins/s':>10}{'tick p50':>12}{'tick p99':>12}{'tick max':>12}")
+    for label, login in (("inline", inline_login), ("pool", pooled_login(pool))):
+        result = asyncio.run(run(login, logins))
+        print(f"{label:<10}{result['logins_per_s']:>10.1f}{result['tick_p50_ms']:>10.1f}ms"
+              f"{result['tick_p99_ms']:>10.1f}ms{result['tick_max_ms']:>10.1f}ms")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+CV structure -> PDF throughput of the direct backend (utils/latex_pdf.py)
+and, when it is installed, of pdflatex with and without the template's
+precompiled format (core/latex_formats.py).
+
+    python -m benchmarks.bench_pdf_backends [--cvs 100] [--compiles 5]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from benchmarks.bench_latex_templates import best_of
+from benchmarks.synthetic import make_cv
+from utils.json_to_latex import HARVARD, json_to_latex
+from utils.latex_pdf import latex_to_pdf
+
+
+def bench_direct(args) -> None:
+    suites = {
+        "typical": [make_cv(seed) for seed in range(args.cvs)],
+        "large": [make_cv(seed, experience_items=12, project_items=8, achievements=10) for seed in range(args.cvs)],
+    }
+    for label, cvs in suites.items():
+        sources = [json_to_latex(cv, HARVARD) for cv in cvs]
+        render = best_of(3, lambda: [json_to_latex(cv, HARVARD) for cv in cvs]) / len(cvs)
+        typeset = best_of(3, lambda: [latex_to_pdf(source) for source in sources]) / len(cvs)
+        size = sum(len(latex_to_pdf(source)) for source in sources) // len(sources)
+        print(f"direct, {label} CVs: {1 / (render + typeset):,.0f} CVs/s; LaTeX {render * 1e3:.2f} ms + "
+              f"PDF {typeset * 1e3:.2f} ms per CV, {size / 1000:.1f} KB")
+
+
+def bench_pdflatex(args) -> None:
+    if shutil.which("pdflatex") is None:
+        print("pdflatex not installed: not measured")
+        return
+    from core.latex_formats import LatexFormatCache
+
+    with tempfile.TemporaryDirectory() as workdir:
+        tex_path = os.path.join(workdir, "cv.tex")
+        source = json_to_latex(make_cv(1), HARVARD)
+        with open(tex_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        plain = best_of(args.compiles, lambda: subprocess.run(
+            ["pdflatex", "-interaction=nonstopmode", f"-output-directory={workdir}", tex_path],
+            check=False, capture_output=True))
+        print(f"pdflatex, typical CV: {plain * 1000:.0f} ms")
+        formats = LatexFormatCache(os.path.join(workdir, "formats"), enabled=True)
+        if formats.get(HARVARD) is not None:
+            with_format = best_of(args.compiles, lambda: formats.compile(tex_path))
+            print(f"pdflatex with the precompiled format, typical CV: {with_format * 1000:.0f} ms")
+        direct = best_of(args.compiles, lambda: latex_to_pdf(source))
+        print(f"direct, same CV: {direct * 1000:.1f} ms ({plain / direct:.0f}x faster than plain pdflatex)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cvs", type=int, default=100)
+    parser.add_argument("--compiles", type=int, default=5)
+    args = parser.parse_args()
+    bench_direct(args)
+    bench_pdflatex(args)
+
+
+if __name__ == "__main__":
+    main()
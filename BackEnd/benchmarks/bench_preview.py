@@ -0,0 +1,111 @@
+"""
+Live preview sessions (services/preview_service.py) under simulated typing:
+how many compiles debouncing and cancellation save, how long after the last
+edit the PDF arrives, and how many compiles run at once when several users
+type, each in several tabs. Compiles are simulated with a fixed delay
+(--compile-ms) unless --pdflatex is given and pdflatex is installed.
+
+    python -m benchmarks.bench_preview [--users 8] [--tabs 2] [--edits 40] [--compile-ms 600]
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import time
+import uuid
+
+from benchmarks.synthetic import make_cv
+from services import preview_service
+from services.preview_service import PreviewLimiter, PreviewSession
+from utils.json_to_latex import HARVARD
+from utils.json_patch import apply_patch
+
+
+class Stats:
+    def __init__(self):
+        self.started = 0
+        self.running = 0
+        self.peak = 0
+
+
+def simulated_compile(stats: Stats, compile_ms: int):
+    async def compile_preview(latex_code: str, workdir: str, stem: str) -> bytes:
+        stats.started += 1
+        stats.running += 1
+        stats.peak = max(stats.peak, stats.running)
+        try:
+            await asyncio.sleep(compile_ms / 1000)
+        finally:
+            stats.running -= 1
+        return b"%PDF-"
+    return compile_preview
+
+
+def recorder(delivered: dict, key: int):
+    async def send(message: dict, pdf=None) -> None:
+        if message["type"] == "pdf":
+            delivered[key] = message["version"]
+    return send
+
+
+async def type_edits(session: PreviewSession, delivered: dict, key: int, edits: int) -> float:
+    """Keystroke-paced edits in bursts; returns the wait from the last edit to its PDF"""
+    rng = random.Random(key)
+    structure = make_cv(key)
+    session.submit(structure)
+    for i in range(edits):
+        structure = apply_patch(structure, [
+            {"op": "replace", "path": "/cv_template/sections/header/name", "value": f"Name {i}"}
+        ])
+        session.submit(structure)
+        # Typing, with a pause now and then
+        await asyncio.sleep(rng.uniform(0.05, 0.15) if rng.random() > 0.1 else rng.uniform(0.5, 1.5))
+    last_edit = time.perf_counter()
+    while delivered.get(key) != session.version:
+        await asyncio.sleep(0.01)
+    return time.perf_counter() - last_edit
+
+
+async def run(args, debounce_ms: int) -> None:
+    stats = Stats()
+    if not (args.pdflatex and shutil.which("pdflatex")):
+        preview_service.compile_preview = simulated_compile(stats, args.compile_ms)
+    limiter = PreviewLimiter(sessions_per_user=args.tabs, max_compiles=args.max_compiles)
+    delivered = {}
+    sessions = []
+    for _ in range(args.users):
+        user_id = uuid.uuid4()
+        for _ in range(args.tabs):
+            limiter.open(user_id)
+            send = recorder(delivered, len(sessions))
+            sessions.append(PreviewSession(user_id, HARVARD, send, limiter=limiter, debounce_ms=debounce_ms))
+
+    started = time.perf_counter()
+    waits = await asyncio.gather(*(
+        type_edits(session, delivered, key, args.edits) for key, session in enumerate(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+    for session in sessions:
+        await session.close()
+    edits = len(sessions) * (args.edits + 1)
+    waits = sorted(waits)
+    print(f"debounce {debounce_ms:>3} ms: {edits} edits -> {stats.started} compiles started "
+          f"({stats.started / edits:.0%}), peak {stats.peak} concurrent; last edit to PDF "
+          f"p50 {waits[len(waits) // 2] * 1000:.0f} ms, max {waits[-1] * 1000:.0f} ms ({elapsed:.1f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--tabs", type=int, default=2)
+    parser.add_argument("--edits", type=int, default=40)
+    parser.add_argument("--compile-ms", type=int, default=600)
+    parser.add_argument("--max-compiles", type=int, default=4)
+    parser.add_argument("--pdflatex", action="store_true", help="compile with pdflatex when installed")
+    args = parser.parse_args()
+    for debounce_ms in (0, 150, preview_service.PREVIEW_DEBOUNCE_MS):
+        asyncio.run(run(args, debounce_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Failure handling of batch CV ingestion (services/batch_ingestion_service.py).
+
+* crash: PDFs parsed on core/pdf_pool.py while one of them kills its worker
+  process; only that file may fail
+* limit: uploads of rejected files (encrypted ZIP entries, files that are not
+  ZIP archives) still count against BATCH_INGEST_MAX_FILES
+* quota: concurrent extraction reservations of one user on a throwaway
+  SQLite database never take more than the plan allows between them
+
+Exits 1 on any failure.
+
+    python -m benchmarks.check_batch_ingestion [--files 22] [--workers 2]
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+from benchmarks.load_llm_endpoints import cv_pdf
+
+CRASH_MARKER = "crash"
+
+
+def parse_or_crash(path: str) -> dict:
+    """parse_cv_pdf_file, except that a file named after CRASH_MARKER kills the worker"""
+    from utils.pdf_text import parse_cv_pdf_file
+
+    if CRASH_MARKER in os.path.basename(path):
+        os._exit(1)
+    return parse_cv_pdf_file(path)
+
+
+async def check_crash(files: int, workers: int) -> int:
+    import core.pdf_pool
+    from core.pdf_pool import PDFParsePool
+
+    core.pdf_pool.parse_cv_pdf_file = parse_or_crash
+    pool = PDFParsePool(workers)
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for i in range(files):
+            path = os.path.join(workdir, f"{CRASH_MARKER if i == files // 2 else 'cv'}_{i:03d}.pdf")
+            with open(path, "wb") as f:
+                f.write(cv_pdf(i))
+            paths.append(path)
+        results = await asyncio.gather(*(pool.parse(path) for path in paths))
+    pool.shutdown()
+
+    failed = [os.path.basename(path) for path, result in zip(paths, results) if "error" in result]
+    expected = [os.path.basename(paths[files // 2])]
+    print(f"crash: {len(failed)} of {files} files failed with {workers} workers (expected {expected})")
+    return 0 if failed == expected else 1
+
+
+def encrypted_zip(entries: int) -> bytes:
+    """ZIP whose entries all carry the encryption flag (zipfile cannot write encrypted archives)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(entries):
+            archive.writestr(f"cv_{i:04d}.pdf", b"%PDF-1.4")
+    data = bytearray(buffer.getvalue())
+    for signature, offset in ((b"PK\x03\x04", 6), (b"PK\x01\x02", 8)):
+        start = data.find(signature)
+        while start != -1:
+            data[start + offset] |= 0x1
+            start = data.find(signature, start + 4)
+    return bytes(data)
+
+
+def check_limit(limit: int = 5) -> int:
+    import services.batch_ingestion_service as ingestion
+    from utils.error_handler import FileValidationError
+
+    ingestion.BATCH_INGEST_MAX_FILES = limit
+    cases = {
+        "encrypted entries": [("batch.zip", io.BytesIO(encrypted_zip(1000)))],
+        "invalid archives": [(f"batch_{i}.zip", io.BytesIO(b"not a zip")) for i in range(1000)],
+    }
+    failures = 0
+    for name, uploads in cases.items():
+        with tempfile.TemporaryDirectory() as workdir:
+            try:
+                entries = ingestion._unpack(uploads, workdir)
+            except FileValidationError:
+                print(f"limit: {name} rejected at {limit} files")
+                continue
+        failures += 1
+        print(f"FAIL limit: {name} gave {len(entries)} entries with a limit of {limit}")
+    return failures
+
+
+async def check_quota(requests: int = 5, count: int = 2) -> int:
+    from sqlalchemy import select
+
+    from core.database import AsyncSessionLocal, Base, engine
+    from models.subscription import UsageTracking
+    from models.user import User
+    from services.subscription_service import SubscriptionService
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(email="quota@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+        limit = await SubscriptionService(session)._usage_limit(user.id, "cv_analysis")
+
+    async def reserve():
+        async with AsyncSessionLocal() as session:
+            return await SubscriptionService(session).reserve_usage(user.id, "cv_analysis", count)
+
+    granted = await asyncio.gather(*(reserve() for _ in range(requests)))
+    async with AsyncSessionLocal() as session:
+        # Racing first requests of the month may add rows; the oldest is the one counted
+        used = (await session.execute(
+            select(UsageTracking.cv_analyses_count)
+            .where(UsageTracking.user_id == user.id).order_by(UsageTracking.id).limit(1)
+        )).scalar_one()
+    await engine.dispose()
+    print(f"quota: {requests} concurrent reservations of {count} got {granted}; usage {used}, limit {limit}")
+    return 0 if sum(granted) == limit == used else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=22)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    try:
+        failures = asyncio.run(check_crash(args.files, args.workers))
+        failures += check_limit()
+        failures += asyncio.run(check_quota())
+    finally:
+        os.unlink(database)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
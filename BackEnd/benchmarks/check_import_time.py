@@ -0,0 +1,72 @@
+"""
+Import-time budget for application startup.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and fails
+(exit code 1) if startup imports any of the modules that are meant to load on
+first use, or if the total import time exceeds the budget.
+
+    python -m benchmarks.check_import_time [budget_ms]
+
+The budget defaults to IMPORT_TIME_BUDGET_MS (2000 ms); import time depends on
+the machine, so CI should set a budget measured on its own runners.
+"""
+import os
+import subprocess
+import sys
+
+# Heavy modules only needed by specific requests (Gemini calls, PDF parsing,
+# uploads, the setup endpoint); none of them may be imported by `import main`
+LAZY_MODULES = ("google.genai", "PyPDF2", "cloudinary", "passlib")
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 2000))
+
+
+def profile_imports(module: str = "main") -> dict:
+    """Return {module name: cumulative import time in microseconds}"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./importtime.db")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    timings = profile_imports()
+    total_ms = timings.get("main", 0) / 1000
+
+    print(f"import main: {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    print("slowest imports:")
+    top_level = {name: us for name, us in timings.items() if "." not in name and name != "main"}
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {name:<30}{us / 1000:>8.0f} ms")
+
+    failures = []
+    eager = [name for name in timings
+             if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)]
+    if eager:
+        failures.append(f"modules that should load lazily were imported at startup: {', '.join(sorted(eager)[:10])}")
+    if total_ms > budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms is over the {budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
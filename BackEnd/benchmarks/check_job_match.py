@@ -0,0 +1,97 @@
+"""
+Quota accounting of the bulk job description analysis
+(services/job_match_service.py) when the client goes away mid-stream.
+
+The stream is consumed the way Starlette's StreamingResponse does it, inside
+an anyio task group, and the group is cancelled as the client disconnects
+after the first analysis arrives. Analyses are stubbed: the first finishes
+at once, the rest would take a minute. Only the finished analysis may stay
+charged. Runs against a throwaway SQLite database; exits 1 on any failure.
+
+    python -m benchmarks.check_job_match [--cvs 5] [--limit 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date
+
+
+class StubGemini:
+    """Canned job analyses; the first one returns at once"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze_cv_against_job_description(self, cv_structure: dict, job_description: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0 if self.calls == 1 else 60)
+        return {"overall_score": 70, "summary": "stub"}
+
+    @staticmethod
+    def is_fallback(result: dict) -> bool:
+        return False
+
+
+async def check_disconnect(cvs: int, limit: int) -> int:
+    import anyio
+    from sqlalchemy import select
+
+    from core.database import AsyncSessionLocal, Base, engine
+    from models.subscription import SubscriptionPlan, SubscriptionTier, UsageTracking, UserSubscription
+    from models.user import User
+    from services.job_match_service import JobMatchService
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(email="bulk@example.com", hashed_password="x")
+        plan = SubscriptionPlan(name="CHECK", tier=SubscriptionTier.PRO,
+                                cv_analyses_per_month=None, job_analyses_per_month=limit)
+        session.add_all([user, plan])
+        await session.flush()
+        session.add(UserSubscription(user_id=user.id, plan_id=plan.id, start_date=date.today()))
+        await session.commit()
+        user_id = user.id
+
+    ranking = [{"cv_id": i + 1, "rank": i + 1, "name": f"CV {i + 1}", "cv_structure": {}} for i in range(cvs)]
+    events = []
+
+    async def consume(service: JobMatchService, cancel_scope) -> None:
+        async for event in service.stream_analyses(StubGemini(), user_id, ranking, "Job", cvs):
+            events.append(event["event"])
+            if event["event"] == "analysis":
+                cancel_scope.cancel()  # The client closed the tab
+
+    async with AsyncSessionLocal() as session:
+        async with anyio.create_task_group() as group:
+            group.start_soon(consume, JobMatchService(session), group.cancel_scope)
+
+    async with AsyncSessionLocal() as session:
+        used = (await session.execute(
+            select(UsageTracking.job_analyses_count)
+            .where(UsageTracking.user_id == user_id).order_by(UsageTracking.id).limit(1)
+        )).scalar_one()
+    await engine.dispose()
+    print(f"disconnect: events {events}; {used} of {cvs} analyses charged (expected 1)")
+    return 0 if used == 1 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cvs", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    try:
+        failures = asyncio.run(check_disconnect(args.cvs, args.limit))
+    finally:
+        os.unlink(database)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Golden-file check of the LaTeX generator (utils/json_to_latex.py).
+
+Every case in benchmarks/golden/latex_cases.json must render byte for byte,
+with every registered template, to benchmarks/golden/latex/<case>.tex for
+the default template and <case>.<template>.tex for the others. The cases cover synthetic CVs,
+LaTeX special characters, odd value types, custom/duplicate/unknown section
+orders and non-ASCII text. Exits 1 on any difference.
+
+    python -m benchmarks.check_latex_golden [--update]
+
+--update rewrites the golden files from the current generator; only use it
+for an intended output change, and review the diff.
+"""
+import difflib
+import json
+import os
+import sys
+
+from utils.json_to_latex import json_to_latex
+from utils.latex_templates import DEFAULT_TEMPLATE, list_templates
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+CASES_PATH = os.path.join(GOLDEN_DIR, "latex_cases.json")
+
+
+def golden_path(name: str, template: str) -> str:
+    suffix = "" if template == DEFAULT_TEMPLATE else f".{template}"
+    return os.path.join(GOLDEN_DIR, "latex", f"{name}{suffix}.tex")
+
+
+def main():
+    update = "--update" in sys.argv
+    with open(CASES_PATH, encoding="utf-8") as f:
+        cases = json.load(f)
+
+    failures = checked = 0
+    for template in list_templates():
+        for name, case in cases.items():
+            label = f"{name} [{template.name}]"
+            rendered = json_to_latex(case, template)
+            path = golden_path(name, template.name)
+            if update:
+                with open(path, "w", encoding="utf-8", newline="") as f:
+                    f.write(rendered)
+                print(f"updated {label}")
+                continue
+
+            checked += 1
+            with open(path, encoding="utf-8", newline="") as f:
+                expected = f.read()
+            if rendered == expected:
+                print(f"ok    {label} ({len(rendered)} chars)")
+                continue
+            failures += 1
+            print(f"FAIL  {label}")
+            diff = difflib.unified_diff(expected.splitlines(True), rendered.splitlines(True), "golden", "rendered")
+            sys.stdout.writelines(list(diff)[:40])
+
+    if not update:
+        print(f"{checked - failures}/{checked} golden cases match")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
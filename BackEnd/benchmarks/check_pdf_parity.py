@@ -0,0 +1,187 @@
+"""
+Parity of the direct PDF backend (utils/latex_pdf.py) with pdflatex.
+
+Every golden case (benchmarks/golden/latex_cases.json), synthetic CV and
+random CV is rendered with each template that has a direct layout, and:
+
+- the direct PDF must parse, and its text (PyPDF2) must be the text of the
+  LaTeX source as read by plain_text() below, a regex reading independent
+  of the typesetter;
+- when pdflatex is installed, the text of its PDF must match the direct
+  PDF's; with pdftoppm as well, both are rasterized and the overlap of
+  their ink is reported (the fonts differ, so it is reported, not checked).
+
+Text is compared without whitespace or bullets (pdflatex takes its bullet
+from a math font), and pdflatex's hyphenation at line ends is undone.
+Sources the direct backend leaves to pdflatex are counted. Exits 1 on any
+text mismatch.
+
+    python -m benchmarks.check_pdf_parity [random_cvs]
+"""
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+import PyPDF2
+
+from benchmarks.bench_json_to_latex import outcome, random_cv
+from benchmarks.check_latex_golden import CASES_PATH
+from benchmarks.synthetic import make_cv
+from utils.json_to_latex import json_to_latex
+from utils.latex_pdf import LAYOUTS, latex_to_pdf
+from utils.latex_templates import get_template
+
+_DETEX = [(re.compile(pattern), replacement) for pattern, replacement in (
+    (r"\\begin\{itemize\}\[[^\]]*\]", " "),
+    (r"\\(?:begin|end)\{[a-z]+\}", " "),
+    (r"\\vspace\{[^}]*\}", " "),
+    (r"\\href\{(?:\\.|\{\}|[^{}\\])*\}", " "),
+    (r"\\(?:textbf|textit|section)\b", ""),
+    (r"\\(?:hfill|hrulefill|item)\b|\\\\", " "),
+    (r"\\textbullet\\? ?", ""),
+    (r"\\textbackslash", r"\\"),
+    (r"\\textasciitilde", "~"),
+    (r"\\textasciicircum", "^"),
+    (r"\\([&%$#_])", r"\1"),
+    (r"\\\{", "\x01"),
+    (r"\\\}", "\x02"),
+    (r"[{}]", ""),
+)]
+_LIGATURES = (("---", "—"), ("--", "–"), ("``", "“"), ("''", "”"), ("!`", "¡"), ("?`", "¿"),
+              ("`", "‘"), ("'", "’"), ("<<", "«"), (">>", "»"), (",,", "„"))
+
+
+def plain_text(source: str) -> str:
+    """The text a generated LaTeX document shows, read with regexes"""
+    body = source[source.index("\\begin{document}") + len("\\begin{document}"):source.rindex("\\end{document}")]
+    for pattern, replacement in _DETEX:
+        body = pattern.sub(replacement, body)
+    for sequence, ligature in _LIGATURES:
+        body = body.replace(sequence, ligature)
+    return body.replace("\x01", "{").replace("\x02", "}")
+
+
+def pdf_text(pdf: bytes) -> str:
+    return "\n".join(page.extract_text() or "" for page in PyPDF2.PdfReader(io.BytesIO(pdf)).pages)
+
+
+def normalize(text: str, dehyphenate: bool = False) -> str:
+    if dehyphenate:
+        text = re.sub(r"(?<=\w)-\s*\n\s*(?=\w)", "", text)
+    text = unicodedata.normalize("NFKC", text).replace("•", "")
+    return re.sub(r"\s+", "", text)
+
+
+def pdflatex_pdf(source: str, workdir: str) -> Optional[bytes]:
+    tex_path = os.path.join(workdir, "parity.tex")
+    pdf_path = os.path.join(workdir, "parity.pdf")
+    if os.path.exists(pdf_path):
+        os.remove(pdf_path)
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(source)
+    subprocess.run(["pdflatex", "-interaction=nonstopmode", f"-output-directory={workdir}", tex_path],
+                   check=False, capture_output=True)
+    if not os.path.exists(pdf_path):
+        return None
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+def _pages(pdf: bytes, workdir: str, name: str) -> List[np.ndarray]:
+    """Ink masks of the pages of pdf rasterized at 30 dpi"""
+    path = os.path.join(workdir, f"{name}.pdf")
+    with open(path, "wb") as f:
+        f.write(pdf)
+    prefix = os.path.join(workdir, name)
+    subprocess.run(["pdftoppm", "-r", "30", "-gray", path, prefix], check=True, capture_output=True)
+    pages = []
+    for filename in sorted(f for f in os.listdir(workdir) if f.startswith(f"{name}-") and f.endswith(".pgm")):
+        with open(os.path.join(workdir, filename), "rb") as f:
+            magic, width, height, _, pixels = f.read().split(maxsplit=4)
+        pages.append(np.frombuffer(pixels, dtype=np.uint8).reshape(int(height), int(width)) < 160)
+        os.remove(os.path.join(workdir, filename))
+    return pages
+
+
+def ink_overlap(direct: bytes, reference: bytes, workdir: str) -> float:
+    """Intersection over union of the inked pixels (dilated by 2 px) over all pages"""
+    def dilate(mask):
+        padded = np.pad(mask, 2)
+        return np.max([padded[dy:dy + mask.shape[0], dx:dx + mask.shape[1]]
+                       for dy in range(5) for dx in range(5)], axis=0)
+    intersection = union = 0
+    direct_pages, reference_pages = _pages(direct, workdir, "direct"), _pages(reference, workdir, "reference")
+    for i in range(max(len(direct_pages), len(reference_pages))):
+        a = dilate(direct_pages[i]) if i < len(direct_pages) else np.zeros_like(dilate(reference_pages[i]))
+        b = dilate(reference_pages[i]) if i < len(reference_pages) else np.zeros_like(a)
+        intersection += int(np.logical_and(a, b).sum())
+        union += int(np.logical_or(a, b).sum())
+    return intersection / union if union else 1.0
+
+
+def cases(random_cvs: int) -> dict:
+    with open(CASES_PATH, encoding="utf-8") as f:
+        all_cases = json.load(f)
+    for seed in range(20):
+        all_cases[f"synthetic_{seed}"] = make_cv(seed, experience_items=seed % 8, project_items=seed % 5)
+    for seed in range(random_cvs):
+        all_cases[f"random_{seed}"] = random_cv(seed)
+    return all_cases
+
+
+def main():
+    random_cvs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with_pdflatex = shutil.which("pdflatex") is not None
+    with_pdftoppm = with_pdflatex and shutil.which("pdftoppm") is not None
+    if not with_pdflatex:
+        print("pdflatex not installed: checking the direct PDFs against their LaTeX source only")
+
+    mismatches = checked = declined = 0
+    overlaps = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for template_name in LAYOUTS:
+            template = get_template(template_name)
+            for name, case in cases(random_cvs).items():
+                label = f"{name} [{template_name}]"
+                source = outcome(lambda data: json_to_latex(data, template), case)
+                if not isinstance(source, str):
+                    continue  # The generator rejects it
+                direct = latex_to_pdf(source)
+                if direct is None:
+                    declined += 1
+                    continue
+                checked += 1
+                direct_text = pdf_text(direct)
+                problems = []
+                if normalize(direct_text) != normalize(plain_text(source)):
+                    problems.append("text differs from the LaTeX source")
+                if with_pdflatex:
+                    reference = pdflatex_pdf(source, workdir)
+                    if reference is None:
+                        problems.append("pdflatex produced no PDF")
+                    else:
+                        if normalize(direct_text, True) != normalize(pdf_text(reference), True):
+                            problems.append("text differs from pdflatex's")
+                        if with_pdftoppm:
+                            overlaps.append(ink_overlap(direct, reference, workdir))
+                if problems:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"MISMATCH {label}: {'; '.join(problems)}")
+
+    print(f"{checked} direct PDFs checked, {declined} sources left to pdflatex, {mismatches} mismatches")
+    if overlaps:
+        print(f"ink overlap with pdflatex: mean {sum(overlaps) / len(overlaps):.0%}, min {min(overlaps):.0%}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
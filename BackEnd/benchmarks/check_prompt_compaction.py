@@ -0,0 +1,163 @@
+"""
+Regression check for the compact CV prompt payloads (utils/prompt_serializer.py).
+
+For a set of synthetic CVs, including ones padded with CV_STRUCTURE
+placeholders the way ensure_cv_structure pads partial extractions, it checks
+that the compact renderings
+
+  * keep every piece of real CV content (all non-placeholder leaf values),
+  * contain no placeholders, links or rendering settings, and
+  * use at most MAX_TOKEN_RATIO of the tokens of the old pretty-printed JSON,
+
+then prints the full prompt size per Gemini operation, captured from
+GeminiService with a stub backend. Exits 1 on any failure.
+
+    python -m benchmarks.check_prompt_compaction [cv_count] [--live]
+
+Token counts are estimated offline; with --live and GOOGLE_GEMINI_API_KEY set,
+the payloads are also counted exactly with the model's count_tokens.
+"""
+import asyncio
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import time
+
+from benchmarks.synthetic import make_cv
+from services.llm_backends import LLMReply
+from utils.prompt_serializer import (
+    PLACEHOLDER_VALUES, PROMPT_DROPPED_KEYS, cv_to_prompt_json, cv_to_prompt_text, estimate_tokens
+)
+
+MAX_TOKEN_RATIO = float(os.getenv("PROMPT_MAX_TOKEN_RATIO", 0.6))
+
+JOB_DESCRIPTION = (
+    "Senior Mobile Engineer. 5+ years building iOS and Android apps with Flutter or Swift/Kotlin. "
+    "Experience with Firebase, CI/CD, REST and GraphQL APIs. Team lead experience is a plus."
+)
+
+
+def content_values(value, key=None) -> list:
+    """Leaf strings the model must still see after compaction"""
+    if key in PROMPT_DROPPED_KEYS or key in ("metadata", "rendering_rules"):
+        return []
+    if isinstance(value, dict):
+        return [v for k, item in value.items() for v in content_values(item, k)]
+    if isinstance(value, list):
+        return [v for item in value for v in content_values(item, key)]
+    if isinstance(value, str) and value.strip() and value.strip().lower() not in PLACEHOLDER_VALUES:
+        return [value.strip()]
+    return []
+
+
+def build_cases(count: int) -> list:
+    from services.gemini_service import GeminiService
+    service = GeminiService()
+
+    cases = []
+    for seed in range(count):
+        cv = make_cv(seed, experience_items=2 + seed % 4, project_items=1 + seed % 3)
+        if seed % 2:
+            # Partial extraction: missing sections are filled with template placeholders
+            for section in ("projects", "certifications", "interests"):
+                cv["cv_template"]["sections"].pop(section)
+            cv = service.ensure_cv_structure(cv)
+        cases.append(cv)
+    return cases
+
+
+def check_case(cv: dict) -> tuple:
+    failures = []
+    pretty = json.dumps(cv, indent=2)
+    renderings = {"json": cv_to_prompt_json(cv), "text": cv_to_prompt_text(cv)}
+
+    for kind, rendered in renderings.items():
+        lowered = rendered.lower()
+        missing = [v for v in content_values(cv["cv_template"]["sections"]) if v not in rendered]
+        if missing:
+            failures.append(f"{kind}: lost content {missing[:3]}")
+        leaked = [p for p in PLACEHOLDER_VALUES if f'"{p}"' in lowered or f": {p}" in lowered]
+        if leaked:
+            failures.append(f"{kind}: placeholders kept {leaked[:3]}")
+        if "mailto:" in lowered or "tel:" in lowered or "truncate_descriptions_at" in lowered:
+            failures.append(f"{kind}: links or rendering rules kept")
+
+    tokens = {"pretty": estimate_tokens(pretty)}
+    tokens.update({kind: estimate_tokens(rendered) for kind, rendered in renderings.items()})
+    for kind in renderings:
+        ratio = tokens[kind] / tokens["pretty"]
+        if ratio > MAX_TOKEN_RATIO:
+            failures.append(f"{kind}: {ratio:.2f} of the pretty JSON tokens (max {MAX_TOKEN_RATIO})")
+    return tokens, failures
+
+
+class CapturingBackend:
+    """Model backend that records prompts and returns unparseable output"""
+
+    def __init__(self):
+        self.prompts = {}
+
+    async def generate_json(self, model, prompt, schema):
+        self.prompts.setdefault(schema.__name__, prompt)
+        return LLMReply(text="")
+
+
+async def capture_prompts(cv: dict) -> dict:
+    from services.gemini_service import GeminiService
+    backend = CapturingBackend()
+    service = GeminiService(backend=backend)
+
+    # The stub's empty replies send every call down its fallback path; hide that logging
+    with contextlib.redirect_stdout(io.StringIO()):
+        await service.analyze_cv_weaknesses(copy.deepcopy(cv))
+        await service.generate_detailed_analysis(copy.deepcopy(cv))
+        await service.enhance_cv_with_input(copy.deepcopy(cv), {"summary": "Mobile engineer"})
+        await service.analyze_cv_against_job_description(copy.deepcopy(cv), JOB_DESCRIPTION)
+    return backend.prompts
+
+
+def count_live(cv: dict) -> dict:
+    from google import genai
+    client = genai.Client(api_key=os.environ["GOOGLE_GEMINI_API_KEY"])
+    payloads = {"pretty": json.dumps(cv, indent=2), "json": cv_to_prompt_json(cv), "text": cv_to_prompt_text(cv)}
+    return {kind: client.models.count_tokens(model="gemini-2.0-flash", contents=payload).total_tokens
+            for kind, payload in payloads.items()}
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    count = int(args[0]) if args else 20
+    cases = build_cases(count)
+
+    totals = {"pretty": 0, "json": 0, "text": 0}
+    failures = []
+    start = time.perf_counter()
+    for index, cv in enumerate(cases):
+        tokens, case_failures = check_case(cv)
+        for kind in totals:
+            totals[kind] += tokens[kind]
+        failures.extend(f"cv {index}: {failure}" for failure in case_failures)
+    per_cv_ms = (time.perf_counter() - start) * 1000 / len(cases)
+
+    print(f"{len(cases)} CVs, estimated CV payload tokens (checks + serialization {per_cv_ms:.2f} ms/CV):")
+    for kind, total in totals.items():
+        print(f"  {kind:<8}{total / len(cases):>8.0f}  ({total / totals['pretty']:.0%} of pretty JSON)")
+
+    prompts = asyncio.run(capture_prompts(cases[0]))
+    print("full prompt size per schema (estimated tokens):")
+    for schema, prompt in prompts.items():
+        print(f"  {schema:<20}{estimate_tokens(prompt):>8}")
+
+    if "--live" in sys.argv:
+        print("exact tokens (count_tokens):", count_live(cases[0]))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Golden cases and throughput for the local skill matcher (utils/skill_matcher.py).
+
+Each case is a CV skill list and a job description with the expected matches,
+missing and unrecognized terms. It also checks that repeated runs on
+synthetic CVs give identical results (the grade must not vary), then times
+match_skills. Exits 1 on any failure.
+
+    python -m benchmarks.check_skill_matcher [cvs]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import make_cv
+from utils.skill_matcher import match_skills, normalize_skill
+
+JOB_DESCRIPTION = (
+    "Senior Mobile Engineer. 5+ years building iOS and Android apps with Flutter or Swift/Kotlin. "
+    "Experience with Firebase, CI/CD, REST and GraphQL APIs, unit testing, Docker and Kafka. "
+    "Terraform is a plus. We monitor with Datadog and Sentry."
+)
+
+
+def cv_with_skills(*items: str, text: str = "") -> dict:
+    return {"cv_template": {"sections": {
+        "skills": {"categories": [{"name": "Technical", "items": list(items)},
+                                  {"name": "Languages", "items": ["English (Fluent)", "Go Lang Club"]}]},
+        "experience": {"items": [{"title": "Engineer", "achievements": [text]}] if text else []},
+    }}}
+
+
+# (name, cv, job description, matches, missing, unrecognized or None to skip)
+CASES = [
+    ("aliases and versions",
+     cv_with_skills("k8s", "Python 3.11", "Vue3", "Postgres"),
+     "Requirements: Kubernetes, Python, Vue.js and PostgreSQL.",
+     ["Kubernetes", "Python", "Vue", "PostgreSQL"], [], []),
+    ("flutter implies platforms, not native languages",
+     cv_with_skills("Flutter", "Firebase", "Git", "CI/CD"),
+     JOB_DESCRIPTION,
+     ["iOS", "Android", "Flutter", "Firebase", "CI/CD"],
+     ["REST", "GraphQL", "Unit Testing", "Docker", "Kafka"],
+     ["Datadog", "Sentry"]),
+    ("alternatives: first listed is missing when none present",
+     cv_with_skills("Java"),
+     "Build apps in Flutter or React Native.",
+     [], ["Flutter"], []),
+    ("alternatives: one present is enough",
+     cv_with_skills("Kotlin"),
+     "You know Swift/Kotlin and SQL.",
+     ["Kotlin"], ["SQL"], []),
+    ("nice-to-have never missing",
+     cv_with_skills("Python"),
+     "Python required. Experience with Terraform is a plus.",
+     ["Python"], [], []),
+    ("cased common words are not skills",
+     cv_with_skills("Python"),
+     "Ready to go the extra mile? REST APIs in Python; the rest is up to you.",
+     ["Python"], ["REST"], None),
+    ("skills in experience text count",
+     cv_with_skills("SQL", text="Migrated the billing service to Go and Docker"),
+     "Go, Docker and SQL.",
+     ["Go", "Docker", "SQL"], [], []),
+    ("spoken languages are not skills",
+     cv_with_skills("Python"),
+     "Python and Go.",
+     ["Python"], ["Go"], []),
+    ("custom CV skills match verbatim; single letters only in lists",
+     cv_with_skills("Zephyr RTOS", "C"),
+     "Firmware in C on Zephyr RTOS.",
+     ["Zephyr RTOS"], [], []),
+    ("docker compose is not jetpack compose",
+     cv_with_skills("Docker Compose", "Terraform", "Linux"),
+     "Android Engineer: native Android apps in Kotlin.",
+     [], ["Android", "Kotlin"], []),
+    ("docker compose asked for: jetpack compose does not cover it",
+     cv_with_skills("Jetpack Compose", "Kotlin"),
+     "Deploy with docker-compose and Kubernetes.",
+     [], ["Docker Compose", "Kubernetes"], []),
+    ("docker compose implies docker",
+     cv_with_skills("docker-compose"),
+     "Docker and Docker Compose.",
+     ["Docker", "Docker Compose"], [], []),
+]
+
+NORMALIZED = {
+    "k8s": "Kubernetes", "Node.js": "Node.js", "nodejs": "Node.js", "Python 3": "Python",
+    "react-native": "React Native", "ReactJS": "React", "C": "C", "Golang": "Go", "Communication": None,
+    "docker-compose": "Docker Compose", "Docker Compose": "Docker Compose", "Jetpack Compose": "Jetpack Compose",
+}
+
+
+def check_cases() -> int:
+    failures = 0
+    for name, cv, job_description, matches, missing, unrecognized in CASES:
+        result = match_skills(cv, job_description)
+        got = (result.matches, result.missing, result.unrecognized if unrecognized is not None else None)
+        expected = (matches, missing, unrecognized)
+        if sorted(got[0]) != sorted(matches) or sorted(got[1]) != sorted(missing) or (
+                unrecognized is not None and sorted(got[2]) != sorted(unrecognized)):
+            failures += 1
+            print(f"FAIL {name}:\n  expected {expected}\n  got      {got}")
+    for alias, canonical in NORMALIZED.items():
+        if normalize_skill(alias) != canonical:
+            failures += 1
+            print(f"FAIL normalize_skill({alias!r}) = {normalize_skill(alias)!r}, expected {canonical!r}")
+    print(f"golden: {len(CASES) + len(NORMALIZED) - failures}/{len(CASES) + len(NORMALIZED)} passed")
+    return failures
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    failures = check_cases()
+
+    cvs = [make_cv(seed) for seed in range(count)]
+    first = [match_skills(cv, JOB_DESCRIPTION).resolve() for cv in cvs]
+    again = [match_skills(cv, JOB_DESCRIPTION).resolve() for cv in cvs]
+    unstable = sum(1 for a, b in zip(first, again) if a != b)
+    failures += unstable
+    print(f"reproducible: {count - unstable}/{count} CVs")
+
+    start = time.perf_counter()
+    for cv in cvs:
+        match_skills(cv, JOB_DESCRIPTION)
+    rate = count / (time.perf_counter() - start)
+    print(f"match_skills: {rate:.0f} CV/JD pairs/s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Load test of the LLM-backed endpoints against the replay model backend
+(services/llm_backends.py), so it runs offline and without API cost:
+
+  /analyze-cv-weaknesses                   upload + extraction + weakness analysis
+  /analyze-cv-with-job-description         upload + JD analysis
+  /analyze-stored-cv-with-job-description  JD analysis of a stored flow
+  /complete-cv-flow                        merge of user edits + LaTeX/PDF generation
+
+Requests go through the full app (middleware, auth, subscription checks, LLM
+governor) in-process over ASGI, against a throwaway SQLite database. For each
+endpoint it reports throughput, p50/p95/p99 latency and the status breakdown.
+
+    python -m benchmarks.load_llm_endpoints [--requests 40] [--concurrency 8]
+        [--latency lognormal:800:0.5] [--error-rate 0.02] [--malformed-rate 0.01]
+        [--recordings replies.jsonl] [--seed 1]
+
+The governor runs with its normal settings (GEMINI_RATE_PER_SECOND etc.), so
+raise those to measure the app alone or keep them to see shedding. Identical
+prompts in flight are coalesced, so the backend sees fewer calls than there
+are requests. /complete-cv-flow needs pdflatex (and Cloudinary credentials);
+without them it returns 500 once the LaTeX is written.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+from benchmarks.synthetic import make_cv
+
+JOB_DESCRIPTION = (
+    "Senior Mobile Engineer. 5+ years building iOS and Android apps with Flutter or Swift/Kotlin. "
+    "Experience with Firebase, CI/CD, REST and GraphQL APIs, unit testing and Docker."
+)
+
+
+PDF_UNSAFE = str.maketrans("", "", "\\()")
+
+
+def cv_pdf(seed: int) -> bytes:
+    """Single-page PDF with the text of a synthetic CV"""
+    cv = make_cv(seed)["cv_template"]
+    sections = cv["sections"]
+    lines = [sections["header"]["name"], "Experience"]
+    for job in sections["experience"]["items"]:
+        lines.append(f"{job['title']} at {job['company']}, {job['dates']['start']} - {job['dates']['end']}")
+        lines += [f"- {achievement}" for achievement in job["achievements"]]
+    lines += ["Projects"] + [project["title"] for project in sections["projects"]["items"]]
+    lines = [line.translate(PDF_UNSAFE)[:90] for line in lines]
+
+    text = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text.encode("latin-1", "replace")),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def setup_user(client, session_factory) -> dict:
+    """Register a user on an unlimited plan and return its bearer headers"""
+    from sqlalchemy import select
+    from models.subscription import SubscriptionPlan, SubscriptionTier, UserSubscription
+    from models.user import User
+
+    email, password = "load@example.com", "load-test-password"
+    await client.post("/auth/register", json={"email": email, "password": password})
+    login = await client.post("/auth/bearer/login", data={"username": email, "password": password})
+    login.raise_for_status()
+
+    async with session_factory() as session:
+        user = (await session.execute(select(User).where(User.email == email))).scalar_one()
+        plan = SubscriptionPlan(name="LOADTEST", tier=SubscriptionTier.PRO,
+                                cv_analyses_per_month=None, job_analyses_per_month=None)
+        session.add(plan)
+        await session.flush()
+        session.add(UserSubscription(user_id=user.id, plan_id=plan.id, start_date=date.today()))
+        await session.commit()
+
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+async def run_endpoint(name: str, requests: int, concurrency: int, send) -> dict:
+    """Issue `requests` calls of `send(i)` with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+            return response
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "throughput": requests / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies),
+        "statuses": statuses,
+        "responses": responses,
+    }
+
+
+async def load_test(args) -> list:
+    import httpx
+    from core.database import AsyncSessionLocal, engine
+    from main import app, on_startup
+    from core.app import gemini_service
+
+    engine.echo = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        await on_startup()
+
+    pdfs = [cv_pdf(seed) for seed in range(8)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        headers = await setup_user(client, AsyncSessionLocal)
+
+        def upload(path, i, **params):
+            files = {"file": (f"cv{i}.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+            return client.post(path, files=files, params=params, headers=headers)
+
+        results = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            weaknesses = await run_endpoint(
+                "/analyze-cv-weaknesses", args.requests, args.concurrency,
+                lambda i: upload("/analyze-cv-weaknesses", i))
+            results.append(weaknesses)
+            flow_ids = [r.json()["flow_id"] for r in weaknesses["responses"]
+                        if r.status_code == 200 and "flow_id" in r.json()]
+            if not flow_ids:
+                return results
+
+            results.append(await run_endpoint(
+                "/analyze-cv-with-job-description", args.requests, args.concurrency,
+                lambda i: upload("/analyze-cv-with-job-description", i, job_description=JOB_DESCRIPTION)))
+            results.append(await run_endpoint(
+                "/analyze-stored-cv-with-job-description", args.requests, args.concurrency,
+                lambda i: client.post("/analyze-stored-cv-with-job-description", headers=headers, json={
+                    "flow_id": flow_ids[i % len(flow_ids)], "job_description": JOB_DESCRIPTION})))
+            results.append(await run_endpoint(
+                "/complete-cv-flow", args.requests, args.concurrency,
+                lambda i: client.post("/complete-cv-flow", headers=headers, json={
+                    "flow_id": flow_ids[i % len(flow_ids)],
+                    "additional_inputs": {"summary": "Mobile engineer focused on Flutter"}})))
+
+    print(f"model backend: {gemini_service.backend.calls} calls")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=40, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:800:0.5", help="replay latency distribution (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    parser.add_argument("--recordings", help="JSONL written with LLM_RECORD_PATH")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # The app reads these at import time
+    database = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["LLM_BACKEND"] = "replay"
+    os.environ["LLM_REPLAY_LATENCY"] = args.latency
+    os.environ["LLM_REPLAY_ERROR_RATE"] = str(args.error_rate)
+    os.environ["LLM_REPLAY_MALFORMED_RATE"] = str(args.malformed_rate)
+    os.environ["LLM_REPLAY_SEED"] = str(args.seed)
+    if args.recordings:
+        os.environ["LLM_REPLAY_RECORDINGS"] = args.recordings
+    os.environ.pop("LLM_RECORD_PATH", None)
+
+    try:
+        results = asyncio.run(load_test(args))
+    finally:
+        os.unlink(database)
+
+    print(f"{args.requests} requests per endpoint, concurrency {args.concurrency}, "
+          f"latency {args.latency}, error rate {args.error_rate}, malformed rate {args.malformed_rate}")
+    print(f"  {'endpoint':<42}{'req/s':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for r in results:
+        statuses = " ".join(f"{code}x{count}" for code, count in sorted(r["statuses"].items()))
+        print(f"  {r['name']:<42}{r['throughput']:>7.1f}{r['p50']:>9.0f}{r['p95']:>9.0f}{r['p99']:>9.0f}  {statuses}")
+    sys.exit(0 if results and results[0]["statuses"].get(200) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Synthetic CV structures for benchmarks
+"""
+import random
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Senior Developer", "Data Analyst", "Mobile Developer", "DevOps Engineer"]
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Flutter", "Dart", "Swift", "Kotlin",
+    "Docker", "Kubernetes", "PostgreSQL", "MySQL", "Git", "AWS", "Firebase", "FastAPI",
+    "Node.js", "Java", "C++", "Go", "Redis", "GraphQL", "TensorFlow", "Pandas",
+]
+VERBS = ["Built", "Led", "Designed", "Optimized", "Migrated", "Automated", "Shipped", "Reduced"]
+OBJECTS = ["the billing pipeline", "a mobile app", "CI/CD workflows", "the search service",
+           "data ingestion jobs", "the checkout flow", "monitoring dashboards"]
+
+
+def _achievement(rng: random.Random) -> str:
+    metric = rng.choice(["", f" by {rng.randint(5, 80)}%", f" for {rng.randint(2, 900)}k users"])
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}{metric} using {rng.choice(SKILLS)} & {rng.choice(SKILLS)}"
+
+
+def make_cv(seed: int = 0, experience_items: int = 4, project_items: int = 3, achievements: int = 4) -> dict:
+    """Build a filled-in CV structure in the CV_STRUCTURE shape"""
+    rng = random.Random(seed)
+    return {
+        "cv_template": {
+            "metadata": {
+                "section_order": ["header", "education", "experience", "projects",
+                                  "skills", "interests", "certifications"]
+            },
+            "sections": {
+                "header": {
+                    "name": f"Candidate {seed}",
+                    "contact_info": {
+                        "email": {"value": f"candidate{seed}@example.com", "link": f"mailto:candidate{seed}@example.com"},
+                        "phone": {"value": f"+1 555 {seed % 10000:04d}", "link": f"tel:+1555{seed % 10000:04d}"},
+                        "location": {"value": "Ho Chi Minh City, Vietnam"},
+                    },
+                },
+                "education": {
+                    "section_title": "Education",
+                    "items": [{
+                        "institution": "University of Science",
+                        "start_date": "Sep 2015",
+                        "graduation_date": "Jun 2019",
+                        "gpa": f"{rng.uniform(2.5, 4.0):.2f}",
+                    }],
+                },
+                "experience": {
+                    "section_title": "Experience",
+                    "items": [{
+                        "type": "job",
+                        "title": rng.choice(TITLES),
+                        "company": rng.choice(COMPANIES),
+                        "location": "Remote",
+                        "dates": {"start": f"Jan {2015 + i}", "end": f"Dec {2016 + i}", "is_current": i == 0},
+                        "achievements": [_achievement(rng) for _ in range(achievements)],
+                    } for i in range(experience_items)],
+                },
+                "projects": {
+                    "section_title": "Projects",
+                    "items": [{
+                        "title": f"Project {i}: {rng.choice(OBJECTS)}",
+                        "description": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with a small team of {rng.randint(2, 9)} people.",
+                        "dates": {"start": f"Mar {2018 + i}", "end": f"Aug {2018 + i}"},
+                        "technologies": rng.sample(SKILLS, 3),
+                        "key_contributions": [_achievement(rng) for _ in range(achievements // 2 or 1)],
+                    } for i in range(project_items)],
+                },
+                "skills": {
+                    "section_title": "Skills",
+                    "categories": [
+                        {"name": "Technical", "items": rng.sample(SKILLS, 8)},
+                        {"name": "Languages", "items": ["English (Fluent)", "Vietnamese (Native)"]},
+                    ],
+                },
+                "interests": {"section_title": "Interests", "items": ["Chess", "Running", "Open source"]},
+                "certifications": {
+                    "section_title": "Certifications",
+                    "items": [{"title": "AWS Certified Developer", "institution": "Amazon", "date": "2021"}],
+                },
+            },
+            "rendering_rules": {
+                "date_format": "MMM YYYY",
+                "hide_empty_sections": True,
+                "max_items_per_section": "No limit for now",
+                "truncate_descriptions_at": 600,
+            },
+        }
+    }
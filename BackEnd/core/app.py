@@ -1,8 +1,6 @@
-import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from services import gemini_service
-from core.cloudinary_config import setup_cloudinary
 from middleware.upload_middleware import UploadSizeMiddleware
 from middleware.auth_debug_middleware import AuthDebugMiddleware
 from core.config import settings
@@ -17,22 +15,17 @@ def create_app() -> FastAPI:
     )
 
     # Add upload size middleware (must be added before other middleware)
-    app.add_middleware(UploadSizeMiddleware, max_size=settings.MAX_UPLOAD_SIZE)
+    app.add_middleware(
+        UploadSizeMiddleware,
+        max_size=settings.MAX_UPLOAD_SIZE,
+        path_limits={"/cv-batches": settings.MAX_BATCH_UPLOAD_SIZE},
+    )
 
     # Add authentication debug middleware (for troubleshooting)
     app.add_middleware(AuthDebugMiddleware)
 
     # Determine allowed origins based on environment
-    allowed_origins = [
-        "http://localhost:3000",
-        "http://localhost:5173",
-        # Production frontend URLs
-        "https://new-cv-fe.onrender.com",
-        settings.FRONTEND_URL
-    ]
-
-    # Remove duplicates and None values
-    allowed_origins = list(set(filter(None, allowed_origins)))
+    allowed_origins = settings.get_allowed_origins()
 
     print(f"🔧 CORS Configuration:")
     print(f"   - Allowed origins: {allowed_origins}")
@@ -58,19 +51,12 @@ def create_app() -> FastAPI:
         expose_headers=["*"],
     )
     
-    # Setup Cloudinary for file uploads
-    setup_cloudinary()
-    
-    # Ensure output directory exists
-    LATEX_OUTPUT_DIR = "output_tex_files"
-    os.makedirs(LATEX_OUTPUT_DIR, exist_ok=True)
-    
     return app
 
 # Create app instance
 app = create_app()
 
-# Initialize services
+# Initialize services (the Gemini client itself is created on first use)
 gemini_service = gemini_service.GeminiService()
 
 # In-memory storage (should be replaced with a database in production)
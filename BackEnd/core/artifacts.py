@@ -0,0 +1,252 @@
+"""
+Lifecycle of the files CV generation leaves on disk.
+
+Every generated document gets its own job directory under ARTIFACT_DIR,
+named after its stem: convert_to_latex_service writes
+<name>_<uuid>.tex to ARTIFACT_DIR/<name>_<uuid>/ and pdflatex is
+pointed at that directory, so its .aux/.log/.out stay with the document and
+a whole job goes in one rmtree. Public filenames are unchanged: the store
+maps foo.pdf to ARTIFACT_DIR/foo/foo.pdf, and still finds files
+written flat into ARTIFACT_DIR before job directories existed.
+
+Callers take a job with create() or acquire() and hand it back with
+release(): a job uploaded elsewhere (complete_cv_flow, update_cv) is removed
+there and then, one still served by GET /pdf/{filename} keeps only its .tex
+and .pdf. Jobs in use are never collected; the rest are removed once older
+than ARTIFACT_TTL_SECONDS, and oldest first while the directory holds more
+than ARTIFACT_MAX_MB. Collection runs every ARTIFACT_GC_INTERVAL_SECONDS
+(run_periodic_gc(), started with the app) and straight away when a release
+pushes the running total over the cap.
+"""
+import asyncio
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.metrics import metrics
+
+ARTIFACT_DIR = os.path.abspath(os.getenv("ARTIFACT_DIR", "output_tex_files"))
+ARTIFACT_TTL_SECONDS = int(os.getenv("ARTIFACT_TTL_SECONDS", str(24 * 3600)))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_MB", "1024")) * 1024 * 1024
+ARTIFACT_GC_INTERVAL_SECONDS = int(os.getenv("ARTIFACT_GC_INTERVAL_SECONDS", "600"))
+# Share of ARTIFACT_MAX_MB a sweep over the cap brings the directory down to
+ARTIFACT_LOW_WATER = float(os.getenv("ARTIFACT_LOW_WATER", "0.8"))
+
+# pdflatex by-products, of no use once the PDF exists
+INTERMEDIATE_EXTENSIONS = (".aux", ".log", ".out", ".toc", ".body.tex")
+
+artifact_disk_bytes = metrics.gauge("artifact_disk_bytes", "Bytes under the artifact directory at the last sweep")
+artifact_jobs = metrics.gauge("artifact_jobs", "Job directories (and legacy flat files) at the last sweep")
+artifact_disk_free_bytes = metrics.gauge("artifact_disk_free_bytes", "Free bytes on the artifact directory's filesystem")
+artifact_removed = metrics.counter("artifact_removed_total", "Artifacts removed by reason")
+artifact_removed_bytes = metrics.counter("artifact_removed_bytes_total", "Artifact bytes removed by reason")
+artifact_gc_duration = metrics.histogram("artifact_gc_duration_seconds", "Artifact directory sweep time")
+
+
+def _usage(path: str) -> Tuple[int, float]:
+    """(bytes, latest mtime) of a file or of everything in a directory"""
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime
+    size, mtime = 0, os.stat(path).st_mtime
+    for directory, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                stat = os.stat(os.path.join(directory, filename))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            mtime = max(mtime, stat.st_mtime)
+    return size, mtime
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+class ArtifactStore:
+    """Job directories under one root, with TTL and size-capped collection"""
+
+    def __init__(self, root: str = ARTIFACT_DIR, ttl_seconds: int = ARTIFACT_TTL_SECONDS,
+                 max_bytes: int = ARTIFACT_MAX_BYTES):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # Job name -> callers holding it
+        self._active: Dict[str, int] = {}
+        # Estimate of the bytes on disk: the last sweep's total plus the jobs released since
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._gc_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def job_name(filename: str) -> Optional[str]:
+        """The job a public filename belongs to; None for anything that is not a plain filename"""
+        if not filename or filename != os.path.basename(filename) or filename.startswith("."):
+            return None
+        name = filename
+        for extension in INTERMEDIATE_EXTENSIONS + (".tex", ".pdf"):
+            if name.endswith(extension):
+                return name[:-len(extension)] or None
+        return os.path.splitext(name)[0] or None
+
+    def _hold(self, job: str) -> None:
+        with self._lock:
+            self._active[job] = self._active.get(job, 0) + 1
+
+    def create(self, filename: str) -> str:
+        """Path for a new document called filename, in its own job directory, held until release()"""
+        job = self.job_name(filename)
+        if job is None:
+            raise ValueError(f"Invalid artifact filename: {filename}")
+        self._hold(job)
+        directory = os.path.join(self.root, job)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """Path of an existing artifact, in its job directory or flat in the root; None if there is none"""
+        job = self.job_name(filename)
+        if job is None:
+            return None
+        for path in (os.path.join(self.root, job, filename), os.path.join(self.root, filename)):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def acquire(self, filename: str) -> Optional[str]:
+        """resolve(), holding the job until release() so it is not collected mid-compile"""
+        path = self.resolve(filename)
+        if path is not None:
+            self._hold(self.job_name(filename))
+        return path
+
+    def release(self, path: str, keep: bool = True) -> None:
+        """
+        Hand back a job from create() or acquire(). keep=False removes it,
+        otherwise its pdflatex intermediates are removed and the rest stays
+        for GET /pdf/{filename} until collected
+        """
+        job = self.job_name(os.path.basename(path))
+        directory = os.path.dirname(path)
+        in_job = directory != self.root
+        with self._lock:
+            count = self._active.get(job, 0) - 1
+            if count > 0:
+                self._active[job] = count
+            else:
+                self._active.pop(job, None)
+        if count > 0:
+            return  # Another request is still using it
+        try:
+            if not keep:
+                target = directory if in_job else path
+                size = _usage(target)[0] if os.path.exists(target) else 0
+                _remove(target)
+                self._count_removed("released", size)
+                return  # Never counted in the running total
+            size = self.remove_intermediates(path) if in_job else 0
+            with self._lock:
+                self._bytes += size
+                over = self._bytes > self.max_bytes
+        except OSError as e:
+            print(f"[ARTIFACTS] Error releasing {path}: {e}")
+            return
+        if over:
+            self.collect()
+
+    def remove_intermediates(self, path: str) -> int:
+        """Remove the pdflatex by-products in path's job directory; bytes left in it"""
+        directory = os.path.dirname(path)
+        left = removed = 0
+        for entry in os.scandir(directory):
+            if entry.name.endswith(INTERMEDIATE_EXTENSIONS):
+                removed += entry.stat().st_size
+                os.remove(entry.path)
+            elif entry.is_file():
+                left += entry.stat().st_size
+        if removed:
+            self._count_removed("intermediate", removed)
+        return left
+
+    def _in_use(self, job: str) -> bool:
+        with self._lock:
+            return job in self._active
+
+    def _count_removed(self, reason: str, size: int) -> None:
+        artifact_removed.inc(reason=reason)
+        artifact_removed_bytes.inc(size, reason=reason)
+
+    def _entries(self) -> List[Tuple[float, int, str, str]]:
+        """(mtime, bytes, job, path) of every job directory and flat file, oldest first"""
+        entries = []
+        for entry in os.scandir(self.root):
+            try:
+                size, mtime = _usage(entry.path)
+            except FileNotFoundError:
+                continue  # Released while scanning
+            job = entry.name if entry.is_dir() else self.job_name(entry.name)
+            entries.append((mtime, size, job, entry.path))
+        entries.sort()
+        return entries
+
+    def collect(self) -> dict:
+        """
+        Remove jobs past the TTL, then the oldest until the root holds at
+        most max_bytes; jobs in use are skipped. Refreshes the disk metrics
+        """
+        if not self._gc_lock.acquire(blocking=False):
+            return {"skipped": True}  # A sweep is already running
+        started = time.perf_counter()
+        try:
+            now = time.time()
+            kept, removed, total = [], {"ttl": 0, "size": 0}, 0
+            for mtime, size, job, path in self._entries():
+                if now - mtime > self.ttl_seconds and not self._in_use(job):
+                    _remove(path)
+                    self._count_removed("ttl", size)
+                    removed["ttl"] += 1
+                    continue
+                kept.append((size, job, path))
+                total += size
+            # Over the cap, make room for a while of new jobs rather than sweeping on every release
+            target = self.max_bytes if total <= self.max_bytes else int(self.max_bytes * ARTIFACT_LOW_WATER)
+            for size, job, path in kept:
+                if total <= target:
+                    break
+                if self._in_use(job):
+                    continue
+                _remove(path)
+                self._count_removed("size", size)
+                removed["size"] += 1
+                total -= size
+            with self._lock:
+                self._bytes = total
+            artifact_disk_bytes.set(total)
+            artifact_jobs.set(len(kept) - removed["size"])
+            artifact_disk_free_bytes.set(shutil.disk_usage(self.root).free)
+            artifact_gc_duration.observe(time.perf_counter() - started)
+            if removed["ttl"] or removed["size"]:
+                print(f"[ARTIFACTS] Removed {removed['ttl']} expired and {removed['size']} jobs over the size cap; "
+                      f"{total / 1024 / 1024:.1f} MB left")
+            return {"bytes": total, "removed_ttl": removed["ttl"], "removed_size": removed["size"]}
+        finally:
+            self._gc_lock.release()
+
+    async def run_periodic_gc(self, interval: float = ARTIFACT_GC_INTERVAL_SECONDS) -> None:
+        """Sweep now and then every interval seconds, off the event loop"""
+        while True:
+            try:
+                await asyncio.to_thread(self.collect)
+            except Exception as e:
+                print(f"[ARTIFACTS] Error collecting artifacts: {e}")
+            await asyncio.sleep(interval)
+
+
+artifact_store = ArtifactStore()
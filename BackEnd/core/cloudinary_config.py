@@ -1,18 +1,22 @@
 import os
-import cloudinary
-import cloudinary.uploader
+
+_configured = False
 
 # Configure Cloudinary
 def setup_cloudinary():
     """
     Set up the Cloudinary configuration using environment variables.
-    This should be called once during application startup.
+    Called on the first upload, so the SDK is not imported at startup.
     """
+    global _configured
+    import cloudinary
+
     cloudinary.config(
         cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
         api_key=os.getenv("CLOUDINARY_API_KEY"),
         api_secret=os.getenv("CLOUDINARY_API_SECRET")
     )
+    _configured = True
 
 def upload_file_to_cloudinary(file_path, public_id=None, folder="cv-pdfs"):
     """
@@ -27,6 +31,11 @@ def upload_file_to_cloudinary(file_path, public_id=None, folder="cv-pdfs"):
         dict: The Cloudinary upload response containing the URL and other metadata
     """
     try:
+        import cloudinary.uploader
+
+        if not _configured:
+            setup_cloudinary()
+
         upload_options = {
             "resource_type": "auto",  # Auto-detect the file type
             "folder": folder,
@@ -7,6 +7,8 @@ class Settings:
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # 10MB default
     MIN_UPLOAD_SIZE: int = int(os.getenv("MIN_UPLOAD_SIZE", 1024))  # 1KB default
+    # Batch CV uploads (/cv-batches) may be a ZIP of hundreds of CVs
+    MAX_BATCH_UPLOAD_SIZE: int = int(os.getenv("MAX_BATCH_UPLOAD_SIZE", 200 * 1024 * 1024))  # 200MB default
     
     # Allowed file types
     ALLOWED_EXTENSIONS: List[str] = [".pdf"]
@@ -44,6 +46,19 @@ class Settings:
     # Frontend URL
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "https://new-cv-fe.onrender.com")
     
+    @classmethod
+    def get_allowed_origins(cls) -> list:
+        """Frontend origins allowed to call the API with credentials (CORS and WebSocket handshakes)"""
+        origins = [
+            "http://localhost:3000",
+            "http://localhost:5173",
+            # Production frontend URLs
+            "https://new-cv-fe.onrender.com",
+            cls.FRONTEND_URL
+        ]
+        # Remove duplicates and None values
+        return list(set(filter(None, origins)))
+
     @classmethod
     def get_max_upload_size_mb(cls) -> int:
         """Get maximum upload size in MB"""
@@ -0,0 +1,295 @@
+"""
+In-process similarity index over stored CV vectors (CV.embedding).
+
+Vectors live in one float32 matrix (row per CV) and are searched by brute
+force: with NumPy a query is a single matrix-vector product, without it a
+pure-Python scan over the query's non-zero buckets. Rare buckets weigh more
+at query time (IDF over bucket mass), so stored vectors never need rewriting
+as the corpus changes.
+
+The index loads lazily on the first search and then stays current
+incrementally:
+
+* routes that create, edit or delete a CV call upsert()/remove() after commit
+* refresh() pulls rows changed in other workers (by updated_at) at most every
+  CV_INDEX_SYNC_SECONDS, and reloads everything every CV_INDEX_RELOAD_SECONDS
+  to drop CVs deleted elsewhere
+
+The index is per process, like core/user_cache.py.
+"""
+import asyncio
+import heapq
+import importlib.util
+import math
+import os
+import time
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from core.metrics import metrics
+from utils.cv_embedding import EMBEDDING_DIM, decode_embedding
+
+# NumPy is optional (without it search falls back to pure Python) and is
+# imported on first use, since importing it costs more than the rest of the app
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+numpy = None
+
+
+def _numpy():
+    global numpy
+    if numpy is None:
+        import numpy as module
+        numpy = module
+    return numpy
+
+CV_INDEX_SYNC_SECONDS = float(os.getenv("CV_INDEX_SYNC_SECONDS", 5))
+CV_INDEX_RELOAD_SECONDS = float(os.getenv("CV_INDEX_RELOAD_SECONDS", 900))
+CV_INDEX_LOAD_BATCH = 2000
+# updated_at is written by the application clock; overlap syncs to absorb skew
+SYNC_OVERLAP = timedelta(seconds=2)
+
+index_rows = metrics.gauge("cv_index_rows", "CVs in the in-process similarity index")
+index_search_seconds = metrics.histogram("cv_index_search_seconds", "Similarity index search latency")
+
+
+class CVVectorIndex:
+    """Row-per-CV float32 matrix with owner lookup, top-k search and incremental sync"""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, use_numpy: bool = True):
+        self.dim = dim
+        self.use_numpy = use_numpy and HAS_NUMPY
+        self.ids: List[int] = []
+        self.owners: List[uuid.UUID] = []
+        self._rows: Dict[int, int] = {}
+        self._by_owner: Dict[uuid.UUID, Set[int]] = {}
+        self._matrix = self._mass = None  # allocated by _reset() on the first upsert
+        self.loaded = False
+        self._watermark: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._last_full_load = 0.0
+        self._lock = asyncio.Lock()
+
+    def _reset(self) -> None:
+        self.ids: List[int] = []
+        self.owners: List[uuid.UUID] = []
+        self._rows: Dict[int, int] = {}
+        self._by_owner: Dict[uuid.UUID, Set[int]] = {}
+        if self.use_numpy:
+            np = _numpy()
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            self._mass = np.zeros(self.dim, dtype=np.float64)
+        else:
+            self._matrix = array("f")
+            self._mass = [0.0] * self.dim
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.ids) * self.dim * 4
+
+    def _row_vector(self, row: int):
+        if self.use_numpy:
+            return self._matrix[row]
+        return self._matrix[row * self.dim:(row + 1) * self.dim]
+
+    def _add_mass(self, vector, sign: float) -> None:
+        if self.use_numpy:
+            self._mass += sign * numpy.abs(vector)
+        else:
+            mass = self._mass
+            for j, value in enumerate(vector):
+                if value:
+                    mass[j] += sign * abs(value)
+
+    def upsert(self, cv_id: int, user_id: uuid.UUID, embedding) -> None:
+        """Add or replace a CV's vector; a missing or stale embedding removes it"""
+        vector = decode_embedding(embedding, self.dim) if isinstance(embedding, (bytes, bytearray, memoryview)) else embedding
+        if vector is None or len(vector) != self.dim:
+            self.remove(cv_id)
+            return
+        if self._matrix is None:
+            self._reset()
+        if self.use_numpy:
+            vector = numpy.frombuffer(array("f", vector), dtype=numpy.float32)
+
+        row = self._rows.get(cv_id)
+        if row is None:
+            row = len(self.ids)
+            self._rows[cv_id] = row
+            self.ids.append(cv_id)
+            self.owners.append(user_id)
+            if self.use_numpy:
+                if row >= len(self._matrix):
+                    grown = numpy.zeros((max(1024, 2 * len(self._matrix)), self.dim), dtype=numpy.float32)
+                    grown[:row] = self._matrix[:row]
+                    self._matrix = grown
+                self._matrix[row] = vector
+            else:
+                self._matrix.extend(vector)
+        else:
+            self._add_mass(self._row_vector(row), -1)
+            self._by_owner.get(self.owners[row], set()).discard(cv_id)
+            self.owners[row] = user_id
+            if self.use_numpy:
+                self._matrix[row] = vector
+            else:
+                self._matrix[row * self.dim:(row + 1) * self.dim] = array("f", vector)
+        self._add_mass(vector, 1)
+        self._by_owner.setdefault(user_id, set()).add(cv_id)
+        index_rows.set(len(self.ids))
+
+    def remove(self, cv_id: int) -> None:
+        """Drop a CV; the last row moves into its place"""
+        row = self._rows.pop(cv_id, None)
+        if row is None:
+            return
+        self._add_mass(self._row_vector(row), -1)
+        owned = self._by_owner.get(self.owners[row])
+        if owned is not None:
+            owned.discard(cv_id)
+            if not owned:
+                del self._by_owner[self.owners[row]]
+
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row], self.owners[row] = moved, self.owners[last]
+            self._rows[moved] = row
+            if self.use_numpy:
+                self._matrix[row] = self._matrix[last]
+            else:
+                self._matrix[row * self.dim:(row + 1) * self.dim] = self._row_vector(last)
+        self.ids.pop()
+        self.owners.pop()
+        if not self.use_numpy:
+            del self._matrix[last * self.dim:]
+        index_rows.set(len(self.ids))
+
+    def clear(self) -> None:
+        self._reset()
+        index_rows.set(0)
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next refresh (e.g. after a bulk rewrite of embeddings)"""
+        self._last_full_load = 0.0
+
+    def weights(self) -> List[float]:
+        """Per-bucket IDF from the share of total vector mass each bucket holds"""
+        if self._matrix is None:
+            return [1.0] * self.dim
+        if self.use_numpy:
+            mass = self._mass
+            total = float(mass.sum())
+            return numpy.log((total + 1.0) / (mass + 1.0 / self.dim)) if total else numpy.ones(self.dim)
+        total = sum(self._mass)
+        if not total:
+            return [1.0] * self.dim
+        return [math.log((total + 1.0) / (m + 1.0 / self.dim)) for m in self._mass]
+
+    def weighted_query(self, vector) -> Dict[int, float]:
+        """Sparse IDF-weighted, re-normalized query {bucket: weight}"""
+        weights = self.weights()
+        query = {j: float(v) * float(weights[j]) for j, v in enumerate(vector) if v}
+        norm = math.sqrt(sum(v * v for v in query.values()))
+        return {j: v / norm for j, v in query.items()} if norm else {}
+
+    def search(self, vector, top_k: int = 10, user_id: Optional[uuid.UUID] = None,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Best (cv_id, score) pairs for a query vector, optionally among one user's CVs"""
+        started = time.perf_counter()
+        if not self.ids or top_k <= 0:
+            return []
+        query = self.weighted_query(vector)
+        if not query:
+            return []
+
+        if user_id is not None:
+            rows = [self._rows[cv_id] for cv_id in self._by_owner.get(user_id, ())]
+        else:
+            rows = None
+
+        if self.use_numpy:
+            dense = numpy.zeros(self.dim, dtype=numpy.float32)
+            dense[list(query)] = list(query.values())
+            if rows is None:
+                scores = self._matrix[:len(self.ids)] @ dense
+                candidates = numpy.arange(len(self.ids))
+            else:
+                candidates = numpy.array(rows, dtype=numpy.int64)
+                scores = self._matrix[candidates] @ dense if rows else numpy.zeros(0, dtype=numpy.float32)
+            wanted = min(len(scores), top_k + (exclude is not None))
+            if wanted < len(scores):
+                best = numpy.argpartition(-scores, wanted - 1)[:wanted]
+            else:
+                best = numpy.arange(len(scores))
+            best = best[numpy.argsort(-scores[best], kind="stable")]
+            results = [(self.ids[int(candidates[i])], float(scores[i])) for i in best]
+        else:
+            dims = list(query.items())
+            matrix, dim = self._matrix, self.dim
+            scored = (
+                (self.ids[row], sum(weight * matrix[row * dim + j] for j, weight in dims))
+                for row in (range(len(self.ids)) if rows is None else rows)
+            )
+            results = heapq.nlargest(top_k + (exclude is not None), scored, key=lambda item: item[1])
+
+        results = [(cv_id, score) for cv_id, score in results if cv_id != exclude][:top_k]
+        index_search_seconds.observe(time.perf_counter() - started)
+        return results
+
+    def vector_of(self, cv_id: int):
+        row = self._rows.get(cv_id)
+        return None if row is None else self._row_vector(row)
+
+    def owned_by(self, user_id: uuid.UUID) -> Set[int]:
+        return set(self._by_owner.get(user_id, ()))
+
+    async def refresh(self, db) -> None:
+        """Load on first use, then apply rows changed since the last sync"""
+        now = time.monotonic()
+        full = not self.loaded or now - self._last_full_load >= CV_INDEX_RELOAD_SECONDS
+        if not full and now - self._last_sync < CV_INDEX_SYNC_SECONDS:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            full = not self.loaded or now - self._last_full_load >= CV_INDEX_RELOAD_SECONDS
+            if not full and now - self._last_sync < CV_INDEX_SYNC_SECONDS:
+                return
+            await self._load(db, full)
+            self._last_sync = now
+            if full:
+                self._last_full_load = now
+                self.loaded = True
+
+    async def _load(self, db, full: bool) -> None:
+        from models.user import CV
+
+        started = datetime.utcnow()
+        since = None if full or self._watermark is None else self._watermark - SYNC_OVERLAP
+        # A full load fills a new index and swaps it in, so searches meanwhile see the old one
+        target = CVVectorIndex(self.dim, self.use_numpy) if full else self
+        last_id = 0
+        while True:
+            query = select(CV.id, CV.user_id, CV.embedding).where(CV.id > last_id)
+            if since is not None:
+                query = query.where(CV.updated_at >= since)
+            rows = (await db.execute(query.order_by(CV.id).limit(CV_INDEX_LOAD_BATCH))).all()
+            if not rows:
+                break
+            for row in rows:
+                last_id = row.id
+                target.upsert(row.id, row.user_id, row.embedding)
+        if full:
+            self.ids, self.owners, self._rows, self._by_owner = target.ids, target.owners, target._rows, target._by_owner
+            self._matrix, self._mass = target._matrix, target._mass
+            index_rows.set(len(self.ids))
+        self._watermark = started
+
+
+cv_index = CVVectorIndex()
@@ -0,0 +1,57 @@
+"""
+In-process PDF backend for generated CVs.
+
+PDF_BACKEND chooses how a rendered .tex becomes a PDF, in
+convert_tex_to_pdf (routes/pdf_routes.py) and in live previews
+(services/preview_service.py):
+
+- "pdflatex" (default): always pdflatex, the reference output.
+- "direct": templates with a direct layout (utils/latex_pdf.py) are set in
+  process in milliseconds, and everything else still goes to pdflatex.
+"""
+import os
+import time
+from typing import Optional
+
+from core.metrics import metrics
+from utils.latex_pdf import latex_to_pdf
+
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pdflatex").lower()
+
+direct_pdf_renders = metrics.counter("direct_pdf_renders_total", "In-process PDF renders by outcome")
+direct_pdf_duration = metrics.histogram("direct_pdf_duration_seconds", "In-process PDF render time")
+
+
+def direct_pdf_enabled() -> bool:
+    return PDF_BACKEND == "direct"
+
+
+def render_direct(latex_code: str) -> Optional[bytes]:
+    """PDF of latex_code from the direct backend; None when it is disabled or pdflatex is needed"""
+    if not direct_pdf_enabled():
+        return None
+    started = time.perf_counter()
+    try:
+        pdf = latex_to_pdf(latex_code)
+    except Exception as e:
+        print(f"[DIRECT_PDF] Error rendering PDF in process: {e}")
+        pdf = None
+    if pdf is None:
+        direct_pdf_renders.inc(outcome="unsupported")
+        return None
+    direct_pdf_duration.observe(time.perf_counter() - started)
+    direct_pdf_renders.inc(outcome="ok")
+    return pdf
+
+
+def compile_direct(tex_path: str) -> bool:
+    """Write the PDF of tex_path next to it with the direct backend; False when pdflatex is needed"""
+    if not direct_pdf_enabled():
+        return False
+    with open(tex_path, encoding="utf-8") as f:
+        pdf = render_direct(f.read())
+    if pdf is None:
+        return False
+    with open(os.path.splitext(tex_path)[0] + ".pdf", "wb") as f:
+        f.write(pdf)
+    return True
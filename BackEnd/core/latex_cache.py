@@ -0,0 +1,105 @@
+"""
+Bounded cache of rendered LaTeX fragments.
+
+An edit through /cv/{cv_id}/update usually changes one field, yet the whole
+CV used to be escaped and rendered again. json_to_latex takes this cache
+and looks each fragment up by template, section key and its data:
+sections made of entries (education, experience, projects) are cached per
+entry, the others whole. Only what changed is rendered; the rest is
+stitched in from the cache, so a one-field edit of a CV with many entries
+costs one entry plus a lookup per entry. The data part of the key is its
+marshal serialization: it runs in C, several times faster than json.dumps
+or rendering, tells apart types JSON would not (a tuple from a list), and
+as the full bytes rather than a digest it cannot collide.
+
+The cache is per process and holds at most LATEX_FRAGMENT_CACHE_SIZE
+fragments (each about the size of its key), least recently used first out.
+"""
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from utils.json_to_latex import LatexTemplate, render_section
+
+LATEX_FRAGMENT_CACHE_SIZE = int(os.getenv("LATEX_FRAGMENT_CACHE_SIZE", 10000))
+
+# Cached result of a section that renders to nothing
+_EMPTY = ""
+
+
+def _serialize(data) -> Optional[bytes]:
+    try:
+        return marshal.dumps(data)
+    except ValueError:
+        # Holds something marshal cannot serialize: not cached
+        return None
+
+
+class LatexFragmentCache:
+    """LRU map of (template, section key, marshalled data) -> rendered section or entry"""
+
+    def __init__(self, max_size: int = LATEX_FRAGMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._fragments: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._fragments.move_to_end(key)
+            self.hits += 1
+        return fragment
+
+    def _set(self, key: tuple, fragment: str) -> None:
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+
+    def render(self, section_key, section: dict, template: LatexTemplate) -> Optional[str]:
+        """render_section(section_key, section, template), reusing unchanged sections and entries"""
+        if self.max_size <= 0:
+            return render_section(section_key, section, template)
+        if section_key in template.entry_renderers:
+            # Title and spacing are cheap; the entries come from the cache
+            return render_section(section_key, section, template, render_entry=self.render_entry)
+
+        data = _serialize(section)
+        if data is None:
+            return render_section(section_key, section, template)
+        key = (template.name, section_key, data)
+        fragment = self._get(key)
+        if fragment is None:
+            fragment = render_section(section_key, section, template)
+            self._set(key, _EMPTY if fragment is None else fragment)
+        return fragment or None
+
+    def render_entry(self, template: LatexTemplate, section_key, item: dict) -> str:
+        """One entry of an entry section, from the cache when unchanged"""
+        render = template.entry_renderers[section_key]
+        data = _serialize(item)
+        if data is None:
+            return render(item)
+        key = (template.name, section_key, data)
+        fragment = self._get(key)
+        if fragment is None:
+            fragment = render(item)
+            self._set(key, fragment)
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+latex_fragment_cache = LatexFragmentCache()
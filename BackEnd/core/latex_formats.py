@@ -0,0 +1,182 @@
+"""
+Precompiled pdflatex formats (.fmt) for the CV templates.
+
+For a one-page CV most of a pdflatex run is loading the document class and
+packages. Each template (utils/latex_templates.py) lists the packages that
+can be dumped into a format; the format is built once per template, named
+after a hash of those lines so a changed template gets a new one, and
+compiles of documents rendered with the template load it instead. Without
+pdflatex, or when a format cannot be built or used, callers fall back to a
+plain pdflatex run; a format whose compiles fail LATEX_FORMAT_MAX_FAILURES
+times in a row is not used again. prepare() and finish() split a compile
+around the pdflatex process so async callers can run it themselves.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from core.metrics import metrics
+from utils.json_to_latex import LatexTemplate
+from utils.latex_templates import list_templates, template_for_source
+
+LATEX_FORMAT_DIR = os.path.abspath(os.getenv("LATEX_FORMAT_DIR", "latex_formats"))
+LATEX_PRECOMPILE_FORMATS = os.getenv("LATEX_PRECOMPILE_FORMATS", "true").lower() == "true"
+LATEX_TIMEOUT_SECONDS = int(os.getenv("LATEX_TIMEOUT_SECONDS", "60"))
+LATEX_FORMAT_MAX_FAILURES = int(os.getenv("LATEX_FORMAT_MAX_FAILURES", "3"))
+
+latex_format_builds = metrics.counter("latex_format_builds_total", "pdflatex format builds by template and outcome")
+latex_format_compiles = metrics.counter("latex_format_compiles_total", "Compiles with a precompiled template format by outcome")
+latex_format_compile_duration = metrics.histogram(
+    "latex_format_compile_duration_seconds", "pdflatex run time with a precompiled template format")
+
+
+class FormatCompile(NamedTuple):
+    """A prepared pdflatex run with a template format (LatexFormatCache.prepare)"""
+    template: LatexTemplate
+    argv: List[str]
+    env: Dict[str, str]
+    body_path: str
+    pdf_path: str
+
+
+class LatexFormatCache:
+    """Builds each template's format on first use and compiles documents with it"""
+
+    def __init__(self, directory: str = LATEX_FORMAT_DIR, enabled: bool = LATEX_PRECOMPILE_FORMATS):
+        self.directory = directory
+        self.enabled = enabled
+        # Template name -> format name, or None when the template has no usable format
+        self._formats: Dict[str, Optional[str]] = {}
+        # Template name -> failed compiles in a row with its format
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def format_name(self, template: LatexTemplate) -> str:
+        digest = hashlib.sha256(template.format_source.encode("utf-8")).hexdigest()[:12]
+        return f"{template.name}-{digest}"
+
+    def get(self, template: LatexTemplate) -> Optional[str]:
+        """The template's format name, building it if needed; None when formats are unavailable"""
+        if not self.enabled:
+            return None
+        if template.name in self._formats:
+            return self._formats[template.name]
+        with self._lock:
+            if template.name not in self._formats:
+                self._formats[template.name] = self._build(template)
+            return self._formats[template.name]
+
+    def _build(self, template: LatexTemplate) -> Optional[str]:
+        if shutil.which("pdflatex") is None:
+            return None
+        name = self.format_name(template)
+        if os.path.exists(os.path.join(self.directory, f"{name}.fmt")):
+            return name  # Built by an earlier run
+        os.makedirs(self.directory, exist_ok=True)
+        source_path = os.path.join(self.directory, f"{name}.tex")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(template.format_source + "\n\\dump\n")
+
+        started = time.perf_counter()
+        try:
+            subprocess.run(
+                ["pdflatex", "-ini", "-interaction=nonstopmode", f"-jobname={name}",
+                 f"-output-directory={self.directory}", "&pdflatex", source_path],
+                check=False, capture_output=True, text=True, timeout=LATEX_TIMEOUT_SECONDS
+            )
+        except subprocess.TimeoutExpired:
+            pass
+        if not os.path.exists(os.path.join(self.directory, f"{name}.fmt")):
+            latex_format_builds.inc(template=template.name, outcome="failed")
+            print(f"[LATEX_FORMAT] Could not build the format of template {template.name}")
+            return None
+        latex_format_builds.inc(template=template.name, outcome="ok")
+        print(f"[LATEX_FORMAT] Built {name}.fmt in {time.perf_counter() - started:.1f}s")
+        return name
+
+    def build_all(self) -> None:
+        """Build the formats of every registered template (run at startup, off the event loop)"""
+        for template in list_templates():
+            try:
+                self.get(template)
+            except Exception as e:
+                print(f"[LATEX_FORMAT] Error building the format of template {template.name}: {e}")
+
+    def prepare(self, tex_path: str, source: Optional[str] = None) -> Optional[FormatCompile]:
+        """
+        The pdflatex run compiling tex_path (whose content source is, when
+        the caller has it) with the format of the template it was rendered
+        with, writing the body that run reads. None when there is no such
+        template or format
+        """
+        if not self.enabled:
+            return None
+        if source is None:
+            with open(tex_path, encoding="utf-8") as f:
+                source = f.read()
+        template = template_for_source(source)
+        if template is None:
+            return None
+        name = self.get(template)
+        if name is None:
+            return None
+
+        output_dir, filename = os.path.split(os.path.abspath(tex_path))
+        stem = os.path.splitext(filename)[0]
+        body_path = os.path.join(output_dir, f"{stem}.body.tex")
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(template.format_body(source))
+        return FormatCompile(
+            template=template,
+            argv=["pdflatex", f"-fmt={name}", f"-jobname={stem}", "-interaction=nonstopmode",
+                  f"-output-directory={output_dir}", body_path],
+            # Where kpathsea looks for the format; the trailing separator keeps the default path
+            env={**os.environ, "TEXFORMATS": f"{self.directory}{os.pathsep}"},
+            body_path=body_path,
+            pdf_path=os.path.join(output_dir, f"{stem}.pdf"),
+        )
+
+    def finish(self, run: FormatCompile, elapsed: float) -> bool:
+        """Whether the run produced its PDF; removes its body file, and a partial PDF"""
+        if os.path.exists(run.body_path):
+            os.remove(run.body_path)
+        if os.path.exists(run.pdf_path) and os.path.getsize(run.pdf_path) > 0:
+            latex_format_compile_duration.observe(elapsed)
+            latex_format_compiles.inc(outcome="ok")
+            self._failures.pop(run.template.name, None)
+            return True
+        latex_format_compiles.inc(outcome="failed")
+        # One failure may be the document's fault; a run of them is the format's (e.g. built by another TeX version)
+        failures = self._failures.get(run.template.name, 0) + 1
+        self._failures[run.template.name] = failures
+        if failures >= LATEX_FORMAT_MAX_FAILURES:
+            self._formats[run.template.name] = None
+            print(f"[LATEX_FORMAT] {failures} failed compiles with the format of template "
+                  f"{run.template.name}; using plain pdflatex")
+        if os.path.exists(run.pdf_path):
+            os.remove(run.pdf_path)
+        return False
+
+    def compile(self, tex_path: str) -> bool:
+        """
+        pdflatex on tex_path with the format of the template it was rendered
+        with; the PDF lands next to it. False, having produced nothing, when
+        there is no such template or format, or the run fails
+        """
+        run = self.prepare(tex_path)
+        if run is None:
+            return False
+        started = time.perf_counter()
+        try:
+            subprocess.run(run.argv, check=False, capture_output=True, text=True,
+                           timeout=LATEX_TIMEOUT_SECONDS, env=run.env)
+        except subprocess.TimeoutExpired:
+            pass
+        return self.finish(run, time.perf_counter() - started)
+
+
+latex_formats = LatexFormatCache()
@@ -0,0 +1,339 @@
+"""
+Shared governor for outbound LLM (Gemini) calls.
+
+Every Gemini request in the process goes through one LLMGovernor, which
+applies, per model:
+
+* a token bucket limiting the request rate, with part of the burst reserved
+  for the priority lane so paid plans keep capacity while free traffic queues;
+* jittered exponential retries of transient failures (429/5xx/timeouts),
+  bounded by a process-wide retry budget so retries cannot amplify an outage;
+* a circuit breaker that, after repeated failures, rejects calls immediately
+  for a cooldown and then lets a single probe through.
+
+Calls that cannot be served (breaker open, queue wait too long, retries
+exhausted) raise LLMUnavailable, a 503 with Retry-After. The lane of the
+current request is carried in the `llm_lane` context variable, set by routes
+from the user's subscription.
+"""
+import asyncio
+import math
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from core.metrics import metrics
+
+T = TypeVar("T")
+
+LANE_PRIORITY = "priority"
+LANE_STANDARD = "standard"
+
+# Request context: which lane this request's LLM calls use
+llm_lane: ContextVar[str] = ContextVar("llm_lane", default=LANE_STANDARD)
+
+
+def _positive_rate(value: str, setting: str) -> float:
+    """A requests-per-second rate from the config; a bucket refilled at 0 or less never frees a token"""
+    rate = float(value)
+    if not rate > 0:
+        raise ValueError(f"{setting} must be a rate above 0 requests per second, got {value!r}")
+    return rate
+
+
+GEMINI_RATE_PER_SECOND = _positive_rate(os.getenv("GEMINI_RATE_PER_SECOND", "4"), "GEMINI_RATE_PER_SECOND")
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", 8))
+# Per-model overrides, e.g. "gemini-2.0-flash=10/20,gemini-2.5-pro=1/2" (rate/burst)
+GEMINI_MODEL_RATE_LIMITS = os.getenv("GEMINI_MODEL_RATE_LIMITS", "")
+# Share of the burst only the priority lane may use
+GEMINI_PRIORITY_RESERVE = float(os.getenv("GEMINI_PRIORITY_RESERVE", 0.25))
+# Longest a call may wait for a rate-limit token before it is shed
+GEMINI_MAX_WAIT_SECONDS = float(os.getenv("GEMINI_MAX_WAIT_SECONDS", 10))
+
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 3))
+GEMINI_RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", 0.5))
+GEMINI_RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", 8))
+# Retries allowed per first attempt, averaged over time (0.2 = at most +20% load)
+GEMINI_RETRY_BUDGET_RATIO = float(os.getenv("GEMINI_RETRY_BUDGET_RATIO", 0.2))
+GEMINI_RETRY_BUDGET_MIN = float(os.getenv("GEMINI_RETRY_BUDGET_MIN", 5))
+
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", 5))
+GEMINI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", 30))
+
+# HTTP statuses from the API worth retrying
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+llm_calls = metrics.counter("llm_calls_total", "Governed LLM calls by model, lane and outcome")
+llm_retries = metrics.counter("llm_retries_total", "LLM call retries by model")
+llm_shed = metrics.counter("llm_shed_total", "LLM calls rejected with 503 by model and reason")
+llm_wait = metrics.histogram("llm_rate_limit_wait_seconds", "Time spent waiting for a rate-limit token")
+llm_breaker_state = metrics.gauge("llm_circuit_open", "1 while the model's circuit breaker is open or probing")
+
+
+class LLMUnavailable(HTTPException):
+    """Raised when the governor sheds an LLM call"""
+
+    def __init__(self, retry_after: float, reason: str):
+        self.reason = reason
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The AI service is busy or unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient API statuses and transport errors; not bad requests or our own bugs"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover - httpx ships with google-genai
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+class TokenBucket:
+    """Request-rate limiter; the standard lane cannot dip into the reserved tokens"""
+
+    def __init__(self, rate: float, burst: int, reserve: float = GEMINI_PRIORITY_RESERVE):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.reserved = self.burst * reserve
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, lane: str) -> float:
+        floor = 0 if lane == LANE_PRIORITY else self.reserved
+        missing = floor + 1 - self.tokens
+        return max(0.0, missing / self.rate)
+
+    async def acquire(self, lane: str, max_wait: float) -> float:
+        """Take one token, sleeping as needed; returns the time waited"""
+        started = time.monotonic()
+        while True:
+            self._refill()
+            wait = self._wait_time(lane)
+            if wait == 0:
+                self.tokens -= 1
+                return time.monotonic() - started
+            if time.monotonic() - started + wait > max_wait:
+                raise LLMUnavailable(wait, "rate_limited")
+            await asyncio.sleep(wait)
+
+    def snapshot(self) -> dict:
+        self._refill()
+        return {"rate_per_second": self.rate, "burst": self.burst,
+                "reserved_for_priority": self.reserved, "tokens": round(self.tokens, 2)}
+
+
+class RetryBudget:
+    """Each first attempt earns `ratio` retries, up to a small reserve"""
+
+    def __init__(self, ratio: float = GEMINI_RETRY_BUDGET_RATIO, minimum: float = GEMINI_RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.cap = max(minimum, 1.0)
+        self.balance = self.cap
+
+    def deposit(self) -> None:
+        self.balance = min(self.cap, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+    def snapshot(self) -> dict:
+        return {"ratio": self.ratio, "available": round(self.balance, 2), "cap": self.cap}
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half_open single probe -> closed"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, model: str, failure_threshold: int = GEMINI_BREAKER_FAILURES,
+                 cooldown: float = GEMINI_BREAKER_COOLDOWN_SECONDS):
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        llm_breaker_state.set(0 if state == self.CLOSED else 1, model=self.model)
+
+    def before_call(self) -> bool:
+        """Raise if calls are being shed; True if this call is the half-open probe"""
+        if self.state == self.CLOSED:
+            return False
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        if self.state == self.OPEN and remaining <= 0:
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.OPEN or self._probing:
+            raise LLMUnavailable(max(remaining, 1), "circuit_open")
+        self._probing = True
+        return True
+
+    def cancel_probe(self) -> None:
+        """The probe ended without an answer (shed or cancelled); allow another"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def snapshot(self) -> dict:
+        retry_in = max(0.0, self.opened_at + self.cooldown - time.monotonic()) if self.state == self.OPEN else 0.0
+        return {"state": self.state, "consecutive_failures": self.failures, "retry_in_seconds": round(retry_in, 1)}
+
+
+def _parse_model_limits(spec: str) -> Dict[str, tuple]:
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, value = entry.partition("=")
+        rate, _, burst = value.partition("/")
+        rate = _positive_rate(rate, f"GEMINI_MODEL_RATE_LIMITS for {model.strip()}")
+        limits[model.strip()] = (rate, int(burst or max(1, rate)))
+    return limits
+
+
+class LLMGovernor:
+    def __init__(
+        self,
+        rate: float = GEMINI_RATE_PER_SECOND,
+        burst: int = GEMINI_BURST,
+        model_limits: Optional[Dict[str, tuple]] = None,
+        max_wait: float = GEMINI_MAX_WAIT_SECONDS,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        retry_base: float = GEMINI_RETRY_BASE_SECONDS,
+        retry_max: float = GEMINI_RETRY_MAX_SECONDS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.model_limits = _parse_model_limits(GEMINI_MODEL_RATE_LIMITS) if model_limits is None else model_limits
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retry_budget = RetryBudget()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _bucket(self, model: str) -> TokenBucket:
+        if model not in self._buckets:
+            rate, burst = self.model_limits.get(model, (self.rate, self.burst))
+            self._buckets[model] = TokenBucket(rate, burst)
+        return self._buckets[model]
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(model)
+        return self._breakers[model]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform over [0, capped exponential]
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+
+    async def call(self, model: str, func: Callable[[], Awaitable[T]], lane: Optional[str] = None) -> T:
+        """Run `func` (one API request) under the model's limits, retrying transient failures"""
+        lane = lane or llm_lane.get()
+        breaker = self._breaker(model)
+        try:
+            is_probe = breaker.before_call()
+        except LLMUnavailable as shed:
+            llm_shed.inc(model=model, reason=shed.reason)
+            llm_calls.inc(model=model, lane=lane, outcome="shed")
+            raise
+
+        try:
+            return await self._call(model, func, lane)
+        finally:
+            if is_probe and breaker.state == CircuitBreaker.HALF_OPEN:
+                breaker.cancel_probe()
+
+    async def _call(self, model: str, func: Callable[[], Awaitable[T]], lane: str) -> T:
+        bucket, breaker = self._bucket(model), self._breaker(model)
+        try:
+            llm_wait.observe(await bucket.acquire(lane, self.max_wait), model=model, lane=lane)
+        except LLMUnavailable as shed:
+            llm_shed.inc(model=model, reason=shed.reason)
+            llm_calls.inc(model=model, lane=lane, outcome="shed")
+            raise
+
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                result = await func()
+            except Exception as error:
+                if not is_retryable(error):
+                    # The API answered; the request itself was bad
+                    breaker.record_success()
+                    llm_calls.inc(model=model, lane=lane, outcome="error")
+                    raise
+
+                attempt += 1
+                if attempt > self.max_retries or not self.retry_budget.withdraw():
+                    breaker.record_failure()
+                    llm_calls.inc(model=model, lane=lane, outcome="failed")
+                    llm_shed.inc(model=model, reason="retries_exhausted")
+                    print(f"[LLM] {model} call failed after {attempt} attempt(s): {error}")
+                    raise LLMUnavailable(self._backoff(attempt) + 1, "retries_exhausted") from error
+
+                delay = self._backoff(attempt)
+                llm_retries.inc(model=model)
+                print(f"[LLM] {model} transient error ({error}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                try:
+                    await bucket.acquire(lane, self.max_wait)
+                except LLMUnavailable as shed:
+                    breaker.record_failure()
+                    llm_shed.inc(model=model, reason=shed.reason)
+                    llm_calls.inc(model=model, lane=lane, outcome="shed")
+                    raise
+                continue
+
+            breaker.record_success()
+            llm_calls.inc(model=model, lane=lane, outcome="ok")
+            return result
+
+    def snapshot(self) -> dict:
+        models = sorted(set(self._buckets) | set(self._breakers))
+        return {
+            "models": {
+                model: {"rate_limit": self._bucket(model).snapshot(), "circuit": self._breaker(model).snapshot()}
+                for model in models
+            },
+            "retry_budget": self.retry_budget.snapshot(),
+            "max_retries": self.max_retries,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+llm_governor = LLMGovernor()
@@ -0,0 +1,209 @@
+"""
+In-place schema upgrades for columns added after a table already exists.
+Base.metadata.create_all only creates missing tables, so new columns on
+existing tables are added (and backfilled) here on startup.
+"""
+from datetime import datetime
+from sqlalchemy import inspect, select, text, table, column, update, LargeBinary
+from sqlalchemy.orm import undefer
+
+from core.database import engine, AsyncSessionLocal
+from models.types import decode_json, encode_json, is_encoded
+
+# Columns added to "cvs" for lightweight listings
+CV_SUMMARY_COLUMNS = {
+    "has_structure": "BOOLEAN",
+    "name": "VARCHAR(255)",
+    "section_counts": "JSON",
+    "created_at": "TIMESTAMP",
+    "updated_at": "TIMESTAMP",
+}
+
+# Rule-based completeness score (utils/cv_rules.py) and similarity vector
+# (utils/cv_embedding.py); existing rows are filled in by POST /admin/cvs/rescore
+# rather than on startup
+CV_SCORE_COLUMNS = {
+    "completeness_score": "INTEGER",
+    "embedding": LargeBinary(),
+}
+
+# Revision counter added to "cvs" for revision history (models.user.CVRevision)
+CV_REVISION_COLUMNS = {
+    "revision": "INTEGER DEFAULT 0",
+}
+
+# Template the CV's PDF is rendered with, reused when it is edited
+CV_TEMPLATE_COLUMNS = {
+    "template": "VARCHAR(50)",
+}
+
+# JSON columns stored with the CompressedJSON codec (models/types.py)
+COMPRESSED_JSON_COLUMNS = {
+    "cvs": ["cv_structure"],
+    "cv_analysis_history": [
+        "weaknesses", "recommendations", "section_completeness", "skill_matches",
+        "missing_skills", "experience_analysis", "overall_grade", "recommended_courses",
+    ],
+}
+
+
+def _missing_columns(sync_conn, table_name: str, columns: dict) -> list:
+    existing = {column["name"] for column in inspect(sync_conn).get_columns(table_name)}
+    return [name for name in columns if name not in existing]
+
+
+async def add_missing_columns(conn, table_name: str, columns: dict) -> list:
+    """
+    Add any of the given columns that the table does not have yet. Types are
+    SQL strings, or SQLAlchemy types where the name differs between databases.
+    """
+    missing = await conn.run_sync(_missing_columns, table_name, columns)
+    for column_name in missing:
+        column_type = columns[column_name]
+        if not isinstance(column_type, str):
+            column_type = column_type.compile(dialect=conn.dialect)
+        await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+    return missing
+
+
+def _non_binary_columns(sync_conn, table_name: str, columns: list) -> list:
+    existing = {column["name"]: column["type"] for column in inspect(sync_conn).get_columns(table_name)}
+    pending = []
+    for name in columns:
+        if name not in existing:
+            continue
+        try:
+            is_binary = existing[name].python_type is bytes
+        except NotImplementedError:
+            is_binary = False
+        if not is_binary:
+            pending.append(name)
+    return pending
+
+
+async def convert_json_columns_to_binary(conn, table_name: str, columns: list) -> list:
+    """
+    Change legacy JSON columns to a binary type so they can hold codec output.
+    Returns the columns whose rows need re-encoding. SQLite is dynamically
+    typed, so nothing is altered there; the columns returned are those with
+    rows still holding JSON text.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        pending = []
+        for column_name in columns:
+            result = await conn.execute(text(
+                f"SELECT 1 FROM {table_name} WHERE typeof({column_name}) = 'text' LIMIT 1"
+            ))
+            if result.first() is not None:
+                pending.append(column_name)
+        return pending
+
+    pending = await conn.run_sync(_non_binary_columns, table_name, columns)
+    for column_name in pending:
+        if dialect == "postgresql":
+            await conn.execute(text(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE BYTEA "
+                f"USING convert_to({column_name}::text, 'UTF8')"
+            ))
+        elif dialect == "mysql":
+            await conn.execute(text(f"ALTER TABLE {table_name} MODIFY COLUMN {column_name} LONGBLOB"))
+    return pending
+
+
+async def reencode_json_columns(conn, table_name: str, columns: list, batch_size: int = 200) -> dict:
+    """
+    Rewrite rows that still hold plain JSON into the compact codec format.
+    Returns row count and stored bytes before/after for reporting.
+    """
+    target = table(table_name, column("id"), *[column(name, LargeBinary) for name in columns])
+    stats = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = 0
+
+    while True:
+        result = await conn.execute(
+            select(target).where(target.c.id > last_id).order_by(target.c.id).limit(batch_size)
+        )
+        rows = result.fetchall()
+        if not rows:
+            break
+
+        for row in rows:
+            last_id = row.id
+            values = {}
+            for name in columns:
+                raw = getattr(row, name)
+                if raw is None:
+                    continue
+                if isinstance(raw, memoryview):
+                    raw = raw.tobytes()
+                if isinstance(raw, str):
+                    raw = raw.encode("utf-8")
+                if is_encoded(raw):
+                    continue
+                encoded = encode_json(decode_json(raw))
+                stats["bytes_before"] += len(raw)
+                stats["bytes_after"] += len(encoded)
+                values[name] = encoded
+
+            if values:
+                await conn.execute(update(target).where(target.c.id == row.id).values(**values))
+                stats["rows"] += 1
+
+    return stats
+
+
+async def backfill_cv_summaries(session, batch_size: int = 200) -> int:
+    """Populate the summary columns of CVs written before they existed"""
+    from models.user import CV
+    from utils.cv_structure import summarize_cv_structure
+
+    total = 0
+    while True:
+        result = await session.execute(
+            select(CV)
+            .options(undefer(CV.cv_structure))
+            .where(CV.has_structure.is_(None))
+            .limit(batch_size)
+        )
+        cvs = result.scalars().all()
+        if not cvs:
+            break
+
+        now = datetime.utcnow()
+        for cv in cvs:
+            summary = summarize_cv_structure(cv.cv_structure)
+            cv.has_structure = summary["has_structure"]
+            cv.name = summary["name"]
+            cv.section_counts = summary["section_counts"]
+            cv.completeness_score = summary["completeness_score"]
+            cv.created_at = cv.created_at or now
+            cv.updated_at = cv.updated_at or now
+
+        await session.commit()
+        total += len(cvs)
+
+    return total
+
+
+async def run_schema_upgrades():
+    """Apply all pending in-place upgrades. Safe to run on every startup."""
+    async with engine.begin() as conn:
+        added = await add_missing_columns(conn, "cvs", {
+            **CV_SUMMARY_COLUMNS, **CV_REVISION_COLUMNS, **CV_SCORE_COLUMNS, **CV_TEMPLATE_COLUMNS
+        })
+    if added:
+        print(f"✅ Added CV columns: {', '.join(added)}")
+
+    for table_name, columns in COMPRESSED_JSON_COLUMNS.items():
+        async with engine.begin() as conn:
+            converted = await convert_json_columns_to_binary(conn, table_name, columns)
+            if converted:
+                stats = await reencode_json_columns(conn, table_name, converted)
+                print(f"✅ Re-encoded {stats['rows']} {table_name} rows "
+                      f"({stats['bytes_before']} -> {stats['bytes_after']} bytes)")
+
+    async with AsyncSessionLocal() as session:
+        backfilled = await backfill_cv_summaries(session)
+    if backfilled:
+        print(f"✅ Backfilled summaries for {backfilled} CVs")
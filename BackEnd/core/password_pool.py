@@ -0,0 +1,102 @@
+"""
+Password hashing and verification off the event loop.
+
+bcrypt/argon2 spend tens to hundreds of milliseconds of CPU per call. Running
+them inline in an async handler stalls every other request on the worker, so
+they run on a small dedicated thread pool instead (both libraries release the
+GIL while hashing). The number of calls waiting for a thread is capped; past
+the cap new logins get a 503 instead of queueing without bound.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper, PasswordHelperProtocol
+
+from core.metrics import metrics
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64))
+
+password_ops = metrics.counter("password_hash_ops_total", "Password hash/verify calls by operation and outcome")
+password_in_flight = metrics.gauge("password_hash_in_flight", "Password operations queued or running")
+password_wait = metrics.histogram("password_hash_wait_seconds", "Time spent waiting for a hashing thread")
+password_duration = metrics.histogram("password_hash_duration_seconds", "Time spent hashing or verifying")
+
+
+class PasswordPoolFull(HTTPException):
+    """Raised when too many password operations are already waiting"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordPool:
+    """Bounded executor wrapping a fastapi-users password helper"""
+
+    def __init__(
+        self,
+        helper: Optional[PasswordHelperProtocol] = None,
+        workers: int = PASSWORD_HASH_WORKERS,
+        queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT,
+    ):
+        self.helper = helper or PasswordHelper()
+        self.workers = max(1, workers)
+        self.queue_limit = queue_limit
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def _run(self, op: str, func, *args):
+        if self._in_flight >= self.workers + self.queue_limit:
+            password_ops.inc(op=op, outcome="rejected")
+            raise PasswordPoolFull()
+
+        self._in_flight += 1
+        password_in_flight.inc()
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            password_wait.observe(started - submitted, op=op)
+            try:
+                return func(*args)
+            finally:
+                password_duration.observe(time.perf_counter() - started, op=op)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+            password_ops.inc(op=op, outcome="ok")
+            return result
+        except Exception:
+            password_ops.inc(op=op, outcome="error")
+            raise
+        finally:
+            self._in_flight -= 1
+            password_in_flight.dec()
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.helper.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run("verify", self.helper.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_pool = PasswordPool()
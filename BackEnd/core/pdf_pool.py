@@ -0,0 +1,85 @@
+"""
+PDF parsing in worker processes.
+
+PyPDF2 is pure Python, so parsing holds the GIL: on the event loop it stalls
+every request, and on threads it cannot use more than one core. Batch
+ingestion (services/batch_ingestion_service.py) parses on a process pool
+instead, so its throughput grows with PDF_PARSE_WORKERS. The pool starts on
+first use.
+
+A worker that dies (killed for memory on a hostile PDF, say) breaks the
+whole pool and fails every file queued on it. The pool is replaced and each
+of those files is parsed again on a process of its own, so only the file
+that kills its process fails.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from core.metrics import metrics
+from utils.pdf_text import parse_cv_pdf_file
+
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", os.cpu_count() or 1))
+
+pdf_parse_duration = metrics.histogram("pdf_parse_duration_seconds", "Time from submitting a PDF to its parsed text")
+pdf_parse_total = metrics.counter("pdf_parse_total", "PDFs parsed in worker processes by outcome")
+
+
+class PDFParsePool:
+    """Lazily started process pool running utils/pdf_text.parse_cv_pdf_file"""
+
+    def __init__(self, workers: int = PDF_PARSE_WORKERS):
+        self.workers = max(1, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Bounds the single-file processes of files retried after a crash
+        self._isolated = asyncio.Semaphore(self.workers)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def parse(self, path: str) -> Dict[str, Any]:
+        """parse_cv_pdf_file(path) in a worker; a crashed worker restarts the pool"""
+        started = time.perf_counter()
+        executor = self.executor
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, parse_cv_pdf_file, path)
+        except BrokenProcessPool:
+            # This file may only have been queued behind the one that crashed: retry it alone
+            self._replace(executor)
+            result = await self._parse_isolated(path)
+            if result is None:
+                pdf_parse_total.inc(outcome="crashed")
+                return {"error": "PDF could not be parsed"}
+        pdf_parse_duration.observe(time.perf_counter() - started)
+        pdf_parse_total.inc(outcome="error" if "error" in result else "ok")
+        return result
+
+    def _replace(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool, unless another caller already started a new one"""
+        if self._executor is executor:
+            self.shutdown()
+
+    async def _parse_isolated(self, path: str) -> Optional[Dict[str, Any]]:
+        """parse_cv_pdf_file(path) in a process of its own; None if that process dies too"""
+        async with self._isolated:
+            executor = ProcessPoolExecutor(max_workers=1)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, parse_cv_pdf_file, path)
+            except BrokenProcessPool:
+                return None
+            finally:
+                executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pdf_pool = PDFParsePool()
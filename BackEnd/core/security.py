@@ -1,12 +1,20 @@
 import os
 import uuid
-from fastapi import Depends, Request, HTTPException, status
-from fastapi_users import FastAPIUsers, BaseUserManager, UUIDIDMixin
+from typing import Optional
+from fastapi import Depends, Request, HTTPException, WebSocket, status
+import jwt
+from fastapi_users import FastAPIUsers, BaseUserManager, UUIDIDMixin, exceptions
 from fastapi_users.authentication import CookieTransport, BearerTransport, AuthenticationBackend, JWTStrategy
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy.orm import make_transient_to_detached
 # Update the import path for SQLAlchemyUserDatabase
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from models.user import User
 from models.user import get_user_db
+from core.database import AsyncSessionLocal
+from core.user_cache import user_cache, invalidate_user
+from core.password_pool import password_pool
+from core.config import settings
 import dotenv
 
 dotenv.load_dotenv()
@@ -41,8 +49,40 @@ cookie_transport = CookieTransport(
 # Bearer transport for cross-domain production usage
 bearer_transport = BearerTransport(tokenUrl="auth/bearer/login")
 
+class CachingJWTStrategy(JWTStrategy):
+    """JWT strategy that serves recently resolved users from core.user_cache"""
+
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+
+        snapshot = user_cache.get(token)
+        if snapshot is not None:
+            # Detached (not transient) so a later session.add() updates instead of inserting
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return user
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+        except jwt.PyJWTError:
+            return None
+
+        try:
+            parsed_id = user_manager.parse_id(user_id)
+            user = await user_manager.get(parsed_id)
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+        user_cache.set(token, user, token_expires_at=data.get("exp"))
+        return user
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    return CachingJWTStrategy(secret=SECRET, lifetime_seconds=3600)
 
 # Cookie-based authentication backend (for development)
 cookie_auth_backend = AuthenticationBackend(
@@ -72,10 +112,11 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         except Exception:
             # Run the hasher to mitigate timing attack
             # Inspired from Django: https://code.djangoproject.com/ticket/20760
-            self.password_helper.hash(credentials.password)
+            await password_pool.hash(credentials.password)
             return None
 
-        verified, updated_password_hash = self.password_helper.verify_and_update(
+        # Hashing runs on the password pool so logins don't block the event loop
+        verified, updated_password_hash = await password_pool.verify_and_update(
             credentials.password, user.hashed_password
         )
         if not verified:
@@ -95,9 +136,54 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
 
         return user
 
+    async def create(self, user_create, safe: bool = False, request: Request | None = None) -> User:
+        """
+        Same as BaseUserManager.create, but hashes the password on the password pool
+        """
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_pool.hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def _update(self, user: User, update_dict: dict) -> User:
+        """Hash a new password on the password pool before the regular update"""
+        if update_dict.get("password") is not None:
+            update_dict = dict(update_dict)
+            password = update_dict.pop("password")
+            await self.validate_password(password, user)
+            update_dict["hashed_password"] = await password_pool.hash(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Request | None = None):
         print(f"User {user.id} has registered.")
 
+    async def on_after_update(self, user: User, update_dict: dict, request: Request | None = None):
+        invalidate_user(user.id)
+
+    async def on_after_delete(self, user: User, request: Request | None = None):
+        invalidate_user(user.id)
+
+    async def on_after_verify(self, user: User, request: Request | None = None):
+        invalidate_user(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Request | None = None):
+        invalidate_user(user.id)
+
     async def on_after_forgot_password(
         self, user: User, token: str, request: Request | None = None
     ):
@@ -131,6 +217,36 @@ fastapi_users = FastAPIUsers[User, uuid.UUID](
 # This remains the same
 current_active_user = fastapi_users.current_user(active=True)
 
+def websocket_origin_allowed(websocket: WebSocket) -> bool:
+    """
+    Whether a WebSocket handshake comes from one of the CORS origins. CORS
+    does not apply to WebSockets and the auth cookie is SameSite=None in
+    production, so without this any site could open one as a signed-in
+    visitor. Clients that are not browsers send no Origin and are let through
+    """
+    origin = websocket.headers.get("origin")
+    return origin is None or origin in settings.get_allowed_origins()
+
+
+async def websocket_user(websocket: WebSocket) -> Optional[User]:
+    """
+    The active user of a WebSocket handshake, or None. Browsers cannot set
+    headers on a WebSocket, so besides a bearer token the JWT is read from
+    the auth cookie (check websocket_origin_allowed() first)
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    else:
+        token = websocket.cookies.get(cookie_transport.cookie_name)
+    if not token:
+        return None
+    async with AsyncSessionLocal() as session:
+        user = await get_jwt_strategy().read_token(token, UserManager(SQLAlchemyUserDatabase(session, User)))
+    if user is None or not user.is_active:
+        return None
+    return user
+
 # Admin role dependency
 async def current_admin_user(user: User = Depends(current_active_user)) -> User:
     """Dependency to ensure the current user is an admin (role_id = 1)"""
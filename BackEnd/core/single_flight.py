@@ -0,0 +1,75 @@
+"""
+In-flight request coalescing ("single flight").
+
+Concurrent calls with the same key share one execution: the first caller
+starts the work as a task and later callers await the same task instead of
+repeating it. Nothing is cached; once the task finishes the key is free again.
+
+Cancellation: a caller that is cancelled stops waiting without affecting the
+others (the task is shielded). The task itself is cancelled only when every
+caller waiting on it has gone.
+"""
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict
+
+from core.metrics import metrics
+
+single_flight_calls = metrics.counter(
+    "single_flight_calls_total", "Coalescable calls by group, operation and role (leader / coalesced)"
+)
+single_flight_cancelled = metrics.counter(
+    "single_flight_cancelled_total", "Shared executions cancelled because every waiter went away"
+)
+single_flight_in_flight = metrics.gauge("single_flight_in_flight", "Distinct executions currently running")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: Dict[str, _Flight] = {}
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+            single_flight_in_flight.dec(group=self.group)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]], operation: str = "") -> Any:
+        """
+        Run `func` once for all concurrent callers using `key`. Every caller
+        gets its own deep copy of the result, so callers may mutate it freely.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            single_flight_in_flight.inc(group=self.group)
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            role = "leader"
+        else:
+            role = "coalesced"
+        single_flight_calls.inc(group=self.group, operation=operation, role=role)
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last interested caller left: stop the work and free the key
+                # now so a new caller starts fresh instead of joining a dying task
+                self._forget(key, flight)
+                flight.task.cancel()
+                single_flight_cancelled.inc(group=self.group, operation=operation)
+        return copy.deepcopy(result)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
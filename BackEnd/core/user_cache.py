@@ -0,0 +1,111 @@
+"""
+Short-lived, bounded cache of authenticated users keyed by JWT.
+
+Resolving the current user otherwise costs a SELECT on the user table for
+every authenticated request. Entries hold a plain snapshot of the user's
+columns and expire after USER_CACHE_TTL_SECONDS (or when the token does,
+whichever comes first). Code that changes a user must call invalidate_user().
+
+The cache is per process: with several workers, a change made through one
+worker is seen by the others once their entries expire.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+
+# Columns copied into a snapshot; everything a route reads from the current user
+SNAPSHOT_FIELDS = ("id", "email", "is_active", "is_superuser", "is_verified", "role_id")
+
+
+class UserSnapshotCache:
+    """LRU map of token -> (expires_at, user snapshot) with per-user invalidation"""
+
+    def __init__(self, ttl_seconds: float = USER_CACHE_TTL_SECONDS, max_size: int = USER_CACHE_MAX_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[uuid.UUID, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached snapshot for a token, or None if missing/expired"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return snapshot
+
+    def set(self, token: str, user: Any, token_expires_at: Optional[float] = None) -> None:
+        """
+        Cache a user for a token. token_expires_at is the JWT "exp" claim
+        (epoch seconds), so an entry never outlives its token.
+        """
+        if not self.enabled:
+            return
+        snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + (token_expires_at - time.time()))
+
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (expires_at, snapshot)
+            self._tokens_by_user.setdefault(snapshot["id"], set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Drop every cached token of a user (after an update or delete)"""
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1]["id"]
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_cache = UserSnapshotCache()
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    """Forget cached authentication results for a user"""
+    user_cache.invalidate_user(user_id)
@@ -0,0 +1,40 @@
+"""
+Re-encode stored CV structures and analysis results into the compact
+JSON storage codec (models/types.py), converting column types first
+where the database requires it.
+"""
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import engine
+from core.migrations import (
+    COMPRESSED_JSON_COLUMNS, convert_json_columns_to_binary, reencode_json_columns
+)
+
+
+async def migrate_json_storage():
+    """Convert and re-encode every codec-backed JSON column"""
+    try:
+        for table_name, columns in COMPRESSED_JSON_COLUMNS.items():
+            async with engine.begin() as conn:
+                converted = await convert_json_columns_to_binary(conn, table_name, columns)
+                # SQLite columns are not altered, only reported for re-encoding
+                if converted and conn.dialect.name != "sqlite":
+                    print(f"✅ Converted {table_name} columns to binary: {', '.join(converted)}")
+                stats = await reencode_json_columns(conn, table_name, columns)
+
+            saved = stats["bytes_before"] - stats["bytes_after"]
+            ratio = (stats["bytes_after"] / stats["bytes_before"]) if stats["bytes_before"] else 1.0
+            print(f"✅ {table_name}: re-encoded {stats['rows']} rows, "
+                  f"{stats['bytes_before']} -> {stats['bytes_after']} bytes "
+                  f"(saved {saved} bytes, ratio {ratio:.2f})")
+    except Exception as e:
+        print(f"❌ Error migrating JSON storage: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_json_storage())
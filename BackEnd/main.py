@@ -1,8 +1,9 @@
+import asyncio
 import os
 from core.app import app
 from schemas.user import UserRead, UserCreate, UserUpdate
 from core.database import Base, engine
-from routes import base_routes, pdf_routes, cv_routes, health_routes, subscription_routes, admin_routes, setup_routes, auth_debug_routes
+from routes import base_routes, pdf_routes, cv_routes, health_routes, subscription_routes, admin_routes, setup_routes, auth_debug_routes, ingestion_routes, preview_routes
 from core.security import cookie_auth_backend, bearer_auth_backend, fastapi_users
 
 @app.on_event("startup")
@@ -15,6 +16,9 @@ async def on_startup():
             await conn.run_sync(Base.metadata.create_all)
         print("✅ Database tables verified/created")
 
+        from core.migrations import run_schema_upgrades
+        await run_schema_upgrades()
+
         try:
             from fresh_deploy_init import initialize_fresh_deployment
             await initialize_fresh_deployment()
@@ -27,11 +31,21 @@ async def on_startup():
         print(f"⚠️ Database setup warning: {e}")
         print("ℹ️ Application will continue, check /health endpoint")
 
+    # Precompile the LaTeX template formats off the event loop (no-op without pdflatex)
+    from core.latex_formats import latex_formats
+    asyncio.get_running_loop().run_in_executor(None, latex_formats.build_all)
+
+    # Keep output_tex_files bounded: expired and over-cap CV artifacts are swept periodically
+    from core.artifacts import artifact_store
+    app.state.artifact_gc = asyncio.create_task(artifact_store.run_periodic_gc())
+
     print("🎉 Application startup completed!")
 
 app.include_router(base_routes.router)
 app.include_router(pdf_routes.router)
 app.include_router(cv_routes.router)
+app.include_router(ingestion_routes.router)
+app.include_router(preview_routes.router)
 app.include_router(health_routes.router)
 app.include_router(subscription_routes.router)
 app.include_router(admin_routes.router)
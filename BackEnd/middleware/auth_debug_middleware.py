@@ -1,103 +1,110 @@
 """
 Authentication debugging middleware to help track authentication issues
 """
+import json
+import logging
 import os
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+import random
+from typing import Optional
 
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class AuthDebugMiddleware(BaseHTTPMiddleware):
+logger = logging.getLogger("auth_debug")
+
+
+def _configure_logger():
+    """Send events to stderr unless the app configured this logger itself"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+
+def _mask(value: str, keep: int) -> str:
+    return value[:keep] + "..." if len(value) > keep else value
+
+
+class AuthDebugMiddleware:
     """Middleware to debug authentication issues"""
-    
-    def __init__(self, app, debug_enabled: bool = None):
-        super().__init__(app)
-        # Enable debug in development or when explicitly requested
+
+    # Skip logging for these paths
+    SKIP_PATHS = (
+        "/health",
+        "/docs",
+        "/openapi.json",
+        "/favicon.ico",
+        "/static/",
+        "/_next/",
+        "/pdf/",  # PDF serving endpoints
+    )
+
+    def __init__(self, app: ASGIApp, debug_enabled: bool = None, sample_rate: Optional[float] = None):
+        self.app = app
+        # Enable debug only when explicitly requested or the environment says development
         self.debug_enabled = debug_enabled if debug_enabled is not None else (
-            os.getenv("ENVIRONMENT", "development") == "development" or
+            os.getenv("ENVIRONMENT") == "development" or
             os.getenv("AUTH_DEBUG", "false").lower() == "true"
         )
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if not self.debug_enabled:
-            return await call_next(request)
-        
-        # Log authentication-related information
-        path = request.url.path
-        method = request.method
-        
-        # Only log for protected endpoints (skip static files, health checks, etc.)
-        if self._should_log_request(path):
-            print(f"🔍 [AUTH_DEBUG] {method} {path}")
-            
-            # Log headers related to authentication
-            auth_header = request.headers.get("authorization")
-            if auth_header:
-                # Mask the token for security
-                if auth_header.startswith("Bearer "):
-                    token_preview = auth_header[:20] + "..." if len(auth_header) > 20 else auth_header
-                    print(f"   - Authorization header: {token_preview}")
-                else:
-                    print(f"   - Authorization header: {auth_header}")
-            else:
-                print(f"   - No Authorization header")
-            
-            # Log cookies
-            cookies = request.cookies
-            if cookies:
-                auth_cookies = {k: v for k, v in cookies.items() if 'auth' in k.lower() or 'cvapp' in k.lower()}
-                if auth_cookies:
-                    # Mask cookie values for security
-                    masked_cookies = {k: v[:10] + "..." if len(v) > 10 else v for k, v in auth_cookies.items()}
-                    print(f"   - Auth cookies: {masked_cookies}")
-                else:
-                    print(f"   - No auth-related cookies found")
-            else:
-                print(f"   - No cookies")
-            
-            # Log origin and referer
-            origin = request.headers.get("origin")
-            referer = request.headers.get("referer")
-            if origin:
-                print(f"   - Origin: {origin}")
-            if referer:
-                print(f"   - Referer: {referer}")
-        
-        # Process the request
-        response = await call_next(request)
-        
-        # Log response status for protected endpoints
-        if self._should_log_request(path) and response.status_code in [401, 403]:
-            print(f"🚨 [AUTH_DEBUG] {method} {path} -> {response.status_code}")
-        
-        return response
-    
+        # Fraction of requests whose auth details are logged; 401/403 are always logged
+        self.sample_rate = sample_rate if sample_rate is not None else float(
+            os.getenv("AUTH_DEBUG_SAMPLE_RATE", "0.1")
+        )
+        if self.debug_enabled:
+            _configure_logger()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.debug_enabled or scope["type"] != "http" or not self._should_log_request(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        event = None
+
+        if sampled or logger.isEnabledFor(logging.DEBUG):
+            event = self._describe_request(scope)
+            logger.info(json.dumps({"event": "request", **event}))
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] in (401, 403):
+                # Log denied requests in full, even when they were not sampled
+                details = event or self._describe_request(scope)
+                logger.warning(json.dumps({"event": "denied", "status": message["status"], **details}))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _describe_request(self, scope: Scope) -> dict:
+        """Authentication-related request details, with secrets masked"""
+        headers = Headers(scope=scope)
+        details = {"method": scope["method"], "path": scope["path"]}
+
+        auth_header = headers.get("authorization")
+        if auth_header:
+            # Mask the token for security
+            details["authorization"] = _mask(auth_header, 20) if auth_header.startswith("Bearer ") else auth_header
+
+        cookie_header = headers.get("cookie")
+        if cookie_header:
+            cookies = cookie_parser(cookie_header)
+            auth_cookies = {k: _mask(v, 10) for k, v in cookies.items() if 'auth' in k.lower() or 'cvapp' in k.lower()}
+            details["auth_cookies"] = auth_cookies
+
+        # Origin and referer
+        for name in ("origin", "referer"):
+            if headers.get(name):
+                details[name] = headers.get(name)
+
+        return details
+
     def _should_log_request(self, path: str) -> bool:
         """Determine if we should log this request"""
-        # Skip logging for these paths
-        skip_paths = [
-            "/health",
-            "/docs",
-            "/openapi.json",
-            "/favicon.ico",
-            "/static/",
-            "/_next/",
-            "/pdf/",  # PDF serving endpoints
-        ]
-        
-        # Skip auth endpoints (they're expected to work)
-        auth_paths = [
-            "/auth/",
-            "/users/me",  # This is actually protected, so we want to log it
-        ]
-        
         # Don't skip /users/me as it's a protected endpoint we want to debug
         if path == "/users/me":
             return True
-        
-        for skip_path in skip_paths:
-            if path.startswith(skip_path):
-                return False
-        
-        # Log protected endpoints and auth endpoints
-        return True
+
+        return not path.startswith(self.SKIP_PATHS)
@@ -1,36 +1,89 @@
-from fastapi import Request, HTTPException
+from typing import Dict, Optional
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from core.config import settings
 
 
+class RequestBodyTooLarge(Exception):
+    """Raised from receive() once a request body passes the upload limit"""
 
-class UploadSizeMiddleware(BaseHTTPMiddleware):
-    """Middleware to enforce upload size limits"""
-    
-    def __init__(self, app, max_size: int = None):
-        super().__init__(app)
+
+class UploadSizeMiddleware:
+    """
+    Middleware to enforce upload size limits.
+
+    Content-Length is checked up front, and the body is also counted as it
+    streams in, so chunked uploads (no Content-Length) are cut off at the limit
+    instead of being spooled in full. `path_limits` maps path prefixes to
+    their own limit (e.g. batch uploads).
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = None, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
         self.max_size = max_size or settings.MAX_UPLOAD_SIZE
-    
-    async def dispatch(self, request: Request, call_next):
+        self.path_limits = path_limits or {}
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits.items():
+            if path.startswith(prefix):
+                return limit
+        return self.max_size
+
+    def _too_large_response(self, max_size: int) -> JSONResponse:
+        size_mb = max_size // (1024 * 1024)
+        formatted = f"{size_mb // 1024}GB" if size_mb >= 1024 else f"{size_mb}MB"
+        return JSONResponse(
+            status_code=413,
+            content={
+                "detail": f"Request entity too large. Maximum allowed size is {formatted}",
+                "max_size_bytes": max_size,
+                "max_size_formatted": formatted
+            }
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Check if this is a file upload request
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_length = request.headers.get("content-length")
-            
-            if content_length:
-                content_length = int(content_length)
-                
-                if content_length > self.max_size:
-                    return JSONResponse(
-                        status_code=413,
-                        content={
-                            "detail": f"Request entity too large. Maximum allowed size is {settings.get_max_upload_size_formatted()}",
-                            "max_size_bytes": self.max_size,
-                            "max_size_formatted": settings.get_max_upload_size_formatted()
-                        }
-                    )
-        
-        response = await call_next(request)
-        return response
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self._limit_for(scope["path"])
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_size:
+            await self._too_large_response(max_size)(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def receive_limited() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    exceeded = True
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def send_checked(message: Message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                # Drop whatever error response the app built from the aborted read
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
+        try:
+            await self.app(scope, receive_limited, send_checked)
+        except RequestBodyTooLarge:
+            pass
+        except Exception:
+            if not exceeded:
+                raise
 
+        if exceeded and not response_started:
+            await self._too_large_response(max_size)(scope, receive, send)
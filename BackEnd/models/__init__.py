@@ -1,14 +1,16 @@
 """Models package for the CV application"""
 
-from .user import User, CV, get_user_db
+from .user import User, CV, CVRevision, get_user_db
 from .role import Role
 from .subscription import (
     SubscriptionTier, AnalysisType, SubscriptionPlan,
     UserSubscription, UsageTracking, CVAnalysisHistory
 )
+from .ingestion import IngestionJob, IngestionFile
 
 __all__ = [
-    "User", "CV", "Role", "get_user_db",
+    "User", "CV", "CVRevision", "Role", "get_user_db",
     "SubscriptionTier", "AnalysisType", "SubscriptionPlan",
-    "UserSubscription", "UsageTracking", "CVAnalysisHistory"
+    "UserSubscription", "UsageTracking", "CVAnalysisHistory",
+    "IngestionJob", "IngestionFile"
 ]
@@ -0,0 +1,62 @@
+"""
+Batch CV ingestion jobs (services/batch_ingestion_service.py)
+"""
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import String, ForeignKey, Integer, DateTime, Text, Uuid
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from core.database import Base
+
+# IngestionJob.status
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# IngestionFile.status
+FILE_QUEUED = "queued"
+FILE_STORED = "stored"
+FILE_FAILED = "failed"
+FILE_SKIPPED = "skipped"  # not processed: usage limit reached
+
+
+class IngestionJob(Base):
+    """One uploaded batch of CVs and its progress"""
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(16), default=JOB_QUEUED, nullable=False)
+
+    total_files: Mapped[int] = mapped_column(Integer, default=0)
+    stored_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    skipped_count: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    files: Mapped[List["IngestionFile"]] = relationship(
+        back_populates="job", cascade="all, delete-orphan", order_by="IngestionFile.position"
+    )
+
+
+class IngestionFile(Base):
+    """Status of one file of an ingestion job"""
+    __tablename__ = "ingestion_files"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("ingestion_jobs.id", ondelete="CASCADE"), index=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default=FILE_QUEUED, nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    file_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    page_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    cv_id: Mapped[Optional[int]] = mapped_column(ForeignKey("cvs.id", ondelete="SET NULL"), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    job: Mapped["IngestionJob"] = relationship(back_populates="files")
@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any, List
 from sqlalchemy import String, Boolean, ForeignKey, Integer, JSON, DateTime, Date, Text, Enum as SQLEnum, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.database import Base
+from models.types import CompressedJSON
 import enum
 
 
@@ -115,19 +116,19 @@ class CVAnalysisHistory(Base):
     analysis_version: Mapped[str] = mapped_column(String(50), default="1.0")
     
     # CV analysis results
-    weaknesses: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
-    recommendations: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
-    section_completeness: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    weaknesses: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
+    recommendations: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
+    section_completeness: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
     
     # Job matching results (if applicable)
     job_description_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # For caching
-    skill_matches: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
-    missing_skills: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
-    experience_analysis: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
-    overall_grade: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    skill_matches: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
+    missing_skills: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
+    experience_analysis: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
+    overall_grade: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
     
     # Course recommendations
-    recommended_courses: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    recommended_courses: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
@@ -0,0 +1,108 @@
+"""
+Compact, optionally compressed storage codec for large JSON columns
+"""
+import json
+import os
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+try:  # zstd is optional; zlib is always available
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the deployment image
+    zstandard = None
+
+
+# Encoded layout: MAGIC + format version + codec id + payload
+MAGIC = b"CJ"
+FORMAT_VERSION = 1
+
+CODEC_RAW = b"r"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+# Payloads smaller than this are stored uncompressed
+COMPRESSION_THRESHOLD = int(os.getenv("JSON_COMPRESSION_THRESHOLD", 512))
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+
+def dumps_compact(value: Any) -> bytes:
+    """Serialize to compact JSON (no whitespace, UTF-8, key order preserved)"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_json(value: Any, threshold: Optional[int] = None) -> bytes:
+    """Encode a JSON value into the versioned storage format"""
+    payload = dumps_compact(value)
+    limit = COMPRESSION_THRESHOLD if threshold is None else threshold
+
+    codec = CODEC_RAW
+    if len(payload) >= limit:
+        if zstandard is not None:
+            compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+            candidate = CODEC_ZSTD
+        else:
+            compressed = zlib.compress(payload, ZLIB_LEVEL)
+            candidate = CODEC_ZLIB
+        if len(compressed) < len(payload):
+            payload, codec = compressed, candidate
+
+    return MAGIC + bytes([FORMAT_VERSION]) + codec + payload
+
+
+def decode_json(data: Any) -> Any:
+    """
+    Decode a stored value. Rows written before the codec existed (plain JSON
+    text, or values already decoded by the driver) are returned as-is.
+    """
+    if data is None:
+        return None
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if isinstance(data, (dict, list)):
+        return data
+    if isinstance(data, str):
+        return json.loads(data)
+
+    data = bytes(data)
+    if not is_encoded(data):
+        return json.loads(data.decode("utf-8"))
+
+    version = data[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported JSON storage format version: {version}")
+
+    codec = data[3:4]
+    payload = data[4:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this value")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Unknown JSON storage codec: {codec!r}")
+
+    return json.loads(payload)
+
+
+def is_encoded(data: bytes) -> bool:
+    """True if the value already uses the storage format"""
+    return len(data) >= 4 and data[:2] == MAGIC
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as compact, optionally compressed, versioned bytes"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_json(value)
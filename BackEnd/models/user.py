@@ -2,11 +2,16 @@
 User and CV models
 """
 import uuid
+from datetime import datetime
 from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Integer, JSON
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import String, ForeignKey, Integer, JSON, Boolean, DateTime, LargeBinary, UniqueConstraint
 from core.database import Base
+from models.types import CompressedJSON
+from utils.cv_embedding import embed_cv, encode_embedding
+from utils.cv_structure import summarize_cv_structure
 
 if TYPE_CHECKING:
     from .role import Role
@@ -32,10 +37,65 @@ class CV(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     file_url: Mapped[str] = mapped_column(String(255), nullable=False)
-    cv_structure: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Deferred: only loaded when a single CV is opened for editing
+    cv_structure: Mapped[Optional[Dict[str, Any]]] = mapped_column(CompressedJSON, nullable=True, deferred=True)
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
     owner: Mapped["User"] = relationship(back_populates="cvs")
 
+    # Denormalized summary of cv_structure, maintained by set_structure()
+    has_structure: Mapped[bool] = mapped_column(Boolean, default=False)
+    name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    section_counts: Mapped[Optional[Dict[str, int]]] = mapped_column(JSON, nullable=True)
+    # 0-100 from the deterministic rules in utils/cv_rules.py
+    completeness_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Hashed float32 vector for similarity search (utils/cv_embedding.py, core/cv_index.py)
+    embedding: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # LaTeX template the PDF was last rendered with (utils/latex_templates.py); None = the default
+    template: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+    # Latest entry in cv_revisions (0 = no history recorded yet)
+    revision: Mapped[int] = mapped_column(Integer, default=0)
+    # Deleting a CV leaves its revisions to the database (ON DELETE CASCADE) instead of loading them
+    revisions: Mapped[List["CVRevision"]] = relationship(
+        back_populates="cv", cascade="all, delete-orphan", passive_deletes=True, order_by="CVRevision.revision"
+    )
+
+    def set_structure(self, cv_structure: Optional[Dict[str, Any]]) -> None:
+        """Store a new CV structure and refresh the listing summary columns."""
+        summary = summarize_cv_structure(cv_structure)
+        self.cv_structure = cv_structure
+        # The structure is usually edited in place, so force the JSON column dirty
+        flag_modified(self, "cv_structure")
+        self.has_structure = summary["has_structure"]
+        self.name = summary["name"]
+        self.section_counts = summary["section_counts"]
+        self.completeness_score = summary["completeness_score"]
+        self.embedding = encode_embedding(embed_cv(cv_structure))
+        self.updated_at = datetime.utcnow()
+
+
+class CVRevision(Base):
+    """
+    One saved version of a CV structure. Every SNAPSHOT_INTERVAL-th revision
+    stores the full document; the ones in between store a JSON patch against
+    the previous revision.
+    """
+    __tablename__ = "cv_revisions"
+    __table_args__ = (UniqueConstraint("cv_id", "revision", name="uq_cv_revision"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    cv_id: Mapped[int] = mapped_column(ForeignKey("cvs.id", ondelete="CASCADE"), index=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)  # "snapshot" or "patch"
+    data: Mapped[Any] = mapped_column(CompressedJSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    cv: Mapped["CV"] = relationship(back_populates="revisions")
+
 
 # Database dependency function
 from fastapi import Depends
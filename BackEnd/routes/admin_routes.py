@@ -8,12 +8,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_async_db
 from core.security import current_admin_user
+from core.metrics import metrics
+from core.llm_governor import llm_governor
 from models.user import User
 from services.admin_service import get_admin_service
+from services.cv_search_service import get_cv_search_service
 from schemas.admin import (
     DashboardMetrics, AdminUserRead, UserUpdateAdmin, BulkUserAction,
     UserSearchFilter, PaginatedUsersResponse, AdminAnalyticsOverview,
-    CVSearchFilter, PaginatedCVsResponse, AdminCVRead,
+    CVSearchFilter, PaginatedCVsResponse, AdminCVRead, CVSimilaritySearch,
     SubscriptionSearchFilter, PaginatedSubscriptionsResponse, AdminSubscriptionRead,
     SubscriptionUpdateAdmin, SubscriptionPlanCreate, SubscriptionPlanUpdate,
     SubscriptionPlanRead, PlanUsageStats
@@ -199,6 +202,40 @@ async def delete_cv(
     return {"message": "CV deleted successfully"}
 
 
+@router.post("/cvs/rescore")
+async def rescore_cvs(
+    only_missing: bool = Query(False, description="Only score CVs without a completeness score"),
+    admin_user: User = Depends(current_admin_user),
+    admin_service = Depends(get_admin_service)
+):
+    """Recompute the rule-based completeness score and similarity vector of stored CVs"""
+    return await admin_service.rescore_cvs(only_missing=only_missing)
+
+
+@router.post("/cvs/search")
+async def search_similar_cvs(
+    request: CVSimilaritySearch,
+    admin_user: User = Depends(current_admin_user),
+    search_service = Depends(get_cv_search_service)
+):
+    """Rank all stored CVs by similarity to a job description or to another CV"""
+    if request.cv_id is not None:
+        results = await search_service.similar_cvs(request.cv_id, request.top_k)
+        if results is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="CV not found or it has no similarity vector yet (run /admin/cvs/rescore)"
+            )
+    elif request.job_description and request.job_description.strip():
+        results = await search_service.rank_cvs(request.job_description, request.top_k)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a job_description or a cv_id"
+        )
+    return {"results": results}
+
+
 # Subscription Management Routes
 @router.get("/subscriptions", response_model=PaginatedSubscriptionsResponse)
 async def get_subscriptions(
@@ -383,3 +420,19 @@ async def admin_health_check(
         "admin_user": admin_user.email,
         "timestamp": "2024-01-01T00:00:00Z"  # TODO: Use actual timestamp
     }
+
+
+@router.get("/metrics")
+async def get_metrics(
+    admin_user: User = Depends(current_admin_user)
+):
+    """In-process counters, gauges and latency histograms for this worker"""
+    return metrics.snapshot()
+
+
+@router.get("/metrics/llm")
+async def get_llm_governor_state(
+    admin_user: User = Depends(current_admin_user)
+):
+    """Rate limits, circuit breakers and retry budget of the Gemini governor on this worker"""
+    return llm_governor.snapshot()
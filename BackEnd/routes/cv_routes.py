@@ -1,34 +1,50 @@
 import os
 import uuid
 from fastapi import APIRouter, HTTPException, File, UploadFile, Depends
-from pydantic import BaseModel
-from typing import Dict
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from utils.latex_prompt import get_latex_template
-from services.latex_service import convert_to_latex_service
+from services.latex_service import convert_to_latex_service, select_template, template_for_cv
 from core.app import gemini_service, cv_flows
+from core.artifacts import artifact_store
 from core.cloudinary_config import upload_file_to_cloudinary
 from core.security import current_active_user
-from models.user import User, CV  # Import from models package
+from core.llm_governor import llm_lane
+from core.cv_index import cv_index
+from models.user import User, CV, CVRevision  # Import from models package
 from core.database import get_async_db  # Import async session dependency
 from sqlalchemy.ext.asyncio import AsyncSession
-from services.subscription_service import SubscriptionService, get_subscription_service
+from services.subscription_service import SubscriptionService, get_subscription_service, job_analysis_history_fields
+from services.cv_revision_service import CVRevisionService, get_cv_revision_service
+from services.cv_search_service import CVSearchService, get_cv_search_service
+from services.job_match_service import JobMatchService, get_job_match_service
 from models.subscription import AnalysisType
+from utils.cv_rules import evaluate_cv_completeness
 from utils.file_validator import FileValidator
 from utils.error_handler import handle_file_upload_error, FileUploadError
 import hashlib
 
 router = APIRouter()
 
-LATEX_OUTPUT_DIR = "output_tex_files"
 
 class CompleteFlowRequest(BaseModel):
     flow_id: str
     additional_inputs: Dict[str, str]
+    template: Optional[str] = None  # LaTeX template name; default: the CV's own, else Harvard
 
 class JobDescriptionRequest(BaseModel):
     flow_id: str
     job_description: str
 
+class RankCVsRequest(BaseModel):
+    job_description: str
+    top_k: int = Field(10, ge=1, le=100)
+
+class RankJobDescriptionsRequest(BaseModel):
+    job_descriptions: List[str] = Field(..., min_length=1, max_length=500)
+    top_k: int = Field(10, ge=1, le=100)
+
+
 @router.post("/analyze-cv-weaknesses")
 async def analyze_cv_weaknesses(
     file: UploadFile = File(...),
@@ -67,9 +83,11 @@ async def analyze_cv_weaknesses(
                 "upgrade_required": True
             }
         )
+    llm_lane.set(await subscription_service.get_llm_lane(user.id))
     
     try:
-        pdf_content = await file.read()
+        await file.seek(0)
+        pdf_content = file.file  # Parsed straight from the spooled upload
         try:
             extracted_cv_data = await gemini_service.extract_pdf_text(pdf_content=pdf_content)
             print(f"[DEBUG] Extracted CV data type: {type(extracted_cv_data)}")
@@ -78,6 +96,8 @@ async def analyze_cv_weaknesses(
                 print(f"[DEBUG] Error in extracted CV data: {extracted_cv_data['error']}")
                 raise Exception(extracted_cv_data["error"])
 
+        except HTTPException:
+            raise
         except Exception as api_error:
             print(f"Error with Gemini API during extraction: {str(api_error)}")
             raise HTTPException(status_code=500, detail=f"Error extracting CV data: {str(api_error)}")
@@ -94,208 +114,26 @@ async def analyze_cv_weaknesses(
             cv_template = extracted_cv_data.get("cv_template", {})
             sections = cv_template.get("sections", {})
             
-            # Generate section-based analysis
-            section_analysis = {}
-            missing_sections = []
-            improvement_suggestions = []
-            
-            # Analyze the header (contact info)
+            # Deterministic section checks (utils/cv_rules.py)
+            completeness = evaluate_cv_completeness(extracted_cv_data)
+            section_analysis = completeness["section_analysis"]
+            missing_sections = completeness["missing_sections"]
+            improvement_suggestions = completeness["improvement_suggestions"]
+            completeness_score = completeness["score"]
+
             header = sections.get("header", {})
             contact_info = header.get("contact_info", {})
-            header_analysis = {
-                "is_complete": True,
-                "missing_fields": []
-            }
-            
-            # Check header fields
-            if not header.get("name") or header.get("name") == "Firstname Lastname":
-                header_analysis["is_complete"] = False
-                header_analysis["missing_fields"].append("name")
-            
-            # Check contact info fields
-            for field in ["email", "phone", "location"]:
-                field_data = contact_info.get(field, {})
-                if not field_data or not field_data.get("value"):
-                    header_analysis["is_complete"] = False
-                    header_analysis["missing_fields"].append(f"contact_info.{field}")
-            
-            if not header_analysis["is_complete"]:
-                missing_sections.append("Contact Information")
-                improvement_suggestions.append("Complete your contact information for better reachability")
-            
-            section_analysis["header"] = header_analysis
-            
-            # Analyze education section
-            education = sections.get("education", {})
-            education_items = education.get("items", [])
-            education_analysis = {
-                "is_complete": bool(education_items),
-                "item_count": len(education_items),
-                "missing_fields": []
-            }
-            
-            if not education_items:
-                missing_sections.append("Education")
-                improvement_suggestions.append("Add your educational background")
-            else:
-                # Check for incomplete education items
-                incomplete_items = 0
-                for item in education_items:
-                    if not item.get("institution") or not item.get("degree"):
-                        incomplete_items += 1
-                
-                if incomplete_items > 0:
-                    education_analysis["missing_fields"].append(f"{incomplete_items} education entries are incomplete")
-                    improvement_suggestions.append("Complete all education entries with institution, degree, and dates")
-            
-            section_analysis["education"] = education_analysis
-            
-            # Analyze experience section
-            experience = sections.get("experience", {})
-            experience_items = experience.get("items", [])
-            experience_analysis = {
-                "is_complete": bool(experience_items),
-                "item_count": len(experience_items),
-                "missing_fields": [],
-                "items_without_achievements": 0,
-            }
-            
-            if not experience_items:
-                missing_sections.append("Work Experience")
-                improvement_suggestions.append("Add your work experience to showcase your professional background")
-            else:
-                # Check for achievements and quantifiables
-                items_without_achievements = 0
-                items_without_quantifiables = 0
-                
-                for item in experience_items:
-                    achievements = item.get("achievements", [])
-                    
-                    if not achievements:
-                        items_without_achievements += 1
-                        continue
-                    
-                    # Check for quantifiable achievements (containing numbers)
-                    has_quantifiable = False
-                    for achievement in achievements:
-                        if any(char.isdigit() for char in achievement):
-                            has_quantifiable = True
-                            break
-                    
-                    if not has_quantifiable:
-                        items_without_quantifiables += 1
-                
-                experience_analysis["items_without_achievements"] = items_without_achievements
-                experience_analysis["items_without_quantifiables"] = items_without_quantifiables
-                
-                if items_without_achievements > 0:
-                    experience_analysis["missing_fields"].append(f"{items_without_achievements} jobs lack achievements")
-                    improvement_suggestions.append("Add achievements for all work experiences")
-                
-                if items_without_quantifiables > 0:
-                    improvement_suggestions.append("Add quantifiable metrics to your achievements (e.g., 'Increased sales by 20%')")
-            
-            section_analysis["experience"] = experience_analysis
-            
-            # Analyze skills section
-            skills = sections.get("skills", {})
-            skill_categories = skills.get("categories", [])
-            skills_analysis = {
-                "is_complete": bool(skill_categories),
-                "category_count": len(skill_categories),
-                "total_skills": sum(len(category.get("items", [])) for category in skill_categories),
-                "missing_categories": []
-            }
-            
-            if not skill_categories:
-                missing_sections.append("Skills")
-                improvement_suggestions.append("Add your technical and soft skills")
-            else:
-                # Check for common categories that might be missing
-                category_names = [category.get("name", "").lower() for category in skill_categories]
-                
-                common_categories = ["technical", "language", "soft skills", "tools"]
-                for category in common_categories:
-                    if not any(category in name for name in category_names):
-                        skills_analysis["missing_categories"].append(category)
-                
-                if skills_analysis["missing_categories"]:
-                    improvement_suggestions.append("Consider adding more skill categories: " + ", ".join(skills_analysis["missing_categories"]))
-                
-                if skills_analysis["total_skills"] < 5:
-                    improvement_suggestions.append("Add more specific skills to make your profile more attractive")
-            
-            section_analysis["skills"] = skills_analysis
-            
-            # Analyze projects section
-            projects = sections.get("projects", {})
-            project_items = projects.get("items", [])
-            projects_analysis = {
-                "is_complete": bool(project_items),
-                "item_count": len(project_items),
-                "items_without_contributions": 0
-            }
-            
-            if not project_items and not experience_items:
-                missing_sections.append("Projects")
-                improvement_suggestions.append("Add projects to showcase your practical skills")
-            elif project_items:
-                # Check for contributions
-                items_without_contributions = 0
-                for item in project_items:
-                    if not item.get("key_contributions", []):
-                        items_without_contributions += 1
-                
-                projects_analysis["items_without_contributions"] = items_without_contributions
-                
-                if items_without_contributions > 0:
-                    improvement_suggestions.append("Add specific contributions for each project")
-            
-            section_analysis["projects"] = projects_analysis
-            
-            # Languages are now integrated into Skills section, so we extract them from there
-            skills = sections.get("skills", {})
-            skill_categories = skills.get("categories", [])
-            language_fields = []
-
-            # Look for Languages category in skills
-            for category in skill_categories:
-                if isinstance(category, dict) and category.get("name", "").lower() == "languages":
-                    language_items = category.get("items", [])
-                    for i, item in enumerate(language_items):
-                        if isinstance(item, str):
-                            # Handle string format like "English (Fluent)"
-                            if "(" in item and ")" in item:
-                                parts = item.split("(")
-                                language_name = parts[0].strip()
-                                proficiency = parts[1].replace(")", "").strip()
-                            else:
-                                language_name = item.strip()
-                                proficiency = "Intermediate"
-                        elif isinstance(item, dict):
-                            # Handle dict format
-                            language_name = item.get("language", "") or item.get("name", "")
-                            proficiency = item.get("proficiency", "Intermediate")
-                        else:
-                            continue
-
-                        language_fields.append({
-                            "id": f"language_{i}",
-                            "language": language_name,
-                            "proficiency": proficiency
-                        })
-                    break
-
-            section_analysis["languages"] = {
-                "is_complete": bool(language_fields),
-                "item_count": len(language_fields)
-            }
+            education_items = sections.get("education", {}).get("items", [])
+            experience_items = sections.get("experience", {}).get("items", [])
+            skill_categories = sections.get("skills", {}).get("categories", [])
+            project_items = sections.get("projects", {}).get("items", [])
             
             # Generate detailed analysis using Gemini
             detailed_analysis = await gemini_service.generate_detailed_analysis(extracted_cv_data)
 
-            # Track usage for CV analysis
-            await subscription_service.increment_usage(user.id, "cv_analysis")
+            # Track usage for CV analysis; fallback content is not charged
+            if not gemini_service.is_fallback(detailed_analysis):
+                await subscription_service.increment_usage(user.id, "cv_analysis")
 
             # Extract analysis data for saving
             analysis_data = {}
@@ -473,6 +311,8 @@ async def analyze_cv_weaknesses(
                     }
                 })
             
+        except HTTPException:
+            raise
         except Exception as analysis_error:
             print(f"Error analyzing CV structure: {str(analysis_error)}")
             import traceback
@@ -481,6 +321,7 @@ async def analyze_cv_weaknesses(
             missing_sections = ["Could not analyze CV completely"]
             improvement_suggestions = ["Please review your CV manually and ensure all sections are complete"]
             section_analysis = {}
+            completeness_score = None
             editable_sections = [{
                 "id": "raw_input",
                 "name": "CV Contents",
@@ -530,7 +371,8 @@ async def analyze_cv_weaknesses(
                 "summary": "Your CV has been analyzed. Review the highlighted areas and edit as needed.",
                 "missing_sections": missing_sections,
                 "improvement_suggestions": improvement_suggestions,
-                "section_analysis": section_analysis
+                "section_analysis": section_analysis,
+                "completeness_score": completeness_score
             },
             "detailed_analysis": detailed_analysis,
             "editable_sections": editable_sections
@@ -551,7 +393,8 @@ async def complete_cv_flow(
     request: CompleteFlowRequest,
     user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_db),
-    subscription_service: SubscriptionService = Depends(get_subscription_service)
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+    revision_service: CVRevisionService = Depends(get_cv_revision_service)
 ):
     """
     Complete the CV flow with additional inputs and generate an enhanced CV.
@@ -565,6 +408,10 @@ async def complete_cv_flow(
         raise HTTPException(status_code=404, detail="Flow not found")
     
     try:
+        # Premium templates need a plan with custom templates
+        custom_templates = bool(request.template) and await subscription_service.has_custom_templates(user.id)
+        template = select_template(request.template, custom_templates)
+
         # Get the extracted text from the flow
         flow_data = cv_flows[flow_id]
         extracted_text = flow_data["extracted_text"]
@@ -847,7 +694,7 @@ async def complete_cv_flow(
         
         try:
             # Generate the LaTeX from the enhanced CV structure
-            latex_result = convert_to_latex_service(extracted_text)               
+            latex_result = convert_to_latex_service(extracted_text, template, save=False)
         except Exception as latex_error:
             print(f"[DEBUG] Error in LaTeX conversion: {str(latex_error)}")
             import traceback
@@ -859,26 +706,29 @@ async def complete_cv_flow(
         
         # Generate a unique filename for the LaTeX file
         tex_filename = f"Dang_Ngoc_Nam_{flow_id}.tex"
-        tex_path = os.path.join(LATEX_OUTPUT_DIR, tex_filename)
-        
-        # Write the LaTeX content to file
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(latex_result["latex"])
-        
-        from routes.pdf_routes import convert_tex_to_pdf
-        convert_tex_to_pdf(tex_filename)
-        pdf_filename = tex_filename.replace(".tex", ".pdf")
-        pdf_path = os.path.join(LATEX_OUTPUT_DIR, pdf_filename)
-        
-        # If PDF wasn't generated, raise an error
-        if not os.path.exists(pdf_path):
-            raise HTTPException(
-                status_code=500, 
-                detail="PDF generation failed. Please check your LaTeX template or try again."
-            )
-        
-        # Upload the PDF to Cloudinary
-        cloudinary_result = upload_file_to_cloudinary(pdf_path)
+        tex_path = artifact_store.create(tex_filename)
+        try:
+            # Write the LaTeX content to file
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(latex_result["latex"])
+
+            from routes.pdf_routes import convert_tex_to_pdf
+            convert_tex_to_pdf(tex_filename)
+            pdf_path = os.path.splitext(tex_path)[0] + ".pdf"
+
+            # If PDF wasn't generated, raise an error
+            if not os.path.exists(pdf_path):
+                raise HTTPException(
+                    status_code=500, 
+                    detail="PDF generation failed. Please check your LaTeX template or try again."
+                )
+
+            # Upload the PDF to Cloudinary
+            cloudinary_result = upload_file_to_cloudinary(pdf_path)
+        finally:
+            # The PDF is served from Cloudinary: nothing of the job is needed on disk
+            artifact_store.release(tex_path, keep=False)
+
         if not cloudinary_result["success"]:
             raise HTTPException(
                 status_code=500, 
@@ -889,11 +739,16 @@ async def complete_cv_flow(
         new_cv = CV(
             file_url=cloudinary_result["url"],
             user_id=user.id,
-            cv_structure=extracted_text  # Save the CV structure as JSON
+            template=template.name  # Edits without a template keep this one
         )
+        new_cv.set_structure(extracted_text)  # Save the CV structure as JSON plus its listing summary
         db.add(new_cv)
+        await db.flush()  # Assign the CV id before recording its first revision
+        await revision_service.record(new_cv, None, extracted_text)
+        embedding = new_cv.embedding
         await db.commit()
         await db.refresh(new_cv)
+        cv_index.upsert(new_cv.id, user.id, embedding)
 
         # Track usage for CV storage/download
         await subscription_service.increment_usage(user.id, "cv_download")
@@ -926,10 +781,13 @@ async def get_user_cvs(
     from sqlalchemy import select
     
     try:
-        # Query to get all CVs for the current user ordered by creation date (oldest first for proper numbering)
-        query = select(CV).where(CV.user_id == user.id).order_by(CV.id.asc())
+        # Only the summary columns are selected; cv_structure stays in the database
+        query = select(
+            CV.id, CV.file_url, CV.has_structure, CV.name,
+            CV.section_counts, CV.completeness_score, CV.created_at, CV.updated_at, CV.revision, CV.template
+        ).where(CV.user_id == user.id).order_by(CV.id.asc())
         result = await db.execute(query)
-        user_cvs = result.scalars().all()
+        user_cvs = result.all()
         
         # Convert to response format with user-specific CV numbers
         cvs_response = []
@@ -939,9 +797,14 @@ async def get_user_cvs(
                 "id": cv.id,  # Keep the global ID for backend operations
                 "user_cv_number": user_cv_number,  # Add user-specific CV number
                 "file_url": cv.file_url,
-                "has_structure": cv.cv_structure is not None,  # Flag to indicate if this CV can be re-edited
-                # Add created_at if you have that field
-                # "created_at": cv.created_at,
+                "has_structure": bool(cv.has_structure),  # Flag to indicate if this CV can be re-edited
+                "name": cv.name,
+                "section_counts": cv.section_counts,
+                "completeness_score": cv.completeness_score,
+                "created_at": cv.created_at,
+                "updated_at": cv.updated_at,
+                "revision": cv.revision or 0,
+                "template": cv.template,
             })
         
         # Return in reverse order (newest first) for display purposes
@@ -963,10 +826,11 @@ async def get_cv(
     Retrieve a specific CV by ID, including its structure for re-editing
     """
     from sqlalchemy import select
+    from sqlalchemy.orm import undefer
     
     try:
-        # Query to get the specific CV
-        query = select(CV).where(CV.id == cv_id, CV.user_id == user.id)
+        # Query to get the specific CV, loading the deferred structure in the same round trip
+        query = select(CV).options(undefer(CV.cv_structure)).where(CV.id == cv_id, CV.user_id == user.id)
         result = await db.execute(query)
         cv = result.scalars().first()
         
@@ -978,7 +842,9 @@ async def get_cv(
             "id": cv.id,
             "file_url": cv.file_url,
             "cv_structure": cv.cv_structure,
-            "can_edit": cv.cv_structure is not None
+            "can_edit": cv.cv_structure is not None,
+            "revision": cv.revision or 0,
+            "template": cv.template
         }
     except HTTPException:
         raise
@@ -994,27 +860,39 @@ async def update_cv(
     request: CompleteFlowRequest,
     user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_db),
-    subscription_service: SubscriptionService = Depends(get_subscription_service)
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+    revision_service: CVRevisionService = Depends(get_cv_revision_service)
 ):
     """
     Update a previously generated CV with new structure and regenerate the PDF
     """
     from sqlalchemy import select
+    from sqlalchemy.orm import undefer
+    import copy
     import json
     
     try:
         # Query to get the specific CV
-        query = select(CV).where(CV.id == cv_id, CV.user_id == user.id)
+        query = select(CV).options(undefer(CV.cv_structure)).where(CV.id == cv_id, CV.user_id == user.id)
         result = await db.execute(query)
         cv = result.scalars().first()
         
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found")
+
+        # Without a template in the request the CV keeps its own; premium ones need custom templates
+        custom_templates = (
+            bool(request.template or cv.template) and await subscription_service.has_custom_templates(user.id)
+        )
+        template = template_for_cv(request.template, cv.template, custom_templates)
         
         # Get the existing CV structure
         cv_structure = cv.cv_structure
         if not cv_structure:
             raise HTTPException(status_code=400, detail="This CV cannot be edited (no structure data available)")
+
+        # The inputs below edit the structure in place; keep the old version for the revision diff
+        previous_structure = copy.deepcopy(cv_structure)
         
         # Process the flow similar to complete_cv_flow
         flow_id = request.flow_id
@@ -1204,7 +1082,7 @@ async def update_cv(
         
         # Generate the LaTeX from the updated CV structure
         try:
-            latex_result = convert_to_latex_service(extracted_text)               
+            latex_result = convert_to_latex_service(extracted_text, template, save=False)
         except Exception as latex_error:
             print(f"[DEBUG] Error in LaTeX conversion: {str(latex_error)}")
             import traceback
@@ -1216,26 +1094,29 @@ async def update_cv(
         
         # Generate a unique filename for the LaTeX file
         tex_filename = f"Dang_Ngoc_Nam_{cv_id}_{uuid.uuid4()}.tex"
-        tex_path = os.path.join(LATEX_OUTPUT_DIR, tex_filename)
-        
-        # Write the LaTeX content to file
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(latex_result["latex"])
-        
-        from routes.pdf_routes import convert_tex_to_pdf
-        convert_tex_to_pdf(tex_filename)
-        pdf_filename = tex_filename.replace(".tex", ".pdf")
-        pdf_path = os.path.join(LATEX_OUTPUT_DIR, pdf_filename)
-        
-        # If PDF wasn't generated, raise an error
-        if not os.path.exists(pdf_path):
-            raise HTTPException(
-                status_code=500, 
-                detail="PDF generation failed. Please check your LaTeX template or try again."
-            )
-        
-        # Upload the PDF to Cloudinary
-        cloudinary_result = upload_file_to_cloudinary(pdf_path)
+        tex_path = artifact_store.create(tex_filename)
+        try:
+            # Write the LaTeX content to file
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(latex_result["latex"])
+
+            from routes.pdf_routes import convert_tex_to_pdf
+            convert_tex_to_pdf(tex_filename)
+            pdf_path = os.path.splitext(tex_path)[0] + ".pdf"
+
+            # If PDF wasn't generated, raise an error
+            if not os.path.exists(pdf_path):
+                raise HTTPException(
+                    status_code=500, 
+                    detail="PDF generation failed. Please check your LaTeX template or try again."
+                )
+
+            # Upload the PDF to Cloudinary
+            cloudinary_result = upload_file_to_cloudinary(pdf_path)
+        finally:
+            # The PDF is served from Cloudinary: nothing of the job is needed on disk
+            artifact_store.release(tex_path, keep=False)
+
         if not cloudinary_result["success"]:
             raise HTTPException(
                 status_code=500, 
@@ -1244,8 +1125,11 @@ async def update_cv(
         
         # Update the CV record in the database
         cv.file_url = cloudinary_result["url"]
-        cv.cv_structure = extracted_text  # Update with the new structure
+        cv.template = template.name
+        cv.set_structure(extracted_text)  # Update with the new structure and listing summary
+        await revision_service.record(cv, previous_structure, extracted_text)
         await db.commit()
+        cv_index.upsert(cv.id, user.id, cv.embedding)
 
         # Track usage for CV storage/download
         await subscription_service.increment_usage(user.id, "cv_download")
@@ -1262,6 +1146,152 @@ async def update_cv(
         import traceback
         print(f"[DEBUG] Stack trace: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error updating CV: {str(e)}")
+
+
+async def _get_owned_cv(db: AsyncSession, cv_id: int, user: User) -> CV:
+    """Load a CV (without its structure) and check it belongs to the user"""
+    from sqlalchemy import select
+
+    result = await db.execute(select(CV).where(CV.id == cv_id, CV.user_id == user.id))
+    cv = result.scalars().first()
+    if not cv:
+        raise HTTPException(status_code=404, detail="CV not found")
+    return cv
+
+@router.post("/rank-cvs-for-job-description")
+async def rank_cvs_for_job_description(
+    request: RankCVsRequest,
+    user: User = Depends(current_active_user),
+    search_service: CVSearchService = Depends(get_cv_search_service)
+):
+    """
+    Rank the user's stored CVs by similarity to a job description (no AI call)
+    """
+    try:
+        if not request.job_description.strip():
+            raise HTTPException(status_code=400, detail="Job description is required")
+        results = await search_service.rank_cvs(request.job_description, request.top_k, user_id=user.id)
+        return {"results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error ranking CVs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error ranking CVs: {str(e)}")
+
+@router.post("/cv/{cv_id}/rank-job-descriptions")
+async def rank_job_descriptions(
+    cv_id: int,
+    request: RankJobDescriptionsRequest,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    search_service: CVSearchService = Depends(get_cv_search_service)
+):
+    """
+    Rank job descriptions by similarity to a stored CV, with the skills each
+    one requires that the CV has and lacks (no AI call)
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer
+
+    try:
+        result = await db.execute(
+            select(CV).options(undefer(CV.cv_structure)).where(CV.id == cv_id, CV.user_id == user.id)
+        )
+        cv = result.scalars().first()
+        if not cv:
+            raise HTTPException(status_code=404, detail="CV not found")
+        if not cv.has_structure:
+            raise HTTPException(status_code=400, detail="This CV has no structure data to compare")
+        results = await search_service.rank_job_descriptions(cv, request.job_descriptions, request.top_k)
+        return {"cv_id": cv.id, "results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error ranking job descriptions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error ranking job descriptions: {str(e)}")
+
+@router.get("/cv/{cv_id}/revisions")
+async def get_cv_revisions(
+    cv_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    revision_service: CVRevisionService = Depends(get_cv_revision_service)
+):
+    """
+    List the saved revisions of a CV, newest first
+    """
+    try:
+        cv = await _get_owned_cv(db, cv_id, user)
+        revisions = await revision_service.list_revisions(cv.id)
+        return {"cv_id": cv.id, "current_revision": cv.revision or 0, "revisions": revisions}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fetching CV revisions: {str(e)}")
+        import traceback
+        print(f"[DEBUG] Stack trace: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error fetching CV revisions: {str(e)}")
+
+@router.get("/cv/{cv_id}/revisions/{revision}")
+async def get_cv_revision(
+    cv_id: int,
+    revision: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    revision_service: CVRevisionService = Depends(get_cv_revision_service)
+):
+    """
+    Retrieve the CV structure as it was at a given revision
+    """
+    try:
+        cv = await _get_owned_cv(db, cv_id, user)
+        if revision < 1:
+            raise HTTPException(status_code=404, detail="Revision not found")
+        cv_structure = await revision_service.get_revision(cv.id, revision)
+        if cv_structure is None:
+            raise HTTPException(status_code=404, detail="Revision not found")
+        return {"cv_id": cv.id, "revision": revision, "cv_structure": cv_structure}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fetching CV revision: {str(e)}")
+        import traceback
+        print(f"[DEBUG] Stack trace: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error fetching CV revision: {str(e)}")
+
+@router.get("/cv/{cv_id}/diff")
+async def get_cv_diff(
+    cv_id: int,
+    from_revision: int,
+    to_revision: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    revision_service: CVRevisionService = Depends(get_cv_revision_service)
+):
+    """
+    Return the JSON patch (RFC 6902) between two revisions of a CV
+    """
+    try:
+        cv = await _get_owned_cv(db, cv_id, user)
+        if from_revision < 1 or to_revision < 1:
+            raise HTTPException(status_code=404, detail="Revision not found")
+        patch = await revision_service.diff(cv.id, from_revision, to_revision)
+        if patch is None:
+            raise HTTPException(status_code=404, detail="Revision not found")
+        return {
+            "cv_id": cv.id,
+            "from_revision": from_revision,
+            "to_revision": to_revision,
+            "patch": patch
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error computing CV diff: {str(e)}")
+        import traceback
+        print(f"[DEBUG] Stack trace: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error computing CV diff: {str(e)}")
+
 @router.delete("/cv/{cv_id}")
 async def delete_user_cv(
     cv_id: int,
@@ -1271,7 +1301,7 @@ async def delete_user_cv(
     """
     Delete a specific CV by ID (only if it belongs to the current user)
     """
-    from sqlalchemy import select
+    from sqlalchemy import delete, select
 
     try:
         # Query to get the specific CV and verify ownership
@@ -1282,9 +1312,11 @@ async def delete_user_cv(
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found or you don't have permission to delete it")
 
-        # Delete the CV
+        # Delete the CV; its revisions in one statement, also where foreign keys are not enforced (SQLite)
+        await db.execute(delete(CVRevision).where(CVRevision.cv_id == cv_id))
         await db.delete(cv)
         await db.commit()
+        cv_index.remove(cv_id)
 
         return {"message": "CV deleted successfully"}
     except HTTPException:
@@ -1327,22 +1359,25 @@ async def analyze_cv_with_job_description(
                 "upgrade_required": True
             }
         )
+    llm_lane.set(await subscription_service.get_llm_lane(user.id))
     
     try:
-        pdf_content = await file.read()
+        await file.seek(0)
+        pdf_content = file.file  # Parsed straight from the spooled upload
         extracted_cv_data = await gemini_service.extract_pdf_text(pdf_content=pdf_content)
         if isinstance(extracted_cv_data, dict) and "error" in extracted_cv_data:
             raise Exception(extracted_cv_data["error"])
         
         if job_description:            # Compare CV to job description
             job_analysis = await gemini_service.analyze_cv_against_job_description(extracted_cv_data, job_description)
-              # Track usage for job description analysis
-            await subscription_service.increment_usage(user.id, "job_analysis")
+            # Track usage for job description analysis; fallback content is not charged
+            if not gemini_service.is_fallback(job_analysis):
+                await subscription_service.increment_usage(user.id, "job_analysis")
             await subscription_service.save_analysis_result(
                 user_id=user.id,
                 cv_id=None,  # No CV ID available in uploaded file analysis
                 analysis_type=AnalysisType.JOB_DESCRIPTION_ANALYSIS,
-                analysis_data={"result": job_analysis, "cv_data": extracted_cv_data},
+                analysis_data=job_analysis_history_fields(job_analysis),
                 job_description=job_description
             )
             
@@ -1354,8 +1389,9 @@ async def analyze_cv_with_job_description(
             # Fallback to normal analysis
             detailed_analysis = await gemini_service.generate_detailed_analysis(extracted_cv_data)
             
-            # Track usage for CV analysis
-            await subscription_service.increment_usage(user.id, "cv_analysis")
+            # Track usage for CV analysis; fallback content is not charged
+            if not gemini_service.is_fallback(detailed_analysis):
+                await subscription_service.increment_usage(user.id, "cv_analysis")
 
             # Extract analysis data for saving
             analysis_data = {}
@@ -1374,6 +1410,8 @@ async def analyze_cv_with_job_description(
                 "cv_data": extracted_cv_data,
                 "detailed_analysis": detailed_analysis
             }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing PDF: {str(e)}")
     finally:
@@ -1404,6 +1442,7 @@ async def analyze_stored_cv_with_job_description(
                 "upgrade_required": True
             }
         )
+    llm_lane.set(await subscription_service.get_llm_lane(user.id))
     
     try:
         # Get the stored CV data from the flow
@@ -1424,28 +1463,16 @@ async def analyze_stored_cv_with_job_description(
         job_analysis = await gemini_service.analyze_cv_against_job_description(
             extracted_cv_data, 
             request.job_description
-        )        # Track usage for job description analysis
-        await subscription_service.increment_usage(user.id, "job_analysis")
-          # Extract and structure analysis data for saving
-        analysis_data = {}
-        if isinstance(job_analysis, dict):
-            if "experience_analysis" in job_analysis:
-                analysis_data["experience_analysis"] = job_analysis["experience_analysis"]
-            # Map skill analysis data from direct keys (not nested under skill_analysis)
-            if "matches" in job_analysis:
-                analysis_data["skill_matches"] = job_analysis.get("matches", [])
-            if "missing" in job_analysis:
-                analysis_data["missing_skills"] = {"missing": job_analysis.get("missing", [])}
-            if "weaknesses" in job_analysis:
-                analysis_data["weaknesses"] = job_analysis["weaknesses"]
-            if "recommended_courses" in job_analysis:
-                analysis_data["recommended_courses"] = job_analysis["recommended_courses"]
+        )
+        # Track usage for job description analysis; fallback content is not charged
+        if not gemini_service.is_fallback(job_analysis):
+            await subscription_service.increment_usage(user.id, "job_analysis")
         
         await subscription_service.save_analysis_result(
             user_id=user.id,
             cv_id=None,  # No CV ID available in flow-based analysis
             analysis_type=AnalysisType.JOB_DESCRIPTION_ANALYSIS,
-            analysis_data=analysis_data,
+            analysis_data=job_analysis_history_fields(job_analysis),
             job_description=request.job_description
         )
         
@@ -1459,3 +1486,59 @@ async def analyze_stored_cv_with_job_description(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing CV against job description: {str(e)}")
+
+class BulkJobDescriptionRequest(BaseModel):
+    job_description: str
+    top_k: int = Field(3, ge=1, le=10)
+
+@router.post("/analyze-stored-cvs-with-job-description")
+async def analyze_stored_cvs_with_job_description(
+    request: BulkJobDescriptionRequest,
+    user: User = Depends(current_active_user),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+    job_match_service: JobMatchService = Depends(get_job_match_service)
+):
+    """
+    Match a job description against all of the user's stored CVs.
+
+    Every CV is ranked locally (skill coverage, then similarity, no AI call);
+    the top_k get the full analysis, run concurrently. The response is NDJSON:
+    a "ranking" event, one "analysis"/"error"/"skipped" event per analyzed CV
+    as it finishes, then "done". Each analysis is charged and saved like
+    /analyze-stored-cv-with-job-description.
+    """
+    import json
+    from fastapi.responses import StreamingResponse
+
+    can_proceed = await subscription_service.check_usage_limits(user.id, "job_analysis")
+    if not can_proceed:
+        usage_stats = await subscription_service.get_usage_stats(user.id)
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Usage limit exceeded. Please upgrade your subscription.",
+                "usage_stats": usage_stats,
+                "upgrade_required": True
+            }
+        )
+    llm_lane.set(await subscription_service.get_llm_lane(user.id))
+
+    try:
+        if not request.job_description.strip():
+            raise HTTPException(status_code=400, detail="Job description is required")
+        ranking = await job_match_service.prerank(gemini_service, user.id, request.job_description)
+        if not ranking:
+            raise HTTPException(status_code=404, detail="No stored CVs with structure data found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error ranking stored CVs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error ranking stored CVs: {str(e)}")
+
+    async def events():
+        async for event in job_match_service.stream_analyses(
+            gemini_service, user.id, ranking, request.job_description, request.top_k
+        ):
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
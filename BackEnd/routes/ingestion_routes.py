@@ -0,0 +1,81 @@
+"""
+Batch CV ingestion: upload a ZIP of CVs (or many PDFs) and follow the job
+"""
+import uuid
+from typing import List
+from fastapi import APIRouter, HTTPException, File, UploadFile, Depends, Query, status
+
+from core.app import gemini_service
+from core.llm_governor import llm_lane
+from core.security import current_active_user
+from models.user import User
+from services.batch_ingestion_service import BatchIngestionService, get_batch_ingestion_service, start_ingestion
+from services.subscription_service import SubscriptionService, get_subscription_service
+from utils.error_handler import FileUploadError, handle_file_upload_error
+
+router = APIRouter(prefix="/cv-batches", tags=["cv-batches"])
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_cv_batch(
+    files: List[UploadFile] = File(...),
+    user: User = Depends(current_active_user),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+    ingestion_service: BatchIngestionService = Depends(get_batch_ingestion_service)
+):
+    """
+    Start ingesting a batch of CVs: ZIP archives of PDFs and/or PDF files.
+    Returns the job at once; poll GET /cv-batches/{job_id} for per-file status.
+    Each stored CV counts as one CV analysis.
+    """
+    if not await subscription_service.check_usage_limits(user.id, "cv_analysis"):
+        usage_stats = await subscription_service.get_usage_stats(user.id)
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Usage limit exceeded. Please upgrade your subscription.",
+                "usage_stats": usage_stats,
+                "upgrade_required": True
+            }
+        )
+    llm_lane.set(await subscription_service.get_llm_lane(user.id))
+
+    try:
+        job, pending, workdir = await ingestion_service.create_job(user.id, files)
+    except FileUploadError as e:
+        raise handle_file_upload_error(e)
+    except Exception as e:
+        print(f"Error creating CV batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating CV batch: {str(e)}")
+    finally:
+        for file in files:
+            await file.close()
+
+    if pending:
+        start_ingestion(gemini_service, job, pending, workdir)
+    print(f"[BATCH_INGEST] Job {job.id}: {job.total_files} files, {len(pending)} to process")
+    return BatchIngestionService.job_to_dict(job, include_files=False)
+
+
+@router.get("")
+async def list_cv_batches(
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(current_active_user),
+    ingestion_service: BatchIngestionService = Depends(get_batch_ingestion_service)
+):
+    """The user's most recent ingestion jobs"""
+    jobs = await ingestion_service.list_jobs(user.id, limit)
+    return {"jobs": [BatchIngestionService.job_to_dict(job, include_files=False) for job in jobs]}
+
+
+@router.get("/{job_id}")
+async def get_cv_batch(
+    job_id: uuid.UUID,
+    user: User = Depends(current_active_user),
+    ingestion_service: BatchIngestionService = Depends(get_batch_ingestion_service)
+):
+    """Progress of an ingestion job with the status of each file"""
+    job = await ingestion_service.get_job(job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return BatchIngestionService.job_to_dict(job)
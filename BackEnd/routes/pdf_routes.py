@@ -1,17 +1,21 @@
 import os
 import subprocess
-from fastapi import APIRouter, HTTPException, File, UploadFile
+from fastapi import APIRouter, HTTPException, File, UploadFile, Depends
 from fastapi.responses import FileResponse
 from schemas.common import CVInput
-from services.latex_service import convert_to_latex_service
+from services.latex_service import convert_to_latex_service, select_template
+from services.subscription_service import SubscriptionService, get_subscription_service
 from core.app import gemini_service
+from core.artifacts import artifact_store
+from core.direct_pdf import compile_direct
+from core.latex_formats import latex_formats
+from core.security import current_active_user
+from models.user import User
+from utils.latex_templates import DEFAULT_TEMPLATE, list_templates
 from utils.file_validator import FileValidator
 
 router = APIRouter()
 
-# Constants
-LATEX_OUTPUT_DIR = "output_tex_files"
-
 @router.post("/extract-pdf")
 async def extract_pdf(file: UploadFile = File(...)) -> dict:
     # Comprehensive file validation
@@ -22,9 +26,12 @@ async def extract_pdf(file: UploadFile = File(...)) -> dict:
     print(f"[FILE_VALIDATION] Pages: {validation_result['page_count']}")
 
     try:
-        pdf_content = await file.read()
+        await file.seek(0)
+        pdf_content = file.file  # Parsed straight from the spooled upload
         result = await gemini_service.extract_pdf_text(pdf_content=pdf_content)
         return {"data": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
     finally:
@@ -32,12 +39,35 @@ async def extract_pdf(file: UploadFile = File(...)) -> dict:
 
 @router.post("/convert-to-latex/")
 def convert_to_latex(cv_input: CVInput) -> dict[str, str]:
-    return convert_to_latex_service(cv_input.data)
+    # Anonymous endpoint: premium templates go through /complete-cv-flow
+    template = select_template(cv_input.template, custom_templates=False)
+    return convert_to_latex_service(cv_input.data, template)
+
+@router.get("/latex-templates")
+async def list_latex_templates(
+    user: User = Depends(current_active_user),
+    subscription_service: SubscriptionService = Depends(get_subscription_service)
+):
+    """The CV templates, and whether the user's plan includes each"""
+    custom_templates = await subscription_service.has_custom_templates(user.id)
+    return {
+        "default": DEFAULT_TEMPLATE,
+        "templates": [
+            {
+                "name": template.name,
+                "title": template.title,
+                "premium": template.premium,
+                "available": custom_templates or not template.premium
+            }
+            for template in list_templates()
+        ]
+    }
 
 @router.get("/pdf/{filename}")
 def get_pdf(filename: str):
-    file_path = os.path.join(LATEX_OUTPUT_DIR, filename)
-    if not os.path.exists(file_path):
+    # In its job directory under the artifact store, or flat there for older files
+    file_path = artifact_store.resolve(filename)
+    if file_path is None:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
     
     # Log the PDF request for debugging
@@ -60,12 +90,14 @@ def get_pdf(filename: str):
 
 @router.post("/convert-tex-to-pdf/{filename}")
 def convert_tex_to_pdf(filename: str):
-    tex_file_path = os.path.join(LATEX_OUTPUT_DIR, filename)
-    if not os.path.exists(tex_file_path):
+    # Held so a sweep cannot collect the job mid-compile; released with its intermediates removed
+    tex_file_path = artifact_store.acquire(filename) if filename.endswith(".tex") else None
+    if tex_file_path is None:
         raise HTTPException(status_code=404, detail="TeX file not found")
 
+    output_dir = os.path.dirname(tex_file_path)
     pdf_filename = filename.replace(".tex", ".pdf")
-    pdf_file_path = os.path.join(LATEX_OUTPUT_DIR, pdf_filename)
+    pdf_file_path = os.path.join(output_dir, pdf_filename)
     
     # Clean up any existing PDF file
     if os.path.exists(pdf_file_path):
@@ -76,33 +108,39 @@ def convert_tex_to_pdf(filename: str):
             print(f"Warning: Could not remove existing PDF file: {e}")
     
     try:
-        # First attempt: Run pdflatex in non-stop mode
-        print(f"Attempting to convert {tex_file_path} to PDF...")
-        process = subprocess.run(
-            ["pdflatex", "-interaction=nonstopmode", "-output-directory", LATEX_OUTPUT_DIR, tex_file_path],
-            check=False,  # Don't raise exception on non-zero return code
-            capture_output=True,
-            text=True
-        )
-        
-        # Log the output for debugging
-        print(f"pdflatex stdout: {process.stdout}")
-        print(f"pdflatex stderr: {process.stderr}")
-        
-        # Check if PDF was created
-        if not os.path.exists(pdf_file_path) or os.path.getsize(pdf_file_path) == 0:
-            print("First attempt failed, trying with different options...")
-            
-            # Second attempt: with -shell-escape for additional permissions
+        # Fastest: typeset in process (PDF_BACKEND=direct), else the template's precompiled format
+        if compile_direct(tex_file_path):
+            print(f"Converted {tex_file_path} to PDF in process")
+        elif latex_formats.compile(tex_file_path):
+            print(f"Converted {tex_file_path} to PDF with its template's precompiled format")
+        else:
+            # First attempt: Run pdflatex in non-stop mode
+            print(f"Attempting to convert {tex_file_path} to PDF...")
             process = subprocess.run(
-                ["pdflatex", "-shell-escape", "-interaction=nonstopmode", "-output-directory", LATEX_OUTPUT_DIR, tex_file_path],
-                check=False,
+                ["pdflatex", "-interaction=nonstopmode", "-output-directory", output_dir, tex_file_path],
+                check=False,  # Don't raise exception on non-zero return code
                 capture_output=True,
                 text=True
             )
+        
+            # Log the output for debugging
+            print(f"pdflatex stdout: {process.stdout}")
+            print(f"pdflatex stderr: {process.stderr}")
+        
+            # Check if PDF was created
+            if not os.path.exists(pdf_file_path) or os.path.getsize(pdf_file_path) == 0:
+                print("First attempt failed, trying with different options...")
+            
+                # Second attempt: with -shell-escape for additional permissions
+                process = subprocess.run(
+                    ["pdflatex", "-shell-escape", "-interaction=nonstopmode", "-output-directory", output_dir, tex_file_path],
+                    check=False,
+                    capture_output=True,
+                    text=True
+                )
             
-            print(f"Second attempt stdout: {process.stdout}")
-            print(f"Second attempt stderr: {process.stderr}")
+                print(f"Second attempt stdout: {process.stdout}")
+                print(f"Second attempt stderr: {process.stderr}")
 
         # Final check
         if not os.path.exists(pdf_file_path):
@@ -129,4 +167,6 @@ def convert_tex_to_pdf(filename: str):
     except Exception as e:
         error_msg = f"Unexpected error during PDF generation: {str(e)}"
         print(error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=error_msg)
+    finally:
+        artifact_store.release(tex_file_path)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Live preview WebSocket (services/preview_service.py).
+
+Connect to /cv-preview, optionally with ?cv_id= to start from a stored CV
+and ?template= to pick the template (a stored CV defaults to the one it
+was last rendered with); authenticate with the auth cookie or a bearer
+token. Browser handshakes from origins outside the CORS list are refused.
+The client sends JSON text messages:
+
+    {"type": "structure", "cv_structure": {...}, "template": "modern"}
+    {"type": "patch", "ops": [...]}   JSON Patch against the last structure
+
+("template" is optional on both). Each is acknowledged with
+{"type": "queued", "version": n}. Once the edits pause, the server sends
+{"type": "pdf", "version": n, "size": ..., "compile_ms": ...} followed by
+the PDF as one binary message, or {"type": "error", "version": n,
+"detail": ...}. Versions superseded by a later edit before their PDF is
+ready get neither.
+"""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal
+from core.security import websocket_origin_allowed, websocket_user
+from models.user import CV
+from services.latex_service import select_template, template_for_cv
+from services.preview_service import (
+    PREVIEW_IDLE_SECONDS, PREVIEW_MAX_MESSAGE_BYTES, PreviewSession, preview_limiter
+)
+from services.subscription_service import SubscriptionService
+from utils.json_patch import apply_patch
+
+router = APIRouter()
+
+
+def _error_detail(e: HTTPException) -> str:
+    return e.detail["message"] if isinstance(e.detail, dict) else str(e.detail)
+
+
+@router.websocket("/cv-preview")
+async def cv_preview(websocket: WebSocket, cv_id: Optional[int] = None, template: Optional[str] = None):
+    """Compile CV structures to PDF as they are edited, without storing anything"""
+    if not websocket_origin_allowed(websocket):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Origin not allowed")
+        return
+    user = await websocket_user(websocket)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+        return
+
+    structure = stored_template = None
+    async with AsyncSessionLocal() as db:
+        custom_templates = await SubscriptionService(db).has_custom_templates(user.id)
+        if cv_id is not None:
+            result = await db.execute(
+                select(CV.cv_structure, CV.template).where(CV.id == cv_id, CV.user_id == user.id)
+            )
+            structure, stored_template = result.one_or_none() or (None, None)
+            if structure is None:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="CV not found or not editable")
+                return
+    try:
+        # A stored CV previews in its own template unless another is asked for
+        selected = template_for_cv(template, stored_template, custom_templates)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=_error_detail(e))
+        return
+
+    if not preview_limiter.open(user.id):
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many open previews")
+        return
+
+    # The PDF header and its bytes must not interleave with other messages
+    send_lock = asyncio.Lock()
+
+    async def send(message: dict, pdf: Optional[bytes] = None) -> None:
+        try:
+            async with send_lock:
+                await websocket.send_json(message)
+                if pdf is not None:
+                    await websocket.send_bytes(pdf)
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # Closed meanwhile
+
+    session = None
+    try:
+        await websocket.accept()
+        session = PreviewSession(user.id, selected, send)
+        if structure is not None:
+            await send({"type": "queued", "version": session.submit(structure)})
+
+        while True:
+            message = await asyncio.wait_for(websocket.receive(), PREVIEW_IDLE_SECONDS)
+            if message["type"] == "websocket.disconnect":
+                break
+            text = message.get("text")
+            if text is None:
+                await send({"type": "error", "detail": "Messages must be JSON text"})
+                continue
+            if len(text) > PREVIEW_MAX_MESSAGE_BYTES:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG, reason="Message too large")
+                break
+            try:
+                data = json.loads(text)
+                if not isinstance(data, dict):
+                    raise ValueError("a JSON object is expected")
+                next_template = None
+                if data.get("template"):
+                    next_template = select_template(data["template"], custom_templates)
+
+                if data.get("type") == "structure":
+                    next_structure = data.get("cv_structure")
+                elif data.get("type") == "patch":
+                    if session.structure is None:
+                        raise ValueError("send a structure before patching it")
+                    next_structure = apply_patch(session.structure, data.get("ops") or [])
+                else:
+                    raise ValueError(f"unknown message type: {data.get('type')}")
+                if not isinstance(next_structure, dict):
+                    raise ValueError("the CV structure must be a JSON object")
+            except HTTPException as e:
+                await send({"type": "error", "detail": _error_detail(e)})
+                continue
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                await send({"type": "error", "detail": f"Invalid message: {e}"})
+                continue
+
+            await send({"type": "queued", "version": session.submit(next_structure, next_template)})
+    except asyncio.TimeoutError:
+        await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle")
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"[PREVIEW] Error in preview session of user {user.id}: {e}")
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass
+    finally:
+        if session is not None:
+            await session.close()
+        preview_limiter.close(user.id)
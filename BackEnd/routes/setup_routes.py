@@ -3,10 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from core.database import get_async_db
 import uuid
-from passlib.context import CryptContext
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 @router.post("/setup/create-admin")
 async def create_admin_endpoint(db: AsyncSession = Depends(get_async_db)):
@@ -30,7 +28,8 @@ async def create_admin_endpoint(db: AsyncSession = Depends(get_async_db)):
         
         # Create admin user
         admin_id = str(uuid.uuid4())
-        hashed_password = pwd_context.hash("admin123")
+        from passlib.context import CryptContext  # Slow to import; only needed here
+        hashed_password = CryptContext(schemes=["bcrypt"], deprecated="auto").hash("admin123")
         
         await db.execute(
             text('''
@@ -56,6 +56,12 @@ class AdminCVRead(CVRead):
     upload_date: datetime
     file_size: Optional[int] = None
     status: str = "active"  # active, deleted, flagged
+    # Listing summary; cv_structure itself is only returned for a single CV
+    has_structure: bool = False
+    name: Optional[str] = None
+    section_counts: Optional[Dict[str, int]] = None
+    completeness_score: Optional[int] = None
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -146,6 +152,13 @@ class CVSearchFilter(BaseModel):
     page_size: int = 20
 
 
+class CVSimilaritySearch(BaseModel):
+    """Rank all stored CVs against a job description or another CV"""
+    job_description: Optional[str] = None
+    cv_id: Optional[int] = None
+    top_k: int = Field(10, ge=1, le=100)
+
+
 class SubscriptionSearchFilter(BaseModel):
     """Search and filter parameters for subscriptions"""
     search: Optional[str] = None  # Search in user name, email
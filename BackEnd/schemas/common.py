@@ -12,6 +12,7 @@ class MsgPayload(BaseModel):
     
 class CVInput(BaseModel):
     data: Dict[str, Any]
+    template: Optional[str] = None
     
     
 class CVWeaknessRequest(BaseModel):
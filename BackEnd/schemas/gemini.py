@@ -0,0 +1,228 @@
+"""
+Response schemas for Gemini structured (JSON mode) output.
+
+Each model is passed to the SDK as `response_schema`, so the model is
+constrained to emit matching JSON and the reply is validated straight into
+these classes. Avoid dict/Any fields: the Gemini API rejects
+additionalProperties in response schemas.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# CV structure (mirrors utils.cv_structure.CV_STRUCTURE)
+class ContactValue(BaseModel):
+    value: Optional[str] = None
+    link: Optional[str] = None
+
+
+class ContactInfo(BaseModel):
+    email: Optional[ContactValue] = None
+    phone: Optional[ContactValue] = None
+    location: Optional[ContactValue] = None
+
+
+class HeaderSection(BaseModel):
+    name: Optional[str] = None
+    contact_info: Optional[ContactInfo] = None
+
+
+class DateRange(BaseModel):
+    start: Optional[str] = None
+    end: Optional[str] = None
+    is_current: Optional[bool] = None
+
+
+class EducationItem(BaseModel):
+    institution: Optional[str] = None
+    degree: Optional[str] = None
+    location: Optional[str] = None
+    start_date: Optional[str] = None
+    graduation_date: Optional[str] = None
+    gpa: Optional[str] = None
+
+
+class ExperienceItem(BaseModel):
+    type: Optional[str] = None
+    title: Optional[str] = None
+    company: Optional[str] = None
+    url: Optional[str] = None
+    location: Optional[str] = None
+    dates: Optional[DateRange] = None
+    achievements: List[str] = Field(default_factory=list)
+
+
+class SkillCategory(BaseModel):
+    name: Optional[str] = None
+    items: List[str] = Field(default_factory=list)
+
+
+class ProjectItem(BaseModel):
+    title: Optional[str] = None
+    url: Optional[str] = None
+    description: Optional[str] = None
+    dates: Optional[DateRange] = None
+    technologies: List[str] = Field(default_factory=list)
+    key_contributions: List[str] = Field(default_factory=list)
+
+
+class CertificationItem(BaseModel):
+    title: Optional[str] = None
+    institution: Optional[str] = None
+    date: Optional[str] = None
+
+
+class EducationSection(BaseModel):
+    section_title: str = "Education"
+    items: List[EducationItem] = Field(default_factory=list)
+
+
+class ExperienceSection(BaseModel):
+    section_title: str = "Experience"
+    items: List[ExperienceItem] = Field(default_factory=list)
+
+
+class SkillsSection(BaseModel):
+    section_title: str = "Skills"
+    categories: List[SkillCategory] = Field(default_factory=list)
+
+
+class ProjectsSection(BaseModel):
+    section_title: str = "Projects"
+    items: List[ProjectItem] = Field(default_factory=list)
+
+
+class InterestsSection(BaseModel):
+    section_title: str = "Interests"
+    items: List[str] = Field(default_factory=list)
+
+
+class CertificationsSection(BaseModel):
+    section_title: str = "Certifications"
+    items: List[CertificationItem] = Field(default_factory=list)
+
+
+class CVSections(BaseModel):
+    header: HeaderSection
+    education: EducationSection
+    experience: ExperienceSection
+    skills: SkillsSection
+    projects: ProjectsSection
+    interests: InterestsSection
+    certifications: CertificationsSection
+
+
+class CVMetadata(BaseModel):
+    section_order: List[str] = Field(default_factory=list)
+
+
+class RenderingRules(BaseModel):
+    date_format: Optional[str] = None
+    hide_empty_sections: Optional[bool] = None
+    max_items_per_section: Optional[str] = None
+    truncate_descriptions_at: Optional[int] = None
+
+
+class CVTemplate(BaseModel):
+    metadata: CVMetadata
+    sections: CVSections
+    rendering_rules: Optional[RenderingRules] = None
+
+
+class CVDocument(BaseModel):
+    cv_template: CVTemplate
+
+
+# CV weakness analysis
+class WeaknessSummary(BaseModel):
+    weaknesses: List[str]
+    missing_information: List[str]
+    improvement_suggestions: List[str]
+    required_inputs: List[str]
+
+
+class Weakness(BaseModel):
+    category: str
+    description: str
+    severity: Optional[str] = None
+
+
+class Recommendation(BaseModel):
+    id: Optional[str] = None
+    section: Optional[str] = None
+    field: Optional[str] = None
+    current: Optional[str] = None
+    suggested: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class DetailedAnalysis(BaseModel):
+    weaknesses: List[Weakness]
+    recommendations: List[Recommendation]
+
+
+# Job description analysis
+class SkillComparison(BaseModel):
+    matches: List[str]
+    missing: List[str]
+
+
+class CourseRecommendation(BaseModel):
+    title: str = "Course recommendation"
+    platform: str = "Online platform"
+    url: Optional[str] = None
+    reason: str = "Addresses skill gap identified in analysis"
+    skill_addressed: str = "General skill improvement"
+    estimated_time: str = "Variable"
+    level: str = "Intermediate"
+    is_free: bool = False
+
+
+class JobGapAnalysis(BaseModel):
+    missing_requirements: List[str]
+    weaknesses: List[Weakness]
+    recommended_courses: List[CourseRecommendation]
+
+
+class CandidateExperience(BaseModel):
+    years: float = 0
+    months: float = 0
+    level: str = "Junior"
+
+
+class JobExperienceRequirements(BaseModel):
+    minimum_years: float = 0
+    preferred_years: float = 0
+    seniority_level: str = "Not specified"
+    specific_requirements: List[str] = Field(default_factory=list)
+    special_requirements: List[str] = Field(default_factory=list)
+
+
+class ExperienceFit(BaseModel):
+    meets_minimum: bool = True
+    experience_gap_years: float = 0
+    level_match: str = "Unknown"
+    strengths: List[str] = Field(default_factory=list)
+    gaps: List[str] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+
+
+class ExperienceAnalysis(BaseModel):
+    candidate_total_experience: CandidateExperience
+    job_requirements: JobExperienceRequirements
+    experience_analysis: ExperienceFit
+    notable_requirements: List[str]
+
+
+class JobDescriptionAnalysis(BaseModel):
+    """All three JD analysis stages answered by a single call"""
+    matches: List[str] = Field(description="Unrecognized terms from PART 1 that the CV already has")
+    missing: List[str] = Field(description="Unrecognized terms from PART 1 the job requires and the CV lacks")
+    experience: ExperienceAnalysis
+    missing_requirements: List[str] = Field(
+        description="Missing technical requirements, in exactly the same short form as the missing skills"
+    )
+    weaknesses: List[Weakness]
+    recommended_courses: List[CourseRecommendation] = Field(
+        description="At most one course per missing skill; never for skills the CV already has"
+    )
@@ -1,15 +1,20 @@
 """
 Admin service for managing users, CVs, and subscriptions
 """
+import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, and_, or_, text
+from sqlalchemy.orm import selectinload, undefer
 
 from models.user import User, CV
 from models.subscription import UserSubscription
+from core.cv_index import cv_index
+from core.user_cache import invalidate_user
+from utils.cv_embedding import embed_cv, encode_embedding
+from utils.cv_rules import completeness_score
 from schemas.admin import (
     DashboardMetrics, AdminUserRead, AdminCVRead, AdminSubscriptionRead,
     UserSearchFilter, CVSearchFilter, SubscriptionSearchFilter,
@@ -101,9 +106,11 @@ class AdminService:
         # TODO: Add created_at field to User model or use alternative tracking
         recent_registrations = 0
 
-        # Recent CV uploads (last 30 days) - using created_at if available
-        # Note: CV model doesn't have created_at, so we'll use a placeholder
-        recent_cv_uploads = 0  # TODO: Add created_at to CV model
+        # Recent CV uploads (last 30 days)
+        recent_cvs_result = await self.db.execute(
+            select(func.count(CV.id)).where(CV.created_at >= datetime.utcnow() - timedelta(days=30))
+        )
+        recent_cv_uploads = recent_cvs_result.scalar() or 0
 
         return DashboardMetrics(
             total_users=total_users,
@@ -248,6 +255,7 @@ class AdminService:
         
         await self.db.commit()
         await self.db.refresh(user)
+        invalidate_user(user_id)
         
         return await self.get_user_by_id(user_id)
 
@@ -260,7 +268,11 @@ class AdminService:
         if not user:
             return False
         
-        # Delete associated CVs first
+        # Delete associated CVs (and their revision history) first
+        await self.db.execute(
+            text("DELETE FROM cv_revisions WHERE cv_id IN (SELECT id FROM cvs WHERE user_id = :user_id)"),
+            {"user_id": str(user_id)}
+        )
         await self.db.execute(
             text("DELETE FROM cvs WHERE user_id = :user_id"),
             {"user_id": str(user_id)}
@@ -269,6 +281,7 @@ class AdminService:
         # Delete user
         await self.db.delete(user)
         await self.db.commit()
+        invalidate_user(user_id)
         
         return True
 
@@ -293,12 +306,10 @@ class AdminService:
             pass
 
         if filters.uploaded_after:
-            # CV model doesn't have created_at field, skip for now
-            pass
+            conditions.append(CV.created_at >= filters.uploaded_after)
 
         if filters.uploaded_before:
-            # CV model doesn't have created_at field, skip for now
-            pass
+            conditions.append(CV.created_at <= filters.uploaded_before)
 
         if conditions:
             query = query.where(and_(*conditions))
@@ -321,19 +332,24 @@ class AdminService:
         result = await self.db.execute(query)
         cvs = result.scalars().all()
 
-        # Convert to admin CV read format
+        # Convert to admin CV read format (cv_structure stays deferred for listings)
         admin_cvs = []
         for cv in cvs:
             admin_cv = AdminCVRead(
                 id=cv.id,
                 file_url=cv.file_url,
-                cv_structure=cv.cv_structure,
+                cv_structure=None,
                 user_id=cv.user_id,
                 owner_email=cv.owner.email if cv.owner else "Unknown",
                 owner_name=None,  # User model doesn't have name field
-                upload_date=datetime.now(timezone.utc),  # Placeholder since CV model doesn't have created_at
+                upload_date=cv.created_at or datetime.now(timezone.utc),
                 file_size=None,  # Not stored in current model
-                status="active"  # Default status
+                status="active",  # Default status
+                has_structure=bool(cv.has_structure),
+                name=cv.name,
+                section_counts=cv.section_counts,
+                completeness_score=cv.completeness_score,
+                updated_at=cv.updated_at
             )
             admin_cvs.append(admin_cv)
 
@@ -349,7 +365,7 @@ class AdminService:
 
     async def get_cv_by_id(self, cv_id: int) -> Optional[AdminCVRead]:
         """Get a specific CV by ID"""
-        query = select(CV).options(selectinload(CV.owner)).where(CV.id == cv_id)
+        query = select(CV).options(selectinload(CV.owner), undefer(CV.cv_structure)).where(CV.id == cv_id)
         result = await self.db.execute(query)
         cv = result.scalar_one_or_none()
 
@@ -363,9 +379,14 @@ class AdminService:
             user_id=cv.user_id,
             owner_email=cv.owner.email if cv.owner else "Unknown",
             owner_name=None,
-            upload_date=datetime.now(timezone.utc),  # Placeholder
+            upload_date=cv.created_at or datetime.now(timezone.utc),
             file_size=None,
-            status="active"
+            status="active",
+            has_structure=bool(cv.has_structure),
+            name=cv.name,
+            section_counts=cv.section_counts,
+            completeness_score=cv.completeness_score,
+            updated_at=cv.updated_at
         )
 
     async def delete_cv(self, cv_id: int) -> bool:
@@ -379,8 +400,55 @@ class AdminService:
 
         await self.db.delete(cv)
         await self.db.commit()
+        cv_index.remove(cv_id)
         return True
 
+    async def rescore_cvs(self, only_missing: bool = False, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Recompute completeness_score (utils/cv_rules.py) and the similarity
+        vector (utils/cv_embedding.py) for every stored CV, or only those
+        missing either. Walks the table in id order and writes only values
+        that changed.
+        """
+        started = time.perf_counter()
+        stats = {"scanned": 0, "updated": 0, "without_structure": 0}
+        last_id = 0
+
+        while True:
+            query = select(
+                CV.id, CV.cv_structure, CV.completeness_score, CV.embedding, CV.updated_at
+            ).where(CV.id > last_id)
+            if only_missing:
+                query = query.where(or_(CV.completeness_score.is_(None), CV.embedding.is_(None)))
+            rows = (await self.db.execute(query.order_by(CV.id).limit(batch_size))).all()
+            if not rows:
+                break
+
+            changes = []
+            for row in rows:
+                last_id = row.id
+                score = completeness_score(row.cv_structure)
+                embedding = encode_embedding(embed_cv(row.cv_structure))
+                if score is None:
+                    stats["without_structure"] += 1
+                if score != row.completeness_score or embedding != row.embedding:
+                    # Keep updated_at: a re-score is not an edit of the CV
+                    changes.append({"id": row.id, "completeness_score": score, "embedding": embedding,
+                                    "updated_at": row.updated_at})
+            stats["scanned"] += len(rows)
+
+            if changes:
+                await self.db.execute(update(CV), changes)
+                await self.db.commit()
+                stats["updated"] += len(changes)
+
+        if stats["updated"]:
+            cv_index.invalidate()  # updated_at is unchanged, so only a full reload sees the new vectors
+        elapsed = time.perf_counter() - started
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["cvs_per_second"] = round(stats["scanned"] / elapsed) if elapsed > 0 else None
+        return stats
+
     # Subscription Management Methods
     async def get_subscriptions_paginated(self, filters: SubscriptionSearchFilter) -> PaginatedSubscriptionsResponse:
         """Get paginated list of subscriptions with filters"""
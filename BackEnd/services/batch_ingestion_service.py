@@ -0,0 +1,442 @@
+"""
+Batch CV ingestion: a ZIP archive or many PDFs in one upload become stored CVs.
+
+Uploads are unpacked to a temporary directory and recorded as an
+IngestionJob with one IngestionFile row per file; the route then returns
+and the job runs in the background:
+
+* PDFs are validated and parsed on the worker processes of core/pdf_pool.py
+* each parsed text waits for one of BATCH_INGEST_LLM_CONCURRENCY extraction
+  slots (on top of the process-wide LLM governor)
+* extracted structures are inserted BATCH_INGEST_FLUSH_SIZE at a time,
+  together with their file statuses and the job counters
+
+Job and file status live in the database, so any worker can report them.
+A job runs in the process that accepted it; jobs interrupted by a restart
+stay "running".
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import Depends, UploadFile
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.cv_index import cv_index
+from core.database import AsyncSessionLocal, get_async_db
+from core.llm_governor import LLMUnavailable
+from core.metrics import metrics
+from core.pdf_pool import pdf_pool
+from models.ingestion import (
+    FILE_FAILED, FILE_QUEUED, FILE_SKIPPED, FILE_STORED,
+    JOB_COMPLETED, JOB_FAILED, JOB_RUNNING, IngestionFile, IngestionJob,
+)
+from models.user import CV
+from services.cv_revision_service import CVRevisionService
+from services.subscription_service import SubscriptionService
+from utils.error_handler import FileSizeError, FileValidationError
+from utils.file_validator import FileValidator
+
+BATCH_INGEST_MAX_FILES = int(os.getenv("BATCH_INGEST_MAX_FILES", 500))
+# Unpacked size of one batch; guards against ZIP bombs
+BATCH_INGEST_MAX_TOTAL_BYTES = int(os.getenv("BATCH_INGEST_MAX_TOTAL_BYTES", 512 * 1024 * 1024))
+BATCH_INGEST_LLM_CONCURRENCY = int(os.getenv("BATCH_INGEST_LLM_CONCURRENCY", 4))
+BATCH_INGEST_FLUSH_SIZE = int(os.getenv("BATCH_INGEST_FLUSH_SIZE", 25))
+BATCH_INGEST_LLM_RETRIES = 3
+COPY_CHUNK_SIZE = 1024 * 1024
+
+ingestion_files = metrics.counter("ingestion_files_total", "Batch-ingested files by final status")
+ingestion_extract_seconds = metrics.histogram("ingestion_extract_seconds", "LLM extraction time per ingested CV")
+
+# Keeps background jobs referenced until they finish
+_running_jobs: Set[asyncio.Task] = set()
+
+
+def _copy_limited(source, path: str, limit: int) -> int:
+    """Copy a stream to `path`; stops and returns limit + 1 once it passes `limit` bytes"""
+    written = 0
+    with open(path, "wb") as target:
+        while written <= limit:
+            chunk = source.read(min(COPY_CHUNK_SIZE, limit + 1 - written))
+            if not chunk:
+                break
+            target.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _unpack(uploads: List[tuple], workdir: str) -> List[Dict[str, Any]]:
+    """
+    Expand (filename, stream) uploads into workdir. Returns one entry per file
+    with "filename" and either "path" or "error". Runs in a thread.
+    """
+    entries: List[Dict[str, Any]] = []
+    total = 0
+
+    def new_entry(filename: str, error: Optional[str] = None) -> Dict[str, Any]:
+        """Record one more file, rejected ones included, within BATCH_INGEST_MAX_FILES"""
+        if len(entries) >= BATCH_INGEST_MAX_FILES:
+            raise FileValidationError(
+                f"Too many files. A batch may hold at most {BATCH_INGEST_MAX_FILES} CVs",
+                status_code=400,
+                details={"error_type": "too_many_files", "max_files": BATCH_INGEST_MAX_FILES},
+            )
+        entry = {"filename": os.path.basename(filename)[:255] or "unnamed.pdf"}
+        if error:
+            entry["error"] = error
+        entries.append(entry)
+        return entry
+
+    def add(filename: str, stream, declared_size: Optional[int] = None) -> None:
+        nonlocal total
+        entry = new_entry(filename)
+        if not filename.lower().endswith(".pdf"):
+            entry["error"] = "Only PDF files are allowed"
+            return
+        if declared_size is not None and declared_size > FileValidator.MAX_FILE_SIZE:
+            entry["error"] = f"File too large. Maximum size is {FileValidator.format_file_size(FileValidator.MAX_FILE_SIZE)}"
+            return
+
+        path = os.path.join(workdir, f"{len(entries):05d}.pdf")
+        size = _copy_limited(stream, path, FileValidator.MAX_FILE_SIZE)
+        if size > FileValidator.MAX_FILE_SIZE:
+            os.remove(path)
+            entry["error"] = f"File too large. Maximum size is {FileValidator.format_file_size(FileValidator.MAX_FILE_SIZE)}"
+            return
+        total += size
+        if total > BATCH_INGEST_MAX_TOTAL_BYTES:
+            raise FileSizeError(
+                f"Batch too large. Unpacked files may total at most {FileValidator.format_file_size(BATCH_INGEST_MAX_TOTAL_BYTES)}",
+                status_code=413,
+                details={"error_type": "batch_too_large", "max_size": BATCH_INGEST_MAX_TOTAL_BYTES},
+            )
+        entry["path"] = path
+
+    for filename, stream in uploads:
+        stream.seek(0)
+        if filename.lower().endswith(".zip"):
+            if not zipfile.is_zipfile(stream):
+                new_entry(filename, "Invalid ZIP archive")
+                continue
+            stream.seek(0)
+            with zipfile.ZipFile(stream) as archive:
+                for info in archive.infolist():
+                    name = info.filename
+                    base = os.path.basename(name)
+                    # Folders and the resource forks/hidden files archivers add
+                    if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+                        continue
+                    if info.flag_bits & 0x1:
+                        new_entry(base, "Encrypted archive entries are not supported")
+                        continue
+                    with archive.open(info) as member:
+                        add(name, member, info.file_size)
+        else:
+            add(filename, stream)
+    return entries
+
+
+class BatchIngestionService:
+    """Creates ingestion jobs and reports their progress"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(self, user_id: uuid.UUID, files: List[UploadFile]) -> tuple:
+        """
+        Unpack the uploads and record a job with a row per file. Returns
+        (job, {file_id: path} of the files still to process, workdir); files
+        rejected while unpacking are recorded as failed already.
+        Raises FileUploadError for a batch that is too large.
+        """
+        workdir = tempfile.mkdtemp(prefix="cv-batch-")
+        try:
+            entries = await asyncio.to_thread(_unpack, [(f.filename or "", f.file) for f in files], workdir)
+        except Exception:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        if not entries:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise FileValidationError(
+                "No files found in the upload", status_code=400, details={"error_type": "empty_batch"}
+            )
+
+        failed = sum(1 for entry in entries if "error" in entry)
+        job = IngestionJob(user_id=user_id, total_files=len(entries), failed_count=failed)
+        job.files = [
+            IngestionFile(
+                position=position,
+                filename=entry["filename"],
+                status=FILE_FAILED if "error" in entry else FILE_QUEUED,
+                error=entry.get("error"),
+            )
+            for position, entry in enumerate(entries)
+        ]
+        if failed == len(entries):
+            job.status = JOB_COMPLETED
+            job.finished_at = datetime.utcnow()
+        self.db.add(job)
+        await self.db.commit()
+        ingestion_files.inc(failed, status=FILE_FAILED)
+
+        pending = {
+            row.id: entry["path"] for row, entry in zip(job.files, entries) if "path" in entry
+        }
+        if not pending:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return job, pending, workdir
+
+    async def get_job(self, job_id: uuid.UUID, user_id: uuid.UUID, include_files: bool = True) -> Optional[IngestionJob]:
+        query = select(IngestionJob).where(IngestionJob.id == job_id, IngestionJob.user_id == user_id)
+        if include_files:
+            query = query.options(selectinload(IngestionJob.files))
+        return (await self.db.execute(query)).scalars().first()
+
+    async def list_jobs(self, user_id: uuid.UUID, limit: int = 20) -> List[IngestionJob]:
+        result = await self.db.execute(
+            select(IngestionJob)
+            .where(IngestionJob.user_id == user_id)
+            .order_by(IngestionJob.created_at.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def job_to_dict(job: IngestionJob, include_files: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": str(job.id),
+            "status": job.status,
+            "total_files": job.total_files,
+            "stored": job.stored_count,
+            "failed": job.failed_count,
+            "skipped": job.skipped_count,
+            "pending": job.total_files - job.stored_count - job.failed_count - job.skipped_count,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+        if include_files:
+            data["files"] = [
+                {
+                    "filename": f.filename,
+                    "status": f.status,
+                    "error": f.error,
+                    "cv_id": f.cv_id,
+                    "page_count": f.page_count,
+                    "file_hash": f.file_hash,
+                }
+                for f in job.files
+            ]
+        return data
+
+
+class _JobWriter:
+    """Buffers per-file outcomes and writes them in bulk"""
+
+    def __init__(self, job_id: uuid.UUID, user_id: uuid.UUID):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.stored: List[tuple] = []   # (file_id, cv_structure, parsed)
+        self.others: List[dict] = []    # IngestionFile updates
+        self.saved = 0                  # CVs committed so far
+        self._lock = asyncio.Lock()
+
+    def pending(self) -> int:
+        return len(self.stored) + len(self.others)
+
+    async def add(self, file_id: int, status: str, error: Optional[str] = None,
+                  parsed: Optional[dict] = None, cv_structure: Optional[dict] = None) -> None:
+        parsed = parsed or {}
+        if status == FILE_STORED:
+            self.stored.append((file_id, cv_structure, parsed))
+        else:
+            self.others.append({
+                "id": file_id, "status": status, "error": error,
+                "file_hash": parsed.get("file_hash"), "page_count": parsed.get("page_count"),
+            })
+        ingestion_files.inc(status=status)
+        if self.pending() >= BATCH_INGEST_FLUSH_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            stored, others = self.stored, self.others
+            self.stored, self.others = [], []
+            if not stored and not others:
+                return
+            try:
+                embeddings = await self._write(stored, others)
+            except Exception as e:
+                # The batch was rolled back: record its files as failed so the job still accounts for them
+                print(f"[BATCH_INGEST] Could not save {len(stored) + len(others)} files of job {self.job_id}: {e}")
+                await self._mark_failed([file_id for file_id, _, _ in stored] + [row["id"] for row in others])
+                return
+
+            self.saved += len(embeddings)
+            for cv_id, embedding in embeddings:
+                cv_index.upsert(cv_id, self.user_id, embedding)
+
+    async def _write(self, stored: List[tuple], others: List[dict]) -> List[tuple]:
+        """Store one batch of outcomes in one transaction; (cv_id, embedding) of the new CVs"""
+        async with AsyncSessionLocal() as db:
+            cvs = []
+            for _, cv_structure, _ in stored:
+                # No PDF exists yet; one is generated when the CV is next saved
+                cv = CV(file_url="", user_id=self.user_id)
+                cv.set_structure(cv_structure)
+                cvs.append(cv)
+            db.add_all(cvs)
+            await db.flush()
+
+            revision_service = CVRevisionService(db)
+            updates = list(others)
+            for cv, (file_id, cv_structure, parsed) in zip(cvs, stored):
+                await revision_service.record(cv, None, cv_structure)
+                updates.append({
+                    "id": file_id, "status": FILE_STORED, "error": None, "cv_id": cv.id,
+                    "file_hash": parsed.get("file_hash"), "page_count": parsed.get("page_count"),
+                })
+            stored_rows = [u for u in updates if "cv_id" in u]
+            other_rows = [u for u in updates if "cv_id" not in u]
+            # Bulk UPDATE by primary key; rows with the same keys go in one executemany
+            for rows in (stored_rows, other_rows):
+                if rows:
+                    await db.execute(update(IngestionFile), rows)
+
+            counts = {FILE_FAILED: 0, FILE_SKIPPED: 0}
+            for row in others:
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+            await db.execute(
+                update(IngestionJob).where(IngestionJob.id == self.job_id).values(
+                    stored_count=IngestionJob.stored_count + len(stored),
+                    failed_count=IngestionJob.failed_count + counts[FILE_FAILED],
+                    skipped_count=IngestionJob.skipped_count + counts[FILE_SKIPPED],
+                )
+            )
+            embeddings = [(cv.id, cv.embedding) for cv in cvs]
+            await db.commit()
+            return embeddings
+
+    async def _mark_failed(self, file_ids: List[int]) -> None:
+        """Fail the files of a batch that could not be saved, in a fresh session"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionFile).where(IngestionFile.id.in_(file_ids))
+                .values(status=FILE_FAILED, error="The result could not be saved")
+            )
+            await db.execute(
+                update(IngestionJob).where(IngestionJob.id == self.job_id)
+                .values(failed_count=IngestionJob.failed_count + len(file_ids))
+            )
+            await db.commit()
+        ingestion_files.inc(len(file_ids), status=FILE_FAILED)
+
+
+async def _extract(gemini_service, text: str) -> dict:
+    """CV structure of a parsed text, waiting out short LLM overloads"""
+    for attempt in range(BATCH_INGEST_LLM_RETRIES + 1):
+        try:
+            return await gemini_service.extract_cv_structure(text)
+        except LLMUnavailable as e:
+            if attempt == BATCH_INGEST_LLM_RETRIES:
+                return {"error": e.detail}
+            await asyncio.sleep(float(e.headers.get("Retry-After", 1)) * (attempt + 1))
+
+
+async def run_ingestion(gemini_service, job_id: uuid.UUID, user_id: uuid.UUID,
+                        pending: Dict[int, str], workdir: str) -> None:
+    """Process the pending files of a job ({file_id: path}); see the module docstring"""
+    writer = _JobWriter(job_id, user_id)
+    llm_slots = asyncio.Semaphore(BATCH_INGEST_LLM_CONCURRENCY)
+    started = time.perf_counter()
+    # Extractions are charged per stored CV, like /analyze-cv-weaknesses: the
+    # job reserves one per file up front, takes one before each LLM call and
+    # gives it back when the call yields nothing to store; reservations no
+    # stored CV used are handed back when the job ends
+    reserved = remaining = 0
+
+    async def process(file_id: int, path: str) -> None:
+        nonlocal remaining
+        parsed = await pdf_pool.parse(path)
+        if "error" in parsed:
+            await writer.add(file_id, FILE_FAILED, parsed["error"], parsed)
+            return
+        async with llm_slots:
+            if remaining <= 0:
+                await writer.add(file_id, FILE_SKIPPED, "Usage limit reached", parsed)
+                return
+            remaining -= 1
+            extract_started = time.perf_counter()
+            try:
+                cv_structure = await _extract(gemini_service, parsed.pop("text"))
+            except BaseException:
+                remaining += 1
+                raise
+            ingestion_extract_seconds.observe(time.perf_counter() - extract_started)
+        if gemini_service.is_fallback(cv_structure):
+            remaining += 1
+            await writer.add(file_id, FILE_FAILED, cv_structure.get("error", "CV data could not be extracted"), parsed)
+        else:
+            await writer.add(file_id, FILE_STORED, parsed=parsed, cv_structure=cv_structure)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            reserved = remaining = await SubscriptionService(db).reserve_usage(user_id, "cv_analysis", len(pending))
+            await db.execute(
+                update(IngestionJob).where(IngestionJob.id == job_id)
+                .values(status=JOB_RUNNING, started_at=datetime.utcnow())
+            )
+            await db.commit()
+
+        results = await asyncio.gather(
+            *(process(file_id, path) for file_id, path in pending.items()), return_exceptions=True
+        )
+        for file_id, result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"[BATCH_INGEST] File {file_id} of job {job_id} failed: {result}")
+                await writer.add(file_id, FILE_FAILED, "Unexpected error while processing the file")
+        await writer.flush()
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionJob).where(IngestionJob.id == job_id)
+                .values(status=JOB_COMPLETED, finished_at=datetime.utcnow())
+            )
+            await db.commit()
+        print(f"[BATCH_INGEST] Job {job_id}: {len(pending)} files in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"[BATCH_INGEST] Job {job_id} failed: {e}")
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionJob).where(IngestionJob.id == job_id)
+                .values(status=JOB_FAILED, error=str(e), finished_at=datetime.utcnow())
+            )
+            await db.commit()
+    finally:
+        if reserved > writer.saved:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await SubscriptionService(db).increment_usage(user_id, "cv_analysis", writer.saved - reserved)
+            except Exception as e:
+                print(f"[BATCH_INGEST] Could not hand back {reserved - writer.saved} extractions of job {job_id}: {e}")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def start_ingestion(gemini_service, job: IngestionJob, pending: Dict[int, str], workdir: str) -> None:
+    """Run a created job in the background (with the caller's LLM lane)"""
+    task = asyncio.create_task(run_ingestion(gemini_service, job.id, job.user_id, pending, workdir))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+
+
+async def get_batch_ingestion_service(db: AsyncSession = Depends(get_async_db)) -> BatchIngestionService:
+    return BatchIngestionService(db)
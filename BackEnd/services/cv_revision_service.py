@@ -0,0 +1,117 @@
+"""
+CV revision history stored as periodic snapshots plus JSON-patch deltas
+
+The history is an addition to cvs.cv_structure, not a replacement: a save
+still rewrites the whole head document there (search, matching and preview
+read it directly) and then adds one revision row. Only the history grows by
+the size of the edit; the write volume of a save is the full document plus
+the patch, not the patch alone.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_async_db
+from models.user import CV, CVRevision
+from utils.json_patch import apply_patch, make_patch
+
+# A full snapshot is written at revision 1, 1 + N, 1 + 2N, ... so rebuilding
+# any revision never replays more than N - 1 patches
+SNAPSHOT_INTERVAL = max(1, int(os.getenv("CV_REVISION_SNAPSHOT_INTERVAL", 20)))
+
+
+def snapshot_revision_for(revision: int) -> int:
+    """Revision number of the snapshot a given revision is built from"""
+    return ((revision - 1) // SNAPSHOT_INTERVAL) * SNAPSHOT_INTERVAL + 1
+
+
+class CVRevisionService:
+    """Service for recording and rebuilding CV revisions"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _add(self, cv: CV, kind: str, data: Any) -> CVRevision:
+        cv.revision = (cv.revision or 0) + 1
+        entry = CVRevision(cv_id=cv.id, revision=cv.revision, kind=kind, data=data)
+        self.db.add(entry)
+        return entry
+
+    async def record(
+        self,
+        cv: CV,
+        previous: Optional[Dict[str, Any]],
+        current: Optional[Dict[str, Any]]
+    ) -> Optional[CVRevision]:
+        """
+        Record `current` as the next revision of a CV. `previous` must be the
+        structure the CV held before the edit (a copy, not the mutated dict).
+        The CV must already have an id; the caller commits.
+        """
+        if not cv.revision:
+            # CVs created before revisions existed get their old state as the base
+            if previous is not None and previous != current:
+                self._add(cv, "snapshot", previous)
+            else:
+                return self._add(cv, "snapshot", current)
+
+        patch = make_patch(previous, current)
+        if not patch:
+            return None
+
+        next_revision = cv.revision + 1
+        if snapshot_revision_for(next_revision) == next_revision:
+            return self._add(cv, "snapshot", current)
+        return self._add(cv, "patch", patch)
+
+    async def list_revisions(self, cv_id: int) -> List[Dict[str, Any]]:
+        """List revision metadata (without rebuilding any document)"""
+        result = await self.db.execute(
+            select(CVRevision.revision, CVRevision.kind, CVRevision.created_at)
+            .where(CVRevision.cv_id == cv_id)
+            .order_by(CVRevision.revision.desc())
+        )
+        return [
+            {"revision": row.revision, "kind": row.kind, "created_at": row.created_at}
+            for row in result.all()
+        ]
+
+    async def get_revision(self, cv_id: int, revision: int) -> Optional[Dict[str, Any]]:
+        """Rebuild the CV structure as it was at a given revision"""
+        base = snapshot_revision_for(revision)
+        result = await self.db.execute(
+            select(CVRevision)
+            .where(
+                CVRevision.cv_id == cv_id,
+                CVRevision.revision >= base,
+                CVRevision.revision <= revision
+            )
+            .order_by(CVRevision.revision.asc())
+        )
+        entries = result.scalars().all()
+        if not entries or entries[-1].revision != revision:
+            return None
+
+        document = None
+        for entry in entries:
+            if entry.kind == "snapshot":
+                document = entry.data
+            else:
+                document = apply_patch(document, entry.data)
+        return document
+
+    async def diff(self, cv_id: int, from_revision: int, to_revision: int) -> Optional[List[Dict[str, Any]]]:
+        """JSON patch that turns one revision into another"""
+        old = await self.get_revision(cv_id, from_revision)
+        new = await self.get_revision(cv_id, to_revision)
+        if old is None or new is None:
+            return None
+        return make_patch(old, new)
+
+
+async def get_cv_revision_service(db: AsyncSession = Depends(get_async_db)) -> CVRevisionService:
+    """Dependency to get CV revision service"""
+    return CVRevisionService(db)
@@ -0,0 +1,111 @@
+"""
+Similarity ranking of stored CVs and job descriptions without LLM calls
+"""
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cv_index import cv_index
+from core.database import get_async_db
+from models.user import CV
+from utils.cv_embedding import decode_embedding, embed_text
+from utils.skill_matcher import match_skills
+
+MAX_TOP_K = 100
+
+
+class CVSearchService:
+    """Ranks CVs against a job description (or job descriptions against a CV) with core/cv_index.py"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _describe(self, hits: list, include_owner: bool = False) -> List[Dict[str, Any]]:
+        """Attach listing columns to (cv_id, score) hits, keeping their order"""
+        if not hits:
+            return []
+        rows = (await self.db.execute(
+            select(CV.id, CV.user_id, CV.name, CV.file_url, CV.completeness_score, CV.updated_at)
+            .where(CV.id.in_([cv_id for cv_id, _ in hits]))
+        )).all()
+        by_id = {row.id: row for row in rows}
+
+        results = []
+        for cv_id, score in hits:
+            row = by_id.get(cv_id)
+            if row is None:  # deleted since the index last synced
+                continue
+            result = {
+                "cv_id": row.id,
+                "score": round(score, 4),
+                "name": row.name,
+                "file_url": row.file_url,
+                "completeness_score": row.completeness_score,
+                "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+            }
+            if include_owner:
+                result["user_id"] = str(row.user_id)
+            results.append(result)
+        return results
+
+    async def rank_cvs(
+        self,
+        job_description: str,
+        top_k: int = 10,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> List[Dict[str, Any]]:
+        """Stored CVs most similar to a job description, all of them or one user's"""
+        await cv_index.refresh(self.db)
+        hits = cv_index.search(embed_text(job_description), min(top_k, MAX_TOP_K), user_id=user_id)
+        return await self._describe(hits, include_owner=user_id is None)
+
+    async def _cv_vector(self, cv_id: int):
+        await cv_index.refresh(self.db)
+        vector = cv_index.vector_of(cv_id)
+        if vector is None:
+            embedding = (await self.db.execute(select(CV.embedding).where(CV.id == cv_id))).scalar_one_or_none()
+            vector = decode_embedding(embedding)
+        return vector
+
+    async def similar_cvs(self, cv_id: int, top_k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """CVs most similar to a stored CV; None if it has no vector"""
+        vector = await self._cv_vector(cv_id)
+        if vector is None:
+            return None
+        hits = cv_index.search(vector, min(top_k, MAX_TOP_K), exclude=cv_id)
+        return await self._describe(hits, include_owner=True)
+
+    async def rank_job_descriptions(self, cv: CV, job_descriptions: List[str], top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Job descriptions ordered by similarity to a stored CV, each with the
+        skills it requires that the CV has and lacks (utils/skill_matcher.py)
+        """
+        vector = await self._cv_vector(cv.id)
+        if vector is None:
+            return []
+        query = cv_index.weighted_query(vector)
+
+        scored = []
+        for position, job_description in enumerate(job_descriptions):
+            job_vector = embed_text(job_description)
+            score = sum(weight * job_vector[j] for j, weight in query.items())
+            scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        results = []
+        for score, position in scored[:min(top_k, MAX_TOP_K)]:
+            skills = match_skills(cv.cv_structure, job_descriptions[position]).resolve()
+            results.append({
+                "index": position,
+                "score": round(score, 4),
+                "matches": skills["matches"],
+                "missing": skills["missing"],
+            })
+        return results
+
+
+async def get_cv_search_service(db: AsyncSession = Depends(get_async_db)) -> CVSearchService:
+    return CVSearchService(db)
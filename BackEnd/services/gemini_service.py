@@ -1,53 +1,127 @@
 import json
-from io import BytesIO
 import os
-import PyPDF2
-from google import genai
 import dotenv
-import re
+from pydantic import BaseModel
+from core.llm_governor import LLMUnavailable, llm_governor
+from core.metrics import metrics
+from core.single_flight import SingleFlight
+from services.llm_backends import backend_from_env, prompt_digest
+from schemas.gemini import (
+    CVDocument, WeaknessSummary, DetailedAnalysis, SkillComparison,
+    JobGapAnalysis, ExperienceAnalysis, JobDescriptionAnalysis
+)
+from utils.jd_prompts import COURSE_RULES, EXPERIENCE_RULES, job_analysis_prompt, skill_terms_block
 from utils.latex_prompt import latex_prompt
-from utils.response_cleaner import response_cleaner
+from utils.pdf_text import pdf_text
+from utils.prompt_serializer import cv_to_prompt_json, cv_to_prompt_text, dumps_prompt_json
+from utils.skill_matcher import match_skills
 from utils.cv_structure import CV_STRUCTURE
 from utils.pdf_field_mapping import filter_recommendations_for_pdf, is_field_used_in_pdf
 
 dotenv.load_dotenv()
 
+# "merged" answers a JD analysis with one Gemini call; "staged" keeps the
+# original three sequential calls (also the fallback when a merged reply fails)
+JD_ANALYSIS_MODE = os.getenv("JD_ANALYSIS_MODE", "merged").lower()
+
+structured_output_total = metrics.counter(
+    "gemini_structured_output_total",
+    "Gemini JSON-mode responses by operation and outcome (ok / parse_failed)"
+)
+prompt_tokens = metrics.histogram(
+    "gemini_prompt_tokens",
+    "Input tokens billed per Gemini call, by operation",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+
+
+# Identical concurrent Gemini requests (double clicks, client retries) share one call
+gemini_single_flight = SingleFlight("gemini")
+
+
+class StructuredOutputError(ValueError):
+    """Gemini returned a response that does not match the requested schema"""
+
+
 class GeminiService:
-    def __init__(self):
-        api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_GEMINI_API_KEY not found in environment variables")
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, backend=None):
+        # LLM_BACKEND selects the real API or the offline replay backend
+        self.backend = backend or backend_from_env()
         self.model_name = "gemini-2.0-flash"
 
-    async def extract_pdf_text(self, pdf_content: bytes) -> dict:
+    async def _generate_json(self, prompt: str, schema: type[BaseModel], operation: str) -> dict:
+        """
+        Call Gemini in JSON mode constrained to `schema` and return the validated
+        result as a plain dict. The request goes through the shared LLM governor,
+        which raises LLMUnavailable (503) when it sheds the call. Raises
+        StructuredOutputError if the reply does not validate; the outcome is
+        counted per operation either way.
+
+        Concurrent calls with the same model, schema and prompt are coalesced
+        into one request; each caller gets its own copy of the result.
+        """
+        key = prompt_digest(self.model_name, schema, prompt)
+        return await gemini_single_flight.do(
+            key, lambda: self._request_json(prompt, schema, operation), operation=operation
+        )
+
+    async def _request_json(self, prompt: str, schema: type[BaseModel], operation: str) -> dict:
+        reply = await llm_governor.call(
+            self.model_name,
+            lambda: self.backend.generate_json(self.model_name, prompt, schema),
+        )
+
+        if reply.prompt_tokens:
+            prompt_tokens.observe(reply.prompt_tokens, operation=operation)
+
+        parsed = reply.parsed
+        if not isinstance(parsed, schema):
+            try:
+                # The SDK swallows validation errors; repeat it to report why
+                parsed = schema.model_validate_json(reply.text or "")
+            except Exception as e:
+                structured_output_total.inc(operation=operation, outcome="parse_failed")
+                print(f"[GEMINI] {operation}: response did not match {schema.__name__}: {e}")
+                raise StructuredOutputError(str(e)) from e
+
+        structured_output_total.inc(operation=operation, outcome="ok")
+        return parsed.model_dump(exclude_none=True)
+
+    async def extract_pdf_text(self, pdf_content) -> dict:
+        """pdf_content may be bytes or a seekable binary file (e.g. a spooled upload)"""
         try:
-            pdf_file = BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            extracted_text = ""
-            for page in pdf_reader.pages:
-                extracted_text += page.extract_text() or ""
+            extracted_text = pdf_text(pdf_content)
+        except Exception as e:
+            return {"error": f"Error processing PDF: {str(e)}"}
+        return await self.extract_cv_structure(extracted_text)
 
+    async def extract_cv_structure(self, extracted_text: str) -> dict:
+        """CV structure from the text of a PDF; {"error": ...} when it cannot be built"""
+        try:
             if not extracted_text.strip():
                 return {"error": "No text could be extracted from the PDF."}
 
             prompt = latex_prompt(extracted_text)
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-            latex_content = response_cleaner(response.text)
-
             try:
-                json_result = json.loads(latex_content)
+                json_result = await self._generate_json(prompt, CVDocument, "extract_pdf_text")
                 standardized_result = self.ensure_cv_structure(json_result)
                 return standardized_result
-            except json.JSONDecodeError as json_err:
-                return {"error": f"Failed to parse API response as JSON: {str(json_err)}", "raw_response": latex_content}
+            except StructuredOutputError as json_err:
+                return {"error": f"Failed to parse API response as JSON: {str(json_err)}"}
 
+        except LLMUnavailable:
+            raise
         except Exception as e:
             return {"error": f"Error processing PDF: {str(e)}"}
     
+    @staticmethod
+    def is_fallback(result) -> bool:
+        """
+        True for placeholder content returned when Gemini failed or its reply
+        could not be parsed; such results must not count against usage quotas
+        """
+        return not isinstance(result, dict) or bool(result.get("is_fallback")) or "error" in result
+
     def ensure_cv_structure(self, data: dict) -> dict:
         """
         Ensures that the CV data conforms to the expected CV_STRUCTURE format.
@@ -63,7 +137,7 @@ class GeminiService:
             
             if "metadata" not in cv_template or not isinstance(cv_template["metadata"], dict):
                 cv_template["metadata"] = expected_structure["metadata"]
-            elif "section_order" not in cv_template["metadata"]:
+            elif not cv_template["metadata"].get("section_order"):
                 cv_template["metadata"]["section_order"] = expected_structure["metadata"]["section_order"]
             
             if "sections" not in cv_template or not isinstance(cv_template["sections"], dict):
@@ -97,7 +171,7 @@ class GeminiService:
             5. Only giving the information that is neccesary, if the section is good enough don't try to improve it
             
             CV Data:
-            {json.dumps(cv_data, indent=2)}
+            {cv_to_prompt_text(cv_data)}
             
             Provide your analysis as a JSON object with these fields:
             1. weaknesses: [List of specific weaknesses found]
@@ -106,29 +180,21 @@ class GeminiService:
             4. required_inputs: [List of specific information to request from the user]
             """
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-            
-            response_text = response.text
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-            
             try:
-                analysis_result = json.loads(response_text)
-                return analysis_result
-            except json.JSONDecodeError:
+                return await self._generate_json(prompt, WeaknessSummary, "analyze_cv_weaknesses")
+            except StructuredOutputError:
                 return {
                     "weaknesses": ["Unable to analyze CV properly"],
                     "missing_information": ["Could not determine missing information"],
                     "improvement_suggestions": ["Review the CV manually"],
-                    "required_inputs": []
+                    "required_inputs": [],
+                    "is_fallback": True
                 }
                 
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            return {"error": f"Error analyzing CV: {str(e)}"}
+            return {"error": f"Error analyzing CV: {str(e)}", "is_fallback": True}
             
     async def generate_detailed_analysis(self, cv_data: dict) -> dict:
         """
@@ -160,7 +226,7 @@ class GeminiService:
             
             DO NOT just check if sections exist - analyze the QUALITY of existing content.
               CV Data:
-            {json.dumps(cv_data, indent=2)}
+            {cv_to_prompt_json(cv_data)}
             
             SPECIFIC ANALYSIS AREAS TO CHECK:
             
@@ -267,28 +333,9 @@ class GeminiService:
             Ensure each recommendation can be directly applied to the CV.
             """
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-            
-            response_text = response.text
-            
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-                
             try:
-                detailed_analysis = json.loads(response_text)
-                if not isinstance(detailed_analysis, dict):
-                    raise ValueError("Response is not a dictionary")
-                    
-                # Ensure required keys exist
-                if "weaknesses" not in detailed_analysis:
-                    detailed_analysis["weaknesses"] = []
-                if "recommendations" not in detailed_analysis:
-                    detailed_analysis["recommendations"] = []
-                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                               # Ensure all recommendations have IDs and are properly categorized
+                detailed_analysis = await self._generate_json(prompt, DetailedAnalysis, "generate_detailed_analysis")
+                # Ensure all recommendations have IDs and are properly categorized
                 for i, rec in enumerate(detailed_analysis["recommendations"]):
                     # Set ID if missing
                     if "id" not in rec or not rec["id"]:
@@ -330,34 +377,10 @@ class GeminiService:
                     else:
                         rec["field"] = str(rec["field"])
                         
-                    if "current" not in rec:
-                        rec["current"] = "empty"
-                    else:
-                        # Convert current content to string representation
-                        current_value = rec["current"]
-                        if isinstance(current_value, dict) or isinstance(current_value, list):
-                            rec["current"] = json.dumps(current_value, indent=2)
-                        elif current_value is None:
-                            rec["current"] = "empty"
-                        else:
-                            rec["current"] = str(current_value)
-                            
-                    if "suggested" not in rec:
-                        rec["suggested"] = ""
-                    else:
-                        # Convert suggested content to string representation  
-                        suggested_value = rec["suggested"]
-                        if isinstance(suggested_value, dict) or isinstance(suggested_value, list):
-                            rec["suggested"] = json.dumps(suggested_value, indent=2)
-                        elif suggested_value is None:
-                            rec["suggested"] = ""
-                        else:
-                            rec["suggested"] = str(suggested_value)
-                            
-                    if "reason" not in rec:
-                        rec["reason"] = "Improves your CV's professional appearance"
-                    else:
-                        rec["reason"] = str(rec["reason"])
+                    # The schema keeps these as strings; only fill in what the model left out
+                    rec["current"] = rec.get("current") or "empty"
+                    rec["suggested"] = rec.get("suggested") or ""
+                    rec["reason"] = rec.get("reason") or "Improves your CV's professional appearance"
                   # Order recommendations by priority: Header → Experience → Education → Projects → Skills → Languages
                 section_priority = {
                     "Header": 1,
@@ -379,7 +402,7 @@ class GeminiService:
                 print(f"[PDF_FILTER] Filtered recommendations count: {len(detailed_analysis['recommendations'])}")
                 
                 return detailed_analysis
-            except json.JSONDecodeError as e:
+            except StructuredOutputError as e:
                 print(f"JSON decode error: {e}")
                 # Provide fallback values if analysis fails
                 return {
@@ -390,9 +413,12 @@ class GeminiService:
                             "severity": "medium"
                         }
                     ],
-                    "recommendations": []
+                    "recommendations": [],
+                    "is_fallback": True
                 }
                 
+        except LLMUnavailable:
+            raise
         except Exception as e:
             print(f"Error generating detailed analysis: {str(e)}")
             import traceback
@@ -400,7 +426,8 @@ class GeminiService:
             return {
                 "error": f"Error analyzing CV: {str(e)}",
                 "weaknesses": [],
-                "recommendations": []
+                "recommendations": [],
+                "is_fallback": True
             }
             
     async def enhance_cv_with_input(self, cv_data: dict, additional_input: dict) -> dict:
@@ -412,10 +439,10 @@ class GeminiService:
             Enhance and improve this CV data using the additional information provided by the user.
             
             Original CV Data:
-            {json.dumps(cv_data, indent=2)}
+            {cv_to_prompt_json(cv_data, keep_links=True)}
             
             Additional User Input:
-            {json.dumps(additional_input, indent=2)}
+            {dumps_prompt_json(additional_input)}
             
             Create an improved CV structure following the Harvard style format.
             Return your response as a valid JSON object matching this structure:
@@ -428,23 +455,18 @@ class GeminiService:
             4. Using action verbs and quantifiable achievements
             """
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-            
-            enhanced_cv = response_cleaner(response.text)
-            
             try:
-                json_result = json.loads(enhanced_cv)
+                json_result = await self._generate_json(prompt, CVDocument, "enhance_cv_with_input")
                 # Ensure the enhanced result conforms to CV_STRUCTURE
                 standardized_result = self.ensure_cv_structure(json_result)
                 return standardized_result
-            except json.JSONDecodeError as json_err:
+            except StructuredOutputError:
                 # If JSON parsing fails, use the original CV data after ensuring it has proper structure
                 standardized_original = self.ensure_cv_structure(cv_data)
                 return standardized_original
                 
+        except LLMUnavailable:
+            raise
         except Exception as e:
             print(f"Error enhancing CV: {str(e)}")
             # In case of any error, return the original CV data with proper structure
@@ -455,188 +477,17 @@ class GeminiService:
         Analyze a CV against a job description to identify gaps, strengths, and learning recommendations.
         This is the main method used by the frontend for job description analysis.
         """        
-        try:            
-            # First get the detailed comparison
-            comparison_result = await self.compare_cv_to_jd_full(cv_data, job_description)
-            
-            # Get experience analysis
-            experience_analysis = await self.analyze_experience_requirements(cv_data, job_description)
-            
-            # Then get the original analysis for missing requirements and courses
-            prompt = f"""
-            You are an expert career counselor and technical recruiter. Analyze the following CV against the provided job description.
-              IMPORTANT: Based on the comparison analysis, the candidate already has these matching skills: {comparison_result.get('matches', [])}
-            Do NOT recommend courses for skills they already possess OR skills covered by their existing cross-platform frameworks.
-            
-            CRITICAL: If candidate has Flutter or React Native, they can develop for iOS and Android PLATFORMS - do NOT recommend iOS/Android platform courses.
-            However, Swift and Kotlin are native programming languages that are different from Flutter and may still be needed.
-            
-            Focus ONLY on missing skills: {comparison_result.get('missing', [])}
-            
-            CRITICAL: When listing missing_requirements, use EXACTLY the same short format as the missing skills above.
-            For example: use "iOS", "Android", "Swift" - NOT "iOS development skills" or "Android development experience"
-            
-            Provide a comprehensive analysis that helps the candidate understand:
-            1. What TECHNICAL requirements they're missing or weak in (focus on the missing technical skills identified)
-            2. Specific TECHNICAL areas where their CV doesn't align with the job requirements
-            3. Targeted learning recommendations ONLY for missing TECHNICAL skills and tools
-            
-            Note: Focus primarily on learnable technical skills. Avoid recommending courses for soft skills, years of experience, or general business competencies.
-            
-            CV Data:
-            {json.dumps(cv_data, indent=2)}
-            
-            Job Description:
-            {job_description}
-              Focus your analysis on:
-            - Technical skills gaps (programming languages, frameworks, tools) - ONLY missing ones
-            - Educational requirements (degrees, certifications) - if they are technical
-            - Platform-specific knowledge - ONLY missing technical platforms/tools
-            
-            DO NOT analyze or recommend courses for:
-            - Years of experience requirements
-            - Soft skills (communication, teamwork, documentation)
-            - General business methodologies (Agile, Scrum) unless they are technical implementations
-            - Professional competencies that cannot be learned through online courses            For course recommendations, ONLY focus on TECHNICAL skills and tools:
-            - Programming languages (Swift, Kotlin, Java, etc.)
-            - Frameworks and libraries (iOS, SwiftUI, React Native, etc.)
-            - Development tools (Xcode, Android Studio, Git, etc.)
-            - Technical methodologies with practical application (Unit Testing, CI/CD)
-            - Platform-specific training (AWS, Google Cloud, Firebase)
-            
-            DO NOT recommend courses for:
-            - Soft skills (communication, teamwork, leadership)
-            - General business skills (project management, documentation)
-            - Experience-based requirements (years of experience)
-            - Non-technical competencies
-            
-            IMPORTANT: Recommend ONLY ONE course per missing skill. Do not provide multiple courses for the same skill.
-            For each missing technical skill, provide the BEST single course recommendation.
-            Prioritize free courses where possible (YouTube, documentation, official tutorials).
-            
-            Provide your response as a JSON object with this structure:
-            {{
-              "missing_requirements": [
-                "ONLY short technical terms (e.g., 'iOS', 'Android', 'Swift', 'Unit Testing', 'Firebase')"
-              ],
-              "weaknesses": [
-                {{
-                  "category": "Skills|Education|Certification",
-                  "description": "Detailed explanation of TECHNICAL weakness and why it matters for this role"
-                }}
-              ],
-              "recommended_courses": [
-                {{
-                  "title": "Specific Course Title",
-                  "platform": "Platform Name (Coursera, Udemy, edX, LinkedIn Learning, YouTube, etc.)",
-                  "url": "Direct course URL or 'Search for: course keywords'",
-                  "reason": "Specific reason why this course addresses a TECHNICAL gap for this job",
-                  "skill_addressed": "Which missing TECHNICAL skill/tool this course addresses",
-                  "estimated_time": "Time commitment (e.g., '4-6 weeks', '20 hours')",
-                  "level": "Beginner|Intermediate|Advanced",
-                  "is_free": true/false
-                }}
-              ]
-            }}
-              CRITICAL FORMATTING RULES:
-            - missing_requirements must contain ONLY short technical terms: "iOS", "Android", "Swift", "Unit Testing"
-            - Do NOT use long descriptions like "iOS development skills" or "Android development experience"
-            - Use the EXACT same format as the comparison results: {comparison_result.get('missing', [])}            - Only include technical skills that can be learned through online courses
-            - Do not include experience requirements, soft skills, or business methodologies
-            - Recommend EXACTLY ONE course per missing skill - no duplicates or multiple options for the same skill
-            - Each course should address a different missing technical skill            
-            - CRITICAL: If candidate has Flutter, do NOT recommend iOS or Android PLATFORM courses as Flutter covers both platforms
-            - CRITICAL: If candidate has React Native, do NOT recommend iOS or Android PLATFORM courses as React Native covers both platforms
-            - NOTE: Swift and Kotlin are native programming languages - they are different from Flutter and may still be needed for native development
-            
-            Make recommendations specific and actionable. Choose the BEST single course option for each skill.
-            REMEMBER: Do not recommend courses for skills the candidate already has: {comparison_result.get('matches', [])}
-            """
-
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
+        try:
+            # Matches and missing skills are computed locally; the model only classifies unknown terms
+            skill_match = match_skills(cv_data, job_description)
+            analysis = None
+            if JD_ANALYSIS_MODE == "merged":
+                analysis = await self._analyze_job_description_merged(cv_data, job_description, skill_match)
+            if analysis is None:
+                analysis = await self._analyze_job_description_staged(cv_data, job_description, skill_match)
+            result, comparison_result, experience_analysis = analysis
 
-            response_text = response.text
-            print(f"[DEBUG] Job Description Analysis Response: {response_text}")
-            
-            # Extract JSON from response
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-                
-            try:
-                result = json.loads(response_text)
-                
-                # Ensure all required keys exist
-                if "missing_requirements" not in result:
-                    result["missing_requirements"] = []
-                if "weaknesses" not in result:
-                    result["weaknesses"] = []
-                if "recommended_courses" not in result:
-                    result["recommended_courses"] = []
-                    
-                # Validate and enhance course recommendations
-                for course in result["recommended_courses"]:
-                    if "title" not in course:
-                        course["title"] = "Course recommendation"
-                    if "platform" not in course:
-                        course["platform"] = "Online platform"
-                    if "url" not in course:
-                        course["url"] = f"Search for: {course['title']}"
-                    if "reason" not in course:
-                        course["reason"] = "Addresses skill gap identified in analysis"
-                    if "skill_addressed" not in course:
-                        course["skill_addressed"] = "General skill improvement"
-                    if "estimated_time" not in course:
-                        course["estimated_time"] = "Variable"
-                    if "level" not in course:
-                        course["level"] = "Intermediate"
-                    if "is_free" not in course:
-                        course["is_free"] = False
-                  # Add comparison data from the full comparison
-                result["matches"] = comparison_result.get("matches", [])
-                result["missing"] = comparison_result.get("missing", [])
-                  # Post-processing: Remove iOS/Android platform courses if Flutter or React Native is present
-                # But keep Swift/Kotlin as they are different native languages
-                cv_skills_text = json.dumps(cv_data).lower()
-                has_flutter = "flutter" in cv_skills_text or "dart" in cv_skills_text
-                has_react_native = "react native" in cv_skills_text or "react-native" in cv_skills_text
-                
-                if has_flutter or has_react_native:
-                    # Filter out ONLY iOS/Android platform courses, keep Swift/Kotlin as they are native languages
-                    result["recommended_courses"] = [
-                        course for course in result["recommended_courses"]
-                        if course.get("skill_addressed", "").lower() not in ["ios", "android"]
-                    ]
-                    
-                    # Remove ONLY iOS/Android platforms from missing requirements, keep Swift/Kotlin
-                    result["missing_requirements"] = [
-                        req for req in result["missing_requirements"]
-                        if req.lower() not in ["ios", "android"]
-                    ]
-                    
-                    # Remove ONLY iOS/Android platforms from missing list, keep Swift/Kotlin
-                    result["missing"] = [
-                        skill for skill in result["missing"]
-                        if skill.lower() not in ["ios", "android"]
-                    ]
-                    
-                    print(f"[DEBUG] Filtered out iOS/Android platform recommendations due to cross-platform framework presence (kept Swift/Kotlin as native languages)")
-                  # Calculate overall grade
-                result["overall_grade"] = self.calculate_cv_grade(
-                    matches=result["matches"],
-                    missing=result["missing"],
-                    missing_requirements=result["missing_requirements"]
-                )
-                
-                # Add experience analysis to the result
-                result["experience_analysis"] = experience_analysis
-                        
-                return result
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error in job description analysis: {e}")
+            if result is None:
                 return {
                     "missing_requirements": ["Unable to parse analysis results"],
                     "weaknesses": [{
@@ -652,9 +503,47 @@ class GeminiService:
                         "score": 20,
                         "feedback": "Unable to properly analyze CV. Please try again.",
                         "color": "#dc2626"
-                    }
+                    },
+                    "is_fallback": True
                 }
-                
+
+            # Schema defaults cover the other course fields
+            for course in result["recommended_courses"]:
+                if "url" not in course:
+                    course["url"] = f"Search for: {course['title']}"
+            # Add comparison data from the full comparison
+            result["matches"] = comparison_result.get("matches", [])
+            result["missing"] = comparison_result.get("missing", [])
+            # Drop model suggestions for skills the CV already covers (e.g. iOS/Android
+            # platform courses when the CV has Flutter; Swift/Kotlin stay as native languages)
+            result["recommended_courses"] = [
+                course for course in result["recommended_courses"]
+                if not skill_match.profile.has(course.get("skill_addressed", ""))
+            ]
+            result["missing_requirements"] = [
+                req for req in result["missing_requirements"]
+                if not skill_match.profile.has(req)
+            ]
+            # Grade from the matcher's lists only: missing_requirements restates
+            # `missing` as model output, so counting it too doubled every gap and
+            # made the score vary between runs
+            result["overall_grade"] = self.calculate_cv_grade(
+                matches=result["matches"],
+                missing=result["missing"],
+                missing_requirements=[]
+            )
+
+            # Add experience analysis to the result
+            result["experience_analysis"] = experience_analysis
+
+            # A stage that fell back leaves the whole analysis incomplete
+            if self.is_fallback(comparison_result) or self.is_fallback(experience_analysis):
+                result["is_fallback"] = True
+
+            return result
+
+        except LLMUnavailable:
+            raise
         except Exception as e:
             print(f"Error in analyze_cv_against_job_description: {str(e)}")
             return {
@@ -668,9 +557,81 @@ class GeminiService:
                     "level": "NOT_RECOMMEND",
                     "score": 0,
                     "feedback": "Analysis failed. Please try again.",
-                    "color": "#dc2626"                }
+                    "color": "#dc2626"                },
+                "is_fallback": True
             }
 
+    async def _analyze_job_description_merged(self, cv_data: dict, job_description: str, skill_match):
+        """
+        One call for skill comparison, experience and course recommendations,
+        sending the CV and job description once. Returns the same
+        (gap result, comparison, experience) triple as the staged path, or None
+        if the reply does not validate so the caller can fall back to it.
+        """
+        prompt = job_analysis_prompt(cv_to_prompt_text(cv_data), job_description, skill_match)
+        try:
+            analysis = await self._generate_json(prompt, JobDescriptionAnalysis, "analyze_job_description")
+        except StructuredOutputError as e:
+            print(f"[GEMINI] Merged job description analysis failed, falling back to staged calls: {e}")
+            return None
+
+        comparison_result = skill_match.resolve({"matches": analysis.pop("matches"), "missing": analysis.pop("missing")})
+        experience_analysis = analysis.pop("experience")
+        return analysis, comparison_result, experience_analysis
+
+    async def _analyze_job_description_staged(self, cv_data: dict, job_description: str, skill_match):
+        """
+        Original staged analysis: comparison, experience, then gaps and
+        courses conditioned on the comparison. The comparison only calls the
+        model when there are unrecognized terms. The gap result is None if the
+        last call fails to parse.
+        """
+        # First get the detailed comparison
+        comparison_result = await self.compare_cv_to_jd_full(cv_data, job_description, skill_match)
+
+        # Get experience analysis
+        experience_analysis = await self.analyze_experience_requirements(cv_data, job_description)
+
+        # Then get the original analysis for missing requirements and courses
+        prompt = f"""
+            You are an expert career counselor and technical recruiter. Analyze the following CV against the provided job description.
+            IMPORTANT: Based on the comparison analysis, the candidate already has these matching skills: {comparison_result.get('matches', [])}
+            Do NOT recommend courses for skills they already possess OR skills covered by their existing cross-platform frameworks.
+
+            CRITICAL: If candidate has Flutter or React Native, they can develop for iOS and Android PLATFORMS - do NOT recommend iOS/Android platform courses.
+            However, Swift and Kotlin are native programming languages that are different from Flutter and may still be needed.
+
+            Focus ONLY on missing skills: {comparison_result.get('missing', [])}
+
+            CRITICAL: When listing missing_requirements, use EXACTLY the same short format as the missing skills above.
+            For example: use "iOS", "Android", "Swift" - NOT "iOS development skills" or "Android development experience"
+
+            Provide a comprehensive analysis that helps the candidate understand:
+            1. What TECHNICAL requirements they're missing or weak in (focus on the missing technical skills identified)
+            2. Specific TECHNICAL areas where their CV doesn't align with the job requirements
+            3. Targeted learning recommendations ONLY for missing TECHNICAL skills and tools
+
+            Note: Focus primarily on learnable technical skills. Avoid recommending courses for soft skills, years of experience, or general business competencies.
+
+            CV Data:
+            {cv_to_prompt_text(cv_data)}
+
+            Job Description:
+            {job_description}
+            {COURSE_RULES}
+            - Use the EXACT same format as the comparison results: {comparison_result.get('missing', [])}
+
+            Make recommendations specific and actionable. Choose the BEST single course option for each skill.
+            REMEMBER: Do not recommend courses for skills the candidate already has: {comparison_result.get('matches', [])}
+            """
+
+        try:
+            result = await self._generate_json(prompt, JobGapAnalysis, "analyze_cv_against_job_description")
+        except StructuredOutputError as e:
+            print(f"JSON decode error in job description analysis: {e}")
+            result = None
+        return result, comparison_result, experience_analysis
+
     def calculate_cv_grade(self, matches: list, missing: list, missing_requirements: list) -> dict:
         """
         Calculate overall CV grade based on matches and missing items only.
@@ -725,31 +686,12 @@ class GeminiService:
             You are an expert HR recruiter specializing in experience evaluation. Analyze the candidate's work experience against the job description requirements.
             
             CV Data:
-            {json.dumps(cv_data, indent=2)}
+            {cv_to_prompt_text(cv_data)}
             
             Job Description:
             {job_description}
             
-            ANALYSIS REQUIREMENTS:
-            1. Calculate total years of professional experience from the CV
-            2. Identify minimum years of experience required by the job (if mentioned)
-            3. Identify specific experience requirements (e.g., "3+ years with React", "Senior level", "Team lead experience")
-            4. Determine seniority level expected (Junior, Mid-level, Senior, Lead, etc.)
-            5. Analyze experience gaps or strengths
-            6. Note any special experience requirements (management, specific industries, etc.)
-            
-            EXPERIENCE CALCULATION RULES:
-            - Count only professional work experience (exclude internships unless specified)
-            - Calculate years from start_date to end_date for each role
-            - For current roles, calculate until present date (2025)
-            - Round to nearest year for total experience
-            
-            SENIORITY LEVEL MAPPING:
-            - 0-2 years: Junior
-            - 2-5 years: Mid-level  
-            - 5-8 years: Senior
-            - 8+ years: Lead/Principal
-            
+            {EXPERIENCE_RULES}
             Provide your response as a JSON object:
             {{
               "candidate_total_experience": {{
@@ -790,48 +732,9 @@ class GeminiService:
             Focus on providing actionable insights about experience alignment and gaps.
             """
             
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-            
-            response_text = response.text
-            print(f"[DEBUG] Experience Analysis Response: {response_text}")
-            
-            # Extract JSON from response
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-                
             try:
-                result = json.loads(response_text)
-                
-                # Ensure all required keys exist with defaults
-                if "candidate_total_experience" not in result:
-                    result["candidate_total_experience"] = {"years": 0, "months": 0, "level": "Junior"}
-                if "job_requirements" not in result:
-                    result["job_requirements"] = {
-                        "minimum_years": 0,
-                        "preferred_years": 0, 
-                        "seniority_level": "Not specified",
-                        "specific_requirements": [],
-                        "special_requirements": []
-                    }
-                if "experience_analysis" not in result:
-                    result["experience_analysis"] = {
-                        "meets_minimum": True,
-                        "experience_gap_years": 0,
-                        "level_match": "Unknown",
-                        "strengths": [],
-                        "gaps": [],
-                        "recommendations": []
-                    }
-                if "notable_requirements" not in result:
-                    result["notable_requirements"] = []
-                
-                return result
-                
-            except json.JSONDecodeError as e:
+                return await self._generate_json(prompt, ExperienceAnalysis, "analyze_experience_requirements")
+            except StructuredOutputError as e:
                 print(f"JSON decode error in experience analysis: {e}")
                 return {
                     "candidate_total_experience": {"years": 0, "months": 0, "level": "Unknown"},
@@ -850,9 +753,12 @@ class GeminiService:
                         "gaps": ["Unable to analyze experience requirements"],
                         "recommendations": ["Please review experience requirements manually"]
                     },
-                    "notable_requirements": ["Unable to extract experience requirements"]
+                    "notable_requirements": ["Unable to extract experience requirements"],
+                    "is_fallback": True
                 }
                 
+        except LLMUnavailable:
+            raise
         except Exception as e:
             print(f"Error in experience analysis: {str(e)}")
             return {
@@ -873,99 +779,48 @@ class GeminiService:
                     "gaps": ["Experience analysis failed"],
                     "recommendations": ["Please review manually"]
                 },
-                "notable_requirements": []
+                "notable_requirements": [],
+                "is_fallback": True
             }
         
-    async def compare_cv_to_jd_full(self, cv_data: dict, job_description: str) -> dict:
+    async def compare_cv_to_jd_full(self, cv_data: dict, job_description: str, skill_match=None) -> dict:
         """
         Compare the CV to a job description and return matches and missing skills only.
-        This simplified analysis focuses on only two categories for better user experience.
+        Skills are matched locally (utils/skill_matcher.py); Gemini is asked only
+        to classify job description terms the skill taxonomy does not know.
         """
+        skill_match = skill_match or match_skills(cv_data, job_description)
+        if not skill_match.unrecognized:
+            return skill_match.resolve()
+
         try:
             prompt = f"""
-            You are a professional career advisor and CV reviewer with deep technical knowledge. Compare the following CV data to the provided job description. Identify:
-            1. What the CV already has for the job description (matches) - return ONLY concise skill names
-            2. What is missing (required by the job description, not in the CV) - return ONLY concise skill names
+            You are a technical recruiter. Compare the CV to the job description for the terms below.
 
             CV Data:
-            {json.dumps(cv_data, indent=2)}
+            {cv_to_prompt_text(cv_data)}
 
             Job Description:
             {job_description}
 
-            CRITICAL TECHNICAL KNOWLEDGE - Apply these rules when analyzing:
-            1. Flutter/Dart - This is a cross-platform mobile framework that develops for BOTH iOS and Android PLATFORMS
-               - If CV has Flutter, DO NOT mark "iOS" or "Android" as missing UNLESS job specifically requires native development
-               - Flutter SATISFIES mobile platform requirements for both iOS and Android
-               - However, Swift and Kotlin are NATIVE programming languages and are DIFFERENT from Flutter
-            2. React Native - Also covers both iOS and Android PLATFORMS
-               - If CV has React Native, DO NOT mark "iOS" or "Android" as missing
-               - However, Swift and Kotlin are still separate native languages
-            3. Native Programming Languages vs Platforms:
-               - iOS/Android = PLATFORMS (covered by Flutter/React Native)
-               - Swift = NATIVE iOS programming language (different from Flutter)
-               - Kotlin = NATIVE Android programming language (different from Flutter)
-               - Even with Flutter, Swift/Kotlin may be needed for native features
-            4. Cross-platform frameworks are excellent for most mobile development roles
-            5. Web frameworks (React, Vue, Angular) can transfer to mobile development
-
-            STRICT ANALYSIS RULES:
-            - Cross-platform frameworks (Flutter, React Native) SATISFY PLATFORM requirements (iOS, Android)
-            - Swift and Kotlin are native languages - treat them separately from platform coverage
-            - Only mark iOS/Android platforms as missing if job explicitly requires native development AND candidate lacks ANY mobile framework
-            - If candidate has Flutter or React Native, they can develop for both iOS and Android
-            - Prioritize cross-platform skills over platform-specific skills
-            - Don't create artificial skill gaps when broader skills exist
-            - ONLY include skills that are EXPLICITLY required by the job description in the missing array
-            - Do NOT include skills that are nice-to-have or not mentioned in the job description
-
-            IMPORTANT: For matches and missing arrays, return ONLY short technical skill names like:
-            - "Flutter", "iOS", "SwiftUI", "Swift", "React", "Python", "MySQL", "Firebase", "Git", "Docker", etc.
-            - Do NOT include long descriptions or explanations
-            - Do NOT include soft skills like "Agile", "Scrum", "Jira", "Confluence", "Communication"
-            - Focus ONLY on programming languages, frameworks, libraries, and development tools
-            - Do NOT include business methodologies or project management tools
-
-            Provide your response as a JSON object with the following structure:
-            {{
-              "matches": [
-                "Flutter", "Git"
-              ],
-              "missing": [
-                "Swift", "Kotlin"
-              ]
-            }}
+            {skill_terms_block(skill_match)}
             """
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-
-            response_text = response.text
-            print(response_text)
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-
             try:
-                result = json.loads(response_text)
-                if "matches" not in result:
-                    result["matches"] = []
-                if "missing" not in result:
-                    result["missing"] = []
-                # Remove not_needed category - only return matches and missing
-                return result
-            except json.JSONDecodeError:
-                return {
-                    "matches": [],
-                    "missing": []
-                }
+                classified = await self._generate_json(prompt, SkillComparison, "compare_cv_to_jd_full")
+            except StructuredOutputError as e:
+                # The local comparison stands; only the unknown terms stay unclassified
+                print(f"[GEMINI] compare_cv_to_jd_full: could not classify {skill_match.unrecognized}: {e}")
+                classified = None
+            return skill_match.resolve(classified)
+        except LLMUnavailable:
+            raise
         except Exception as e:
             return {
                 "error": f"Error comparing CV to JD: {str(e)}",
                 "matches": [],
-                "missing": []
+                "missing": [],
+                "is_fallback": True
             }
 
 gemini_service = GeminiService()
@@ -0,0 +1,187 @@
+"""
+Match one job description against all of a user's stored CVs.
+
+A local pass ranks every CV without LLM calls (skill coverage from
+utils/skill_matcher.py, then vector similarity from utils/cv_embedding.py);
+only the top-k then get the full Gemini analysis, run concurrently with a
+bound and reported as each one finishes.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List
+
+import anyio
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from core.cv_index import cv_index
+from core.database import AsyncSessionLocal, get_async_db
+from models.subscription import AnalysisType
+from models.user import CV
+from services.subscription_service import SubscriptionService, job_analysis_history_fields
+from utils.cv_embedding import decode_embedding, embed_text
+from utils.skill_matcher import match_skills
+
+# Deep analyses of one request running at the same time (the LLM governor
+# still bounds the process as a whole)
+BULK_JD_CONCURRENCY = int(os.getenv("BULK_JD_CONCURRENCY", 3))
+BULK_JD_MAX_DEEP = int(os.getenv("BULK_JD_MAX_DEEP", 10))
+BULK_JD_MAX_CVS = int(os.getenv("BULK_JD_MAX_CVS", 200))
+
+
+class JobMatchService:
+    """Local pre-ranking of a user's CVs and streamed deep analysis of the best ones"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def prerank(self, gemini_service, user_id: uuid.UUID, job_description: str) -> List[Dict[str, Any]]:
+        """
+        Every stored CV of the user with a structure, best first. Each entry
+        has the local skill matches/missing, the grade they give and the
+        vector similarity; the CV structure is kept under "cv_structure".
+        """
+        result = await self.db.execute(
+            select(CV)
+            .options(undefer(CV.cv_structure), undefer(CV.embedding))
+            .where(CV.user_id == user_id, CV.has_structure.is_(True))
+            .order_by(CV.updated_at.desc())
+            .limit(BULK_JD_MAX_CVS)
+        )
+        cvs = result.scalars().all()
+        # IDF weights come from the shared index when it is loaded; uniform otherwise
+        query = cv_index.weighted_query(embed_text(job_description))
+
+        ranking = []
+        for cv in cvs:
+            skills = match_skills(cv.cv_structure, job_description).resolve()
+            grade = gemini_service.calculate_cv_grade(skills["matches"], skills["missing"], [])
+            vector = decode_embedding(cv.embedding)
+            similarity = sum(weight * vector[j] for j, weight in query.items()) if vector is not None else 0.0
+            ranking.append({
+                "cv_id": cv.id,
+                "name": cv.name,
+                "local_score": grade["score"],
+                "similarity": round(similarity, 4),
+                "matches": skills["matches"],
+                "missing": skills["missing"],
+                "cv_structure": cv.cv_structure,
+            })
+
+        ranking.sort(key=lambda entry: (-entry["local_score"], -entry["similarity"], entry["cv_id"]))
+        for rank, entry in enumerate(ranking, 1):
+            entry["rank"] = rank
+        return ranking
+
+    @staticmethod
+    async def _analyze(gemini_service, user_id: uuid.UUID, entry: dict, job_description: str) -> Dict[str, Any]:
+        """Full analysis of one CV (already charged by stream_analyses), saved to history like the single-CV route"""
+        event = {"cv_id": entry["cv_id"], "rank": entry["rank"], "name": entry["name"]}
+        job_analysis = await gemini_service.analyze_cv_against_job_description(
+            entry["cv_structure"], job_description
+        )
+        # Each analysis runs concurrently with the others, so it needs its own session
+        async with AsyncSessionLocal() as session:
+            await SubscriptionService(session).save_analysis_result(
+                user_id=user_id,
+                cv_id=entry["cv_id"],
+                analysis_type=AnalysisType.JOB_DESCRIPTION_ANALYSIS,
+                analysis_data=job_analysis_history_fields(job_analysis),
+                job_description=job_description,
+            )
+        return {"event": "analysis", **event, "job_analysis": job_analysis}
+
+    @staticmethod
+    async def _charge(user_id: uuid.UUID, count: int) -> None:
+        """Add count job analyses to the user's usage (negative to hand reservations back)"""
+        async with AsyncSessionLocal() as session:
+            await SubscriptionService(session).increment_usage(user_id, "job_analysis", count)
+
+    async def stream_analyses(
+        self,
+        gemini_service,
+        user_id: uuid.UUID,
+        ranking: List[Dict[str, Any]],
+        job_description: str,
+        top_k: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the ranking, then one event per deep analysis of the top_k CVs
+        in completion order, then a summary. Failures are reported per CV.
+
+        The analyses are reserved up front (SubscriptionService.reserve_usage),
+        at most as many as the user's quota has left, and CVs past that are
+        skipped; analyses that fail, fall back or are cancelled by a
+        disconnect are handed back at the end.
+        """
+        started = time.perf_counter()
+        selected = ranking[:min(top_k, BULK_JD_MAX_DEEP)]
+        async with AsyncSessionLocal() as session:
+            reserved = await SubscriptionService(session).reserve_usage(user_id, "job_analysis", len(selected))
+        charged = selected[:reserved]
+
+        semaphore = asyncio.Semaphore(BULK_JD_CONCURRENCY)
+        counts = {"analysis": 0, "error": 0, "skipped": 0}
+        tasks: List[asyncio.Task] = []
+        used = 0
+
+        async def run(entry):
+            nonlocal used
+            async with semaphore:
+                try:
+                    event = await self._analyze(gemini_service, user_id, entry, job_description)
+                except Exception as e:
+                    status_code = getattr(e, "status_code", 500)
+                    detail = getattr(e, "detail", None) or str(e)
+                    print(f"[BULK_JD] Analysis of CV {entry['cv_id']} failed: {detail}")
+                    return {"event": "error", "cv_id": entry["cv_id"], "rank": entry["rank"],
+                            "status_code": status_code, "detail": detail}
+                if not gemini_service.is_fallback(event["job_analysis"]):
+                    used += 1
+                return event
+
+        try:
+            yield {
+                "event": "ranking",
+                "total_cvs": len(ranking),
+                "deep_analysis": [entry["cv_id"] for entry in charged],
+                "ranking": [{k: v for k, v in entry.items() if k != "cv_structure"} for entry in ranking],
+            }
+            for entry in selected[len(charged):]:
+                counts["skipped"] += 1
+                yield {"event": "skipped", "cv_id": entry["cv_id"], "rank": entry["rank"], "name": entry["name"],
+                       "reason": "usage_limit"}
+
+            # Tasks copy the current context, so the request's LLM lane applies to them
+            tasks = [asyncio.create_task(run(entry)) for entry in charged]
+            for next_done in asyncio.as_completed(tasks):
+                event = await next_done
+                counts[event["event"]] += 1
+                yield event
+        finally:
+            # The client went away: stop the analyses nobody will read
+            for task in tasks:
+                task.cancel()
+            if len(charged) > used:
+                # On a disconnect this runs in the cancelled request task; shield the hand-back
+                with anyio.CancelScope(shield=True):
+                    try:
+                        await self._charge(user_id, used - len(charged))
+                    except Exception as e:
+                        print(f"[BULK_JD] Could not hand back {len(charged) - used} job analyses: {e}")
+
+        yield {
+            "event": "done",
+            "analyzed": counts["analysis"],
+            "failed": counts["error"],
+            "skipped": counts["skipped"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+async def get_job_match_service(db: AsyncSession = Depends(get_async_db)) -> JobMatchService:
+    return JobMatchService(db)
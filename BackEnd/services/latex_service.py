@@ -1,10 +1,10 @@
-import os
 import uuid
+from typing import Optional
 from fastapi import HTTPException
-from utils.json_to_latex import json_to_latex
-
-LATEX_OUTPUT_DIR = "output_tex_files"
-os.makedirs(LATEX_OUTPUT_DIR, exist_ok=True)
+from core.artifacts import artifact_store
+from core.latex_cache import latex_fragment_cache
+from utils.json_to_latex import HARVARD, LatexTemplate, json_to_latex
+from utils.latex_templates import DEFAULT_TEMPLATE, get_template
 
 def sanitize_filename(name: str) -> str:
     """Removes potentially unsafe characters for filenames."""
@@ -15,9 +15,42 @@ def sanitize_filename(name: str) -> str:
     name = re.sub(r'[^\w\-]+', '', name)
     return name if name else "cv_output"
 
-def convert_to_latex_service(cv_data: dict) -> dict:
+def select_template(name: Optional[str], custom_templates: bool) -> LatexTemplate:
+    """The requested template (the default one when None) if the plan includes it"""
+    template = get_template(name or DEFAULT_TEMPLATE)
+    if template is None:
+        raise HTTPException(status_code=400, detail=f"Unknown CV template: {name}")
+    if template.premium and not custom_templates:
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "message": f"The {template.title} template needs a plan with custom templates.",
+                "upgrade_required": True
+            }
+        )
+    return template
+
+def template_for_cv(requested: Optional[str], stored: Optional[str], custom_templates: bool) -> LatexTemplate:
+    """
+    Template for re-rendering a stored CV: the requested one, otherwise the
+    one it was last rendered with, or the default when that one is unknown or
+    no longer in the plan
+    """
+    if requested:
+        return select_template(requested, custom_templates)
+    template = get_template(stored) if stored else None
+    if template is None or (template.premium and not custom_templates):
+        return get_template(DEFAULT_TEMPLATE)
+    return template
+
+def convert_to_latex_service(cv_data: dict, template: LatexTemplate = HARVARD, save: bool = True) -> dict:
+    """The CV as LaTeX; with save, also written to its own artifact job for /convert-tex-to-pdf"""
     try:
-        latex_code = json_to_latex(cv_data)
+        # Sections and entries unchanged since an earlier render (e.g. before an edit) come from the cache
+        latex_code = json_to_latex(cv_data, template, fragment_cache=latex_fragment_cache)
+        response_data = {"latex": latex_code, "template": template.name}
+        if not save:
+            return response_data
 
         base_filename = "cv_output"
         try:
@@ -29,17 +62,18 @@ def convert_to_latex_service(cv_data: dict) -> dict:
 
         unique_id = uuid.uuid4()
         filename = f"{base_filename}_{unique_id}.tex"
-        filepath = os.path.join(LATEX_OUTPUT_DIR, filename)
+        filepath = artifact_store.create(filename)
 
         try:
             with open(filepath, "w", encoding="utf-8") as f:
                 f.write(latex_code)
             print(f"LaTeX file saved successfully to: {filepath}")
+            artifact_store.release(filepath)
         except IOError as io_err:
             print(f"Error saving LaTeX file to {filepath}: {io_err}")
+            artifact_store.release(filepath, keep=False)
             filepath = None
 
-        response_data = {"latex": latex_code}
         if filepath:
             response_data["saved_filepath_server"] = filepath
 
@@ -0,0 +1,247 @@
+"""
+Model backends for GeminiService.
+
+GeminiService builds prompts and post-processes results; the backend only
+turns (model, prompt, response schema) into a reply. Backends:
+
+* GeminiBackend    - the real API through the google-genai SDK (default)
+* RecordingBackend - wraps another backend and appends every reply to a
+                     JSONL file, to capture realistic responses once
+* ReplayBackend    - offline stand-in that replays recorded replies (or
+                     synthesizes schema-valid ones) with configurable latency,
+                     error rate and malformed output, for load tests and CI
+
+The backend is chosen with LLM_BACKEND=gemini|replay (see backend_from_env).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import typing
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+@dataclass
+class LLMReply:
+    """Raw reply text, the SDK-validated object if any, and billed input tokens"""
+    text: str
+    parsed: Optional[BaseModel] = None
+    prompt_tokens: Optional[int] = None
+
+
+def prompt_digest(model: str, schema: type, prompt: str) -> str:
+    return hashlib.sha256(
+        f"{model}\0{schema.__module__}.{schema.__qualname__}\0{prompt}".encode("utf-8")
+    ).hexdigest()
+
+
+class GeminiBackend:
+    """google-genai client, created (and the SDK imported) on first use"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            if not self._api_key:
+                raise ValueError("GOOGLE_GEMINI_API_KEY not found in environment variables")
+            from google import genai
+            self._client = genai.Client(api_key=self._api_key)
+        return self._client
+
+    async def generate_json(self, model: str, prompt: str, schema: type[BaseModel]) -> LLMReply:
+        from google.genai import types
+
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=schema,
+            ),
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return LLMReply(
+            text=response.text or "",
+            parsed=response.parsed if isinstance(response.parsed, BaseModel) else None,
+            prompt_tokens=usage.prompt_token_count if usage is not None else None,
+        )
+
+
+class RecordingBackend:
+    """Pass-through that appends each reply to `path` for later replay"""
+
+    name = "recording"
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+
+    async def generate_json(self, model: str, prompt: str, schema: type[BaseModel]) -> LLMReply:
+        reply = await self.inner.generate_json(model, prompt, schema)
+        record = {
+            "schema": schema.__name__,
+            "prompt_sha256": prompt_digest(model, schema, prompt),
+            "prompt_tokens": reply.prompt_tokens,
+            "text": reply.text,
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return reply
+
+
+class FakeAPIError(Exception):
+    """Injected failure; `code` is an HTTP status like the SDK's APIError"""
+
+    def __init__(self, code: int, message: str = "injected failure"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class LatencyModel:
+    """
+    Latency distribution in milliseconds, parsed from a spec:
+    "constant:200", "uniform:100:400" or "lognormal:800:0.5" (median, sigma)
+    """
+
+    def __init__(self, spec: str = "constant:0", rng: Optional[random.Random] = None):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.rng = rng or random.Random()
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample_ms(self) -> float:
+        if self.kind == "constant":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return self.rng.lognormvariate(0, sigma) * median
+
+
+def example_instance(schema: type[BaseModel]) -> dict:
+    """Smallest schema-valid reply: defaults where given, empty values otherwise"""
+    value = {}
+    for name, field in schema.model_fields.items():
+        if not field.is_required():
+            continue
+        value[name] = _example_value(field.annotation)
+    return schema.model_validate(value).model_dump(exclude_none=True)
+
+
+def _example_value(annotation):
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        return []
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _example_value(args[0]) if args else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return example_instance(annotation)
+    return {str: "", int: 0, float: 0.0, bool: False}.get(annotation)
+
+
+class ReplayBackend:
+    """
+    Offline backend. Replies come from, in order of preference: a recording
+    of the exact same prompt, any recording for the same schema (round robin),
+    or a synthesized minimal valid instance. Each call sleeps for a sampled
+    latency, then fails with probability `error_rate` (503/429) or returns
+    truncated JSON with probability `malformed_rate`.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        recordings_path: Optional[str] = None,
+        latency: str = "constant:0",
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.by_prompt: Dict[str, str] = {}
+        self.by_schema: Dict[str, List[str]] = {}
+        self._cursor: Dict[str, int] = {}
+        self.calls = 0
+        if recordings_path:
+            self.load(recordings_path)
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self.add(record["schema"], record["text"], record.get("prompt_sha256"))
+
+    def add(self, schema_name: str, text: str, prompt_sha256: Optional[str] = None) -> None:
+        if prompt_sha256:
+            self.by_prompt[prompt_sha256] = text
+        self.by_schema.setdefault(schema_name, []).append(text)
+
+    def _reply_text(self, model: str, prompt: str, schema: type[BaseModel]) -> str:
+        exact = self.by_prompt.get(prompt_digest(model, schema, prompt))
+        if exact is not None:
+            return exact
+        recorded = self.by_schema.get(schema.__name__)
+        if recorded:
+            index = self._cursor.get(schema.__name__, 0)
+            self._cursor[schema.__name__] = index + 1
+            return recorded[index % len(recorded)]
+        return json.dumps(example_instance(schema))
+
+    async def generate_json(self, model: str, prompt: str, schema: type[BaseModel]) -> LLMReply:
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample_ms() / 1000)
+
+        if self.rng.random() < self.error_rate:
+            raise FakeAPIError(self.rng.choice((503, 429)))
+
+        text = self._reply_text(model, prompt, schema)
+        prompt_tokens = len(prompt) // 4
+        if self.rng.random() < self.malformed_rate:
+            return LLMReply(text=text[: len(text) // 2], prompt_tokens=prompt_tokens)
+        return LLMReply(text=text, parsed=schema.model_validate_json(text), prompt_tokens=prompt_tokens)
+
+
+def backend_from_env():
+    """
+    LLM_BACKEND=gemini (default) or replay. Replay options:
+    LLM_REPLAY_RECORDINGS (JSONL from RecordingBackend), LLM_REPLAY_LATENCY
+    (e.g. "lognormal:800:0.5"), LLM_REPLAY_ERROR_RATE, LLM_REPLAY_MALFORMED_RATE,
+    LLM_REPLAY_SEED. LLM_RECORD_PATH records replies of the chosen backend.
+    """
+    kind = os.getenv("LLM_BACKEND", "gemini").lower()
+    if kind == "replay":
+        seed = os.getenv("LLM_REPLAY_SEED")
+        backend = ReplayBackend(
+            recordings_path=os.getenv("LLM_REPLAY_RECORDINGS") or None,
+            latency=os.getenv("LLM_REPLAY_LATENCY", "constant:0"),
+            error_rate=float(os.getenv("LLM_REPLAY_ERROR_RATE", 0)),
+            malformed_rate=float(os.getenv("LLM_REPLAY_MALFORMED_RATE", 0)),
+            seed=int(seed) if seed else None,
+        )
+    elif kind == "gemini":
+        backend = GeminiBackend(os.getenv("GOOGLE_GEMINI_API_KEY"))
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {kind}")
+
+    record_path = os.getenv("LLM_RECORD_PATH")
+    if record_path:
+        backend = RecordingBackend(backend, record_path)
+    return backend
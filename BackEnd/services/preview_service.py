@@ -0,0 +1,227 @@
+"""
+Live CV preview: structure edits in, PDFs out, nothing uploaded or stored.
+
+A PreviewSession belongs to one WebSocket (routes/preview_routes.py). Each
+edit replaces or patches the session's CV structure and restarts a
+PREVIEW_DEBOUNCE_MS timer; only when the timer runs out is the structure
+rendered (through the LaTeX fragment cache, so an edit costs the entries it
+touched) and compiled in the session's scratch directory, or typeset in
+process with PDF_BACKEND=direct (core/direct_pdf.py). An edit arriving
+while a compile runs cancels it and kills its pdflatex: only the latest
+structure is worth a PDF. A compile holds one of the user's
+PREVIEW_COMPILES_PER_USER slots, shared by all their sessions, and one of
+PREVIEW_MAX_COMPILES for the process; a user has at most
+PREVIEW_SESSIONS_PER_USER sessions open.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from core.direct_pdf import render_direct
+from core.latex_cache import latex_fragment_cache
+from core.latex_formats import LATEX_TIMEOUT_SECONDS, latex_formats
+from core.metrics import metrics
+from utils.json_to_latex import LatexTemplate, json_to_latex
+
+PREVIEW_DEBOUNCE_MS = int(os.getenv("PREVIEW_DEBOUNCE_MS", "400"))
+PREVIEW_COMPILES_PER_USER = int(os.getenv("PREVIEW_COMPILES_PER_USER", "1"))
+PREVIEW_MAX_COMPILES = int(os.getenv("PREVIEW_MAX_COMPILES", str(os.cpu_count() or 1)))
+PREVIEW_SESSIONS_PER_USER = int(os.getenv("PREVIEW_SESSIONS_PER_USER", "3"))
+# A session without a message for this long is closed
+PREVIEW_IDLE_SECONDS = int(os.getenv("PREVIEW_IDLE_SECONDS", "900"))
+PREVIEW_MAX_MESSAGE_BYTES = int(os.getenv("PREVIEW_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+# Parent of the per-session scratch directories (the system temp dir when unset)
+PREVIEW_SCRATCH_DIR = os.getenv("PREVIEW_SCRATCH_DIR") or None
+
+preview_sessions = metrics.gauge("preview_sessions", "Open live preview sessions")
+preview_compiles = metrics.counter("preview_compiles_total", "Live preview compiles by outcome")
+preview_compile_duration = metrics.histogram("preview_compile_duration_seconds", "Live preview render and compile time")
+
+# Sends a message to the client: a JSON-serializable dict, then the PDF bytes if any
+SendPreview = Callable[[dict, Optional[bytes]], Awaitable[None]]
+
+
+class PreviewError(Exception):
+    """A preview that could not be compiled; the message is shown to the client"""
+
+
+class PreviewLimiter:
+    """Open preview sessions and compile slots per user"""
+
+    def __init__(self, sessions_per_user: int = PREVIEW_SESSIONS_PER_USER,
+                 compiles_per_user: int = PREVIEW_COMPILES_PER_USER, max_compiles: int = PREVIEW_MAX_COMPILES):
+        self.sessions_per_user = sessions_per_user
+        self.compiles_per_user = compiles_per_user
+        self._sessions: Dict[uuid.UUID, int] = {}
+        self._user_slots: Dict[uuid.UUID, asyncio.Semaphore] = {}
+        self._slots = asyncio.Semaphore(max_compiles)
+
+    def open(self, user_id: uuid.UUID) -> bool:
+        """Count a new session of the user; False when they already have the maximum"""
+        sessions = self._sessions.get(user_id, 0)
+        if sessions >= self.sessions_per_user:
+            return False
+        if not sessions:
+            self._user_slots[user_id] = asyncio.Semaphore(self.compiles_per_user)
+        self._sessions[user_id] = sessions + 1
+        preview_sessions.inc()
+        return True
+
+    def close(self, user_id: uuid.UUID) -> None:
+        sessions = self._sessions.get(user_id, 0) - 1
+        if sessions > 0:
+            self._sessions[user_id] = sessions
+        else:
+            self._sessions.pop(user_id, None)
+            self._user_slots.pop(user_id, None)
+        preview_sessions.dec()
+
+    @asynccontextmanager
+    async def compile_slot(self, user_id: uuid.UUID):
+        async with self._user_slots[user_id]:
+            async with self._slots:
+                yield
+
+
+preview_limiter = PreviewLimiter()
+
+
+async def _run_pdflatex(argv: list, env: Optional[dict] = None) -> None:
+    """Run pdflatex, killing it when the run is cancelled or times out"""
+    process = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL, env=env
+    )
+    try:
+        await asyncio.wait_for(process.wait(), LATEX_TIMEOUT_SECONDS)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+
+def _read_pdf(pdf_path: str) -> Optional[bytes]:
+    if not os.path.exists(pdf_path):
+        return None
+    with open(pdf_path, "rb") as f:
+        return f.read() or None
+
+
+async def compile_preview(latex_code: str, workdir: str, stem: str) -> bytes:
+    """PDF of latex_code compiled in workdir; the files of the run are removed afterwards"""
+    pdf = render_direct(latex_code)
+    if pdf is not None:
+        return pdf
+    if shutil.which("pdflatex") is None:
+        raise PreviewError("PDF compiler not available on this server")
+    tex_path = os.path.join(workdir, f"{stem}.tex")
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(latex_code)
+    try:
+        run = latex_formats.prepare(tex_path, latex_code)
+        if run is not None:
+            started = time.perf_counter()
+            try:
+                await _run_pdflatex(run.argv, run.env)
+            except asyncio.TimeoutError:
+                pass
+            if latex_formats.finish(run, time.perf_counter() - started):
+                return _read_pdf(run.pdf_path)
+
+        try:
+            await _run_pdflatex(["pdflatex", "-interaction=nonstopmode", "-halt-on-error",
+                                 f"-output-directory={workdir}", tex_path])
+        except asyncio.TimeoutError:
+            raise PreviewError("Compiling the preview took too long")
+        pdf = _read_pdf(os.path.join(workdir, f"{stem}.pdf"))
+        if pdf is None:
+            raise PreviewError("The CV could not be compiled to PDF")
+        return pdf
+    finally:
+        for filename in os.listdir(workdir):
+            if filename.startswith(f"{stem}."):
+                os.remove(os.path.join(workdir, filename))
+
+
+class PreviewSession:
+    """The CV structure being previewed over one connection, and its pending compile"""
+
+    def __init__(self, user_id: uuid.UUID, template: LatexTemplate, send: SendPreview,
+                 limiter: PreviewLimiter = preview_limiter, debounce_ms: int = PREVIEW_DEBOUNCE_MS):
+        self.user_id = user_id
+        self.template = template
+        self.structure: Optional[dict] = None
+        self.version = 0
+        self._send = send
+        self._limiter = limiter
+        self._debounce = debounce_ms / 1000
+        self._task: Optional[asyncio.Task] = None
+        # Whether _task has its PDF and is sending it; cancelling then could split the header from the bytes
+        self._sending = False
+        self._workdir = tempfile.mkdtemp(prefix="cv-preview-", dir=PREVIEW_SCRATCH_DIR)
+
+    def submit(self, structure: dict, template: Optional[LatexTemplate] = None) -> int:
+        """
+        Preview structure (with template, if given) once no further edit
+        arrives within the debounce interval; supersedes the pending or
+        running compile (a PDF already being sent is still delivered).
+        Returns the version the PDF will carry
+        """
+        self.structure = structure
+        if template is not None:
+            self.template = template
+        self.version += 1
+        if self._task is not None and not self._task.done() and not self._sending:
+            self._task.cancel()
+        self._sending = False
+        self._task = asyncio.create_task(self._preview(self.version, structure, self.template))
+        return self.version
+
+    async def _preview(self, version: int, structure: dict, template: LatexTemplate) -> None:
+        await asyncio.sleep(self._debounce)
+        started = None
+        try:
+            async with self._limiter.compile_slot(self.user_id):
+                started = time.perf_counter()
+                latex_code = json_to_latex(structure, template, fragment_cache=latex_fragment_cache)
+                pdf = await compile_preview(latex_code, self._workdir, f"preview-{version}")
+        except asyncio.CancelledError:
+            if started is not None:
+                preview_compiles.inc(outcome="superseded")
+            raise
+        except PreviewError as e:
+            preview_compiles.inc(outcome="failed")
+            await self._send({"type": "error", "version": version, "detail": str(e)}, None)
+            return
+        except Exception as e:
+            preview_compiles.inc(outcome="failed")
+            print(f"[PREVIEW] Error previewing version {version} for user {self.user_id}: {e}")
+            await self._send({"type": "error", "version": version, "detail": "The CV could not be rendered"}, None)
+            return
+
+        elapsed = time.perf_counter() - started
+        preview_compile_duration.observe(elapsed)
+        preview_compiles.inc(outcome="ok")
+        self._sending = True
+        await self._send({
+            "type": "pdf",
+            "version": version,
+            "template": template.name,
+            "size": len(pdf),
+            "compile_ms": round(elapsed * 1000),
+        }, pdf)
+
+    async def close(self) -> None:
+        """Cancel the pending compile and remove the scratch directory"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        shutil.rmtree(self._workdir, ignore_errors=True)
@@ -5,13 +5,14 @@ import uuid
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, extract, func, desc
+from sqlalchemy import select, update, and_, extract, func, desc
 from sqlalchemy.orm import selectinload
 from fastapi import Depends
 import hashlib
 import calendar
 
 from core.database import get_async_db
+from core.llm_governor import LANE_PRIORITY, LANE_STANDARD
 from models.user import User, CV
 from models.subscription import (
     SubscriptionPlan, UserSubscription, UsageTracking, CVAnalysisHistory,
@@ -21,6 +22,12 @@ from schemas.subscription import (
     UsageStatsResponse, AnalyticsOverview, SubscriptionStatus
 )
 
+USAGE_COUNTERS = {
+    "cv_analysis": UsageTracking.cv_analyses_count,
+    "job_analysis": UsageTracking.job_analyses_count,
+    "cv_download": UsageTracking.cv_downloads_count,
+}
+
 
 class SubscriptionService:
     """Service for managing subscriptions and usage tracking"""
@@ -45,72 +52,116 @@ class SubscriptionService:
         )
         return result.scalar_one_or_none()
     
+    async def get_llm_lane(self, user_id: uuid.UUID) -> str:
+        """Gemini capacity lane for the user's requests: paid plans get the priority lane"""
+        subscription = await self.get_user_subscription(user_id)
+        if subscription and subscription.plan and subscription.plan.tier != SubscriptionTier.FREE:
+            return LANE_PRIORITY
+        return LANE_STANDARD
+    
+    async def has_custom_templates(self, user_id: uuid.UUID) -> bool:
+        """Whether the user's plan includes the premium CV templates"""
+        subscription = await self.get_user_subscription(user_id)
+        return bool(subscription and subscription.plan and subscription.plan.custom_templates)
+    
     async def get_or_create_usage_tracking(self, user_id: uuid.UUID) -> UsageTracking:
         """Get or create usage tracking for current month"""
         current_date = datetime.now()
         month = current_date.month
         year = current_date.year
         
-        result = await self.db.execute(
-            select(UsageTracking).where(
-                and_(
-                    UsageTracking.user_id == user_id,
-                    UsageTracking.tracking_month == month,
-                    UsageTracking.tracking_year == year
-                )
+        query = select(UsageTracking).where(
+            and_(
+                UsageTracking.user_id == user_id,
+                UsageTracking.tracking_month == month,
+                UsageTracking.tracking_year == year
             )
-        )
-        usage = result.scalar_one_or_none()
+        ).order_by(UsageTracking.id).limit(1)
+        # Concurrent first requests of a month can each insert a row; always use the oldest
+        usage = (await self.db.execute(query)).scalars().first()
         
         if not usage:
-            usage = UsageTracking(
+            self.db.add(UsageTracking(
                 user_id=user_id,
                 tracking_month=month,
                 tracking_year=year
-            )
-            self.db.add(usage)
+            ))
             await self.db.commit()
-            await self.db.refresh(usage)
+            # Read back rather than keep our own row, which may not be the oldest
+            usage = (await self.db.execute(query)).scalars().first()
         
         return usage
     
-    async def check_usage_limits(self, user_id: uuid.UUID, analysis_type: str) -> bool:
-        """Check if user can perform the requested analysis based on their subscription"""
+    async def _usage_limit(self, user_id: uuid.UUID, analysis_type: str) -> Optional[int]:
+        """Monthly limit of this analysis type for the user's plan; None when unlimited"""
         subscription = await self.get_user_subscription(user_id)
-        usage = await self.get_or_create_usage_tracking(user_id)
-        
         if not subscription:
             # Free tier limits
-            if analysis_type == "cv_analysis" and usage.cv_analyses_count >= 3:
-                return False
-            if analysis_type == "job_analysis" and usage.job_analyses_count >= 1:
-                return False
-            return True
-        
-        plan = subscription.plan
-        
-        # Check limits based on subscription plan
-        if analysis_type == "cv_analysis":
-            if plan.cv_analyses_per_month is not None and usage.cv_analyses_count >= plan.cv_analyses_per_month:
-                return False
-        elif analysis_type == "job_analysis":
-            if plan.job_analyses_per_month is not None and usage.job_analyses_count >= plan.job_analyses_per_month:
-                return False
-        
-        return True
+            limits = {"cv_analysis": 3, "job_analysis": 1}
+        else:
+            plan = subscription.plan
+            limits = {"cv_analysis": plan.cv_analyses_per_month, "job_analysis": plan.job_analyses_per_month}
+        return limits.get(analysis_type)
+
+    async def remaining_usage(self, user_id: uuid.UUID, analysis_type: str) -> Optional[int]:
+        """Analyses of this type the user has left this month; None when unlimited"""
+        limit = await self._usage_limit(user_id, analysis_type)
+        usage = await self.get_or_create_usage_tracking(user_id)
+        used = {"cv_analysis": usage.cv_analyses_count, "job_analysis": usage.job_analyses_count}
+
+        if limit is None:
+            return None
+        return max(0, limit - used[analysis_type])
+
+    async def check_usage_limits(self, user_id: uuid.UUID, analysis_type: str) -> bool:
+        """Check if user can perform the requested analysis based on their subscription"""
+        remaining = await self.remaining_usage(user_id, analysis_type)
+        return remaining is None or remaining > 0
     
-    async def increment_usage(self, user_id: uuid.UUID, analysis_type: str):
+    async def increment_usage(self, user_id: uuid.UUID, analysis_type: str, count: int = 1):
         """Increment usage counter for the specified analysis type"""
         usage = await self.get_or_create_usage_tracking(user_id)
         
-        if analysis_type == "cv_analysis":
-            usage.cv_analyses_count += 1
-        elif analysis_type == "job_analysis":
-            usage.job_analyses_count += 1
-        elif analysis_type == "cv_download":
-            usage.cv_downloads_count += 1
-        
+        column = USAGE_COUNTERS.get(analysis_type)
+        if column is None:
+            return
+
+        # Increment in SQL so concurrent analyses of the same user do not lose counts
+        await self.db.execute(
+            update(UsageTracking).where(UsageTracking.id == usage.id).values({column: column + count})
+        )
         await self.db.commit()
+
+    async def reserve_usage(self, user_id: uuid.UUID, analysis_type: str, count: int) -> int:
+        """
+        Charge up to count analyses of this type, as many as the user has
+        left this month, and return how many were charged (all of them when
+        unlimited). Concurrent reservations never take more than the limit
+        between them; hand back unused ones with increment_usage(-n).
+        """
+        if count <= 0:
+            return 0
+        column = USAGE_COUNTERS[analysis_type]
+        limit = await self._usage_limit(user_id, analysis_type)
+        if limit is None:
+            await self.increment_usage(user_id, analysis_type, count)
+            return count
+
+        usage = await self.get_or_create_usage_tracking(user_id)
+        while True:
+            used = (await self.db.execute(select(column).where(UsageTracking.id == usage.id))).scalar_one()
+            granted = min(count, limit - used)
+            if granted <= 0:
+                return 0
+            # Applies only if nobody charged or handed back in between; otherwise read again
+            result = await self.db.execute(
+                update(UsageTracking)
+                .where(UsageTracking.id == usage.id, column == used)
+                .values({column: column + granted})
+            )
+            await self.db.commit()
+            if result.rowcount:
+                return granted
     
     async def save_analysis_result(
         self, 
@@ -331,6 +382,24 @@ class SubscriptionService:
         return result.scalar_one_or_none()
 
 
+def job_analysis_history_fields(job_analysis) -> dict:
+    """Map a JD analysis result onto the CVAnalysisHistory columns"""
+    analysis_data = {}
+    if isinstance(job_analysis, dict):
+        if "experience_analysis" in job_analysis:
+            analysis_data["experience_analysis"] = job_analysis["experience_analysis"]
+        # Map skill analysis data from direct keys (not nested under skill_analysis)
+        if "matches" in job_analysis:
+            analysis_data["skill_matches"] = job_analysis.get("matches", [])
+        if "missing" in job_analysis:
+            analysis_data["missing_skills"] = {"missing": job_analysis.get("missing", [])}
+        if "weaknesses" in job_analysis:
+            analysis_data["weaknesses"] = job_analysis["weaknesses"]
+        if "recommended_courses" in job_analysis:
+            analysis_data["recommended_courses"] = job_analysis["recommended_courses"]
+    return analysis_data
+
+
 async def get_subscription_service(db: AsyncSession = Depends(get_async_db)) -> SubscriptionService:
     """Dependency to get subscription service"""
     return SubscriptionService(db)
@@ -0,0 +1,186 @@
+"""
+Hashed bag-of-words vectors for CV/job description similarity.
+
+No model is involved: each CV section and job description is reduced to
+weighted features (content words plus canonical skill names from
+utils/skill_matcher.py, so "k8s" and "Kubernetes" meet), and the features
+are hashed into a fixed number of signed float32 buckets and L2-normalized.
+Rare-term weighting (the IDF part) is applied at query time by the index in
+core/cv_index.py, so stored vectors never go stale as the corpus grows.
+
+Vectors are stored per CV (CV.embedding) as MAGIC + version + float32 bytes;
+a vector with another version or dimension is treated as missing.
+"""
+import math
+import os
+import re
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.prompt_serializer import PLACEHOLDER_VALUES, PROMPT_DROPPED_KEYS
+from utils.skill_matcher import GENERIC_TERMS, SKILL_TAXONOMY, implied_skills, skills_in_text
+
+EMBEDDING_DIM = int(os.getenv("CV_EMBEDDING_DIM", 512))
+
+# Stored layout: MAGIC + format version + little-endian float32 values.
+# Bump EMBEDDING_VERSION whenever features or weights change.
+MAGIC = b"EV"
+EMBEDDING_VERSION = 1
+
+# Weight of each CV section's words; header/contact data never says anything about fit
+SECTION_WEIGHTS = {
+    "summary": 1.0,
+    "experience": 1.0,
+    "projects": 1.0,
+    "skills": 1.5,
+    "certifications": 1.0,
+    "education": 0.5,
+    "interests": 0.25,
+}
+# Canonical skills weigh more than any single word, most when listed as skills
+SKILL_WEIGHT = 3.0
+SKILL_SOURCE_WEIGHTS = {
+    "skills": 1.0,        # entries of the skills section
+    "technologies": 0.5,  # technologies of an experience or project item
+    "text": 0.1,          # mentioned in any other CV text
+    "implied": 0.25,      # implied by another skill (Flutter -> iOS, Android)
+}
+SKIPPED_KEYS = PROMPT_DROPPED_KEYS | {"dates", "start_date", "end_date", "graduation_date", "gpa", "is_current"}
+
+STOP_WORDS = frozenset("""
+i me my we our you your he she they them their it its a an the and or but if then so of to in on at by
+for with from into over under about as is are was were be been being have has had do does did will would
+can could should may might must not no nor than too very just also both each all any few more most other
+some such only own same this that these those there here when where which who whom what why how per via
+""".split())
+
+# Skill names are counted as skill features only, not again as words
+SKILL_WORDS = frozenset(alias for aliases in SKILL_TAXONOMY.values() for alias in aliases if " " not in alias)
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+_VERSION_SUFFIX = re.compile(r"^(.*?[a-z+#])v?\d+(?:\.\d+)*$")
+
+
+def _words(text: str) -> Iterable[str]:
+    for word in _WORD.findall(text.lower()):
+        match = _VERSION_SUFFIX.match(word)
+        if match:
+            word = match.group(1)
+        if len(word) > 1 and word not in STOP_WORDS and word not in GENERIC_TERMS and word not in SKILL_WORDS:
+            yield word
+
+
+def _strings(value, key: Optional[str] = None) -> Iterable[Tuple[Optional[str], str]]:
+    """(key of the nearest enclosing dict entry, text) for every string in a section"""
+    if key in SKIPPED_KEYS:
+        return
+    if isinstance(value, str):
+        if value.strip() and value.strip().lower() not in PLACEHOLDER_VALUES:
+            yield key, value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item, key)
+    elif isinstance(value, dict):
+        for item_key, item in value.items():
+            yield from _strings(item, item_key)
+
+
+def text_features(text: str, weight: float = 1.0, features: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Add the word and skill features of running text (a job description) to `features`"""
+    features = features if features is not None else defaultdict(float)
+    if not isinstance(text, str):
+        return features
+    for word in _words(text):
+        features[word] += weight
+    for skill in skills_in_text(text):
+        features["skill:" + skill] += SKILL_WEIGHT * weight
+    return features
+
+
+def cv_features(cv_structure) -> Dict[str, float]:
+    """Weighted features of a CV structure ({"cv_template": {"sections": ...}})"""
+    features: Dict[str, float] = defaultdict(float)
+    if not isinstance(cv_structure, dict):
+        return features
+    template = cv_structure.get("cv_template", cv_structure)
+    sections = template.get("sections", {}) if isinstance(template, dict) else {}
+    if not isinstance(sections, dict):
+        return features
+
+    found = set()
+    for section, weight in SECTION_WEIGHTS.items():
+        for key, text in _strings(sections.get(section)):
+            for word in _words(text):
+                features[word] += weight
+            if section == "skills":
+                source = "skills"
+            elif key == "technologies":
+                source = "technologies"
+            else:
+                source = "text"
+            for skill in skills_in_text(text, running_text=source == "text"):
+                features["skill:" + skill] += SKILL_WEIGHT * SKILL_SOURCE_WEIGHTS[source]
+                found.add(skill)
+
+    for skill in implied_skills(found) - found:
+        features["skill:" + skill] += SKILL_WEIGHT * SKILL_SOURCE_WEIGHTS["implied"]
+    return features
+
+
+def hash_features(features: Dict[str, float], dim: int = EMBEDDING_DIM) -> array:
+    """
+    Signed feature hashing with sublinear term weights, L2-normalized.
+    Returns a float32 array('f'); all zeros when there are no features.
+    """
+    vector = [0.0] * dim
+    for feature, weight in features.items():
+        if weight <= 0:
+            continue
+        digest = zlib.crc32(feature.encode("utf-8"))
+        value = 1.0 + math.log(weight) if weight > 1 else weight
+        vector[digest % dim] += value if digest & 0x80000000 else -value
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm:
+        vector = [v / norm for v in vector]
+    return array("f", vector)
+
+
+def embed_cv(cv_structure, dim: int = EMBEDDING_DIM) -> Optional[array]:
+    """Vector of a CV structure, or None when it has no structure"""
+    if not isinstance(cv_structure, dict):
+        return None
+    return hash_features(cv_features(cv_structure), dim)
+
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> array:
+    """Vector of a job description"""
+    return hash_features(text_features(text), dim)
+
+
+def encode_embedding(vector: Optional[array]) -> Optional[bytes]:
+    if vector is None:
+        return None
+    values = array("f", vector)
+    if sys.byteorder != "little":  # pragma: no cover
+        values.byteswap()
+    return MAGIC + bytes([EMBEDDING_VERSION]) + values.tobytes()
+
+
+def decode_embedding(data, dim: int = EMBEDDING_DIM) -> Optional[array]:
+    """Stored vector as array('f'), or None if missing, stale or of another dimension"""
+    if data is None:
+        return None
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    header = len(MAGIC) + 1
+    if (not isinstance(data, (bytes, bytearray)) or data[:len(MAGIC)] != MAGIC
+            or data[len(MAGIC)] != EMBEDDING_VERSION or len(data) != header + 4 * dim):
+        return None
+    values = array("f")
+    values.frombytes(bytes(data[header:]))
+    if sys.byteorder != "little":  # pragma: no cover
+        values.byteswap()
+    return values
@@ -0,0 +1,259 @@
+"""
+Deterministic section-completeness checks for a CV structure.
+
+These are the rule checks /analyze-cv-weaknesses runs before asking Gemini
+for a detailed review: required header fields, complete education entries,
+achievements with numbers in them, skill category coverage and languages.
+They need no model call, so they are also used to score stored CVs in bulk
+(CV.completeness_score, POST /admin/cvs/rescore).
+
+The rules are data (the tables below) plus one checker per section, run in
+report order in a single pass over the structure.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Header
+PLACEHOLDER_NAMES = frozenset({"Firstname Lastname"})
+CONTACT_FIELDS = ("email", "phone", "location")
+
+# Education entries need these to be complete
+EDUCATION_REQUIRED_FIELDS = ("institution", "degree")
+
+# Skills: categories every CV is expected to cover (substring of a category name)
+COMMON_SKILL_CATEGORIES = ("technical", "language", "soft skills", "tools")
+MIN_TOTAL_SKILLS = 5
+LANGUAGES_CATEGORY = "languages"
+
+# Share of the 0-100 completeness score carried by each section
+SECTION_WEIGHTS = {
+    "header": 20,
+    "education": 15,
+    "experience": 30,
+    "skills": 20,
+    "projects": 10,
+    "languages": 5,
+}
+
+SUGGESTIONS = {
+    "contact": "Complete your contact information for better reachability",
+    "education_missing": "Add your educational background",
+    "education_incomplete": "Complete all education entries with institution, degree, and dates",
+    "experience_missing": "Add your work experience to showcase your professional background",
+    "achievements": "Add achievements for all work experiences",
+    "quantifiables": "Add quantifiable metrics to your achievements (e.g., 'Increased sales by 20%')",
+    "skills_missing": "Add your technical and soft skills",
+    "skill_categories": "Consider adding more skill categories: ",
+    "more_skills": "Add more specific skills to make your profile more attractive",
+    "projects_missing": "Add projects to showcase your practical skills",
+    "contributions": "Add specific contributions for each project",
+}
+
+_DIGIT = re.compile(r"\d")
+_LANGUAGE_WITH_LEVEL = re.compile(r"([^(]*)\(([^(]*)")
+DEFAULT_LANGUAGE_PROFICIENCY = "Intermediate"
+
+
+def _dict(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def parse_language_item(item) -> Optional[Tuple[str, str]]:
+    """
+    (language, proficiency) from a Languages skill item, either a string like
+    "English (Fluent)" or a {"language"/"name", "proficiency"} dict
+    """
+    if isinstance(item, str):
+        if "(" in item and ")" in item:
+            match = _LANGUAGE_WITH_LEVEL.match(item)
+            return match.group(1).strip(), match.group(2).replace(")", "").strip()
+        return item.strip(), DEFAULT_LANGUAGE_PROFICIENCY
+    if isinstance(item, dict):
+        name = item.get("language", "") or item.get("name", "")
+        return name, item.get("proficiency", DEFAULT_LANGUAGE_PROFICIENCY)
+    return None
+
+
+class _Report:
+    __slots__ = ("section_analysis", "missing_sections", "improvement_suggestions", "section_scores")
+
+    def __init__(self):
+        self.section_analysis: Dict[str, dict] = {}
+        self.missing_sections: List[str] = []
+        self.improvement_suggestions: List[str] = []
+        self.section_scores: Dict[str, float] = {}
+
+
+def _check_header(sections: dict, report: _Report) -> None:
+    header = _dict(sections.get("header"))
+    contact_info = _dict(header.get("contact_info"))
+    missing_fields = []
+
+    name = header.get("name")
+    if not name or name in PLACEHOLDER_NAMES:
+        missing_fields.append("name")
+    for field in CONTACT_FIELDS:
+        if not _dict(contact_info.get(field)).get("value"):
+            missing_fields.append(f"contact_info.{field}")
+
+    if missing_fields:
+        report.missing_sections.append("Contact Information")
+        report.improvement_suggestions.append(SUGGESTIONS["contact"])
+    report.section_analysis["header"] = {"is_complete": not missing_fields, "missing_fields": missing_fields}
+    report.section_scores["header"] = 1 - len(missing_fields) / (len(CONTACT_FIELDS) + 1)
+
+
+def _check_education(sections: dict, report: _Report) -> None:
+    items = _list(_dict(sections.get("education")).get("items"))
+    analysis = {"is_complete": bool(items), "item_count": len(items), "missing_fields": []}
+
+    if not items:
+        report.missing_sections.append("Education")
+        report.improvement_suggestions.append(SUGGESTIONS["education_missing"])
+        report.section_scores["education"] = 0.0
+    else:
+        incomplete = sum(
+            1 for item in items
+            if not all(_dict(item).get(field) for field in EDUCATION_REQUIRED_FIELDS)
+        )
+        if incomplete:
+            analysis["missing_fields"].append(f"{incomplete} education entries are incomplete")
+            report.improvement_suggestions.append(SUGGESTIONS["education_incomplete"])
+        report.section_scores["education"] = 1 - incomplete / len(items)
+    report.section_analysis["education"] = analysis
+
+
+def _check_experience(sections: dict, report: _Report) -> None:
+    items = _list(_dict(sections.get("experience")).get("items"))
+    analysis = {
+        "is_complete": bool(items),
+        "item_count": len(items),
+        "missing_fields": [],
+        "items_without_achievements": 0,
+    }
+
+    if not items:
+        report.missing_sections.append("Work Experience")
+        report.improvement_suggestions.append(SUGGESTIONS["experience_missing"])
+        report.section_scores["experience"] = 0.0
+    else:
+        without_achievements = 0
+        without_quantifiables = 0
+        for item in items:
+            achievements = _list(_dict(item).get("achievements"))
+            if not achievements:
+                without_achievements += 1
+            elif not any(isinstance(a, str) and _DIGIT.search(a) for a in achievements):
+                without_quantifiables += 1
+
+        analysis["items_without_achievements"] = without_achievements
+        analysis["items_without_quantifiables"] = without_quantifiables
+        if without_achievements:
+            analysis["missing_fields"].append(f"{without_achievements} jobs lack achievements")
+            report.improvement_suggestions.append(SUGGESTIONS["achievements"])
+        if without_quantifiables:
+            report.improvement_suggestions.append(SUGGESTIONS["quantifiables"])
+        report.section_scores["experience"] = 1 - (without_achievements + 0.5 * without_quantifiables) / len(items)
+    report.section_analysis["experience"] = analysis
+
+
+def _check_skills(sections: dict, report: _Report) -> None:
+    categories = [_dict(c) for c in _list(_dict(sections.get("skills")).get("categories"))]
+    analysis = {
+        "is_complete": bool(categories),
+        "category_count": len(categories),
+        "total_skills": sum(len(_list(c.get("items"))) for c in categories),
+        "missing_categories": [],
+    }
+
+    if not categories:
+        report.missing_sections.append("Skills")
+        report.improvement_suggestions.append(SUGGESTIONS["skills_missing"])
+        report.section_scores["skills"] = 0.0
+    else:
+        # Names never contain newlines, so a substring test on the joined names
+        # is the same as testing each name
+        names = "\n".join(str(c.get("name", "")).lower() for c in categories)
+        analysis["missing_categories"] = [c for c in COMMON_SKILL_CATEGORIES if c not in names]
+        if analysis["missing_categories"]:
+            report.improvement_suggestions.append(
+                SUGGESTIONS["skill_categories"] + ", ".join(analysis["missing_categories"])
+            )
+        if analysis["total_skills"] < MIN_TOTAL_SKILLS:
+            report.improvement_suggestions.append(SUGGESTIONS["more_skills"])
+        coverage = 1 - len(analysis["missing_categories"]) / len(COMMON_SKILL_CATEGORIES)
+        report.section_scores["skills"] = 0.5 * coverage + 0.5 * min(analysis["total_skills"] / MIN_TOTAL_SKILLS, 1)
+    report.section_analysis["skills"] = analysis
+
+
+def _check_projects(sections: dict, report: _Report) -> None:
+    items = _list(_dict(sections.get("projects")).get("items"))
+    analysis = {"is_complete": bool(items), "item_count": len(items), "items_without_contributions": 0}
+
+    if not items:
+        # Projects are optional when there is work experience to show instead
+        if not report.section_analysis["experience"]["item_count"]:
+            report.missing_sections.append("Projects")
+            report.improvement_suggestions.append(SUGGESTIONS["projects_missing"])
+        report.section_scores["projects"] = 0.0
+    else:
+        without = sum(1 for item in items if not _dict(item).get("key_contributions"))
+        analysis["items_without_contributions"] = without
+        if without:
+            report.improvement_suggestions.append(SUGGESTIONS["contributions"])
+        report.section_scores["projects"] = 1 - without / len(items)
+    report.section_analysis["projects"] = analysis
+
+
+def _check_languages(sections: dict, report: _Report) -> None:
+    # Languages live in the Skills section as a "Languages" category
+    count = 0
+    for category in _list(_dict(sections.get("skills")).get("categories")):
+        if isinstance(category, dict) and str(category.get("name", "")).lower() == LANGUAGES_CATEGORY:
+            count = sum(1 for item in _list(category.get("items")) if parse_language_item(item) is not None)
+            break
+
+    report.section_analysis["languages"] = {"is_complete": bool(count), "item_count": count}
+    report.section_scores["languages"] = 1.0 if count else 0.0
+
+
+# Report order; later checkers may read earlier results (projects reads experience)
+RULES: Tuple[Callable[[dict, _Report], None], ...] = (
+    _check_header,
+    _check_education,
+    _check_experience,
+    _check_skills,
+    _check_projects,
+    _check_languages,
+)
+
+
+def evaluate_cv_completeness(cv_data: Any) -> dict:
+    """
+    Run every rule over a CV structure ({"cv_template": {"sections": ...}}).
+    Returns section_analysis, missing_sections and improvement_suggestions in
+    the shape /analyze-cv-weaknesses reports them, plus a 0-100 score.
+    """
+    sections = _dict(_dict(_dict(cv_data).get("cv_template")).get("sections"))
+    report = _Report()
+    for rule in RULES:
+        rule(sections, report)
+
+    score = sum(SECTION_WEIGHTS[key] * report.section_scores[key] for key in SECTION_WEIGHTS)
+    return {
+        "section_analysis": report.section_analysis,
+        "missing_sections": report.missing_sections,
+        "improvement_suggestions": report.improvement_suggestions,
+        "score": round(score),
+    }
+
+
+def completeness_score(cv_structure: Any) -> Optional[int]:
+    """Score stored alongside a CV; None when it has no structure"""
+    if not isinstance(cv_structure, dict):
+        return None
+    return evaluate_cv_completeness(cv_structure)["score"]
@@ -1,3 +1,5 @@
+from utils.cv_rules import completeness_score
+
 CV_STRUCTURE = '''{
         "cv_template": {
             "metadata": {
@@ -92,3 +94,46 @@ CV_STRUCTURE = '''{
             }
           }
         }'''
+
+# Sections summarized in the denormalized CV listing columns, mapped to the
+# key holding their entries.
+SUMMARY_SECTIONS = {
+    "education": "items",
+    "experience": "items",
+    "projects": "items",
+    "skills": "categories",
+    "interests": "items",
+    "certifications": "items",
+}
+
+
+def summarize_cv_structure(cv_structure) -> dict:
+    """
+    Build the lightweight summary stored alongside a CV so that listings
+    never need to load the full cv_structure JSON.
+    """
+    if not isinstance(cv_structure, dict):
+        return {"has_structure": False, "name": None, "section_counts": None, "completeness_score": None}
+
+    cv_template = cv_structure.get("cv_template", {})
+    sections = cv_template.get("sections", {}) if isinstance(cv_template, dict) else {}
+    if not isinstance(sections, dict):
+        sections = {}
+
+    header = sections.get("header", {})
+    name = header.get("name") if isinstance(header, dict) else None
+    if not isinstance(name, str) or not name.strip():
+        name = None
+
+    section_counts = {}
+    for section_key, items_key in SUMMARY_SECTIONS.items():
+        section = sections.get(section_key)
+        items = section.get(items_key, []) if isinstance(section, dict) else []
+        section_counts[section_key] = len(items) if isinstance(items, list) else 0
+
+    return {
+        "has_structure": True,
+        "name": name.strip()[:255] if name else None,
+        "section_counts": section_counts,
+        "completeness_score": completeness_score(cv_structure),
+    }
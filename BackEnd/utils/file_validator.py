@@ -1,7 +1,6 @@
 import os
-import PyPDF2
 from io import BytesIO
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 from fastapi import HTTPException, UploadFile
 import hashlib
 from utils.error_handler import FileSizeError, FileTypeError, FileValidationError
@@ -23,6 +22,9 @@ class FileValidator:
         'text/x-pdf'
     }
     
+    # Read size used when hashing the spooled upload
+    CHUNK_SIZE = 64 * 1024
+
     # PDF magic numbers (file signatures)
     PDF_SIGNATURES = [
         b'%PDF-1.',  # Standard PDF signature
@@ -60,11 +62,12 @@ class FileValidator:
             if not file.filename.lower().endswith('.pdf'):
                 raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-            file_content = await file.read()
-            file_size = len(file_content)
+            # Work from the spooled upload; the content is never read into memory in full
+            stream = file.file
+            stream.seek(0, os.SEEK_END)
+            file_size = stream.tell()
             validation_result['file_size'] = file_size
-
-            await file.seek(0)
+            stream.seek(0)
 
             if file_size < cls.MIN_FILE_SIZE:
                 raise FileSizeError(
@@ -90,17 +93,19 @@ class FileValidator:
                     details={"error_type": "invalid_file_type", "detected_type": mime_type}
                 )
 
-            if not cls._validate_pdf_signature(file_content):
+            file_header = stream.read(8)
+            stream.seek(0)
+            if not cls._validate_pdf_signature(file_header):
                 raise FileValidationError(
                     "Invalid PDF file. File signature does not match PDF format",
                     status_code=400,
                     details={"error_type": "corrupted_pdf"}
                 )
 
-            pdf_info = cls._validate_pdf_structure(file_content)
+            pdf_info = cls._validate_pdf_structure(stream)
             validation_result.update(pdf_info)
 
-            validation_result['file_hash'] = cls._generate_file_hash(file_content)
+            validation_result['file_hash'] = cls._generate_file_hash(stream)
 
             if not validation_result['has_text']:
                 raise FileValidationError(
@@ -132,7 +137,7 @@ class FileValidator:
         return any(file_header.startswith(sig) for sig in cls.PDF_SIGNATURES)
     
     @classmethod
-    def _validate_pdf_structure(cls, file_content: bytes) -> Dict[str, any]:
+    def _validate_pdf_structure(cls, file_content: Union[bytes, BinaryIO]) -> Dict[str, any]:
         """Validate PDF internal structure and extract basic info"""
         result = {
             'page_count': 0,
@@ -142,7 +147,10 @@ class FileValidator:
         }
         
         try:
-            pdf_file = BytesIO(file_content)
+            import PyPDF2
+
+            pdf_file = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+            pdf_file.seek(0)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
 
             if pdf_reader.is_encrypted:
@@ -179,9 +187,17 @@ class FileValidator:
         return result
     
     @classmethod
-    def _generate_file_hash(cls, file_content: bytes) -> str:
+    def _generate_file_hash(cls, file_content: Union[bytes, BinaryIO]) -> str:
         """Generate SHA-256 hash of file content for duplicate detection"""
-        return hashlib.sha256(file_content).hexdigest()
+        if isinstance(file_content, (bytes, bytearray)):
+            return hashlib.sha256(file_content).hexdigest()
+
+        digest = hashlib.sha256()
+        file_content.seek(0)
+        for chunk in iter(lambda: file_content.read(cls.CHUNK_SIZE), b""):
+            digest.update(chunk)
+        file_content.seek(0)
+        return digest.hexdigest()
     
     @classmethod
     def format_file_size(cls, size_bytes: int) -> str:
@@ -0,0 +1,117 @@
+"""
+Instructions for the job description analysis prompts.
+
+Each stage (skill comparison, experience analysis, gap and course
+recommendations) can run as its own Gemini call, or all three can be asked
+in one call that carries the CV and job description only once
+(job_analysis_prompt). Both paths share the rule blocks below.
+
+Skill comparison is computed locally (utils/skill_matcher.py); the model is
+only asked about job description terms the skill taxonomy does not know.
+"""
+
+SKILL_TERM_RULES = """
+Classify ONLY the unrecognized terms listed above:
+- put a term in matches if the CV shows the candidate has it
+- put a term in missing if the job explicitly requires it and the CV lacks it
+- leave out terms that are not learnable technical skills (company or product names the role
+  does not require, soft skills, methodologies like Agile or Scrum, project tools like Jira)
+- do NOT include nice-to-have skills in missing
+Write each term exactly as listed. Return empty lists when no terms are listed.
+"""
+
+
+def skill_terms_block(skill_match) -> str:
+    """The locally computed comparison and the terms left for the model (utils/skill_matcher.py)"""
+    return f"""Already computed from a skill taxonomy (do not repeat or change these):
+  matches: {skill_match.matches}
+  missing: {skill_match.missing}
+Unrecognized terms from the job description: {skill_match.unrecognized or "none"}
+{SKILL_TERM_RULES}"""
+
+
+EXPERIENCE_RULES = """
+ANALYSIS REQUIREMENTS:
+1. Calculate total years of professional experience from the CV
+2. Identify minimum years of experience required by the job (if mentioned)
+3. Identify specific experience requirements (e.g., "3+ years with React", "Senior level", "Team lead experience")
+4. Determine seniority level expected (Junior, Mid-level, Senior, Lead, etc.)
+5. Analyze experience gaps or strengths
+6. Note any special experience requirements (management, specific industries, etc.)
+
+EXPERIENCE CALCULATION RULES:
+- Count only professional work experience (exclude internships unless specified)
+- Calculate years from start_date to end_date for each role
+- For current roles, calculate until present date (2025)
+- Round to nearest year for total experience
+
+SENIORITY LEVEL MAPPING:
+- 0-2 years: Junior
+- 2-5 years: Mid-level
+- 5-8 years: Senior
+- 8+ years: Lead/Principal
+
+level and seniority_level are one of Junior|Mid-level|Senior|Lead; level_match is one of Perfect|Close|Gap|Overqualified.
+"""
+
+COURSE_RULES = """
+Focus your analysis on:
+- Technical skills gaps (programming languages, frameworks, tools) - ONLY missing ones
+- Educational requirements (degrees, certifications) - if they are technical
+- Platform-specific knowledge - ONLY missing technical platforms/tools
+
+DO NOT analyze or recommend courses for:
+- Years of experience requirements
+- Soft skills (communication, teamwork, documentation)
+- General business methodologies (Agile, Scrum) unless they are technical implementations
+- Professional competencies that cannot be learned through online courses
+
+For course recommendations, ONLY focus on TECHNICAL skills and tools:
+- Programming languages (Swift, Kotlin, Java, etc.)
+- Frameworks and libraries (iOS, SwiftUI, React Native, etc.)
+- Development tools (Xcode, Android Studio, Git, etc.)
+- Technical methodologies with practical application (Unit Testing, CI/CD)
+- Platform-specific training (AWS, Google Cloud, Firebase)
+
+IMPORTANT: Recommend ONLY ONE course per missing skill. Do not provide multiple courses for the same skill.
+For each missing technical skill, provide the BEST single course recommendation.
+Prioritize free courses where possible (YouTube, documentation, official tutorials).
+
+CRITICAL FORMATTING RULES:
+- missing_requirements must contain ONLY short technical terms: "iOS", "Android", "Swift", "Unit Testing"
+- Do NOT use long descriptions like "iOS development skills" or "Android development experience"
+- Only include technical skills that can be learned through online courses
+- Do not include experience requirements, soft skills, or business methodologies
+- Recommend EXACTLY ONE course per missing skill - no duplicates or multiple options for the same skill
+- Each course should address a different missing technical skill
+- CRITICAL: If candidate has Flutter, do NOT recommend iOS or Android PLATFORM courses as Flutter covers both platforms
+- CRITICAL: If candidate has React Native, do NOT recommend iOS or Android PLATFORM courses as React Native covers both platforms
+- NOTE: Swift and Kotlin are native programming languages - they are different from Flutter and may still be needed for native development
+- Weakness categories are one of Skills|Education|Certification
+- Course levels are one of Beginner|Intermediate|Advanced; url is a direct course URL or 'Search for: course keywords'
+"""
+
+
+def job_analysis_prompt(cv_text: str, job_description: str, skill_match) -> str:
+    """Single prompt answering all three stages over one copy of the CV and JD"""
+    return f"""
+You are an expert technical recruiter and career counselor. Analyze the CV below against the job description.
+Answer all three parts in one JSON object; later parts build on earlier ones.
+
+CV Data:
+{cv_text}
+
+Job Description:
+{job_description}
+
+PART 1 - SKILL COMPARISON (`matches`, `missing`):
+{skill_terms_block(skill_match)}
+PART 2 - EXPERIENCE (`experience`):
+Analyze the candidate's work experience against the job's experience requirements.
+{EXPERIENCE_RULES}
+PART 3 - GAPS AND COURSES (`missing_requirements`, `weaknesses`, `recommended_courses`):
+Use ONLY the computed missing skills plus any terms you put in `missing`, in exactly the same short form.
+Do NOT recommend courses for skills the candidate already has: {skill_match.matches}
+{COURSE_RULES}
+Make recommendations specific and actionable. Choose the BEST single course option for each skill.
+"""
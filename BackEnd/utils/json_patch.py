@@ -0,0 +1,108 @@
+"""
+Minimal JSON Patch (RFC 6902) support for CV structures.
+
+Only the "add", "remove" and "replace" operations are produced and applied,
+which is all a structural diff between two JSON documents needs.
+"""
+import copy
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(old: Any, new: Any, path: str, ops: Patch) -> None:
+    if old == new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": copy.deepcopy(value)})
+            else:
+                _diff(old[key], value, f"{path}/{_escape(key)}", ops)
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        # Skip the unchanged head and tail so an insert/delete in the middle
+        # does not turn into a replace of every following item
+        start = 0
+        while start < len(old) and start < len(new) and old[start] == new[start]:
+            start += 1
+        old_end, new_end = len(old), len(new)
+        while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+
+        common = min(old_end - start, new_end - start)
+        for offset in range(common):
+            index = start + offset
+            _diff(old[index], new[index], f"{path}/{index}", ops)
+        for index in range(old_end - 1, start + common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(start + common, new_end):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": copy.deepcopy(new[index])})
+        return
+
+    ops.append({"op": "replace", "path": path, "value": copy.deepcopy(new)})
+
+
+def make_patch(old: Any, new: Any) -> Patch:
+    """Return the operations that turn `old` into `new`"""
+    ops: Patch = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _resolve(document: Any, path: str):
+    """Return (parent container, last token) for a JSON pointer"""
+    tokens = [_unescape(token) for token in path.split("/")[1:]]
+    parent = document
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    return parent, tokens[-1]
+
+
+def apply_patch(document: Any, patch: Patch) -> Any:
+    """Apply a patch to a copy of `document` and return the result"""
+    result = copy.deepcopy(document)
+
+    for operation in patch:
+        op, path = operation["op"], operation["path"]
+        if path == "":
+            if op == "remove":
+                result = None
+            else:
+                result = copy.deepcopy(operation["value"])
+            continue
+
+        parent, token = _resolve(result, path)
+        if isinstance(parent, list):
+            index = len(parent) if token == "-" else int(token)
+            if op == "add":
+                parent.insert(index, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                del parent[index]
+            elif op == "replace":
+                parent[index] = copy.deepcopy(operation["value"])
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+        else:
+            if op in ("add", "replace"):
+                parent[token] = copy.deepcopy(operation["value"])
+            elif op == "remove":
+                del parent[token]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+
+    return result
@@ -1,21 +1,89 @@
-import json
+"""
+CV structure -> LaTeX source.
+
+A LatexTemplate is a preamble, a header renderer and section body renderers;
+the Harvard template is defined here, the others and the registry in
+utils/latex_templates.py. Fixed fragments are module constants and each
+section has a renderer that appends to a list of parts (sections of dated
+entries have a renderer per entry, so core/latex_cache.py can reuse
+unchanged ones); the document is joined once at the end. Lists (bullets,
+skills, interests) are escaped in one call over their joined text. The
+output is byte-for-byte the one of the earlier concatenating version
+(benchmarks/check_latex_golden.py holds the golden files).
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_SECTION_ORDER = ["header", "education", "experience", "projects",
+                         "skills", "interests", "certifications"]
+
+PREAMBLE = r"""
+\documentclass[11pt]{article}
+
+% Harvard Style CV Template - Compatible with basic LaTeX installations
+\setlength{\parindent}{0pt}
+\usepackage{hyperref}
+\usepackage{enumitem}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[left=1.06cm,top=1.7cm,right=1.06cm,bottom=0.49cm]{geometry}
+
+% Basic hyperref settings
+\hypersetup{
+    colorlinks=true,
+    linkcolor=blue,
+    filecolor=blue,
+    urlcolor=blue,
+    pdftitle={Harvard Style CV},
+}
+
+% Custom section formatting to match Harvard style
+\makeatletter
+\renewcommand{\section}[1]{%
+  \vspace{12pt}%
+  \begin{center}%
+    \textbf{#1}%
+  \end{center}%
+  \vspace{0.5pt}%
+}
+\makeatother
+
+\begin{document}
+"""
+DOCUMENT_END = r"""
+\end{document}
+"""
+
+# Harvard-style compact lists
+ITEMIZE_BEGIN = "\\begin{itemize}[noitemsep, topsep=0pt, partopsep=0pt, parsep=0pt]\n"
+ITEMIZE_END = "\\end{itemize}\n"
+# Spacing between entries of a section
+ENTRY_SPACING = "\\vspace{12pt}\n"
+ITEM_SEPARATOR = "\n    \\item "
+CONTACT_SEPARATOR = " \\textbullet\\ "
+HEADER_END = "\\end{center}\n\n\\vspace{0.5pt}\n\n"
+# Placeholder separator while a list is escaped in one go; nothing escapes it
+_JOIN_MARK = "\x00"
 
 
 def escape_latex(text):
     """Escapes special LaTeX characters in a string."""
     if not isinstance(text, str):
         text = str(text)
-    text = text.replace('\\', r'\textbackslash{}')
-    text = text.replace('&', r'\&')
-    text = text.replace('%', r'\%')
-    text = text.replace('$', r'\$')
-    text = text.replace('#', r'\#')
-    text = text.replace('_', r'\_')
-    text = text.replace('{', r'\{')
-    text = text.replace('}', r'\}')
-    text = text.replace('~', r'\textasciitilde{}')
-    text = text.replace('^', r'\textasciicircum{}')
-    return text
+    # Chained str.replace beats a translate table or a regex pre-check here.
+    # The backslash goes first, so the braces of its \textbackslash{} are
+    # escaped by the later replaces; generated CVs have always read so.
+    return (text.replace('\\', r'\textbackslash{}')
+            .replace('&', r'\&')
+            .replace('%', r'\%')
+            .replace('$', r'\$')
+            .replace('#', r'\#')
+            .replace('_', r'\_')
+            .replace('{', r'\{')
+            .replace('}', r'\}')
+            .replace('~', r'\textasciitilde{}')
+            .replace('^', r'\textasciicircum{}'))
+
 
 def format_dates(dates_obj):
     """Formats the start and end dates."""
@@ -33,347 +101,315 @@ def format_dates(dates_obj):
 
     if start_esc and end_esc:
         return f"{start_esc} -- {end_esc}"
-    elif start_esc:
-        return start_esc
-    elif end_esc:
-        return end_esc
-    else:
-        return ""
+    return start_esc or end_esc
+
+
+def _escape_join(items, separator: str) -> str:
+    """
+    escape_latex of each string in items, joined by separator, in one escape
+    pass: escaping works character by character, so escaping the joined text
+    is the same as joining the escaped items
+    """
+    joined = _JOIN_MARK.join(items)
+    if joined.count(_JOIN_MARK) != len(items) - 1:
+        # An item contains the mark itself
+        return separator.join([escape_latex(item) for item in items])
+    return escape_latex(joined).replace(_JOIN_MARK, separator)
+
 
 def generate_latex_list(items):
     """Generates a LaTeX itemize list for achievements/contributions with proper spacing."""
-    if not isinstance(items, list):
-        return ""
-    if not items:
+    if not isinstance(items, list) or not items:
         return ""
-        
-    # Harvard-style compact formatting
-    latex = "\\begin{itemize}[noitemsep, topsep=0pt, partopsep=0pt, parsep=0pt]\n"
-    for item in items:
-        latex += f"    \\item {escape_latex(item)}\n"
-    latex += "\\end{itemize}\n"
-    return latex
+    return f"{ITEMIZE_BEGIN}    \\item {_escape_join([str(item) for item in items], ITEM_SEPARATOR)}\n{ITEMIZE_END}"
 
-def json_to_latex(json_data):
-    """Converts CV JSON data to a LaTeX string using the Harvard template."""
 
-    if not isinstance(json_data, dict):
-         raise TypeError("Input data must be a dictionary.")
-
-    # Use .get chaining safely
-    cv_data = json_data.get("cv_template", {})
-    if not isinstance(cv_data, dict): cv_data = {}
-
-    metadata = cv_data.get("metadata", {})
-    if not isinstance(metadata, dict): metadata = {}
-
-    sections = cv_data.get("sections", {})
-    if not isinstance(sections, dict): sections = {}
-
-    # Default section order if not specified
-    default_order = ["header", "education", "experience", "projects",
-                     "skills", "interests", "certifications"]
-                      
-    section_order = metadata.get("section_order", default_order)
-    
-    # Make sure section_order is valid
-    if not isinstance(section_order, list) or not section_order: 
-        section_order = default_order
-
-    # --- LaTeX Preamble for Harvard Style CV ---
-    latex_string = r"""
-\documentclass[11pt]{article}
+def _dict(value):
+    return value if isinstance(value, dict) else {}
 
-% Harvard Style CV Template - Compatible with basic LaTeX installations
-\setlength{\parindent}{0pt}
-\usepackage{hyperref}
-\usepackage{enumitem}
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage[left=1.06cm,top=1.7cm,right=1.06cm,bottom=0.49cm]{geometry}
 
-% Basic hyperref settings
-\hypersetup{
-    colorlinks=true,
-    linkcolor=blue,
-    filecolor=blue,
-    urlcolor=blue,
-    pdftitle={Harvard Style CV},
+def _list(value):
+    return value if isinstance(value, list) else []
+
+
+def _technologies_line(technologies) -> str:
+    return f"\\textit{{Technologies:}} {escape_latex(', '.join(filter(None, map(str, technologies))))}\n"
+
+
+def header_contact(section) -> Tuple[str, List[str]]:
+    """Escaped name and contact line parts (location, email link, phone link) of a header section"""
+    name = escape_latex(section.get("name", "Firstname Lastname"))
+    contact_info = _dict(section.get("contact_info", {}))
+    email_info = _dict(contact_info.get("email", {}))
+    phone_info = _dict(contact_info.get("phone", {}))
+    location_info = _dict(contact_info.get("location", {}))
+
+    email_val = escape_latex(email_info.get("value", ""))
+    email_link_target = email_info.get("value", "")
+    email_link = escape_latex(email_info.get("link", f"mailto:{email_link_target}" if isinstance(email_link_target, str) else ""))
+
+    phone_val = escape_latex(phone_info.get("value", ""))
+    phone_link_target = phone_info.get("value", "")
+    phone_link = escape_latex(phone_info.get("link", f"tel:{phone_link_target}" if isinstance(phone_link_target, str) else ""))
+
+    location_val = escape_latex(location_info.get("value", ""))
+
+    contact_parts = []
+    if location_val:
+        contact_parts.append(location_val)
+    if email_val and email_link:
+        contact_parts.append(f"\\href{{{email_link}}}{{{email_val}}}")
+    if phone_val and phone_link:
+        contact_parts.append(f"\\href{{{phone_link}}}{{{phone_val}}}")
+    return name, contact_parts
+
+
+def _render_header(section) -> str:
+    name, contact_parts = header_contact(section)
+    # Centered name over a horizontal rule, then the contact line
+    return (
+        f"\\begin{{center}}\n    \\textbf{{{name}}}\\\\ \n    \\hrulefill\n\\end{{center}}\n\n"
+        f"\\begin{{center}}\n    {CONTACT_SEPARATOR.join(contact_parts)}\n{HEADER_END}"
+    )
+
+
+def _render_summary(section, out: list) -> None:
+    content = escape_latex(section.get("content", ""))
+    if content:
+        out.append(f"{content}\n\n")
+
+
+def _education_entry(item: dict) -> str:
+    institution = escape_latex(item.get("institution", ""))
+    start_date = escape_latex(item.get("start_date", ""))
+    graduation_date = escape_latex(item.get("graduation_date", ""))
+    gpa = escape_latex(item.get("gpa", ""))
+
+    if start_date and graduation_date:
+        dates_str = f"{start_date} -- {graduation_date}"
+    else:
+        dates_str = graduation_date or start_date
+
+    entry = f"\\textbf{{{institution}}} \\hfill {dates_str}\n"
+    if gpa:
+        entry += f"GPA: {gpa}\n"
+    return entry + "\n"
+
+
+def _experience_entry(item: dict) -> str:
+    company = escape_latex(item.get("company", ""))
+    location = escape_latex(item.get("location", ""))
+    title = escape_latex(item.get("title", ""))
+    dates_str = format_dates(item.get("dates", {}))
+    achievements = item.get("achievements", [])
+    technologies = _list(item.get("technologies", []))
+
+    parts = [f"\\textbf{{{company}}} \\hfill {location}\n\n\\textbf{{{title}}} \\hfill {dates_str}\n"]
+    if achievements:
+        # A single achievement may come as a plain string (or another scalar)
+        if not isinstance(achievements, list):
+            achievements = [achievements if isinstance(achievements, str) else str(achievements)]
+        parts.append(generate_latex_list(achievements))
+    if technologies:
+        parts.append(_technologies_line(technologies))
+    return "".join(parts)
+
+
+def _project_entry(item: dict) -> str:
+    title = escape_latex(item.get("title", ""))
+    description = escape_latex(item.get("description", ""))
+
+    # Direct date fields take precedence over the dates object
+    start_date = item.get("start_date", "")
+    end_date = item.get("end_date", "")
+    if start_date and end_date:
+        dates_str = f"{escape_latex(start_date)} -- {escape_latex(end_date)}"
+    elif start_date or end_date:
+        dates_str = escape_latex(start_date or end_date)
+    else:
+        dates_str = format_dates(item.get("dates", {}))
+
+    if "key_contributions" in item:
+        contributions = item.get("key_contributions", [])
+    else:
+        contributions = item.get("contributions", [])
+    technologies = _list(item.get("technologies", []))
+
+    parts = [f"\\textbf{{{title}}} \\hfill {dates_str}\n\n"]
+    if description:
+        parts.append(f"{description}\n\n")
+    if contributions:
+        parts.append(generate_latex_list(contributions))
+    if technologies:
+        parts.append(_technologies_line(technologies) + "\n")
+    return "".join(parts)
+
+
+def _render_skills(section, out: list) -> None:
+    # Languages are listed as a skills category
+    for category in _list(section.get("categories", [])):
+        if not isinstance(category, dict):
+            continue
+        cat_name = escape_latex(category.get("name", "Skills"))
+        skills = [skill for skill in _list(category.get("items", [])) if isinstance(skill, str)]
+        if skills:
+            out.append(f"\\textbf{{{cat_name}:}} {escape_latex(', '.join(skills))}\n\n")
+
+
+def _render_interests(section, out: list) -> None:
+    interests_str = escape_latex(", ".join([str(interest) for interest in _list(section.get("items", [])) if interest]))
+    if interests_str:
+        out.append(f"{interests_str}\n\n")
+
+
+def _render_certifications(section, out: list) -> None:
+    for item in _list(section.get("items", [])):
+        if not isinstance(item, dict):
+            continue
+        title = escape_latex(item.get("title", ""))
+        institution = escape_latex(item.get("institution", ""))
+        date = escape_latex(item.get("date", ""))
+
+        if title:
+            cert_line = f"\\textbf{{{title}}}"
+            if institution:
+                cert_line += f", {institution}"
+            if date:
+                cert_line += f" \\hfill {date}"
+            out.append(cert_line + "\n\n")
+
+
+# Sections made of dated entries (the "items" list), rendered one entry at a
+# time and separated by ENTRY_SPACING
+ENTRY_RENDERERS = {
+    "education": _education_entry,
+    "experience": _experience_entry,
+    "projects": _project_entry,
 }
 
-% Custom section formatting to match Harvard style
-\makeatletter
-\renewcommand{\section}[1]{%
-  \vspace{12pt}%
-  \begin{center}%
-    \textbf{#1}%
-  \end{center}%
-  \vspace{0.5pt}%
+# Body renderers of the other sections by key; unknown keys render as a
+# title only (and are dropped)
+SECTION_RENDERERS = {
+    "summary": _render_summary,
+    "skills": _render_skills,
+    "interests": _render_interests,
+    "certifications": _render_certifications,
 }
-\makeatother
 
-\begin{document}
-"""
 
-    # --- Process Sections Based on Order ---
+@dataclass(frozen=True)
+class LatexTemplate:
+    """
+    A CV document style. format_packages are the preamble lines (after the
+    \\documentclass line) that can be dumped into a precompiled pdflatex
+    format, see core/latex_formats.py; hyperref cannot, so it stays out.
+    """
+    name: str
+    title: str
+    preamble: str
+    documentclass: str
+    format_packages: str
+    render_header: Callable[[dict], str]
+    renderers: Dict[str, Callable[[dict, list], None]]
+    entry_renderers: Dict[str, Callable[[dict], str]]
+    premium: bool = False
+
+    def __post_init__(self):
+        for line in [self.documentclass] + self.format_packages.splitlines():
+            if line and line not in self.preamble:
+                raise ValueError(f"Template {self.name}: {line!r} is not in its preamble")
+
+    @property
+    def format_source(self) -> str:
+        """Source of the template's pdflatex format, without the final \\dump"""
+        return f"{self.documentclass}\n{self.format_packages}"
+
+    def format_body(self, source: str) -> Optional[str]:
+        """
+        A document rendered with this template, to compile with its format:
+        the class comes from the format, and loading a package again is a
+        no-op. None for any other document
+        """
+        if not source.startswith(self.preamble):
+            return None
+        return source.replace(self.documentclass, "%" + self.documentclass, 1)
+
+
+HARVARD = LatexTemplate(
+    name="harvard",
+    title="Harvard",
+    preamble=PREAMBLE,
+    documentclass=r"\documentclass[11pt]{article}",
+    format_packages="\n".join([
+        r"\usepackage{enumitem}",
+        r"\usepackage[utf8]{inputenc}",
+        r"\usepackage[T1]{fontenc}",
+        r"\usepackage[left=1.06cm,top=1.7cm,right=1.06cm,bottom=0.49cm]{geometry}",
+    ]),
+    render_header=_render_header,
+    renderers=SECTION_RENDERERS,
+    entry_renderers=ENTRY_RENDERERS,
+)
+
+
+def render_section(section_key, section_content: dict, template: LatexTemplate = HARVARD,
+                   render_entry=None) -> Optional[str]:
+    """
+    LaTeX of one section; None for a section with nothing past its title.
+    render_entry(template, section_key, item) stands in for the template's
+    entry renderers (core/latex_cache.py caches entries through it)
+    """
+    if section_key == "header":
+        return template.render_header(section_content)
+
+    section_title = escape_latex(section_content.get("section_title", section_key.capitalize()))
+    out = [f"\\section{{{section_title}}}\n"]
+    entry_renderer = template.entry_renderers.get(section_key)
+    if entry_renderer is not None:
+        items = _list(section_content.get("items", []))
+        last = len(items) - 1
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            out.append(entry_renderer(item) if render_entry is None else render_entry(template, section_key, item))
+            if i < last:
+                out.append(ENTRY_SPACING)
+    else:
+        render = template.renderers.get(section_key)
+        if render is not None:
+            render(section_content, out)
+
+    section_latex = "".join(out)
+    if section_latex[section_latex.index("\n") + 1:].strip():
+        return section_latex
+    return None
+
+
+def json_to_latex(json_data, template: LatexTemplate = HARVARD, fragment_cache=None):
+    """
+    Converts CV JSON data to a LaTeX string using the given template (Harvard by default).
+    fragment_cache (core/latex_cache.py) reuses the LaTeX of unchanged sections and entries.
+    """
+
+    if not isinstance(json_data, dict):
+        raise TypeError("Input data must be a dictionary.")
+
+    cv_data = _dict(json_data.get("cv_template", {}))
+    metadata = _dict(cv_data.get("metadata", {}))
+    sections = _dict(cv_data.get("sections", {}))
+
+    section_order = metadata.get("section_order", DEFAULT_SECTION_ORDER)
+    if not isinstance(section_order, list) or not section_order:
+        section_order = DEFAULT_SECTION_ORDER
+
+    render = render_section if fragment_cache is None else fragment_cache.render
     processed_sections = []
     for section_key in section_order:
         section_content = sections.get(section_key)
         if not isinstance(section_content, dict):
             continue
-
-        section_latex = ""
-
-        # --- Header Section ---
-        if section_key == "header":
-            name = escape_latex(section_content.get("name", "Firstname Lastname"))
-            title = escape_latex(section_content.get("title", ""))
-            contact_info = section_content.get("contact_info", {})
-            if not isinstance(contact_info, dict): contact_info = {}
-
-            email_info = contact_info.get("email", {})
-            if not isinstance(email_info, dict): email_info = {}
-            phone_info = contact_info.get("phone", {})
-            if not isinstance(phone_info, dict): phone_info = {}
-            location_info = contact_info.get("location", {})
-            if not isinstance(location_info, dict): location_info = {}
-
-            email_val = escape_latex(email_info.get("value", ""))
-            email_link_target = email_info.get("value", "")
-            email_link = escape_latex(email_info.get("link", f"mailto:{email_link_target}" if isinstance(email_link_target, str) else ""))
-
-            phone_val = escape_latex(phone_info.get("value", ""))
-            phone_link_target = phone_info.get("value", "")
-            phone_link = escape_latex(phone_info.get("link", f"tel:{phone_link_target}" if isinstance(phone_link_target, str) else ""))
-
-            location_val = escape_latex(location_info.get("value", ""))
-
-            contact_parts = []
-            if location_val:
-                contact_parts.append(location_val)
-            if email_val and email_link:
-                 contact_parts.append(f"\\href{{{email_link}}}{{{email_val}}}")
-            if phone_val and phone_link:
-                 contact_parts.append(f"\\href{{{phone_link}}}{{{phone_val}}}")
-
-            # Harvard-style header with centered name and horizontal rule
-            section_latex += "\\begin{center}\n"
-            section_latex += f"    \\textbf{{{name}}}\\\\ \n"
-            section_latex += "    \\hrulefill\n"
-            section_latex += "\\end{center}\n\n"
-            section_latex += "\\begin{center}\n"
-            section_latex += "    " + " \\textbullet\\ ".join(contact_parts) + "\n"
-            section_latex += "\\end{center}\n\n"
-            section_latex += "\\vspace{0.5pt}\n\n"
+        section_latex = render(section_key, section_content, template)
+        if section_latex is not None:
             processed_sections.append(section_latex)
-            continue
-
-        # --- General Section Title with Harvard Style ---
-        section_title = escape_latex(section_content.get("section_title", section_key.capitalize()))
-        section_latex += f"\\section{{{section_title}}}\n"
-
-        # --- Summary Section ---
-        if section_key == "summary":
-            content = escape_latex(section_content.get("content", ""))
-            if content:
-                section_latex += f"{content}\n\n"
-
-        # --- Education Section ---
-        elif section_key == "education":
-            items = section_content.get("items", [])
-            if not isinstance(items, list): items = []
-            for i, item in enumerate(items):
-                 if not isinstance(item, dict): continue
-                 institution = escape_latex(item.get("institution", ""))
-                 start_date = escape_latex(item.get("start_date", ""))
-                 graduation_date = escape_latex(item.get("graduation_date", ""))
-                 gpa = escape_latex(item.get("gpa", ""))
-
-                 # Format date range
-                 dates_str = ""
-                 if start_date and graduation_date:
-                     dates_str = f"{start_date} -- {graduation_date}"
-                 elif graduation_date:
-                     dates_str = graduation_date
-                 elif start_date:
-                     dates_str = start_date
-
-                 # Harvard-style education entry - simplified format
-                 section_latex += f"\\textbf{{{institution}}} \\hfill {dates_str}\n"
-
-                 # Add GPA if available
-                 if gpa:
-                     section_latex += f"GPA: {gpa}\n"
-
-                 section_latex += "\n"
-
-                 # Add proper spacing between education entries
-                 if i < len(items) - 1:
-                     section_latex += "\\vspace{12pt}\n"        # --- Experience Section with Enhanced Formatting ---
-        elif section_key == "experience":
-            print(f"🔍 LATEX DEBUG: Processing experience section")
-            items = section_content.get("items", [])
-            print(f"🔍 LATEX DEBUG: Experience items: {items}")
-            if not isinstance(items, list): items = []
-            for i, item in enumerate(items):
-                 if not isinstance(item, dict): continue
-                 print(f"🔍 LATEX DEBUG: Processing experience item {i + 1}: {item}")
-                 company = escape_latex(item.get("company", ""))
-                 location = escape_latex(item.get("location", ""))
-                 title = escape_latex(item.get("title", ""))
-                 dates_str = format_dates(item.get("dates", {}))
-                 achievements = item.get("achievements", [])
-                 print(f"🔍 LATEX DEBUG: Item {i + 1} achievements: {achievements}")
-                 technologies = item.get("technologies", [])
-                 if not isinstance(technologies, list): technologies = []
-
-                 # Harvard-style job entry
-                 section_latex += f"\\textbf{{{company}}} \\hfill {location}\n\n"
-                 section_latex += f"\\textbf{{{title}}} \\hfill {dates_str}\n"
-                   # Properly formatted achievements list
-                 if achievements:
-                     print(f"🔍 LATEX DEBUG: Raw achievements type: {type(achievements)}")
-                     print(f"🔍 LATEX DEBUG: Raw achievements value: {achievements}")
-                     
-                     # Handle both string and list formats
-                     if isinstance(achievements, str):
-                         # If it's a string, treat it as a single achievement
-                         achievements_list = [achievements]
-                         print(f"🔍 LATEX DEBUG: Converted string to list: {achievements_list}")
-                     elif isinstance(achievements, list):
-                         # If it's already a list, use it as is
-                         achievements_list = achievements
-                         print(f"🔍 LATEX DEBUG: Using existing list: {achievements_list}")
-                     else:
-                         # Fallback for other types
-                         achievements_list = [str(achievements)]
-                         print(f"🔍 LATEX DEBUG: Converted other type to list: {achievements_list}")
-                     
-                     print(f"🔍 LATEX DEBUG: Generating LaTeX list for {len(achievements_list)} achievements")
-                     achievements_latex = generate_latex_list(achievements_list)
-                     print(f"🔍 LATEX DEBUG: Generated achievements LaTeX: {achievements_latex}")
-                     section_latex += achievements_latex
-                 else:
-                     print(f"🔍 LATEX DEBUG: No achievements found for item {i + 1}")
-                 
-                 # Add technologies if present
-                 if technologies:
-                      section_latex += f"\\textit{{Technologies:}} {escape_latex(', '.join(filter(None, map(str, technologies))))}\n"
-                 
-                 # Add clear spacing between job entries
-                 if i < len(items) - 1:
-                     section_latex += "\\vspace{12pt}\n"  # Harvard-style spacing between experience items
-
-        # --- Projects Section with Enhanced Formatting ---
-        elif section_key == "projects":
-            items = section_content.get("items", [])
-            if not isinstance(items, list): items = []
-            for i, item in enumerate(items):
-                 if not isinstance(item, dict): continue
-                 title = escape_latex(item.get("title", ""))
-                 description = escape_latex(item.get("description", ""))
-                 
-                 # Format dates properly
-                 start_date = item.get("start_date", "")
-                 end_date = item.get("end_date", "")
-                 
-                 # Use direct date fields if available, otherwise use dates object
-                 if start_date or end_date:
-                     if start_date and end_date:
-                         dates_str = f"{escape_latex(start_date)} -- {escape_latex(end_date)}"
-                     elif start_date:
-                         dates_str = escape_latex(start_date)
-                     else:
-                         dates_str = escape_latex(end_date)
-                 else:
-                     dates_str = format_dates(item.get("dates", {}))
-                     
-                 # Handle both key_contributions and contributions fields
-                 contributions = []
-                 if "key_contributions" in item:
-                     contributions = item.get("key_contributions", [])
-                 elif "contributions" in item:
-                     contributions = item.get("contributions", [])
-                     
-                 technologies = item.get("technologies", [])
-                 if not isinstance(technologies, list): technologies = []
-
-                 # Harvard-style project entry
-                 section_latex += f"\\textbf{{{title}}} \\hfill {dates_str}\n\n"
-                 
-                 if description:
-                     section_latex += f"{description}\n\n"  # Add extra newline for spacing
-                     
-                 # Add contributions as bullet points
-                 if contributions:
-                     section_latex += generate_latex_list(contributions)
-                 
-                 # Add technologies if present
-                 if technologies:
-                      section_latex += f"\\textit{{Technologies:}} {escape_latex(', '.join(filter(None, map(str, technologies))))}\n\n"  # Add extra newline here
-                 
-                 # Add clear spacing between project entries
-                 if i < len(items) - 1:
-                     section_latex += "\\vspace{12pt}\n"  # Harvard-style spacing between project items
-
-        # --- Skills Section with Harvard Formatting (includes languages) ---
-        elif section_key == "skills":
-            categories = section_content.get("categories", [])
-            if not isinstance(categories, list): categories = []
-
-            for i, category in enumerate(categories):
-                if not isinstance(category, dict): continue
-                cat_name = escape_latex(category.get("name", "Skills"))
-                items = category.get("items", [])
-                if not isinstance(items, list): items = []
-                if items:
-                    escaped_items = [escape_latex(skill) for skill in items if isinstance(skill, str)]
-                    if escaped_items:
-                        section_latex += f"\\textbf{{{cat_name}:}} {', '.join(escaped_items)}\n\n"
-
-        # --- Interests Section ---
-        elif section_key == "interests":
-            items = section_content.get("items", [])
-            if not isinstance(items, list): items = []
-            if items:
-                interests_str = ", ".join([escape_latex(interest) for interest in items if interest])
-                if interests_str:
-                    section_latex += f"{interests_str}\n\n"
-
-        # --- Certifications Section ---
-        elif section_key == "certifications":
-            items = section_content.get("items", [])
-            if not isinstance(items, list): items = []
-            for item in items:
-                if not isinstance(item, dict): continue
-                title = escape_latex(item.get("title", ""))
-                institution = escape_latex(item.get("institution", ""))
-                date = escape_latex(item.get("date", ""))
-
-                if title:
-                    cert_line = f"\\textbf{{{title}}}"
-                    if institution:
-                        cert_line += f", {institution}"
-                    if date:
-                        cert_line += f" \\hfill {date}"
-                    section_latex += cert_line + "\n\n"
-
-
-
-        # Only add sections that have content (skip empty sections)
-        if section_latex.strip() and section_key != "header":
-            # Check if section has actual content beyond just the title
-            content_lines = [line.strip() for line in section_latex.split('\n') if line.strip()]
-            # If we have more than just the section title, add it
-            if len(content_lines) > 1 or (len(content_lines) == 1 and not content_lines[0].startswith('\\section{')):
-                processed_sections.append(section_latex)
-
-    # --- Join processed sections ---
-    latex_string += "\n".join(processed_sections)
-
-    # --- LaTeX Ending ---
-    latex_string += r"""
-\end{document}
-"""
 
-    return latex_string
\ No newline at end of file
+    return template.preamble + "\n".join(processed_sections) + DOCUMENT_END
@@ -0,0 +1,470 @@
+"""
+Generated CV LaTeX -> PDF, in process, without pdflatex.
+
+json_to_latex writes a small, fixed subset of LaTeX: paragraphs, \\textbf,
+\\textit, \\hfill, \\hrulefill, \\href, \\\\, \\vspace, \\section and the
+center and itemize environments, plus the escapes of escape_latex. This
+module typesets exactly that subset into a PdfDocument
+(utils/pdf_writer.py), following the layout of the template's preamble
+(LAYOUTS: page geometry, body size, the spacing LaTeX puts around
+environments and sections, compact lists), in a few milliseconds instead
+of a pdflatex run. Lines are filled greedily and justified like TeX's, but
+in Times rather than Computer Modern, so they break in other places; the
+text, its order, emphasis and links are those of pdflatex
+(benchmarks/check_pdf_parity.py compares the two).
+
+latex_to_pdf() returns None for a source it cannot typeset faithfully: a
+template without a layout, a command outside the subset, or characters
+the WinAnsi encoding of the standard fonts lacks. Callers then fall back
+to pdflatex.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.json_to_latex import DOCUMENT_END, HARVARD
+from utils.latex_templates import template_for_source
+from utils.pdf_writer import BOLD, ITALIC, REGULAR, PdfDocument, PdfPage, encode_text, text_width
+
+CM = 72 / 2.54
+
+
+@dataclass(frozen=True)
+class PdfLayout:
+    """Page geometry and vertical spacing of a template, in PostScript points"""
+    page_width: float
+    page_height: float
+    margin_left: float
+    margin_right: float
+    margin_top: float
+    margin_bottom: float
+    font_size: float
+    baselineskip: float
+    # Top of the text area to the first baseline of a page
+    topskip: float
+    # Before and after a center environment (\topsep + \partopsep)
+    env_skip: float
+    # \vspace before and after a \section title
+    section_before: float
+    section_after: float
+    # Left margin of a list level and the gap between bullet and text
+    list_indent: float
+    label_sep: float
+    title: Optional[str] = None
+    rule_thickness: float = 0.4
+
+
+LAYOUTS = {
+    # article, 11pt, on US letter (no paper option) with the margins of the geometry line
+    HARVARD.name: PdfLayout(
+        page_width=612, page_height=792,
+        margin_left=1.06 * CM, margin_right=1.06 * CM, margin_top=1.7 * CM, margin_bottom=0.49 * CM,
+        font_size=11, baselineskip=13.6, topskip=10, env_skip=12,
+        section_before=12, section_after=0.5, list_indent=27.5, label_sep=5.5,
+        title="Harvard Style CV",
+    ),
+}
+
+# hyperref's urlcolor=blue
+LINK_COLOR = (0, 0, 1)
+
+# Paragraph break, spaces, control word (with the spaces TeX skips after it),
+# control symbol, brace, text
+_TOKEN = re.compile(r"(\n[ \t]*\n\s*)|(\s+)|\\([A-Za-z]+)[ \t]*|\\(.)|([{}])|([^\\{}\s]+)", re.S)
+PAR, SPACE, COMMAND, SYMBOL, BRACE, TEXT = range(6)
+
+# TeX ligatures of the T1 fonts, longest first
+_LIGATURES = (("---", "—"), ("--", "–"), ("``", "“"), ("''", "”"), ("!`", "¡"), ("?`", "¿"),
+              ("`", "‘"), ("'", "’"), ("<<", "«"), (">>", "»"), (",,", "„"))
+_LIGATURE_CHARS = frozenset("-`'<>,")
+
+_SYMBOLS = {"&": "&", "%": "%", "$": "$", "#": "#", "_": "_", "{": "{", "}": "}"}
+_CHARACTER_COMMANDS = {"textbullet": "•", "textbackslash": "\\", "textasciitilde": "~", "textasciicircum": "^"}
+_FONT_COMMANDS = {"textbf": BOLD, "textit": ITALIC}
+
+# Items of a paragraph
+WORD, GLUE, HFILL, RULE, BREAK = range(5)
+
+
+class UnsupportedLatex(Exception):
+    """The source uses LaTeX this module does not typeset"""
+
+
+def _tokenize(body: str) -> list:
+    tokens = []
+    for match in _TOKEN.finditer(body):
+        kind = match.lastindex - 1
+        tokens.append((kind, match.group(match.lastindex)))
+    return tokens
+
+
+def _ligatures(text: str) -> str:
+    if _LIGATURE_CHARS.isdisjoint(text):
+        return text
+    for sequence, ligature in _LIGATURES:
+        text = text.replace(sequence, ligature)
+    return text
+
+
+class _Typesetter:
+    def __init__(self, layout: PdfLayout):
+        self.layout = layout
+        self.doc = PdfDocument(layout.page_width, layout.page_height, layout.title)
+        self.page: Optional[PdfPage] = None
+        self.y = 0.0
+        self.pending_skip = 0.0
+        self.last_skip = 0.0
+        self.center_depth = 0
+        self.list_depth = 0
+        # Font and link of each open group
+        self.groups = [(REGULAR, None)]
+        self._new_paragraph()
+
+    # --- Vertical list ---
+
+    def _new_paragraph(self, label: bool = False) -> None:
+        self.items: list = []
+        self.word: list = []
+        # An item's bullet is set even when its text is empty
+        self.started = label
+        self.label = label
+
+    def vspace(self, amount: float) -> None:
+        self.flush()
+        self.pending_skip += amount
+        self.last_skip = 0.0
+
+    def addvspace(self, amount: float) -> None:
+        """LaTeX's \\addvspace: consecutive ones take the largest, not the sum"""
+        self.flush()
+        if self.last_skip < amount:
+            self.pending_skip += amount - self.last_skip
+            self.last_skip = amount
+
+    def _next_baseline(self) -> float:
+        layout = self.layout
+        y = self.y - layout.baselineskip - self.pending_skip
+        self.pending_skip = self.last_skip = 0.0
+        if self.page is None or y < layout.margin_bottom:
+            # Skips at the top of a page are discarded, as TeX does
+            self.page = self.doc.new_page()
+            y = layout.page_height - layout.margin_top - layout.topskip
+        return y
+
+    # --- Horizontal list ---
+
+    def add_text(self, text: str) -> None:
+        font, link = self.groups[-1]
+        try:
+            data = encode_text(text)
+        except UnicodeEncodeError:
+            raise UnsupportedLatex(f"characters outside WinAnsi: {text!r}")
+        self.word.append((data, font, link, text_width(data, font, self.layout.font_size)))
+        self.started = True
+
+    def _end_word(self) -> None:
+        if self.word:
+            self.items.append((WORD, self.word))
+            self.word = []
+
+    def add_item(self, kind: int) -> None:
+        self._end_word()
+        if kind == GLUE and (not self.items or self.items[-1][0] in (GLUE, BREAK)):
+            return
+        if kind != GLUE:
+            self.started = True
+        self.items.append((kind, None))
+
+    def flush(self) -> None:
+        """End the current paragraph and set its lines"""
+        self._end_word()
+        if self.started:
+            while self.items and self.items[-1][0] == GLUE:
+                self.items.pop()
+            for line, last in self._break_lines():
+                self._set_line(line, last)
+        self._new_paragraph()
+
+    def _indent(self) -> float:
+        return self.list_depth * self.layout.list_indent
+
+    def _break_lines(self):
+        """Greedy line breaking; yields (items, ends the paragraph or a \\\\)"""
+        size = self.layout.font_size
+        available = self.layout.page_width - self.layout.margin_left - self.layout.margin_right - self._indent()
+        space = text_width(b" ", REGULAR, size)
+        line, width = [], 0.0
+        for kind, value in self.items:
+            if kind == WORD:
+                word_width = sum([run[3] for run in value])
+                glue = space if line and line[-1][0] == GLUE else 0.0
+                if line and width + glue + word_width > available and any(k == WORD for k, _ in line):
+                    while line and line[-1][0] == GLUE:
+                        line.pop()
+                    yield line, False
+                    line, width, glue = [], 0.0, 0.0
+                line.append((kind, value))
+                width += glue + word_width
+            elif kind == BREAK:
+                yield line, True
+                line, width = [], 0.0
+            elif kind == GLUE:
+                if line:
+                    line.append((kind, value))
+            else:
+                line.append((kind, value))
+        if line:
+            yield line, True
+
+    def _set_line(self, line: list, last: bool) -> None:
+        layout = self.layout
+        size = layout.font_size
+        left = layout.margin_left + self._indent()
+        available = layout.page_width - layout.margin_right - left
+        space = text_width(b" ", REGULAR, size)
+        while line and line[-1][0] == GLUE:
+            line.pop()
+
+        natural = 0.0
+        glues = fills = 0
+        for kind, value in line:
+            if kind == WORD:
+                natural += sum([run[3] for run in value])
+            elif kind == GLUE:
+                natural += space
+                glues += 1
+            elif kind in (HFILL, RULE):
+                fills += 1
+        extra = max(available - natural, 0.0)
+
+        x = left
+        fill = stretch = 0.0
+        if fills:
+            fill = extra / fills
+        elif self.center_depth:
+            x += extra / 2
+        elif not last and glues:
+            stretch = extra / glues
+
+        self.y = y = self._next_baseline()
+        page = self.page
+        if self.label:
+            bullet = encode_text("•")
+            page.text(left - layout.label_sep - text_width(bullet, REGULAR, size), y, bullet, REGULAR, size)
+            self.label = False
+
+        # Runs of one font and link share a text operation; stretched spaces via word spacing
+        segment: Optional[list] = None  # [x, font, link, bytearray]
+
+        def close(trailing_space: bool = False):
+            nonlocal segment
+            if segment is not None:
+                start, font, link, data = segment
+                if trailing_space:
+                    data += b" "
+                color = LINK_COLOR if link else None
+                page.text(start, y, bytes(data), font, size, word_spacing=stretch, color=color)
+                if link:
+                    page.link(start, y - 0.25 * size, start + text_width(bytes(data).rstrip(), font, size)
+                              + stretch * bytes(data).rstrip().count(b" "), y + 0.8 * size, link)
+                segment = None
+
+        pending_space = False
+        for kind, value in line:
+            if kind == WORD:
+                for data, font, link, width in value:
+                    if segment is not None and (segment[1], segment[2]) == (font, link):
+                        if pending_space:
+                            segment[3] += b" "
+                    else:
+                        close(trailing_space=pending_space)
+                        segment = [x, font, link, bytearray()]
+                    segment[3] += data
+                    pending_space = False
+                    x += width
+            elif kind == GLUE:
+                x += space + stretch
+                pending_space = True
+            else:
+                close(trailing_space=True)
+                pending_space = False
+                if kind == RULE:
+                    page.rule(x, x + fill, y, layout.rule_thickness)
+                x += fill
+        close()
+
+    # --- Source ---
+
+    def run(self, tokens: list, title: bool = False) -> None:
+        """Typeset tokens; a title (of a \\section) stays within the current paragraph"""
+        position = 0
+        count = len(tokens)
+        while position < count:
+            kind, value = tokens[position]
+            position += 1
+            if kind == TEXT:
+                self.add_text(_ligatures(value))
+            elif kind == SPACE:
+                self.add_item(GLUE)
+            elif kind == PAR:
+                if title:
+                    raise UnsupportedLatex("paragraph break in a section title")
+                self.flush()
+            elif kind == BRACE:
+                if value == "{":
+                    self.groups.append(self.groups[-1])
+                elif len(self.groups) > 1:
+                    self.groups.pop()
+                else:
+                    raise UnsupportedLatex("unbalanced braces")
+            elif kind == SYMBOL:
+                if value in _SYMBOLS:
+                    self.add_text(_SYMBOLS[value])
+                elif value == " ":
+                    self.add_item(GLUE)
+                elif value == "\\":
+                    self.add_item(BREAK)
+                    position = _skip_spaces(tokens, position)
+                else:
+                    raise UnsupportedLatex(f"\\{value}")
+            else:
+                position = self.command(value, tokens, position)
+        if not title:
+            self.flush()
+
+    def command(self, name: str, tokens: list, position: int) -> int:
+        """Typeset a control word; returns the position after its arguments"""
+        if position < len(tokens) and tokens[position][0] == SPACE:
+            position += 1  # Spaces after a control word are skipped
+        if name in _CHARACTER_COMMANDS:
+            self.add_text(_CHARACTER_COMMANDS[name])
+        elif name in _FONT_COMMANDS:
+            _expect_group(tokens, position)
+            self.groups.append((_FONT_COMMANDS[name], self.groups[-1][1]))
+            self.started = True
+            position += 1
+        elif name == "href":
+            url, position = _argument(tokens, position)
+            _expect_group(tokens, position)
+            self.groups.append((self.groups[-1][0], url))
+            self.started = True
+            position += 1
+        elif name == "hfill":
+            self.add_item(HFILL)
+        elif name == "hrulefill":
+            self.add_item(RULE)
+        elif name == "vspace":
+            amount, position = _argument(tokens, position)
+            self.vspace(_points(amount))
+        elif name == "section":
+            title_end = _group_end(tokens, position)
+            self.vspace(self.layout.section_before)
+            self.addvspace(self.layout.env_skip)
+            self.center_depth += 1
+            self.groups.append((BOLD, None))
+            self.run(tokens[position + 1:title_end], title=True)
+            self.groups.pop()
+            self.addvspace(self.layout.env_skip)
+            self.center_depth -= 1
+            self.vspace(self.layout.section_after)
+            position = title_end + 1
+        elif name in ("begin", "end"):
+            environment, position = _argument(tokens, position)
+            position = self.environment(name == "begin", environment, tokens, position)
+        elif name == "item":
+            if not self.list_depth:
+                raise UnsupportedLatex("\\item outside a list")
+            self.flush()
+            self._new_paragraph(label=True)
+        else:
+            raise UnsupportedLatex(f"\\{name}")
+        return position
+
+    def environment(self, begin: bool, environment: str, tokens: list, position: int) -> int:
+        if environment == "center":
+            self.addvspace(self.layout.env_skip)
+            self.center_depth += 1 if begin else -1
+        elif environment == "itemize":
+            # The generated lists set topsep, partopsep, parsep and itemsep to 0
+            self.flush()
+            self.list_depth += 1 if begin else -1
+            if begin and position < len(tokens) and tokens[position][0] == TEXT and tokens[position][1][0] == "[":
+                while not tokens[position][1].endswith("]"):
+                    position += 1
+                    if position >= len(tokens):
+                        raise UnsupportedLatex("unterminated list options")
+                position += 1
+        elif environment != "document":
+            raise UnsupportedLatex(f"{environment} environment")
+        if self.center_depth < 0 or self.list_depth < 0:
+            raise UnsupportedLatex(f"unbalanced {environment} environment")
+        return position
+
+
+def _skip_spaces(tokens: list, position: int) -> int:
+    while position < len(tokens) and tokens[position][0] == SPACE:
+        position += 1
+    return position
+
+
+def _expect_group(tokens: list, position: int) -> None:
+    if position >= len(tokens) or tokens[position] != (BRACE, "{"):
+        raise UnsupportedLatex("command argument without braces")
+
+
+def _group_end(tokens: list, position: int) -> int:
+    """Position of the brace closing the group that opens at position"""
+    _expect_group(tokens, position)
+    depth = 0
+    for end in range(position, len(tokens)):
+        if tokens[end][0] == BRACE:
+            depth += 1 if tokens[end][1] == "{" else -1
+            if depth == 0:
+                return end
+    raise UnsupportedLatex("unbalanced braces")
+
+
+def _argument(tokens: list, position: int):
+    """Plain text of a braced argument (a URL, a length, an environment name) and the position after it"""
+    end = _group_end(tokens, position)
+    parts = []
+    for kind, value in tokens[position + 1:end]:
+        if kind == TEXT:
+            parts.append(value)
+        elif kind == SPACE:
+            parts.append(" ")
+        elif kind == SYMBOL and value in _SYMBOLS:
+            parts.append(_SYMBOLS[value])
+        elif kind == COMMAND and value in _CHARACTER_COMMANDS:
+            parts.append(_CHARACTER_COMMANDS[value])
+        elif kind != BRACE:
+            raise UnsupportedLatex("unexpected content in an argument")
+    return "".join(parts), end + 1
+
+
+def _points(length: str) -> float:
+    if not length.endswith("pt"):
+        raise UnsupportedLatex(f"length {length}")
+    try:
+        return float(length[:-2])
+    except ValueError:
+        raise UnsupportedLatex(f"length {length}")
+
+
+def latex_to_pdf(source: str) -> Optional[bytes]:
+    """PDF of LaTeX rendered by json_to_latex; None when it needs pdflatex"""
+    template = template_for_source(source)
+    layout = LAYOUTS.get(template.name) if template is not None else None
+    if layout is None or not source.endswith(DOCUMENT_END):
+        return None
+    body = source[len(template.preamble):len(source) - len(DOCUMENT_END)]
+    typesetter = _Typesetter(layout)
+    try:
+        typesetter.run(_tokenize(body))
+    except UnsupportedLatex:
+        return None
+    if typesetter.center_depth or typesetter.list_depth or len(typesetter.groups) > 1:
+        return None
+    if not typesetter.doc.pages:
+        return None  # Nothing to typeset; pdflatex reports it
+    return typesetter.doc.to_bytes()
@@ -0,0 +1,164 @@
+"""
+Registry of the CV LaTeX templates.
+
+Templates are built once at import, as LatexTemplate objects holding their
+final preamble string and renderer table (utils/json_to_latex.py), so
+rendering with any of them costs the same and a request only does a dict
+lookup to pick one. Premium templates need a plan with custom_templates.
+"""
+from typing import Dict, List, Optional
+
+from utils.json_to_latex import (
+    CONTACT_SEPARATOR, ENTRY_RENDERERS, HARVARD, SECTION_RENDERERS, LatexTemplate, header_contact
+)
+
+DEFAULT_TEMPLATE = HARVARD.name
+
+MODERN_CONTACT_SEPARATOR = " \\textbar\\ "
+
+MODERN_PREAMBLE = r"""
+\documentclass[11pt]{article}
+
+% Modern CV Template - sans-serif, left-aligned headings
+\setlength{\parindent}{0pt}
+\usepackage{hyperref}
+\usepackage{enumitem}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage{helvet}
+\usepackage[left=1.5cm,top=1.5cm,right=1.5cm,bottom=1.2cm]{geometry}
+\renewcommand{\familydefault}{\sfdefault}
+
+\hypersetup{
+    colorlinks=true,
+    linkcolor=black,
+    filecolor=black,
+    urlcolor=blue,
+    pdftitle={Curriculum Vitae},
+}
+
+% Section titles flush left over a full-width rule
+\makeatletter
+\renewcommand{\section}[1]{%
+  \par\vspace{10pt}%
+  {\large\textbf{#1}}\par
+  \vspace{2pt}\hrule\vspace{6pt}%
+}
+\makeatother
+
+\begin{document}
+"""
+
+COMPACT_PREAMBLE = r"""
+\documentclass[10pt]{article}
+
+% Compact CV Template - Harvard layout on tighter margins and spacing
+\setlength{\parindent}{0pt}
+\usepackage{hyperref}
+\usepackage{enumitem}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[left=1cm,top=1cm,right=1cm,bottom=0.8cm]{geometry}
+
+\hypersetup{
+    colorlinks=true,
+    linkcolor=blue,
+    filecolor=blue,
+    urlcolor=blue,
+    pdftitle={Curriculum Vitae},
+}
+
+\makeatletter
+\renewcommand{\section}[1]{%
+  \vspace{6pt}%
+  \begin{center}%
+    \textbf{\MakeUppercase{#1}}%
+  \end{center}%
+  \vspace{0pt}%
+}
+\makeatother
+
+\begin{document}
+"""
+
+
+def _render_modern_header(section) -> str:
+    name, contact_parts = header_contact(section)
+    # Large name flush left, contact details on one line below it
+    header = f"{{\\LARGE\\textbf{{{name}}}}}\n\n"
+    if contact_parts:
+        header += f"\\vspace{{4pt}}\n{MODERN_CONTACT_SEPARATOR.join(contact_parts)}\n\n"
+    return header + "\\vspace{4pt}\n\n"
+
+
+def _render_compact_header(section) -> str:
+    name, contact_parts = header_contact(section)
+    # Name and contact details in one centered block
+    header = f"\\begin{{center}}\n    \\textbf{{\\large {name}}}"
+    if contact_parts:
+        header += f"\\\\\n    {CONTACT_SEPARATOR.join(contact_parts)}"
+    return header + "\n\\end{center}\n\n"
+
+
+MODERN = LatexTemplate(
+    name="modern",
+    title="Modern",
+    preamble=MODERN_PREAMBLE,
+    documentclass=r"\documentclass[11pt]{article}",
+    format_packages="\n".join([
+        r"\usepackage{enumitem}",
+        r"\usepackage[utf8]{inputenc}",
+        r"\usepackage[T1]{fontenc}",
+        r"\usepackage{helvet}",
+        r"\usepackage[left=1.5cm,top=1.5cm,right=1.5cm,bottom=1.2cm]{geometry}",
+    ]),
+    render_header=_render_modern_header,
+    renderers=SECTION_RENDERERS,
+    entry_renderers=ENTRY_RENDERERS,
+    premium=True,
+)
+
+COMPACT = LatexTemplate(
+    name="compact",
+    title="Compact",
+    preamble=COMPACT_PREAMBLE,
+    documentclass=r"\documentclass[10pt]{article}",
+    format_packages="\n".join([
+        r"\usepackage{enumitem}",
+        r"\usepackage[utf8]{inputenc}",
+        r"\usepackage[T1]{fontenc}",
+        r"\usepackage[left=1cm,top=1cm,right=1cm,bottom=0.8cm]{geometry}",
+    ]),
+    render_header=_render_compact_header,
+    renderers=SECTION_RENDERERS,
+    entry_renderers=ENTRY_RENDERERS,
+    premium=True,
+)
+
+TEMPLATES: Dict[str, LatexTemplate] = {}
+
+
+def register_template(template: LatexTemplate) -> None:
+    if template.name in TEMPLATES:
+        raise ValueError(f"LaTeX template {template.name} is already registered")
+    TEMPLATES[template.name] = template
+
+
+for _template in (HARVARD, MODERN, COMPACT):
+    register_template(_template)
+
+
+def get_template(name: str) -> Optional[LatexTemplate]:
+    return TEMPLATES.get(name)
+
+
+def list_templates() -> List[LatexTemplate]:
+    return list(TEMPLATES.values())
+
+
+def template_for_source(source: str) -> Optional[LatexTemplate]:
+    """The template a LaTeX document was rendered with, from its preamble"""
+    for template in TEMPLATES.values():
+        if source.startswith(template.preamble):
+            return template
+    return None
@@ -0,0 +1,72 @@
+"""
+PDF validation and text extraction without the web layer.
+
+parse_cv_pdf() takes raw bytes and returns plain data, so it can run in a
+worker process (core/pdf_pool.py) as well as inline.
+"""
+import hashlib
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Union
+
+from core.config import settings
+from utils.file_validator import FileValidator
+
+
+def pdf_text(pdf_content: Union[bytes, bytearray, BinaryIO]) -> str:
+    """Text of every page of a PDF, from bytes or a seekable binary file"""
+    import PyPDF2
+
+    if isinstance(pdf_content, (bytes, bytearray)):
+        pdf_file = BytesIO(pdf_content)
+    else:
+        pdf_file = pdf_content
+        pdf_file.seek(0)
+    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    return "".join(page.extract_text() or "" for page in pdf_reader.pages)
+
+
+def parse_cv_pdf(data: bytes) -> Dict[str, Any]:
+    """
+    Apply the upload checks of FileValidator to raw PDF bytes and extract
+    their text. Returns {"file_hash", "page_count", "text"} on success or
+    {"file_hash", "error"} when the file is rejected.
+    """
+    result: Dict[str, Any] = {"file_hash": hashlib.sha256(data).hexdigest()}
+
+    if len(data) < FileValidator.MIN_FILE_SIZE:
+        result["error"] = f"File too small. Minimum size is {FileValidator.format_file_size(FileValidator.MIN_FILE_SIZE)}"
+        return result
+    if len(data) > FileValidator.MAX_FILE_SIZE:
+        result["error"] = f"File too large. Maximum size is {FileValidator.format_file_size(FileValidator.MAX_FILE_SIZE)}"
+        return result
+    if not FileValidator._validate_pdf_signature(data[:8]):
+        result["error"] = "Invalid PDF file. File signature does not match PDF format"
+        return result
+
+    try:
+        import PyPDF2
+
+        pdf_reader = PyPDF2.PdfReader(BytesIO(data))
+        if pdf_reader.is_encrypted:
+            result["error"] = "PDF is password protected"
+            return result
+        result["page_count"] = len(pdf_reader.pages)
+        if result["page_count"] > settings.MAX_PDF_PAGES:
+            result["error"] = f"PDF has too many pages ({result['page_count']}). CVs should typically be 1-3 pages."
+            return result
+        text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
+    except Exception as e:
+        result["error"] = f"PDF structure validation failed: {str(e)}"
+        return result
+
+    if len(text.strip()) < settings.MIN_TEXT_LENGTH:
+        result["error"] = "PDF appears to be empty or contains no extractable text"
+        return result
+    result["text"] = text
+    return result
+
+
+def parse_cv_pdf_file(path: str) -> Dict[str, Any]:
+    """parse_cv_pdf() of a file on disk (cheaper to hand to a worker process than the bytes)"""
+    with open(path, "rb") as f:
+        return parse_cv_pdf(f.read())
@@ -0,0 +1,191 @@
+"""
+Minimal PDF writer: text in the standard Times fonts, rules and links.
+
+Just enough of PDF 1.4 for a typeset CV (utils/latex_pdf.py). The fonts are
+three of the standard 14 every PDF viewer provides, so nothing is embedded;
+text is encoded as WinAnsi (cp1252) and measured with the Adobe font
+metrics below. Page content is deflated and the file written in one pass.
+"""
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+REGULAR = "regular"
+BOLD = "bold"
+ITALIC = "italic"
+
+# Adobe Font Metrics advance widths (1/1000 em) of ASCII 32..126
+_ASCII_WIDTHS = {
+    REGULAR: (
+        "250 333 408 500 500 833 778 180 333 333 500 564 250 333 250 278 500 500 500 500 500 500 500 500 "
+        "500 500 278 278 564 564 564 444 921 722 667 667 722 611 556 722 722 333 389 722 611 889 722 722 "
+        "556 722 667 556 611 722 722 944 722 722 611 333 278 333 469 500 333 444 500 444 500 444 333 500 "
+        "500 278 278 500 278 778 500 500 500 500 333 389 278 500 500 722 500 500 444 480 200 480 541"
+    ),
+    BOLD: (
+        "250 333 555 500 500 1000 833 278 333 333 500 570 250 333 250 278 500 500 500 500 500 500 500 500 "
+        "500 500 333 333 570 570 570 500 930 722 667 722 722 667 611 778 778 389 500 778 667 944 722 778 "
+        "611 778 722 556 667 722 722 1000 722 722 667 333 278 333 581 500 333 500 556 444 556 444 333 500 "
+        "556 278 333 556 278 833 556 500 556 556 444 389 333 556 500 722 500 500 444 394 220 394 520"
+    ),
+    ITALIC: (
+        "250 333 420 500 500 833 778 214 333 333 500 675 250 333 250 278 500 500 500 500 500 500 500 500 "
+        "500 500 333 333 675 675 675 500 920 611 611 667 722 611 611 722 722 333 444 667 556 833 667 722 "
+        "611 722 611 500 556 722 611 833 611 556 556 389 278 389 422 500 333 500 500 444 500 444 278 500 "
+        "500 278 278 444 278 722 500 500 500 500 389 389 278 500 444 667 444 444 389 400 275 400 541"
+    ),
+}
+
+# Widths of the WinAnsi punctuation above ASCII, per font
+_PUNCTUATION_WIDTHS = {
+    "•": (350, 350, 350),     # bullet
+    "–": (500, 500, 500),     # en dash
+    "—": (1000, 1000, 889),   # em dash
+    "‘": (333, 333, 333),
+    "’": (333, 333, 333),
+    "“": (444, 500, 556),
+    "”": (444, 500, 556),
+    "…": (1000, 1000, 889),   # ellipsis
+    " ": (250, 250, 250),     # no-break space
+}
+
+PDF_FONTS = {
+    REGULAR: ("F1", "Times-Roman"),
+    BOLD: ("F2", "Times-Bold"),
+    ITALIC: ("F3", "Times-Italic"),
+}
+
+
+def _width_table(font: str, column: int) -> List[int]:
+    """Advance widths of the 256 WinAnsi codes"""
+    ascii_widths = [int(width) for width in _ASCII_WIDTHS[font].split()]
+    widths = [0] * 32 + ascii_widths + [500] * (256 - 32 - len(ascii_widths))
+    for code in range(128, 256):
+        try:
+            char = bytes([code]).decode("cp1252")
+        except UnicodeDecodeError:
+            continue
+        if char in _PUNCTUATION_WIDTHS:
+            widths[code] = _PUNCTUATION_WIDTHS[char][column]
+            continue
+        # Accented letters are as wide as their base letter
+        base = unicodedata.normalize("NFKD", char)[:1]
+        if base and " " < base <= "~":
+            widths[code] = widths[ord(base)]
+    return widths
+
+
+FONT_WIDTHS: Dict[str, List[int]] = {font: _width_table(font, i) for i, font in enumerate((REGULAR, BOLD, ITALIC))}
+
+
+def encode_text(text: str) -> bytes:
+    """WinAnsi bytes of text; raises UnicodeEncodeError for anything outside it"""
+    return text.encode("cp1252")
+
+
+def text_width(data: bytes, font: str, size: float) -> float:
+    return sum(map(FONT_WIDTHS[font].__getitem__, data)) * size / 1000
+
+
+def _literal(data: bytes) -> bytes:
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _number(value: float) -> bytes:
+    return f"{value:.2f}".rstrip("0").rstrip(".").encode("ascii")
+
+
+class PdfPage:
+    """Drawing operations of one page"""
+
+    def __init__(self):
+        self.ops: List[bytes] = []
+        self.links: List[Tuple[float, float, float, float, str]] = []
+
+    def text(self, x: float, y: float, data: bytes, font: str, size: float,
+             word_spacing: float = 0.0, color: Optional[Tuple[float, float, float]] = None) -> None:
+        """WinAnsi-encoded text with its baseline starting at (x, y)"""
+        ops = [b"BT /", PDF_FONTS[font][0].encode("ascii"), b" ", _number(size), b" Tf "]
+        if word_spacing:
+            ops += [_number(word_spacing), b" Tw "]
+        if color is not None:
+            ops += [b" ".join(_number(c) for c in color), b" rg "]
+        ops += [_number(x), b" ", _number(y), b" Td ", _literal(data), b" Tj ET"]
+        self.ops.append(b"".join(ops))
+
+    def rule(self, x1: float, x2: float, y: float, thickness: float = 0.4) -> None:
+        """Horizontal rule whose bottom edge is at y"""
+        self.ops.append(b"%s %s %s %s re f" % (_number(x1), _number(y), _number(x2 - x1), _number(thickness)))
+
+    def link(self, x1: float, y1: float, x2: float, y2: float, uri: str) -> None:
+        self.links.append((x1, y1, x2, y2, uri))
+
+
+class PdfDocument:
+    """Pages of one size, written out by to_bytes()"""
+
+    def __init__(self, width: float, height: float, title: Optional[str] = None):
+        self.width = width
+        self.height = height
+        self.title = title
+        self.pages: List[PdfPage] = []
+
+    def new_page(self) -> PdfPage:
+        page = PdfPage()
+        self.pages.append(page)
+        return page
+
+    def to_bytes(self) -> bytes:
+        objects: List[bytes] = []
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(b"")  # filled in once the page tree exists
+        page_tree = add(b"")
+        fonts = b" ".join(
+            b"/%s %d 0 R" % (resource.encode("ascii"), add(
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode("ascii")))
+            for resource, base in PDF_FONTS.values()
+        )
+        resources = add(b"<< /Font << " + fonts + b" >> >>")
+        media_box = b"[0 0 %s %s]" % (_number(self.width), _number(self.height))
+
+        page_ids = []
+        for page in self.pages:
+            content = zlib.compress(b"\n".join(page.ops))
+            contents = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+            annots = b""
+            if page.links:
+                annots = b" /Annots [" + b" ".join(
+                    b"<< /Type /Annot /Subtype /Link /Border [0 0 0] /Rect [%s %s %s %s] "
+                    b"/A << /S /URI /URI %s >> >>" % (
+                        _number(x1), _number(y1), _number(x2), _number(y2),
+                        _literal(uri.encode("ascii", "backslashreplace")))
+                    for x1, y1, x2, y2, uri in page.links
+                ) + b"]"
+            page_ids.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox %s /Resources %d 0 R /Contents %d 0 R%s >>"
+                % (page_tree, media_box, resources, contents, annots)
+            ))
+        objects[page_tree - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % page_tree
+        info = add(b"<< /Producer (CV direct PDF writer)%s >>" % (
+            b" /Title " + _literal(self.title.encode("cp1252", "replace")) if self.title else b""))
+
+        out = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+        offsets = []
+        position = len(out[0])
+        for number, body in enumerate(objects, start=1):
+            chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+            offsets.append(position)
+            out.append(chunk)
+            position += len(chunk)
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)]
+        xref += [b"%010d 00000 n \n" % offset for offset in offsets]
+        out += xref
+        out.append(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                   % (len(objects) + 1, catalog, info, position))
+        return b"".join(out)
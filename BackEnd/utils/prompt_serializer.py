@@ -0,0 +1,176 @@
+"""
+Compact CV renderings for LLM prompts.
+
+Prompts used to embed `json.dumps(cv_data, indent=2)`: pretty-printed, with
+template placeholders, links and rendering settings the model never needs.
+These helpers drop all of that and give either minified JSON (when the model
+has to refer to field paths or return the structure) or a terse text
+rendering (when it only needs to read the content).
+"""
+import json
+import math
+from typing import Any
+
+
+# Keys that only matter for rendering or linking, never for analysis
+PROMPT_DROPPED_KEYS = frozenset({"link", "url", "section_title"})
+
+# Long strings in a list are rendered one per line, short ones comma-joined
+INLINE_ITEM_MAX_CHARS = 40
+
+# Rough characters-per-token ratio of Gemini tokenizers on English CV text
+CHARS_PER_TOKEN = 4
+
+
+# Example values from CV_STRUCTURE that the extractor copies through when the
+# PDF has nothing better. Realistic examples ("English (Fluent)", "Technical")
+# are deliberately not listed since real CVs contain them too.
+PLACEHOLDER_VALUES = frozenset({
+    "firstname lastname", "youremail@college.harvard.edu", "phone number",
+    "home or campus street address, city, state zip",
+    "start date", "end date", "graduation date", "month year", "issue date", "gpa (optional)",
+    "position title", "city, state (or remote)", "company url", "project url",
+    "project title", "project description", "certification name", "issuing institution",
+    "software 1", "software 2", "programming language 1", "programming language 2",
+    "technology 1", "technology 2", "contribution 1", "contribution 2",
+    "interest 1", "interest 2", "interest 3", "quantify where possible",
+    "begin each bullet with an action verb and include details that will help "
+    "the reader understand your accomplishments",
+    "do not use personal pronouns; each line should be a phrase rather than a full sentence",
+})
+
+
+def _is_empty(value) -> bool:
+    if value is None or value is False:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value.strip().lower() in PLACEHOLDER_VALUES
+    if isinstance(value, (dict, list)):
+        return not value
+    return False
+
+
+def _prune(value, keep_links: bool):
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            if key in PROMPT_DROPPED_KEYS and not (keep_links and key in ("link", "url")):
+                continue
+            item = _prune(item, keep_links)
+            if not _is_empty(item):
+                pruned[key] = item
+        # {"value": "x"} wrappers (contact info) collapse to the value itself
+        if list(pruned) == ["value"]:
+            return pruned["value"]
+        return pruned
+    if isinstance(value, list):
+        return [item for item in (_prune(item, keep_links) for item in value) if not _is_empty(item)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def compact_cv(cv_data: dict, keep_links: bool = False) -> dict:
+    """
+    Return only the filled-in CV content: sections in display order, without
+    metadata, rendering rules, section titles, placeholders or empty fields.
+    Links are dropped unless `keep_links` (needed when the model rewrites the CV).
+    """
+    cv_template = cv_data.get("cv_template", cv_data) if isinstance(cv_data, dict) else {}
+    sections = cv_template.get("sections", {}) if isinstance(cv_template, dict) else {}
+    if not isinstance(sections, dict):
+        return {}
+
+    metadata = cv_template.get("metadata") or {}
+    order = [name for name in metadata.get("section_order", []) if name in sections]
+    order += [name for name in sections if name not in order]
+
+    compact = {}
+    for name in order:
+        section = _prune(sections[name], keep_links)
+        if not _is_empty(section):
+            compact[name] = section
+    return compact
+
+
+def dumps_prompt_json(value: Any) -> str:
+    """Minified JSON for prompts (no indentation, non-ASCII kept as-is)"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def cv_to_prompt_json(cv_data: dict, keep_links: bool = False) -> str:
+    """Minified JSON of the compact CV"""
+    return dumps_prompt_json(compact_cv(cv_data, keep_links=keep_links))
+
+
+def _format_dates(dates) -> str:
+    if not isinstance(dates, dict):
+        return str(dates)
+    start = dates.get("start", "")
+    end = dates.get("end", "")
+    if dates.get("is_current"):
+        end = f"{end} (current)" if end else "Present"
+    return f"{start} - {end}".strip(" -")
+
+
+def _format_scalar(key: str, value) -> str:
+    if key == "dates":
+        return _format_dates(value)
+    return str(value)
+
+
+def _render(value, indent: str, lines: list):
+    if isinstance(value, list):
+        if all(not isinstance(item, (dict, list)) for item in value):
+            if all(len(str(item)) <= INLINE_ITEM_MAX_CHARS for item in value):
+                lines.append(f"{indent}{', '.join(str(item) for item in value)}")
+            else:
+                lines.extend(f"{indent}- {item}" for item in value)
+            return
+        for item in value:
+            if isinstance(item, dict):
+                _render_dict(item, indent, lines, bullet=True)
+            else:
+                _render(item, indent + "  ", lines)
+        return
+    if isinstance(value, dict):
+        _render_dict(value, indent, lines)
+        return
+    lines.append(f"{indent}{value}")
+
+
+def _render_dict(value: dict, indent: str, lines: list, bullet: bool = False):
+    inline = [(key, item) for key, item in value.items()
+              if not isinstance(item, (dict, list)) or key == "dates"]
+    nested = [(key, item) for key, item in value.items() if (key, item) not in inline]
+
+    child_indent = indent
+    if inline:
+        text = "; ".join(f"{key}: {_format_scalar(key, item)}" for key, item in inline)
+        lines.append(f"{indent}{'* ' if bullet else ''}{text}")
+        child_indent = indent + "  "
+
+    for key, item in nested:
+        if isinstance(item, list) and all(not isinstance(i, (dict, list)) for i in item) \
+                and all(len(str(i)) <= INLINE_ITEM_MAX_CHARS for i in item):
+            lines.append(f"{child_indent}{key}: {', '.join(str(i) for i in item)}")
+        else:
+            lines.append(f"{child_indent}{key}:")
+            _render(item, child_indent + "  ", lines)
+
+
+def cv_to_prompt_text(cv_data: dict) -> str:
+    """
+    Terse, line-oriented rendering of the compact CV for prompts that only
+    read the content (skill matching, experience and weakness analysis)
+    """
+    lines = []
+    for name, section in compact_cv(cv_data).items():
+        lines.append(f"## {name}")
+        _render(section, "", lines)
+    return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline token estimate; use the model's count_tokens for exact numbers"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
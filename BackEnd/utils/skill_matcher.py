@@ -0,0 +1,611 @@
+"""
+Deterministic skill matching between a CV and a job description.
+
+Skills are normalized against a taxonomy (canonical name -> aliases), so
+"k8s", "Kubernetes" and "kubernetes" are one skill and "Python 3.11" or
+"Vue3" lose their version. Frameworks imply what they cover (Flutter implies
+Dart, iOS and Android, but not Swift or Kotlin). Text is tokenized once and
+aliases are found through an index keyed on their first token.
+
+From the job description the matcher derives the required skills and
+resolves them against the CV:
+
+* skills joined by "or" or "/" ("Flutter or Swift/Kotlin") are alternatives;
+  one of them is enough, and if none is present only the first is missing
+* skills only named in a nice-to-have sentence ("... is a plus") count as
+  matches when present and are never missing
+* capitalized terms the taxonomy does not know are returned as
+  `unrecognized`; only those are left to the model to classify
+
+The same CV and job description always give the same matches and missing
+skills, and so the same grade.
+"""
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Canonical skill name -> aliases (lowercase; multi-word aliases are token sequences).
+# Soft skills and methodologies (Agile, Scrum, Jira) are deliberately absent.
+SKILL_TAXONOMY: Dict[str, Tuple[str, ...]] = {
+    # Languages
+    "Python": ("python",),
+    "JavaScript": ("javascript", "js", "ecmascript", "es6", "es2015"),
+    "TypeScript": ("typescript", "ts"),
+    "Java": ("java",),
+    "Kotlin": ("kotlin",),
+    "Swift": ("swift",),
+    "Objective-C": ("objective-c", "objective c", "objc"),
+    "Dart": ("dart",),
+    "C#": ("c#", "csharp"),
+    "C++": ("c++", "cpp"),
+    "C": ("c",),
+    "Go": ("go", "golang"),
+    "Rust": ("rust",),
+    "Ruby": ("ruby",),
+    "PHP": ("php",),
+    "Scala": ("scala",),
+    "R": ("r",),
+    "SQL": ("sql",),
+    "Bash": ("bash", "shell scripting"),
+    "HTML": ("html",),
+    "CSS": ("css",),
+    "Sass": ("sass", "scss"),
+    # Mobile
+    "iOS": ("ios",),
+    "Android": ("android",),
+    "Flutter": ("flutter",),
+    "React Native": ("react native", "react-native"),
+    "SwiftUI": ("swiftui",),
+    "UIKit": ("uikit",),
+    # No bare "compose": it is as often Docker Compose
+    "Jetpack Compose": ("jetpack compose",),
+    "Xamarin": ("xamarin",),
+    "Ionic": ("ionic",),
+    "Bloc": ("bloc",),
+    "Riverpod": ("riverpod",),
+    "Xcode": ("xcode",),
+    "Android Studio": ("android studio",),
+    "CocoaPods": ("cocoapods",),
+    "Core Data": ("core data", "coredata"),
+    # Web and backend frameworks
+    "React": ("react", "react.js", "reactjs"),
+    "Redux": ("redux",),
+    "Next.js": ("next.js", "nextjs"),
+    "Vue": ("vue", "vue.js", "vuejs"),
+    "Nuxt": ("nuxt", "nuxt.js"),
+    "Angular": ("angular", "angularjs", "angular.js"),
+    "Svelte": ("svelte",),
+    "Node.js": ("node.js", "nodejs", "node"),
+    "Express": ("express", "express.js", "expressjs"),
+    "NestJS": ("nestjs", "nest.js"),
+    "Django": ("django",),
+    "Flask": ("flask",),
+    "FastAPI": ("fastapi",),
+    "Spring": ("spring",),
+    "Spring Boot": ("spring boot", "springboot"),
+    "Rails": ("rails", "ruby on rails", "ror"),
+    "Laravel": ("laravel",),
+    ".NET": (".net", "dotnet", ".net core"),
+    "ASP.NET": ("asp.net", "asp.net core"),
+    "Electron": ("electron",),
+    "Tailwind CSS": ("tailwind", "tailwind css", "tailwindcss"),
+    "Bootstrap": ("bootstrap",),
+    # APIs and architecture
+    "REST": ("rest", "restful", "rest api", "rest apis", "restful api", "restful apis"),
+    "GraphQL": ("graphql",),
+    "gRPC": ("grpc",),
+    "WebSockets": ("websocket", "websockets"),
+    "Microservices": ("microservices", "microservice"),
+    "OAuth": ("oauth", "oauth2"),
+    "JWT": ("jwt",),
+    # Data stores
+    "PostgreSQL": ("postgresql", "postgres", "psql"),
+    "MySQL": ("mysql",),
+    "SQLite": ("sqlite",),
+    "SQL Server": ("sql server", "mssql"),
+    "Oracle Database": ("oracle database", "oracle db"),
+    "MongoDB": ("mongodb", "mongo"),
+    "Redis": ("redis",),
+    "Elasticsearch": ("elasticsearch", "elastic search"),
+    "DynamoDB": ("dynamodb",),
+    "Cassandra": ("cassandra",),
+    "Firebase": ("firebase",),
+    "Supabase": ("supabase",),
+    "NoSQL": ("nosql",),
+    # Messaging and data processing
+    "Kafka": ("kafka", "apache kafka"),
+    "RabbitMQ": ("rabbitmq",),
+    "Spark": ("spark", "apache spark", "pyspark"),
+    "Airflow": ("airflow", "apache airflow"),
+    "Pandas": ("pandas",),
+    "NumPy": ("numpy",),
+    "Tableau": ("tableau",),
+    "Power BI": ("power bi", "powerbi"),
+    "Excel": ("excel",),
+    # Machine learning
+    "Machine Learning": ("machine learning", "ml"),
+    "Deep Learning": ("deep learning",),
+    "NLP": ("nlp", "natural language processing"),
+    "Computer Vision": ("computer vision",),
+    "TensorFlow": ("tensorflow",),
+    "PyTorch": ("pytorch", "torch"),
+    "scikit-learn": ("scikit-learn", "sklearn", "scikit learn"),
+    "LLM": ("llm", "llms", "large language models"),
+    # Cloud and infrastructure
+    "AWS": ("aws", "amazon web services"),
+    "Azure": ("azure", "microsoft azure"),
+    "GCP": ("gcp", "google cloud", "google cloud platform"),
+    "Docker": ("docker",),
+    "Docker Compose": ("docker compose", "docker-compose"),
+    "Kubernetes": ("kubernetes", "k8s"),
+    "Terraform": ("terraform",),
+    "Ansible": ("ansible",),
+    "Linux": ("linux",),
+    "Nginx": ("nginx",),
+    "Serverless": ("serverless",),
+    "Prometheus": ("prometheus",),
+    "Grafana": ("grafana",),
+    # Delivery and tooling
+    "Git": ("git",),
+    "GitHub": ("github",),
+    "GitLab": ("gitlab",),
+    "CI/CD": ("ci/cd", "ci cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"),
+    "GitHub Actions": ("github actions",),
+    "GitLab CI": ("gitlab ci",),
+    "Jenkins": ("jenkins",),
+    "CircleCI": ("circleci",),
+    "Fastlane": ("fastlane",),
+    "Unit Testing": ("unit testing", "unit tests", "unit test", "unit-testing"),
+    "TDD": ("tdd", "test-driven development", "test driven development"),
+    "Jest": ("jest",),
+    "Pytest": ("pytest",),
+    "JUnit": ("junit",),
+    "XCTest": ("xctest",),
+    "Cypress": ("cypress",),
+    "Selenium": ("selenium",),
+    "Figma": ("figma",),
+    "Unity": ("unity",),
+}
+
+# A skill implies the skills it covers (applied transitively)
+SKILL_IMPLIES: Dict[str, Tuple[str, ...]] = {
+    # Cross-platform frameworks cover both mobile platforms, not the native languages
+    "Flutter": ("Dart", "iOS", "Android"),
+    "Bloc": ("Flutter",),
+    "Riverpod": ("Flutter",),
+    "React Native": ("React", "JavaScript", "iOS", "Android"),
+    "Xamarin": ("C#", "iOS", "Android"),
+    "Ionic": ("JavaScript", "iOS", "Android"),
+    "SwiftUI": ("Swift", "iOS"),
+    "UIKit": ("Swift", "iOS"),
+    "Objective-C": ("iOS",),
+    "Core Data": ("iOS",),
+    "XCTest": ("iOS", "Unit Testing"),
+    "Jetpack Compose": ("Kotlin", "Android"),
+    "Redux": ("React",),
+    "Next.js": ("React",),
+    "React": ("JavaScript",),
+    "Nuxt": ("Vue",),
+    "Vue": ("JavaScript",),
+    "Svelte": ("JavaScript",),
+    "Angular": ("TypeScript",),
+    "TypeScript": ("JavaScript",),
+    "Node.js": ("JavaScript",),
+    "Express": ("Node.js",),
+    "NestJS": ("Node.js", "TypeScript"),
+    "Electron": ("JavaScript",),
+    "Django": ("Python",),
+    "Flask": ("Python",),
+    "FastAPI": ("Python",),
+    "Pandas": ("Python",),
+    "NumPy": ("Python",),
+    "PyTorch": ("Python", "Deep Learning"),
+    "TensorFlow": ("Deep Learning",),
+    "Deep Learning": ("Machine Learning",),
+    "scikit-learn": ("Python", "Machine Learning"),
+    "Pytest": ("Python", "Unit Testing"),
+    "Jest": ("JavaScript", "Unit Testing"),
+    "JUnit": ("Java", "Unit Testing"),
+    "TDD": ("Unit Testing",),
+    "Spring Boot": ("Spring",),
+    "Spring": ("Java",),
+    "Rails": ("Ruby",),
+    "Laravel": ("PHP",),
+    "ASP.NET": (".NET", "C#"),
+    "PostgreSQL": ("SQL",),
+    "MySQL": ("SQL",),
+    "SQLite": ("SQL",),
+    "SQL Server": ("SQL",),
+    "Oracle Database": ("SQL",),
+    "MongoDB": ("NoSQL",),
+    "DynamoDB": ("NoSQL", "AWS"),
+    "Cassandra": ("NoSQL",),
+    "Docker Compose": ("Docker",),
+    "GitHub Actions": ("CI/CD", "GitHub"),
+    "GitLab CI": ("CI/CD", "GitLab"),
+    "Jenkins": ("CI/CD",),
+    "CircleCI": ("CI/CD",),
+    "GitHub": ("Git",),
+    "GitLab": ("Git",),
+    "Sass": ("CSS",),
+    "Tailwind CSS": ("CSS",),
+    "Bootstrap": ("CSS",),
+}
+
+# Aliases that are also ordinary English words: in running text they only
+# count when not written in lowercase ("Swift", "REST", not "swift", "the rest")
+CASED_ALIASES = frozenset({
+    "go", "swift", "rust", "rest", "dart", "spring", "express", "ruby", "react", "spark",
+    "unity", "excel", "ionic", "electron", "node", "torch", "bloc", "ts", "ml",
+    "rails", "jest", "ror", "flask", "bootstrap",
+})
+# Too ambiguous for running text; only recognized as entries of a skills list
+LIST_ONLY_SKILLS = frozenset({"C", "R"})
+
+# Sentences with these mark their skills as nice to have
+OPTIONAL_MARKERS = re.compile(
+    r"\b(?:nice[- ]to[- ]have|a plus|is a plus|bonus|preferred|desirable|advantage(?:ous)?|optional)\b",
+    re.IGNORECASE,
+)
+
+# Capitalized words common in job ads that are not skills
+GENERIC_TERMS = frozenset("""
+a an and or the of for to in on with at by from as is are be our we you your us they it this that
+senior junior lead principal staff mid level intern head chief manager engineer engineers engineering
+developer developers development software mobile web frontend front-end backend back-end full-stack
+fullstack stack team teams experience years year strong solid good excellent knowledge understanding
+ability skills skill required requirements responsibilities qualifications preferred plus bonus
+bachelor bachelors bachelor's master masters degree computer science equivalent related field
+apps app application applications building build design designing architecture systems system
+platform platforms api apis services service tools tool data cloud product products company
+remote hybrid onsite office location salary benefits english communication collaboration
+must should will can may etc including such e.g i.e job role position candidate candidates
+we're you'll you're who what why how about join work working help new modern high quality
+""".split())
+
+MAX_UNRECOGNIZED_TERMS = 12
+
+_TOKEN = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#]*(?:[.\-'][A-Za-z0-9+#]+)*")
+_VERSION_SUFFIX = re.compile(r"^(.*?[a-z+#])v?\d+(?:\.\d+)*$")
+_SENTENCE_BREAK = re.compile(r"[.!?;:](?:\s|$)|\n")
+_ALTERNATIVE_GAP = re.compile(r"^\s*(?:/|\||or|,|,\s*or|and|,\s*and|&)\s*$", re.IGNORECASE)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int, int]]:
+    """(raw, lowercase, start, end) per token"""
+    return [(m.group(), m.group().lower(), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+
+
+def _unversioned(token: str) -> str:
+    match = _VERSION_SUFFIX.match(token)
+    return match.group(1) if match else token
+
+
+def _phrase(alias: str) -> Tuple[str, ...]:
+    return tuple(token for _, token, _, _ in _tokenize(alias))
+
+
+def _build_index(phrases: Iterable[Tuple[Tuple[str, ...], str]]) -> Dict[str, List[Tuple[Tuple[str, ...], str]]]:
+    index: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+    for phrase, skill in phrases:
+        if phrase:
+            index.setdefault(phrase[0], []).append((phrase, skill))
+    for candidates in index.values():
+        candidates.sort(key=lambda candidate: -len(candidate[0]))  # longest alias wins
+    return index
+
+
+_SKILL_INDEX = _build_index(
+    (_phrase(alias), skill) for skill, aliases in SKILL_TAXONOMY.items() for alias in aliases
+)
+_SKILL_KEYS = {skill.lower(): skill for skill in SKILL_TAXONOMY}
+
+
+def _closure(skills: Iterable[str]) -> Set[str]:
+    covered = set()
+    pending = list(skills)
+    while pending:
+        skill = pending.pop()
+        if skill not in covered:
+            covered.add(skill)
+            pending.extend(SKILL_IMPLIES.get(skill, ()))
+    return covered
+
+
+@dataclass
+class _Mention:
+    skill: str
+    start: int
+    end: int
+    first_token: int
+
+
+def _scan(tokens: list, index: dict, running_text: bool) -> List[_Mention]:
+    """All alias occurrences, left to right, longest alias first at each position"""
+    mentions = []
+    i = 0
+    while i < len(tokens):
+        raw, lower, _, _ = tokens[i]
+        candidates = index.get(lower) or index.get(_unversioned(lower)) or ()
+        matched = None
+        for phrase, skill in candidates:
+            end = i + len(phrase)
+            if end > len(tokens):
+                continue
+            if all(tokens[i + k][1] == part or _unversioned(tokens[i + k][1]) == part
+                   for k, part in enumerate(phrase)):
+                if running_text and (skill in LIST_ONLY_SKILLS
+                                     or (len(phrase) == 1 and phrase[0] in CASED_ALIASES and raw.islower())):
+                    continue
+                matched = (phrase, skill)
+                break
+        if matched:
+            phrase, skill = matched
+            mentions.append(_Mention(skill, tokens[i][2], tokens[i + len(phrase) - 1][3], i))
+            i += len(phrase)
+        else:
+            i += 1
+    return mentions
+
+
+def normalize_skill(name: str) -> Optional[str]:
+    """Canonical taxonomy name for a single skill string, or None if unknown"""
+    if not isinstance(name, str):
+        return None
+    if name.lower() in _SKILL_KEYS:
+        return _SKILL_KEYS[name.lower()]
+    mentions = _scan(_tokenize(name), _SKILL_INDEX, running_text=False)
+    return mentions[0].skill if len(mentions) == 1 else None
+
+
+def skills_in_text(text: str, running_text: bool = True) -> List[str]:
+    """
+    Canonical taxonomy skills mentioned in a text, in order of first mention.
+    Pass running_text=False for skill list entries, where "swift" or "C" are skills.
+    """
+    if not isinstance(text, str):
+        return []
+    mentions = _scan(_tokenize(text), _SKILL_INDEX, running_text=running_text)
+    return list(dict.fromkeys(mention.skill for mention in mentions))
+
+
+def implied_skills(skills: Iterable[str]) -> Set[str]:
+    """The skills plus everything they imply (Flutter -> Dart, iOS, Android)"""
+    return _closure(skills)
+
+
+def _custom_key(name: str) -> str:
+    return " ".join(_unversioned(token) for _, token, _, _ in _tokenize(name))
+
+
+@dataclass
+class SkillProfile:
+    """Skills a CV shows: taxonomy skills (with implications) plus unknown skill entries"""
+    skills: Set[str] = field(default_factory=set)
+    covered: Set[str] = field(default_factory=set)
+    custom: Dict[str, str] = field(default_factory=dict)  # normalized key -> name as written
+
+    def has(self, name: str) -> bool:
+        skill = normalize_skill(name)
+        if skill is not None:
+            return skill in self.covered
+        return _custom_key(name) in self.custom
+
+
+def _cv_sections(cv_data) -> dict:
+    if not isinstance(cv_data, dict):
+        return {}
+    template = cv_data.get("cv_template", cv_data)
+    sections = template.get("sections", {}) if isinstance(template, dict) else {}
+    return sections if isinstance(sections, dict) else {}
+
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+
+
+def build_skill_profile(cv_data) -> SkillProfile:
+    """Collect skills from the skills section, technologies lists and experience/project text"""
+    sections = _cv_sections(cv_data)
+    profile = SkillProfile()
+
+    skills_section = sections.get("skills", {})
+    categories = skills_section.get("categories", []) if isinstance(skills_section, dict) else []
+    for category in categories if isinstance(categories, list) else []:
+        if not isinstance(category, dict) or str(category.get("name", "")).strip().lower() == "languages":
+            continue  # spoken languages
+        for item in category.get("items", []) if isinstance(category.get("items"), list) else []:
+            if not isinstance(item, str) or not item.strip():
+                continue
+            found = _scan(_tokenize(item), _SKILL_INDEX, running_text=False)
+            profile.skills.update(mention.skill for mention in found)
+            if not found:
+                profile.custom.setdefault(_custom_key(item), item.strip())
+
+    for key in ("experience", "projects"):
+        section = sections.get(key, {})
+        items = section.get("items", []) if isinstance(section, dict) else []
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            for technology in _strings(item.get("technologies", [])):
+                profile.skills.update(m.skill for m in _scan(_tokenize(technology), _SKILL_INDEX, False))
+            for text in _strings({k: v for k, v in item.items() if k not in ("technologies", "dates", "link")}):
+                profile.skills.update(m.skill for m in _scan(_tokenize(text), _SKILL_INDEX, True))
+
+    profile.covered = _closure(profile.skills)
+    return profile
+
+
+@dataclass
+class SkillMatch:
+    matches: List[str]
+    missing: List[str]
+    unrecognized: List[str]
+    profile: SkillProfile
+    optional: List[str] = field(default_factory=list)
+
+    def resolve(self, classified: Optional[dict] = None) -> dict:
+        """
+        Final matches/missing, adding the model's verdict on `unrecognized`
+        terms. Anything the model returns that is not one of those terms is
+        ignored, so taxonomy skills are always decided locally.
+        """
+        matches, missing = list(self.matches), list(self.missing)
+        if classified:
+            terms = {term.lower(): term for term in self.unrecognized}
+            seen = {name.lower() for name in matches + missing}
+            for key, target in (("matches", matches), ("missing", missing)):
+                for name in classified.get(key, []) or []:
+                    term = terms.get(str(name).strip().lower())
+                    if term and term.lower() not in seen:
+                        target.append(term)
+                        seen.add(term.lower())
+        return {"matches": matches, "missing": missing}
+
+
+def _sentence_bounds(text: str) -> List[int]:
+    return [m.end() for m in _SENTENCE_BREAK.finditer(text)]
+
+
+def _alternative_groups(mentions: List[_Mention], text: str) -> List[List[_Mention]]:
+    """
+    Split mentions into requirement groups. Neighbours joined by "/" are
+    alternatives; a list joined by commas is one group of alternatives when
+    its connectors include "or" and none is "and".
+    """
+    groups: List[List[_Mention]] = []
+    chain: List[_Mention] = []
+    gaps: List[str] = []
+
+    def flush():
+        if not chain:
+            return
+        words = {gap.strip(" ,").lower() for gap in gaps}
+        if "or" in words and "and" not in words and "&" not in words:
+            groups.append(list(chain))
+        else:
+            current = [chain[0]]
+            for mention, gap in zip(chain[1:], gaps):
+                if gap.strip() in ("/", "|"):
+                    current.append(mention)
+                else:
+                    groups.append(current)
+                    current = [mention]
+            groups.append(current)
+        chain.clear()
+        gaps.clear()
+
+    for mention in mentions:
+        if chain:
+            gap = text[chain[-1].end:mention.start]
+            if _ALTERNATIVE_GAP.match(gap):
+                chain.append(mention)
+                gaps.append(gap)
+                continue
+            flush()
+        chain.append(mention)
+    flush()
+    return groups
+
+
+def _unrecognized_terms(tokens: list, mentions: List[_Mention], bounds: List[int], profile: SkillProfile) -> List[str]:
+    """Capitalized, non-generic words outside recognized skills, not opening a sentence"""
+    covered = set()
+    for mention in mentions:
+        covered.update(range(mention.start, mention.end))
+    sentence_starts = {0, *bounds}
+
+    terms, current = [], []
+    for index, (raw, lower, start, end) in enumerate(tokens):
+        candidate = (
+            start not in covered
+            and any(c.isupper() for c in raw)
+            and any(c.isalpha() for c in raw)
+            and len(raw) > 1  # "C", "R", "Plan B": too ambiguous for the model as well
+            and lower.strip(".") not in GENERIC_TERMS
+            and not _opens_sentence(tokens, index, sentence_starts)
+        )
+        if candidate:
+            current.append(raw)
+            continue
+        if current:
+            terms.append(" ".join(current))
+            current = []
+    if current:
+        terms.append(" ".join(current))
+
+    unique = []
+    for term in terms:
+        if term.lower() not in {t.lower() for t in unique} and _custom_key(term) not in profile.custom:
+            unique.append(term)
+    return unique[:MAX_UNRECOGNIZED_TERMS]
+
+
+def _opens_sentence(tokens: list, index: int, sentence_starts: set) -> bool:
+    if index == 0:
+        return True
+    start = tokens[index][2]
+    previous_end = tokens[index - 1][3]
+    return any(previous_end <= boundary <= start for boundary in sentence_starts)
+
+
+def match_skills(cv_data, job_description: str) -> SkillMatch:
+    """Required skills of the job description, split into those the CV has and those it lacks"""
+    profile = build_skill_profile(cv_data)
+    text = job_description or ""
+    tokens = _tokenize(text)
+
+    # The CV's own unknown skills are matched verbatim against the job description
+    custom_index = _build_index((tuple(key.split()), name) for key, name in profile.custom.items())
+    mentions = sorted(
+        _scan(tokens, _SKILL_INDEX, running_text=True) + _scan(tokens, custom_index, running_text=True),
+        key=lambda mention: mention.start,
+    )
+    bounds = _sentence_bounds(text)
+
+    def sentence_of(position: int) -> int:
+        return bisect.bisect_right(bounds, position)
+
+    optional_sentences = set()
+    previous = 0
+    for index, boundary in enumerate(bounds + [len(text)]):
+        if OPTIONAL_MARKERS.search(text[previous:boundary]):
+            optional_sentences.add(index)
+        previous = boundary
+
+    def cv_has(skill: str) -> bool:
+        return skill in profile.covered or skill in profile.custom.values()
+
+    matches, missing, optional = [], [], []
+    for group in _alternative_groups(mentions, text):
+        names = list(dict.fromkeys(mention.skill for mention in group))
+        is_optional = all(sentence_of(mention.start) in optional_sentences for mention in group)
+        present = [name for name in names if cv_has(name)]
+        if present:
+            matches.extend(present)
+        elif is_optional:
+            optional.extend(names)
+        else:
+            missing.append(names[0])
+
+    # A skill required anywhere is required; the first verdict for a name wins
+    matches = list(dict.fromkeys(matches))
+    missing = [name for name in dict.fromkeys(missing) if name not in matches]
+    optional = [name for name in dict.fromkeys(optional) if name not in matches and name not in missing]
+
+    return SkillMatch(
+        matches=matches,
+        missing=missing,
+        unrecognized=_unrecognized_terms(tokens, mentions, bounds, profile),
+        profile=profile,
+        optional=optional,
+    )